@@ -1,4 +1,6 @@
-from guage_kit.utils.io import load_run_artifacts
+from guage_kit.datasets.indexed import IndexedJsonl
+from guage_kit.reporting.run_store import DEFAULT_RUNS_DIR, MANIFEST_NAME, USAGE_FIELDS, RunStore
+import pyarrow as pa
 import streamlit as st
 import json
 import os
@@ -6,7 +8,7 @@ import os
 st.title("Results Explorer")
 
 # Directory to load run artifacts from
-artifacts_dir = ".guage_kit/runs"
+artifacts_dir = str(DEFAULT_RUNS_DIR)
 
 # List all available runs
 runs = [d for d in os.listdir(artifacts_dir) if os.path.isdir(os.path.join(artifacts_dir, d))]
@@ -14,13 +16,13 @@ selected_run = st.selectbox("Select a run", runs)
 
 if selected_run:
     run_path = os.path.join(artifacts_dir, selected_run)
-    
+
     # Load the JSON report
     report_path = os.path.join(run_path, "last_report.json")
     if os.path.exists(report_path):
         with open(report_path) as f:
             report = json.load(f)
-        
+
         st.subheader("Metrics Overview")
         st.json(report)
 
@@ -28,5 +30,41 @@ if selected_run:
         for metric, value in report.items():
             st.write(f"**{metric}**: {value}")
 
-    else:
-        st.warning("No report found for the selected run.")
\ No newline at end of file
+    elif not os.path.exists(os.path.join(run_path, MANIFEST_NAME)):
+        st.warning("No report found for the selected run.")
+
+    # Per-sample scores written by evaluate(run_dir=...)
+    if os.path.exists(os.path.join(run_path, MANIFEST_NAME)):
+        store = RunStore(run_path)
+        st.subheader("Metrics Overview")
+        if store.complete:
+            st.json(store.results)
+        else:
+            st.info(f"Incomplete run: {store.num_rows} samples stored so far.")
+
+        # Only averaged metrics have one score per sample; BLEU rows hold n-gram statistics
+        schema = store.schema
+        scalar_metrics = [m for m in store.metrics if schema is not None and pa.types.is_floating(schema.field(m).type)]
+        if scalar_metrics and store.num_rows:
+            metric = st.selectbox("Metric", scalar_metrics)
+            # Read only the columns shown instead of the whole run
+            table = store.read(["row", "query_id", metric, *USAGE_FIELDS]).to_pandas()
+            st.subheader("Lowest-scoring samples")
+            st.dataframe(table.sort_values(metric).head(100))
+            st.subheader("Score distribution")
+            st.bar_chart(table[metric].dropna().round(2).value_counts().sort_index())
+            usage = table[list(USAGE_FIELDS)].dropna(axis=1, how="all")
+            if not usage.empty:
+                st.subheader("Latency and tokens")
+                st.dataframe(usage.describe())
+
+    # Browse per-sample rows without loading the whole file
+    samples_path = os.path.join(run_path, "samples.jsonl")
+    if os.path.exists(samples_path):
+        samples = IndexedJsonl(samples_path)
+        st.subheader("Samples")
+        if len(samples):
+            row = st.number_input("Row", min_value=0, max_value=len(samples) - 1, value=0, step=1)
+            st.json(samples[int(row)])
+        else:
+            st.info("The run has no samples.")
@@ -1,33 +1,38 @@
-from guage_kit.utils.io import load_run_artifacts
+from guage_kit.api import compare
+from guage_kit.utils.io import loads_json
+import pandas as pd
 import streamlit as st
 
 st.title("Compare Runs")
 
-# File uploader for selecting run artifacts
-run1_file = st.file_uploader("Upload first run artifact (JSON)", type="json")
-run2_file = st.file_uploader("Upload second run artifact (JSON)", type="json")
-
-if run1_file and run2_file:
-    # Load the run artifacts
-    run1_data = load_run_artifacts(run1_file)
-    run2_data = load_run_artifacts(run2_file)
-
-    # Display the metrics for both runs
-    st.subheader("Run 1 Metrics")
-    st.json(run1_data)
-
-    st.subheader("Run 2 Metrics")
-    st.json(run2_data)
-
-    # Compare metrics
+# Per-sample run files; samples are paired by query id
+run1_file = st.file_uploader("Upload baseline run (JSONL)", type="jsonl")
+run2_file = st.file_uploader("Upload candidate run (JSONL)", type="jsonl")
+metrics = st.multiselect(
+    "Metrics", ["rougeL", "rouge1", "rouge2", "bleu", "recall@5", "recall@10", "mrr", "ndcg@10", "map",
+                "answer_relevancy", "semantic_similarity"],
+    default=["rougeL", "bleu"],
+)
+resamples = st.number_input("Resamples", min_value=100, max_value=100_000, value=10_000, step=1000)
+correction = st.selectbox("Multiple-comparison correction", ["holm", "bonferroni", "fdr_bh", "none"])
+
+if run1_file and run2_file and metrics:
+    run1_rows = [loads_json(line) for line in run1_file.getvalue().splitlines() if line.strip()]
+    run2_rows = [loads_json(line) for line in run2_file.getvalue().splitlines() if line.strip()]
+
+    with st.spinner("Running paired tests..."):
+        result = compare(run1_rows, run2_rows, metrics, n_resamples=int(resamples), correction=correction)
+
+    st.write(
+        f"{result['num_samples']} paired samples "
+        f"({result['only_a']} only in the baseline, {result['only_b']} only in the candidate)"
+    )
+    table = pd.DataFrame(result["metrics"]).T
     st.subheader("Comparison")
-    comparison = {key: (run1_data.get(key), run2_data.get(key)) for key in set(run1_data) | set(run2_data)}
-    st.json(comparison)
+    st.dataframe(table)
 
-    # Optionally, add visualizations for comparison
-    # e.g., bar charts, line charts, etc. using Streamlit's charting capabilities
-    st.line_chart([run1_data.get('metric_name'), run2_data.get('metric_name')], 
-                   use_container_width=True)  # Replace 'metric_name' with actual metric keys
+    # Improvement of the candidate per metric (sign flipped for lower-is-better metrics)
+    st.bar_chart(table["delta"].astype(float))
 
 else:
-    st.warning("Please upload both run artifacts to compare.")
\ No newline at end of file
+    st.warning("Please upload both runs and select at least one metric to compare.")
@@ -1,14 +1,61 @@
 """Main API for the Guage-Kit evaluation toolkit."""
 
-from typing import Iterable, Mapping, Any, Union, List, Optional
+from typing import Dict, Iterable, Iterator, Mapping, Any, Tuple, Union, List, Optional
 import json
 import pathlib
-from .schemas.core import EvalSample, Query, Generation, RetrievalResult
-from .datasets.loaders import load_jsonl, load_csv
-from .metrics.llm_quality import compute_rouge, compute_bleu
-from .metrics.retrieval_ir import compute_recall_at_k, compute_mrr, compute_ndcg
-from .metrics.rag_quality import compute_answer_relevancy
-from .metrics.embeddings import compute_sts_spearman
+import numpy as np
+import pandas as pd
+from .schemas.core import EvalSample
+from .datasets.columnar import batch_columns, is_columnar_path, iter_column_batches
+from .datasets.loaders import iter_path, row_to_sample
+from .metrics.accumulators import DEFAULT_BOOTSTRAP_GROUPS
+from .metrics.planner import LOWER_IS_BETTER, USAGE_COLUMNS, MetricPlan, extract_columns, plan_metrics
+from .metrics.significance import DEFAULT_RESAMPLES, DEFAULT_TEST_GROUPS, paired_tests
+from .metrics.scheduler import query_ids, score_chunks, score_column_batches, score_jsonl, score_to_store
+from .reporting.run_store import RunStore
+from .utils.cache import DEFAULT_CACHE_DIR, DiskCache
+from .utils.parallel import chunked
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def iter_samples(data: Union[Iterable[Union[EvalSample, Mapping[str, Any]]], str]) -> Iterator[EvalSample]:
+    """Lazily yield EvalSample objects from a data file path or an iterable.
+
+    Rows are read and converted one at a time, so the full dataset is never
+    materialised. Iterables may contain EvalSample objects or raw row dicts.
+    """
+    rows = iter_path(pathlib.Path(data)) if isinstance(data, str) else data
+    for index, item in enumerate(rows):
+        yield item if isinstance(item, EvalSample) else row_to_sample(item, index)
+
+
+def iter_column_chunks(
+    data: Union[Iterable[EvalSample], str], columns: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Mapping[str, Any]]:
+    """Yield chunks of ``data`` as planner column batches.
+
+    Columnar files are read as Arrow record batches; other inputs are streamed
+    as samples and their columns extracted per chunk.
+    """
+    columns = set(columns)
+    if isinstance(data, str) and is_columnar_path(data):
+        return (batch_columns(batch) for batch in iter_column_batches(data, columns, chunk_size))
+    return (extract_columns(chunk, columns) for chunk in chunked(iter_samples(data), chunk_size))
+
+
+def _fit_plan(plan: MetricPlan, data: Union[Iterable[EvalSample], str], chunk_size: int) -> None:
+    # Dataset-level models (e.g. rag.tfidf='corpus') need an extra pass
+    if not isinstance(data, str) and iter(data) is data:
+        raise ValueError("Corpus-fitted metrics need a file path or a re-iterable dataset, not an iterator")
+    plan.fit(lambda: iter_column_chunks(data, plan.columns, chunk_size))
+
+
+def _open_score_cache(cache: Union[bool, str], config: Mapping[str, Any]) -> Optional[DiskCache]:
+    if not cache:
+        return None
+    cache_dir = DEFAULT_CACHE_DIR if cache is True else pathlib.Path(cache)
+    return DiskCache(cache_dir / "scores.sqlite", max_entries=config.get('cache.max_entries', 10_000_000))
 
 
 def evaluate(
@@ -17,114 +64,121 @@ def evaluate(
     config: Optional[Mapping[str, Any]] = None,
     parallelism: int = 1,
     report: Optional[Mapping[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Union[bool, str] = False,
+    bootstrap: int = 0,
+    run_dir: Optional[str] = None,
 ) -> dict[str, float]:
     """Run selected metrics and return aggregated scores.
+
+    Samples are streamed from ``data`` and scored in chunks of ``chunk_size``;
+    each metric folds its chunk results into a running accumulator, so memory
+    stays bounded regardless of dataset size. With ``parallelism > 1`` chunks
+    are scored in worker processes and their partial aggregates merged in
+    input order, giving the same scores as a serial run.
+
+    Parquet and Arrow IPC files (``.parquet``, ``.arrow``, ``.feather``) are
+    read column-wise: only the fields the requested metrics need are loaded
+    and scored straight from Arrow arrays, without building per-row models.
+    Requires ``pyarrow``. JSONL files scored with ``parallelism > 1`` are
+    indexed once (the index is cached next to the file) and each worker parses
+    its own byte range.
+
+    With ``bootstrap > 0`` every metric also gets a percentile confidence
+    interval (``<metric>.ci_lower`` and ``<metric>.ci_upper``). Samples are
+    hashed by row number into ``bootstrap.groups`` groups (default 1000) whose
+    summed statistics are resampled with one Poisson weight matrix shared by
+    all metrics; corpus metrics such as BLEU are recomputed from resampled
+    n-gram statistics. ``bootstrap.confidence_level`` (default 0.95) and
+    ``bootstrap.seed`` (default 0) are read from ``config``.
+
+    With ``run_dir`` the per-sample values of every metric, the query ids and
+    any ``latency_ms``/``prompt_tokens``/``completion_tokens`` fields are
+    written to a :class:`~guage_kit.reporting.run_store.RunStore` chunk by
+    chunk. Calling ``evaluate`` again with the same directory, metrics,
+    config and chunk size resumes an interrupted run after its last stored
+    chunk, or returns a completed run's results without rescoring.
     
     Args:
-        data: Either an iterable of EvalSample objects or a path to a data file
+        data: Either an iterable of EvalSample objects (or raw row dicts) or a path to a
+            ``.jsonl``, ``.csv``, ``.parquet`` or Arrow IPC file
         metrics: List of metric names to compute (e.g., ['rougeL', 'bleu', 'recall@10'])
         config: Optional configuration dictionary for metric parameters
-        parallelism: Number of parallel workers (currently not implemented)
+        parallelism: Number of worker processes used to score chunks
         report: Optional dictionary mapping report types to file paths
+        chunk_size: Number of samples scored together per chunk
+        cache: Reuse per-sample scores from an on-disk cache. ``True`` uses
+            ``.guage_kit/cache``; a string selects another cache directory.
+            ``cache.max_entries`` in ``config`` bounds its size.
+        bootstrap: Number of bootstrap resamples for confidence intervals; 0 disables them.
+        run_dir: Directory of a per-sample run store to write or resume.
         
     Returns:
-        Dictionary mapping metric names to their computed scores
+        Dictionary mapping metric names to their computed scores. Empty if
+        ``data`` contains no samples.
+
+    Raises:
+        ValueError: If ``run_dir`` holds a run with other metrics, config, chunk size or data file.
     """
     if config is None:
         config = {}
-        
-    # Load data if provided as string path
-    if isinstance(data, str):
-        data_path = pathlib.Path(data)
-        if data_path.suffix == '.jsonl':
-            raw_data = load_jsonl(data_path)
-        elif data_path.suffix == '.csv':
-            raw_data = load_csv(data_path)
-        else:
-            raise ValueError(f"Unsupported file format: {data_path.suffix}")
-            
-        # Convert raw data to EvalSample objects
-        eval_samples = []
-        for item in raw_data:
-            # Handle different data formats
-            if 'query' in item and 'generation' in item:
-                # Already in the right format
-                query = Query(**item['query'])
-                generation = Generation(**item['generation'])
-                retrieval = None
-                if 'retrieval' in item and item['retrieval']:
-                    retrieval = RetrievalResult(**item['retrieval'])
-                eval_samples.append(EvalSample(query=query, generation=generation, retrieval=retrieval))
-            else:
-                # Simple format conversion
-                query = Query(
-                    id=item.get('id', str(len(eval_samples))),
-                    prompt=item.get('prompt', item.get('question', '')),
-                    references=item.get('references', [item.get('reference')] if item.get('reference') else None)
-                )
-                generation = Generation(
-                    query_id=query.id,
-                    text=item.get('prediction', item.get('answer', '')),
-                    model=item.get('model', None)
-                )
-                eval_samples.append(EvalSample(query=query, generation=generation))
-        
-        data = eval_samples
-    
-    # Convert to list if iterator
-    if not isinstance(data, list):
-        data = list(data)
-    
-    # Compute metrics
-    results = {}
-    
-    for metric in metrics:
-        if metric == 'rougeL':
-            predictions = [sample.generation.text for sample in data]
-            references = []
-            for sample in data:
-                if sample.query.references:
-                    references.append(sample.query.references)
-                else:
-                    references.append([''])  # Empty reference if none provided
-            rouge_scores = compute_rouge(predictions, references)
-            results['rougeL'] = rouge_scores.get('rougeL', 0.0)
-            
-        elif metric == 'bleu':
-            predictions = [sample.generation.text for sample in data]
-            references = []
-            for sample in data:
-                if sample.query.references:
-                    references.append(sample.query.references)
-                else:
-                    references.append([''])
-            bleu_score = compute_bleu(predictions, references)
-            results['bleu'] = bleu_score
-            
-        elif metric.startswith('recall@'):
-            k = int(metric.split('@')[1]) if '@' in metric else config.get('retrieval.k', 10)
-            recall_score = compute_recall_at_k(data, k)
-            results[metric] = recall_score
-            
-        elif metric == 'mrr':
-            mrr_score = compute_mrr(data)
-            results['mrr'] = mrr_score
-            
-        elif metric.startswith('ndcg@'):
-            k = int(metric.split('@')[1]) if '@' in metric else config.get('retrieval.k', 10)
-            ndcg_score = compute_ndcg(data, k)
-            results[metric] = ndcg_score
-            
-        elif metric == 'sts_spearman':
-            sts_score = compute_sts_spearman(data)
-            results['sts_spearman'] = sts_score
-            
-        elif metric == 'answer_relevancy':
-            relevancy_score = compute_answer_relevancy(data)
-            results['answer_relevancy'] = relevancy_score
-            
+
+    # Validate metric names before reading any data
+    plan = plan_metrics(metrics, config)
+    if bootstrap:
+        plan.enable_bootstrap(config.get('bootstrap.groups', DEFAULT_BOOTSTRAP_GROUPS))
+    columnar = isinstance(data, str) and is_columnar_path(data)
+
+    store = None
+    if run_dir is not None:
+        store = RunStore(run_dir)
+        store.begin(plan.metrics, config, chunk_size, data=data if isinstance(data, str) else None)
+
+    if store is not None and store.complete and not bootstrap:
+        # A finished run returns its stored results without rescoring
+        num_samples, results = store.num_rows, dict(store.results)
+    else:
+        if plan.needs_fit and not (store and store.complete):
+            _fit_plan(plan, data, chunk_size)
+
+        score_cache = _open_score_cache(cache, config)
+
+        if store is not None:
+            chunks = iter_column_chunks(data, plan.columns | {'query_id', *USAGE_COLUMNS}, chunk_size)
+            num_samples, accumulators = score_to_store(
+                chunks, plan, store, parallelism=parallelism, cache=score_cache
+            )
+        elif columnar:
+            num_samples, accumulators = score_column_batches(
+                iter_column_batches(data, plan.columns, chunk_size),
+                plan, parallelism=parallelism, cache=score_cache,
+            )
+        elif isinstance(data, str) and pathlib.Path(data).suffix == '.jsonl' and parallelism > 1:
+            # Workers parse their own byte ranges of the indexed file
+            num_samples, accumulators = score_jsonl(
+                data, plan, chunk_size=chunk_size, parallelism=parallelism, cache=score_cache
+            )
         else:
-            raise ValueError(f"Unknown metric: {metric}")
+            rows = iter_path(pathlib.Path(data)) if isinstance(data, str) else data
+            num_samples, accumulators = score_chunks(
+                rows, plan, chunk_size=chunk_size, parallelism=parallelism, cache=score_cache
+            )
+
+        if num_samples == 0:
+            return {}
+
+        results = {metric: accumulator.result() for metric, accumulator in accumulators.items()}
+        if store is not None and not store.complete:
+            store.finish(results)
+        if bootstrap:
+            intervals = plan.confidence_intervals(
+                accumulators, n_resamples=bootstrap,
+                confidence_level=config.get('bootstrap.confidence_level', 0.95),
+                seed=config.get('bootstrap.seed', 0),
+            )
+            for metric, (lower, upper) in intervals.items():
+                results[f"{metric}.ci_lower"] = lower
+                results[f"{metric}.ci_upper"] = upper
     
     # Save reports if requested
     if report:
@@ -133,7 +187,7 @@ def evaluate(
                 json.dump({
                     'metrics': results,
                     'config': config,
-                    'num_samples': len(data)
+                    'num_samples': num_samples
                 }, f, indent=2)
         
         if 'html' in report:
@@ -150,11 +204,130 @@ def evaluate(
             </ul>
             <h2>Configuration</h2>
             <pre>{json.dumps(config, indent=2)}</pre>
-            <p>Number of samples: {len(data)}</p>
+            <p>Number of samples: {num_samples}</p>
             </body>
             </html>
             """
             with open(report['html'], 'w') as f:
                 f.write(html_content)
     
-    return results
\ No newline at end of file
+    return results
+
+
+def score_samples(
+    data: Union[Iterable[EvalSample], str],
+    metrics: List[str],
+    config: Optional[Mapping[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Union[bool, str] = False,
+) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """Score every sample and keep the per-sample values instead of aggregating them.
+
+    Args:
+        data: Samples or a data file path, as accepted by :func:`evaluate`.
+        metrics: Metric names accepted by :func:`evaluate`.
+        config: Optional configuration dictionary for metric parameters.
+        chunk_size: Number of samples scored together per chunk.
+        cache: Per-sample score cache, as in :func:`evaluate`.
+
+    Returns:
+        The query id of every sample (its row number when it has none) and,
+        per metric, the values its accumulator folds: one score per sample
+        for averaged metrics (NaN where not applicable), one statistics row
+        per sample for BLEU.
+    """
+    if config is None:
+        config = {}
+    plan = plan_metrics(metrics, config)
+    if plan.needs_fit:
+        _fit_plan(plan, data, chunk_size)
+    score_cache = _open_score_cache(cache, config)
+
+    ids: List[str] = []
+    parts: Dict[str, List[np.ndarray]] = {metric: [] for metric in plan.metrics}
+    for columns in iter_column_chunks(data, plan.columns | {'query_id'}, chunk_size):
+        chunk_ids = query_ids(columns['query_id'], len(ids))
+        ids.extend(chunk_ids)
+        values = plan.score_columns(columns, len(chunk_ids), cache=score_cache)
+        for metric in plan.metrics:
+            parts[metric].append(np.asarray(values[metric], dtype=float))
+    return ids, {metric: np.concatenate(chunks) if chunks else np.zeros(0) for metric, chunks in parts.items()}
+
+
+def compare(
+    run_a: Union[Iterable[EvalSample], str],
+    run_b: Union[Iterable[EvalSample], str],
+    metrics: List[str],
+    config: Optional[Mapping[str, Any]] = None,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    alpha: float = 0.05,
+    correction: str = 'holm',
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Union[bool, str] = False,
+) -> Dict[str, Any]:
+    """Test whether two runs differ on each metric, pairing samples by query id.
+
+    Both runs are scored per sample, aligned on the query ids they share and
+    compared with a paired bootstrap and an approximate randomization test
+    (see :func:`guage_kit.metrics.significance.paired_tests`). p-values are
+    corrected for testing several metrics at once.
+
+    Args:
+        run_a: Baseline run (samples or data file path).
+        run_b: Candidate run.
+        metrics: Metric names accepted by :func:`evaluate`, except ``sts_spearman``.
+        config: Optional configuration dictionary; ``significance.groups`` and
+            ``significance.seed`` tune the resampling.
+        n_resamples: Bootstrap resamples and random swaps per test.
+        alpha: Significance level after correction.
+        correction: ``'holm'``, ``'bonferroni'``, ``'fdr_bh'`` or ``'none'``.
+        chunk_size: Number of samples scored together per chunk.
+        cache: Per-sample score cache, as in :func:`evaluate`.
+
+    Returns:
+        ``num_samples`` (aligned samples), ``only_a`` and ``only_b`` (samples
+        missing from the other run) and ``metrics``, the per-metric results of
+        :func:`~guage_kit.metrics.significance.paired_tests`. ``delta`` and its
+        interval are oriented so that positive means the candidate is better:
+        for metrics in :data:`~guage_kit.metrics.planner.LOWER_IS_BETTER`
+        (``ece``, ``brier``, ...) they are negated to ``a - b``, and
+        ``lower_is_better`` flags those metrics.
+
+    Raises:
+        ValueError: If a run repeats a query id or a metric cannot be tested pairwise.
+    """
+    if config is None:
+        config = {}
+    accumulators = plan_metrics(metrics, config).new_accumulators()
+    for metric, accumulator in accumulators.items():
+        if accumulator.sample_statistics(np.zeros(0)) is None:
+            raise ValueError(f"Metric {metric} has no per-sample statistics and cannot be tested pairwise")
+
+    ids_a, scores_a = score_samples(run_a, metrics, config, chunk_size=chunk_size, cache=cache)
+    ids_b, scores_b = score_samples(run_b, metrics, config, chunk_size=chunk_size, cache=cache)
+    for name, ids in (('run_a', ids_a), ('run_b', ids_b)):
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"{name} contains duplicate query ids")
+
+    position_b = pd.Index(ids_b).get_indexer(ids_a)
+    in_a = np.flatnonzero(position_b >= 0)
+    in_b = position_b[in_a]
+    results = paired_tests(
+        {metric: values[in_a] for metric, values in scores_a.items()},
+        {metric: values[in_b] for metric, values in scores_b.items()},
+        accumulators,
+        n_resamples=n_resamples, alpha=alpha, correction=correction,
+        n_groups=config.get('significance.groups', DEFAULT_TEST_GROUPS),
+        seed=config.get('significance.seed', 0),
+    )
+    for metric, result in results.items():
+        result['lower_is_better'] = metric in LOWER_IS_BETTER
+        if result['lower_is_better']:
+            result['delta'] = -result['delta']
+            result['ci_lower'], result['ci_upper'] = -result['ci_upper'], -result['ci_lower']
+    return {
+        'num_samples': len(in_a),
+        'only_a': len(ids_a) - len(in_a),
+        'only_b': len(ids_b) - len(in_b),
+        'metrics': results,
+    }
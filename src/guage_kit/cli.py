@@ -1,20 +1,89 @@
 from argparse import ArgumentParser
 import json
-from .api import evaluate
+import sys
+from .api import compare, evaluate
 
 def main():
     parser = ArgumentParser("guage-kit")
     subparsers = parser.add_subparsers(dest="cmd", required=True)
-    
+
     run_parser = subparsers.add_parser("run")
     run_parser.add_argument("--data", required=True, help="Path to the dataset (JSONL/CSV/Parquet)")
     run_parser.add_argument("--metrics", nargs="+", required=True, help="List of metrics to evaluate")
     run_parser.add_argument("--config", help="Path to the configuration file (YAML or JSON)")
     run_parser.add_argument("--report-html", help="Path to save the HTML report")
     run_parser.add_argument("--report-json", help="Path to save the JSON report")
-    
+    run_parser.add_argument("--parallelism", type=int, default=1, help="Number of worker processes used for scoring")
+    run_parser.add_argument("--cache", nargs="?", const=True, default=False, metavar="DIR",
+                            help="Reuse per-sample scores from an on-disk cache (default: .guage_kit/cache)")
+    run_parser.add_argument("--chunk-size", type=int, default=1000, help="Number of samples scored per streamed chunk")
+    run_parser.add_argument("--bootstrap", type=int, default=0, metavar="N",
+                            help="Add bootstrap confidence intervals from N resamples")
+    run_parser.add_argument("--run-dir", metavar="DIR",
+                            help="Write per-sample scores to a resumable run store (Parquet) in DIR")
+
+    compare_parser = subparsers.add_parser("compare", help="Paired significance tests between two runs")
+    compare_parser.add_argument("--baseline", required=True, help="Path to the baseline run's dataset")
+    compare_parser.add_argument("--candidate", required=True, help="Path to the candidate run's dataset")
+    compare_parser.add_argument("--metrics", nargs="+", required=True, help="List of metrics to compare")
+    compare_parser.add_argument("--config", help="Path to the configuration file (YAML or JSON)")
+    compare_parser.add_argument("--resamples", type=int, default=10_000, help="Bootstrap resamples and random swaps")
+    compare_parser.add_argument("--alpha", type=float, default=0.05, help="Significance level after correction")
+    compare_parser.add_argument("--correction", default="holm", choices=["holm", "bonferroni", "fdr_bh", "none"],
+                                help="Multiple-comparison correction")
+    compare_parser.add_argument("--cache", nargs="?", const=True, default=False, metavar="DIR",
+                                help="Reuse per-sample scores from an on-disk cache (default: .guage_kit/cache)")
+    compare_parser.add_argument("--chunk-size", type=int, default=1000, help="Number of samples scored per streamed chunk")
+    compare_parser.add_argument("--fail-on-regression", action="store_true",
+                                help="Exit with status 1 if the candidate is significantly worse on any metric")
+
+    drift_parser = subparsers.add_parser("drift", help="Embedding drift between two snapshots")
+    drift_parser.add_argument("--reference", required=True,
+                              help="Reference embeddings (.npy/.parquet) or a saved sketch (.npz)")
+    drift_parser.add_argument("--current", required=True,
+                              help="Current embeddings (.npy/.parquet) or a saved sketch (.npz)")
+    drift_parser.add_argument("--save-reference", metavar="PATH", help="Save the reference sketch (.npz) for reuse")
+    drift_parser.add_argument("--save-current", metavar="PATH", help="Save the current sketch (.npz) for reuse")
+    drift_parser.add_argument("--normalize", action="store_true",
+                              help="Compare L2-normalized vectors in MMD, coverage and outlier rate")
+    drift_parser.add_argument("--num-workers", type=int, default=1, help="Worker processes for .npy snapshots")
+
+    trec_parser = subparsers.add_parser("trec", help="Score a TREC run file against graded qrels")
+    trec_parser.add_argument("--run", required=True, help="Run file (query_id Q0 doc_id rank score tag)")
+    trec_parser.add_argument("--qrels", required=True, help="TREC qrels or BEIR qrels .tsv")
+    trec_parser.add_argument("--metrics", nargs="+", default=["ndcg@10", "map", "recall@100", "mrr"],
+                             help="Retrieval metrics to compute")
+    trec_parser.add_argument("--relevance-level", type=int, default=1, help="Minimum grade counted as relevant")
+    trec_parser.add_argument("--depth", type=int, help="Number of ranks to keep per query")
+    trec_parser.add_argument("--complete", action="store_true",
+                             help="Score judged queries missing from the run as empty rankings")
+
     args = parser.parse_args()
 
+    if args.cmd == "trec":
+        from .metrics.retrieval_ir import evaluate_trec
+        result = evaluate_trec(args.run, args.qrels, args.metrics, depth=args.depth,
+                               relevance_level=args.relevance_level, complete=args.complete)
+        print(json.dumps(result, indent=2))
+        return
+
+    if args.cmd == "drift":
+        from .metrics.drift import DriftSketch, compare_sketches, sketch_embeddings
+
+        def _sketch(path, like=None):
+            if path.endswith(".npz"):
+                return DriftSketch.load(path)
+            return sketch_embeddings(path, like=like, num_workers=args.num_workers)
+
+        reference = _sketch(args.reference)
+        current = _sketch(args.current, like=reference)
+        if args.save_reference:
+            reference.save(args.save_reference)
+        if args.save_current:
+            current.save(args.save_current)
+        print(json.dumps(compare_sketches(reference, current, normalize=args.normalize), indent=2))
+        return
+
     cfg = {}
     if args.config:
         import yaml
@@ -22,11 +91,24 @@ def main():
             txt = f.read()
             cfg = yaml.safe_load(txt) if ":" in txt else json.loads(txt)
 
+    if args.cmd == "compare":
+        result = compare(args.baseline, args.candidate, args.metrics, config=cfg, n_resamples=args.resamples,
+                         alpha=args.alpha, correction=args.correction, chunk_size=args.chunk_size, cache=args.cache)
+        print(json.dumps(result, indent=2))
+        # compare() orients delta so that negative is worse, also for lower-is-better metrics such as ECE
+        regressions = [m for m, r in result["metrics"].items() if r["significant"] and r["delta"] < 0]
+        if args.fail_on_regression and regressions:
+            print(f"Significant regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     report = {}
     if args.report_html:
         report["html"] = args.report_html
     if args.report_json:
         report["json"] = args.report_json
 
-    scores = evaluate(args.data, args.metrics, config=cfg, report=report)
-    print(json.dumps(scores, indent=2))
\ No newline at end of file
+    scores = evaluate(args.data, args.metrics, config=cfg, report=report, parallelism=args.parallelism,
+                      chunk_size=args.chunk_size, cache=args.cache, bootstrap=args.bootstrap,
+                      run_dir=args.run_dir)
+    print(json.dumps(scores, indent=2))
@@ -0,0 +1,175 @@
+"""Columnar Parquet/Arrow ingestion for the streaming evaluation engine.
+
+Instead of turning every row into pydantic models, the file is read as Arrow
+record batches with only the columns the requested metrics need. Nested rows
+(``query.prompt``, ``generation.text``, ``retrieval.chunks[].id`` and
+``.text``) and the simple flat layout (``prompt``/``question``,
+``prediction``/``answer``, ``references``/``reference``, ``retrieved_ids``,
+``chunk_texts``/``contexts``) are both supported and
+projected to the planner's column names.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import pathlib
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+COLUMNAR_FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'}
+
+# Candidate source fields for every planner column, in order of preference
+COLUMN_FIELDS: Dict[str, List[Tuple[str, ...]]] = {
+    'prompt': [('query', 'prompt'), ('prompt',), ('question',)],
+    'prediction': [('generation', 'text'), ('prediction',), ('answer',)],
+    'references': [('query', 'references'), ('references',), ('reference',)],
+    'relevant_ids': [('query', 'references'), ('references',), ('reference',)],
+    'retrieved_ids': [('retrieval', 'chunks'), ('retrieved_ids',)],
+    'chunk_texts': [('retrieval', 'chunks'), ('chunk_texts',), ('contexts',), ('context',)],
+    'sts_score': [('query', 'metadata', 'sts_score'), ('sts_score',)],
+    'query_id': [('query', 'id'), ('id',), ('query_id',)],
+    'confidence': [('query', 'metadata', 'confidence'), ('confidence',)],
+    'correct': [('query', 'metadata', 'correct'), ('correct',)],
+    'latency_ms': [('query', 'metadata', 'latency_ms'), ('latency_ms',)],
+    'prompt_tokens': [('query', 'metadata', 'prompt_tokens'), ('prompt_tokens',)],
+    'completion_tokens': [('query', 'metadata', 'completion_tokens'), ('completion_tokens',)],
+}
+
+TEXT_COLUMNS = ('prompt', 'prediction', 'query_id')
+# Numeric columns and their Arrow type
+SCALAR_COLUMNS = {name: pa.float64() for name in (
+    'sts_score', 'confidence', 'correct', 'latency_ms', 'prompt_tokens', 'completion_tokens',
+)} if HAS_PYARROW else {}
+
+
+def is_columnar_path(file_path: Union[str, pathlib.Path]) -> bool:
+    """Return True if the file extension is read by :func:`iter_column_batches`."""
+    return pathlib.Path(file_path).suffix in COLUMNAR_FORMATS
+
+
+def _field_type(schema: "pa.Schema", path: Sequence[str]) -> Optional["pa.DataType"]:
+    """Return the type at a nested field path, or None if the path does not exist."""
+    fields = schema
+    field_type = None
+    for name in path:
+        index = fields.get_field_index(name) if fields is not None else -1
+        if index < 0:
+            return None
+        field_type = fields.field(index).type
+        fields = field_type if pa.types.is_struct(field_type) else None
+    return field_type
+
+
+def _resolve_fields(schema: "pa.Schema", columns: Iterable[str]) -> Dict[str, Optional[Tuple[str, ...]]]:
+    resolved = {}
+    for name in columns:
+        if name not in COLUMN_FIELDS:
+            raise ValueError(f"Unknown column: {name}")
+        resolved[name] = next((path for path in COLUMN_FIELDS[name] if _field_type(schema, path) is not None), None)
+    return resolved
+
+
+def _normalize(name: str, array: "pa.Array") -> "pa.Array":
+    """Bring a projected field into the planner's column representation."""
+    if name in TEXT_COLUMNS:
+        return pc.fill_null(array.cast(pa.string()), '')
+    if name in SCALAR_COLUMNS:
+        return array.cast(SCALAR_COLUMNS[name])
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        # A single ``reference`` string becomes a one-element list
+        offsets = pa.array(np.arange(len(array) + 1, dtype=np.int32))
+        return pa.ListArray.from_arrays(offsets, array.cast(pa.string()), mask=array.is_null())
+    if pa.types.is_list(array.type) and pa.types.is_struct(array.type.value_type):
+        # ``retrieval.chunks`` keeps the chunk texts for ``chunk_texts`` and the ids otherwise
+        if array.offset:
+            # from_arrays cannot combine a validity mask with sliced offsets
+            array = pa.concat_arrays([array])
+        field = 'text' if name == 'chunk_texts' else 'id'
+        return pa.ListArray.from_arrays(array.offsets, array.values.field(field), mask=array.is_null())
+    return array
+
+
+def iter_column_batches(
+    file_path: Union[str, pathlib.Path], columns: Iterable[str], batch_size: int = 1000
+) -> Iterator["pa.RecordBatch"]:
+    """Stream a Parquet or Arrow IPC file as record batches of planner columns.
+
+    Only the source fields behind ``columns`` are read from disk. Text columns
+    are returned as non-null strings, id and reference columns as list arrays
+    (null when a row has no retrieval result or no references).
+
+    Args:
+        file_path: Path to a ``.parquet``, ``.arrow``, ``.feather`` or ``.ipc`` file.
+        columns: Planner column names (see :data:`COLUMN_FIELDS`).
+        batch_size: Maximum number of rows per batch.
+
+    Yields:
+        pa.RecordBatch: One batch per chunk with one field per requested column.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the file format or a column name is unknown.
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required for columnar ingestion. Install with: pip install guage-kit[arrow]")
+    ext = pathlib.Path(file_path).suffix
+    if ext not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+    dataset = ds.dataset(str(file_path), format=COLUMNAR_FORMATS[ext])
+    columns = sorted(columns)
+    fields = _resolve_fields(dataset.schema, columns)
+    projection = {name: pc.field(*path) for name, path in fields.items() if path is not None}
+    if not projection:
+        # Nothing to read but the row count; keep the cheapest column
+        projection = {'_row': pc.field(dataset.schema.names[0])}
+
+    for batch in dataset.to_batches(columns=projection, batch_size=batch_size):
+        if batch.num_rows == 0:
+            continue
+        arrays = []
+        for name in columns:
+            if fields[name] is None:
+                missing_type = SCALAR_COLUMNS.get(name, pa.string() if name in TEXT_COLUMNS else pa.list_(pa.string()))
+                array = pa.nulls(batch.num_rows, missing_type)
+            else:
+                array = batch.column(name)
+            arrays.append(_normalize(name, array))
+        yield pa.RecordBatch.from_arrays(arrays, names=columns)
+
+
+def batch_columns(batch: "pa.RecordBatch") -> Dict[str, "pa.Array"]:
+    """Return the columns of a record batch keyed by name."""
+    return {name: batch.column(name) for name in batch.schema.names}
+
+
+def _flatten_lists(array: "pa.Array") -> Tuple[np.ndarray, "pa.Array"]:
+    lengths = pc.fill_null(pc.list_value_length(array), 0).to_numpy(zero_copy_only=False)
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    return offsets, pc.list_flatten(array).cast(pa.string())
+
+
+def list_id_codes(
+    retrieved: "pa.Array", relevant: "pa.Array"
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Dictionary-encode two list-of-id columns into shared integer codes.
+
+    Returns:
+        Offsets and codes for ``retrieved``, offsets and codes for ``relevant``,
+        and a mask of rows that have a retrieval result, in the layout expected
+        by :func:`guage_kit.metrics.retrieval_ir.sample_retrieval_code_scores`.
+    """
+    retrieved_offsets, retrieved_values = _flatten_lists(retrieved)
+    relevant_offsets, relevant_values = _flatten_lists(relevant)
+    encoded = pc.dictionary_encode(pa.concat_arrays([retrieved_values, relevant_values]))
+    # Null ids share one extra code, matching ``None == None`` on the row path
+    codes = pc.fill_null(encoded.indices, len(encoded.dictionary)).to_numpy(zero_copy_only=False)
+    codes = codes.astype(np.int64)
+    split = len(retrieved_values)
+    has_retrieval = retrieved.is_valid().to_numpy(zero_copy_only=False)
+    return retrieved_offsets, codes[:split], relevant_offsets, codes[split:], has_retrieval
@@ -0,0 +1,175 @@
+"""Memory-mapped JSONL reader with a cached line-offset index.
+
+The index records the byte span of every non-blank line, so rows can be read
+by position without scanning the file, and a file can be cut into disjoint
+byte ranges that worker processes parse independently. It is built with
+vectorized newline search over the memory-mapped file and saved next to it
+(``<file>.idx.npz``); it is rebuilt whenever the file's size or modification
+time changes.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import mmap
+import os
+import pathlib
+import numpy as np
+from ..utils.io import loads_json
+
+# Bytes scanned per step while building the index
+INDEX_BLOCK_SIZE = 64 * 1024 * 1024
+_WHITESPACE = np.frombuffer(b" \t\r\n\x0b\x0c", dtype=np.uint8)
+
+
+def index_path_for(file_path: Union[str, pathlib.Path]) -> pathlib.Path:
+    """Return where the line index of ``file_path`` is cached."""
+    file_path = pathlib.Path(file_path)
+    return file_path.with_name(file_path.name + ".idx.npz")
+
+
+def _file_stamp(file_path: pathlib.Path) -> np.ndarray:
+    stat = file_path.stat()
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def _scan_lines(buffer: Union[mmap.mmap, bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return start and end offsets of every non-blank line in ``buffer``."""
+    size = len(buffer)
+    newlines = []
+    for offset in range(0, size, INDEX_BLOCK_SIZE):
+        block = np.frombuffer(buffer, dtype=np.uint8, count=min(INDEX_BLOCK_SIZE, size - offset), offset=offset)
+        newlines.append(np.flatnonzero(block == ord('\n')) + offset)
+    ends = np.concatenate(newlines) if newlines else np.zeros(0, dtype=np.int64)
+    starts = np.concatenate([[0], ends + 1])
+    ends = np.concatenate([ends, [size]])
+
+    # Only lines that start with whitespace can be blank; check those in Python
+    keep = ends > starts
+    candidates = np.flatnonzero(keep)
+    data = np.frombuffer(buffer, dtype=np.uint8) if size else np.zeros(0, dtype=np.uint8)
+    suspect = candidates[np.isin(data[starts[candidates]], _WHITESPACE)]
+    for i in suspect:
+        keep[i] = bool(bytes(buffer[starts[i]:ends[i]]).strip())
+    return starts[keep].astype(np.int64), ends[keep].astype(np.int64)
+
+
+def iter_byte_range(file_path: Union[str, pathlib.Path], start: int, end: int) -> Iterator[Any]:
+    """Parse the JSONL rows whose lines lie in ``[start, end)`` of ``file_path``.
+
+    ``start`` and ``end`` must fall on line boundaries, e.g. offsets taken from
+    :meth:`IndexedJsonl.byte_range`.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    for line in data.split(b'\n'):
+        if line.strip():
+            yield loads_json(line)
+
+
+class IndexedJsonl:
+    """Random-access, memory-mapped view of a JSONL file.
+
+    Blank lines are skipped, so row ``i`` is the ``i``-th non-blank line, the
+    same numbering :func:`~guage_kit.datasets.loaders.iter_jsonl` produces.
+    The memory map is opened lazily and not pickled, so a reader can be sent
+    to worker processes cheaply.
+
+    Args:
+        file_path: Path to the JSONL file.
+        cache_index: Save the line index next to the file and reuse it.
+
+    Example:
+        >>> rows = IndexedJsonl("data.jsonl")
+        >>> rows[0], len(rows)
+    """
+
+    def __init__(self, file_path: Union[str, pathlib.Path], cache_index: bool = True):
+        self.path = pathlib.Path(file_path)
+        self.cache_index = cache_index
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self.starts, self.ends = self._load_index()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_mmap'] = state['_file'] = None
+        return state
+
+    def _load_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        stamp = _file_stamp(self.path)
+        index_path = index_path_for(self.path)
+        if self.cache_index and index_path.exists():
+            try:
+                with np.load(index_path) as index:
+                    if np.array_equal(index['stamp'], stamp):
+                        return index['starts'], index['ends']
+            except (OSError, ValueError, KeyError):
+                pass  # Unreadable index: rebuild it
+
+        with open(self.path, 'rb') as f:
+            if stamp[0] == 0:
+                starts, ends = _scan_lines(b'')
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    starts, ends = _scan_lines(buffer)
+
+        if self.cache_index:
+            tmp_path = index_path.with_name(index_path.name + f".{os.getpid()}.tmp.npz")
+            try:
+                np.savez(tmp_path, starts=starts, ends=ends, stamp=stamp)
+                os.replace(tmp_path, index_path)
+            except OSError:
+                pass  # Read-only location: keep the index in memory only
+        return starts, ends
+
+    @property
+    def buffer(self) -> mmap.mmap:
+        if self._mmap is None:
+            self._file = open(self.path, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def raw(self, row: int) -> bytes:
+        """Return the undecoded line of ``row``."""
+        return self.buffer[self.starts[row]:self.ends[row]]
+
+    def __getitem__(self, row: int) -> Any:
+        if not -len(self) <= row < len(self):
+            raise IndexError(f"Row {row} out of range for {len(self)} rows")
+        return loads_json(self.raw(row))
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Any]:
+        """Yield decoded rows ``start`` to ``stop`` in order."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for row in range(start, stop):
+            yield loads_json(self.raw(row))
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.rows()
+
+    def byte_range(self, start: int, stop: int) -> Tuple[int, int]:
+        """Return the byte span covering rows ``start`` to ``stop``."""
+        if stop <= start:
+            return 0, 0
+        return int(self.starts[start]), int(self.ends[stop - 1])
+
+    def shards(self, rows_per_shard: int) -> List[Tuple[int, int, int]]:
+        """Split the file into consecutive shards of up to ``rows_per_shard`` rows.
+
+        Returns:
+            ``(first_row, byte_start, byte_end)`` per shard, ready for
+            :func:`iter_byte_range`.
+        """
+        return [
+            (start, *self.byte_range(start, min(start + rows_per_shard, len(self))))
+            for start in range(0, len(self), rows_per_shard)
+        ]
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
@@ -1,23 +1,94 @@
-from typing import Union, List
+from typing import Any, Iterator, Mapping, Optional, Union, List
 import pandas as pd
-import json
 import csv
 import pathlib
+from ..schemas.core import ContextChunk, EvalSample, Query, Generation, RetrievalResult
+from ..utils.io import loads_json
 
-def load_jsonl(file_path: Union[str, pathlib.Path]) -> List[dict]:
-    data = []
+def row_to_sample(item: Mapping[str, Any], index: int) -> EvalSample:
+    """Convert a raw data row into an EvalSample."""
+    # Handle different data formats
+    if 'query' in item and 'generation' in item:
+        # Already in the right format
+        query = Query(**item['query'])
+        generation = Generation(**item['generation'])
+        retrieval = None
+        if 'retrieval' in item and item['retrieval']:
+            retrieval = RetrievalResult(**item['retrieval'])
+        return EvalSample(query=query, generation=generation, retrieval=retrieval)
+
+    # Simple format conversion
+    metadata = dict(item.get('metadata') or {})
+    for field in ('sts_score', 'confidence', 'correct', 'latency_ms', 'prompt_tokens', 'completion_tokens'):
+        if item.get(field) not in (None, ''):
+            metadata[field] = float(item[field])
+    query = Query(
+        id=item.get('id', str(index)),
+        prompt=item.get('prompt', item.get('question', '')),
+        references=item.get('references', [item.get('reference')] if item.get('reference') else None),
+        metadata=metadata
+    )
+    generation = Generation(
+        query_id=query.id,
+        text=item.get('prediction', item.get('answer', '')),
+        model=item.get('model', None)
+    )
+    return EvalSample(query=query, generation=generation, retrieval=_flat_retrieval(item, query.id))
+
+def _flat_retrieval(item: Mapping[str, Any], query_id: str) -> Optional[RetrievalResult]:
+    """Build the retrieval result of a flat row from ``retrieved_ids`` and ``chunk_texts``/``contexts``.
+
+    A field that is present but empty is an empty retrieval (scored as zero
+    hits), as on the columnar path; only rows without these fields (or with
+    null or empty CSV cells) have no retrieval.
+    """
+    texts = next(
+        (item[key] for key in ('chunk_texts', 'contexts', 'context') if item.get(key) not in (None, '')), None
+    )
+    if isinstance(texts, str):
+        texts = [texts]
+    ids = item.get('retrieved_ids')
+    if ids == '':
+        ids = None
+    if texts is None and ids is None:
+        return None
+    texts = list(texts or [])
+    ids = list(ids or [])
+    chunks = [
+        ContextChunk(id=ids[i] if i < len(ids) else str(i), text=texts[i] if i < len(texts) else '')
+        for i in range(max(len(ids), len(texts)))
+    ]
+    return RetrievalResult(query_id=query_id, chunks=chunks)
+
+def iter_jsonl(file_path: Union[str, pathlib.Path]) -> Iterator[dict]:
+    """Yield rows from a JSONL file one at a time without buffering the file."""
     with open(file_path, 'r') as f:
         for line in f:
-            data.append(json.loads(line))
-    return data
+            if line.strip():
+                yield loads_json(line)
 
-def load_csv(file_path: Union[str, pathlib.Path]) -> List[dict]:
-    data = []
-    with open(file_path, 'r') as f:
+def iter_csv(file_path: Union[str, pathlib.Path]) -> Iterator[dict]:
+    """Yield rows from a CSV file one at a time without buffering the file."""
+    with open(file_path, 'r', newline='') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            data.append(row)
-    return data
+            yield row
+
+def iter_path(file_path: Union[str, pathlib.Path]) -> Iterator[dict]:
+    """Yield rows from a JSONL or CSV file based on its extension."""
+    ext = pathlib.Path(file_path).suffix
+    if ext == '.jsonl':
+        return iter_jsonl(file_path)
+    elif ext == '.csv':
+        return iter_csv(file_path)
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+def load_jsonl(file_path: Union[str, pathlib.Path]) -> List[dict]:
+    return list(iter_jsonl(file_path))
+
+def load_csv(file_path: Union[str, pathlib.Path]) -> List[dict]:
+    return list(iter_csv(file_path))
 
 def load_parquet(file_path: Union[str, pathlib.Path]) -> List[dict]:
     return pd.read_parquet(file_path).to_dict(orient='records')
@@ -31,4 +102,4 @@ def load_path(file_path: Union[str, pathlib.Path]) -> List[dict]:
     elif ext == '.parquet':
         return load_parquet(file_path)
     else:
-        raise ValueError(f"Unsupported file extension: {ext}")
\ No newline at end of file
+        raise ValueError(f"Unsupported file extension: {ext}")
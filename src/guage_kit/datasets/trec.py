@@ -0,0 +1,143 @@
+"""TREC run files and graded relevance judgments as integer-encoded arrays.
+
+Large IR benchmarks (BEIR, MS MARCO, TREC tracks) ship runs and qrels as
+whitespace-separated text with millions of lines. They are parsed in one
+pass by pandas' C reader and kept as flat arrays: query and document ids are
+interned to integer codes (a sorted query vocabulary, documents in order of
+first appearance), and each query owns one contiguous slice ``[offsets[i], offsets[i + 1])``
+of the code, score and grade arrays. This is the layout
+:func:`~guage_kit.metrics.retrieval_ir.encode_hit_codes` consumes, so a run is
+scored without building per-query Python objects.
+
+Supported formats (optionally compressed, e.g. ``.gz``):
+
+* run: ``query_id Q0 doc_id rank score tag``;
+* qrels: ``query_id iteration doc_id grade`` (TREC) or
+  ``query-id corpus-id score`` with an optional header (BEIR ``.tsv``).
+"""
+
+from typing import Any, Dict, NamedTuple, Tuple, Union
+import pathlib
+import numpy as np
+import pandas as pd
+
+PathLike = Union[str, pathlib.Path]
+
+
+class TrecRun(NamedTuple):
+    """A ranked run with interned ids.
+
+    Attributes:
+        query_ids: Sorted query id vocabulary; query ``i`` is ``query_ids[i]``.
+        doc_ids: Document id vocabulary, indexed by ``docs``.
+        offsets: ``len(query_ids) + 1`` offsets into ``docs`` and ``scores``.
+        docs: Document codes, ranked within each query.
+        scores: Retrieval scores aligned with ``docs``.
+    """
+    query_ids: np.ndarray
+    doc_ids: np.ndarray
+    offsets: np.ndarray
+    docs: np.ndarray
+    scores: np.ndarray
+
+
+class Qrels(NamedTuple):
+    """Graded relevance judgments with interned ids.
+
+    Attributes:
+        query_ids: Sorted query id vocabulary; query ``i`` is ``query_ids[i]``.
+        doc_ids: Document id vocabulary, indexed by ``docs``.
+        offsets: ``len(query_ids) + 1`` offsets into ``docs`` and ``grades``.
+        docs: Judged document codes, grouped by query.
+        grades: Relevance grade of each judgment (0 or negative: not relevant).
+    """
+    query_ids: np.ndarray
+    doc_ids: np.ndarray
+    offsets: np.ndarray
+    docs: np.ndarray
+    grades: np.ndarray
+
+
+def _read_table(path: PathLike, dtypes: Dict[int, Any], skiprows: int = 0) -> pd.DataFrame:
+    # na_filter=False keeps ids such as "NA" or "null" as strings
+    return pd.read_csv(
+        path, sep=r'\s+', header=None, usecols=list(dtypes), skiprows=skiprows,
+        dtype=dtypes, na_filter=False, engine='c',
+    )
+
+
+def _intern(values: pd.Series, sort: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Return int32 codes and the vocabulary of a string column."""
+    codes, vocabulary = pd.factorize(values, sort=sort)
+    return codes.astype(np.int32), np.asarray(vocabulary, dtype=object)
+
+
+def _offsets(queries: np.ndarray, n_queries: int) -> np.ndarray:
+    counts = np.bincount(queries, minlength=n_queries)
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+def load_trec_run(path: PathLike) -> TrecRun:
+    """Load a TREC run file.
+
+    Documents are ranked by descending score with ties broken by descending
+    document id, as ``trec_eval`` does; the rank column is ignored.
+
+    Args:
+        path: Run file with ``query_id Q0 doc_id rank score tag`` lines.
+
+    Returns:
+        TrecRun: The run with interned query and document ids.
+    """
+    frame = _read_table(path, {0: str, 2: str, 4: np.float64})
+    queries, query_ids = _intern(frame[0], sort=True)
+    docs, doc_ids = _intern(frame[2])
+    scores = frame[4].to_numpy(dtype=np.float64)
+    # Runs are usually written query by query in score order; then a stable sort by query suffices
+    order = np.argsort(queries, kind='stable')
+    same_query = queries[order][1:] == queries[order][:-1]
+    if (np.diff(scores[order]) > 0)[same_query].any():
+        order = np.lexsort((-scores, queries))
+        same_query = queries[order][1:] == queries[order][:-1]
+
+    # Sorting the whole document vocabulary is costly; only tied scores need the string order
+    same = same_query & (scores[order][1:] == scores[order][:-1])
+    if same.any():
+        tied = order[np.unique(np.flatnonzero(same)[:, None] + [0, 1])]
+        tie_rank = np.zeros(len(docs), dtype=np.int64)
+        tie_rank[tied] = pd.factorize(doc_ids[docs[tied]], sort=True)[0]
+        order = np.lexsort((-tie_rank, -scores, queries))
+    return TrecRun(query_ids, doc_ids, _offsets(queries, len(query_ids)), docs[order], scores[order])
+
+
+def load_qrels(path: PathLike) -> Qrels:
+    """Load graded relevance judgments.
+
+    Args:
+        path: TREC qrels (``query_id iteration doc_id grade``) or a BEIR-style
+            three-column file (``query-id corpus-id score``, header optional).
+
+    Returns:
+        Qrels: The judgments with interned query and document ids, grouped by
+        query in file order.
+
+    Raises:
+        ValueError: If the file has neither three nor four columns.
+    """
+    first = pd.read_csv(path, sep=r'\s+', header=None, nrows=1, dtype=str, na_filter=False)
+    n_columns = first.shape[1]
+    if n_columns == 4:
+        frame = _read_table(path, {0: str, 2: str, 3: np.int32})
+        query_col, doc_col, grade_col = 0, 2, 3
+    elif n_columns == 3:
+        header = not first.iloc[0, 2].lstrip('+-').isdigit()
+        frame = _read_table(path, {0: str, 1: str, 2: np.int32}, skiprows=int(header))
+        query_col, doc_col, grade_col = 0, 1, 2
+    else:
+        raise ValueError(f"Expected 3 or 4 qrels columns, got {n_columns} in {path}")
+
+    queries, query_ids = _intern(frame[query_col], sort=True)
+    docs, doc_ids = _intern(frame[doc_col])
+    grades = frame[grade_col].to_numpy(dtype=np.int32)
+    order = np.argsort(queries, kind='stable')
+    return Qrels(query_ids, doc_ids, _offsets(queries, len(query_ids)), docs[order], grades[order])
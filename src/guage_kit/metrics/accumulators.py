@@ -0,0 +1,361 @@
+"""Mergeable running aggregates used by the streaming evaluation engine.
+
+Each accumulator folds chunk-level values (per-sample scores or sufficient
+statistics produced by a metric family) into a small, fixed-size state, so
+memory does not grow with the number of samples. Accumulators for the same
+metric can be merged, which lets chunks be scored independently and combined
+afterwards.
+
+Bootstrap confidence intervals use grouped Poisson resampling. Every sample
+is hashed by its row number into one of a fixed number of groups, and a
+:class:`BootstrapAccumulator` keeps per-group sums of the metric's
+sufficient statistics (score and count for means, n-gram counts for BLEU).
+One ``(n_resamples, n_groups)`` matrix of Poisson(1) weights, shared by all
+metrics, turns those sums into resampled metric values with a single matrix
+product, so the cost does not depend on the number of samples. Group sums
+are merged like any other state, so the intervals do not depend on chunking
+or parallelism.
+"""
+
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from scipy.stats import poisson, rankdata
+from .calibration import (
+    ADAPTIVE_RESOLUTION, DEFAULT_CALIBRATION_BINS, bin_indices, calibration_histogram, ece_from_histograms,
+    equal_mass_histograms,
+)
+from .llm_quality import bleu_from_statistics
+
+DEFAULT_BOOTSTRAP_GROUPS = 1000
+# Poisson(1) quantiles for every 16-bit value: a table lookup is ~10x faster
+# than sampling, and the quantisation error (1/65536 per outcome) is negligible
+_POISSON_TABLE = poisson.ppf((np.arange(65536) + 0.5) / 65536, 1.0)
+
+
+class MetricAccumulator:
+    """Base class for a running aggregate of one metric."""
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold the values computed for one chunk into the running state."""
+        raise NotImplementedError
+
+    def merge(self, other: "MetricAccumulator") -> None:
+        """Fold the state of another accumulator for the same metric into this one."""
+        raise NotImplementedError
+
+    def result(self) -> float:
+        """Return the aggregated score for everything seen so far."""
+        raise NotImplementedError
+
+    def sample_statistics(self, values: np.ndarray) -> Optional[np.ndarray]:
+        """Return ``(n, c)`` per-sample statistics whose sums determine the metric.
+
+        None when the metric is not a function of summed statistics; such
+        accumulators implement :meth:`resample_results` instead.
+        """
+        return None
+
+    def result_from_statistics(self, sums: np.ndarray) -> np.ndarray:
+        """Return the metric for every row of ``(b, c)`` summed statistics."""
+        raise NotImplementedError
+
+    def group_statistics(self, values: np.ndarray, groups: np.ndarray, n_groups: int) -> Optional[np.ndarray]:
+        """Return ``(n_groups, c)`` sums of :meth:`sample_statistics` per sample group.
+
+        Accumulators with wide per-sample statistics override this to sum
+        straight into the groups without building the per-sample rows.
+        """
+        stats = self.sample_statistics(values)
+        if stats is None:
+            return None
+        # Sparse group-membership matrix times the statistics: one pass for any number of columns
+        membership = sparse.csr_matrix(
+            (np.ones(len(groups)), (groups, np.arange(len(groups)))), shape=(n_groups, len(groups))
+        )
+        return np.asarray(membership @ stats)
+
+    def resample_results(self, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+        """Return the metric on ``n_resamples`` multinomial resamples of the stored samples."""
+        raise NotImplementedError
+
+
+class MeanAccumulator(MetricAccumulator):
+    """Running mean of per-sample scores; NaN scores are treated as not applicable."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, values: np.ndarray) -> None:
+        scores = np.asarray(values, dtype=float)
+        scores = scores[~np.isnan(scores)]
+        self.total += float(scores.sum())
+        self.count += int(scores.size)
+
+    def merge(self, other: "MeanAccumulator") -> None:
+        self.total += other.total
+        self.count += other.count
+
+    def result(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def sample_statistics(self, values: np.ndarray) -> np.ndarray:
+        scores = np.asarray(values, dtype=float)
+        valid = ~np.isnan(scores)
+        return np.column_stack([np.where(valid, scores, 0.0), valid])
+
+    def result_from_statistics(self, sums: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(sums[:, 1] > 0, sums[:, 0] / sums[:, 1], np.nan)
+
+
+class BleuAccumulator(MetricAccumulator):
+    """Running corpus BLEU kept as summed n-gram sufficient statistics.
+
+    ``update`` takes per-sample statistic rows of shape ``(n, 10)``.
+    """
+
+    def __init__(self):
+        self.stats = np.zeros(10, dtype=np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        self.stats += np.asarray(values, dtype=np.int64).reshape(-1, 10).sum(axis=0)
+
+    def merge(self, other: "BleuAccumulator") -> None:
+        self.stats += other.stats
+
+    def result(self) -> float:
+        return bleu_from_statistics(self.stats)
+
+    def sample_statistics(self, values: np.ndarray) -> np.ndarray:
+        return np.asarray(values, dtype=float).reshape(-1, 10)
+
+    def result_from_statistics(self, sums: np.ndarray) -> np.ndarray:
+        # Poisson weights are integers, so the weighted counts are too
+        return np.array([bleu_from_statistics(row) for row in np.rint(sums)])
+
+
+class CalibrationAccumulator(MetricAccumulator):
+    """Running calibration metric over ``(confidence, correct)`` rows.
+
+    ``update`` takes an ``(n, 2)`` array; rows with a NaN are skipped. ECE
+    keeps a histogram over its bins, adaptive ECE a fine histogram
+    (:data:`~guage_kit.metrics.calibration.ADAPTIVE_RESOLUTION` bins) merged
+    into equal-mass bins when the result is requested, and Brier the sum of
+    squared errors.
+
+    Args:
+        metric: ``'ece'``, ``'adaptive_ece'`` or ``'brier'``.
+        n_bins: Number of ECE bins.
+    """
+
+    def __init__(self, metric: str, n_bins: int = DEFAULT_CALIBRATION_BINS):
+        if metric not in ('ece', 'adaptive_ece', 'brier'):
+            raise ValueError(f"Unknown calibration metric: {metric}")
+        self.metric = metric
+        self.n_bins = n_bins
+        self.resolution = ADAPTIVE_RESOLUTION if metric == 'adaptive_ece' else n_bins
+        self.stats = np.zeros(2 if metric == 'brier' else 3 * self.resolution)
+
+    @staticmethod
+    def _rows(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows = np.asarray(values, dtype=float).reshape(-1, 2)
+        valid = ~np.isnan(rows).any(axis=1)
+        return np.clip(np.where(valid, rows[:, 0], 0.0), 0.0, 1.0), np.where(valid, rows[:, 1], 0.0), valid
+
+    def sample_statistics(self, values: np.ndarray) -> np.ndarray:
+        p, y, valid = self._rows(values)
+        if self.metric == 'brier':
+            return np.column_stack([(p - y) ** 2 * valid, valid])
+        # One-hot bin membership times (1, confidence, label)
+        stats = np.zeros((len(p), 3, self.resolution))
+        index = np.arange(len(p))
+        bins = bin_indices(p, self.resolution)
+        stats[index, 0, bins] = valid
+        stats[index, 1, bins] = p * valid
+        stats[index, 2, bins] = y * valid
+        return stats.reshape(len(p), 3 * self.resolution)
+
+    def group_statistics(self, values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+        if self.metric == 'brier':
+            return super().group_statistics(values, groups, n_groups)
+        # Per-group histograms from one bincount per row of (count, confidence, label)
+        p, y, valid = self._rows(values)
+        keys = np.asarray(groups, dtype=np.int64) * self.resolution + bin_indices(p, self.resolution)
+        size = n_groups * self.resolution
+        histograms = np.stack([
+            np.bincount(keys, weights=weights, minlength=size).reshape(n_groups, self.resolution)
+            for weights in (valid.astype(float), p * valid, y * valid)
+        ], axis=1)
+        return histograms.reshape(n_groups, 3 * self.resolution)
+
+    def result_from_statistics(self, sums: np.ndarray) -> np.ndarray:
+        if self.metric == 'brier':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(sums[:, 1] > 0, sums[:, 0] / sums[:, 1], np.nan)
+        histograms = sums.reshape(len(sums), 3, self.resolution)
+        if self.metric == 'adaptive_ece':
+            histograms = equal_mass_histograms(histograms, self.n_bins)
+        return ece_from_histograms(histograms)
+
+    def update(self, values: np.ndarray) -> None:
+        if self.metric == 'brier':
+            self.stats += self.sample_statistics(values).sum(axis=0)
+            return
+        p, y, valid = self._rows(values)
+        self.stats += calibration_histogram(p[valid], y[valid], self.resolution).ravel()
+
+    def merge(self, other: "CalibrationAccumulator") -> None:
+        self.stats += other.stats
+
+    def result(self) -> float:
+        value = float(self.result_from_statistics(self.stats[None])[0])
+        return 0.0 if np.isnan(value) else value
+
+
+class ConcatAccumulator(MetricAccumulator):
+    """Keeps compact per-sample feature rows for metrics that are not decomposable.
+
+    Rank-based metrics such as Spearman correlation need every sample at once, so
+    this accumulator stores a small float row per sample instead of the samples
+    themselves and reduces them when the result is requested.
+    """
+
+    def __init__(self, reduce_fn: Callable[[np.ndarray], float]):
+        self.reduce_fn = reduce_fn
+        self.parts: List[np.ndarray] = []
+
+    def update(self, values: np.ndarray) -> None:
+        self.parts.append(np.asarray(values, dtype=float))
+
+    def merge(self, other: "ConcatAccumulator") -> None:
+        self.parts.extend(other.parts)
+
+    def result(self) -> float:
+        if not self.parts:
+            return self.reduce_fn(np.zeros((0, 0)))
+        return self.reduce_fn(np.concatenate(self.parts))
+
+    def resample_results(self, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+        rows = np.concatenate(self.parts) if self.parts else np.zeros((0, 0))
+        if not len(rows):
+            return np.full(n_resamples, np.nan)
+        return np.array([self.reduce_fn(rows[rng.integers(0, len(rows), len(rows))]) for _ in range(n_resamples)])
+
+
+class SpearmanAccumulator(ConcatAccumulator):
+    """Keeps ``(x, y)`` rows per sample and reduces them to a Spearman correlation.
+
+    Bootstrap resamples do not re-rank: the valid rows are ranked once and
+    every resample is the Poisson-weighted Pearson correlation of those ranks,
+    computed for a block of resamples with one matrix product. This is the
+    usual rank-once approximation of the Spearman bootstrap; it costs one
+    pass over the rows per block instead of a full ``spearmanr`` per resample.
+    """
+
+    # Weights materialised per block of resamples (rows x samples)
+    BLOCK_SIZE = 1 << 22
+
+    def resample_results(self, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+        rows = np.concatenate(self.parts).reshape(-1, 2) if self.parts else np.zeros((0, 2))
+        rows = rows[~np.isnan(rows).any(axis=1)]
+        n = len(rows)
+        if n < 2:
+            return np.full(n_resamples, np.nan)
+        x, y = rankdata(rows[:, 0]), rankdata(rows[:, 1])
+        moments = np.column_stack([np.ones(n), x, y, x * x, y * y, x * y])
+
+        results = np.empty(n_resamples)
+        step = max(self.BLOCK_SIZE // n, 1)
+        for start in range(0, n_resamples, step):
+            size = min(step, n_resamples - start)
+            weights = _POISSON_TABLE[rng.integers(0, 65536, size=(size, n), dtype=np.uint16)]
+            total, sx, sy, sxx, syy, sxy = (weights @ moments).T
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cov = sxy / total - sx * sy / total ** 2
+                var_x = sxx / total - (sx / total) ** 2
+                var_y = syy / total - (sy / total) ** 2
+                # Constant resampled scores give 0.0, as in the full result
+                degenerate = (var_x <= 1e-12 * sxx / total) | (var_y <= 1e-12 * syy / total)
+                results[start:start + size] = np.where(
+                    degenerate, 0.0, cov / np.sqrt(np.maximum(var_x * var_y, 1e-300))
+                )
+        return results
+
+
+def bootstrap_groups(first_row: int, num_samples: int, n_groups: int) -> np.ndarray:
+    """Assign rows ``first_row .. first_row + num_samples - 1`` to bootstrap groups.
+
+    Row numbers are mixed with the splitmix64 finaliser, so neighbouring rows
+    (often similar samples in sorted files) land in unrelated groups.
+    """
+    x = np.arange(first_row, first_row + num_samples, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x % np.uint64(n_groups)).astype(np.int64)
+
+
+def poisson_weights(n_resamples: int, n_groups: int, seed: int = 0) -> np.ndarray:
+    """Return an ``(n_resamples, n_groups)`` matrix of Poisson(1) bootstrap weights."""
+    rng = np.random.default_rng(seed)
+    return _POISSON_TABLE[rng.integers(0, 65536, size=(n_resamples, n_groups), dtype=np.uint16)]
+
+
+class BootstrapAccumulator(MetricAccumulator):
+    """Wraps an accumulator and keeps per-group statistics for bootstrap intervals.
+
+    Args:
+        inner: The metric's accumulator; :meth:`result` is its result.
+        n_groups: Number of bootstrap groups.
+    """
+
+    def __init__(self, inner: MetricAccumulator, n_groups: int = DEFAULT_BOOTSTRAP_GROUPS):
+        self.inner = inner
+        self.n_groups = n_groups
+        self.group_sums: Optional[np.ndarray] = None
+
+    def update(self, values: np.ndarray) -> None:
+        self.inner.update(values)
+
+    def update_groups(self, values: np.ndarray, groups: np.ndarray) -> None:
+        """Fold chunk values into the sums of the groups their samples belong to."""
+        sums = self.inner.group_statistics(values, groups, self.n_groups)
+        if sums is None:
+            return
+        self.group_sums = sums if self.group_sums is None else self.group_sums + sums
+
+    def merge(self, other: "BootstrapAccumulator") -> None:
+        self.inner.merge(other.inner)
+        if other.group_sums is not None:
+            self.group_sums = other.group_sums.copy() if self.group_sums is None else self.group_sums + other.group_sums
+
+    def result(self) -> float:
+        return self.inner.result()
+
+    def resampled(self, weights: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Return the metric on every bootstrap resample.
+
+        Args:
+            weights: ``(n_resamples, n_groups)`` weights from :func:`poisson_weights`.
+            rng: Generator for accumulators without summed statistics.
+        """
+        if self.group_sums is not None:
+            return self.inner.result_from_statistics(weights @ self.group_sums)
+        if self.inner.sample_statistics(np.zeros(0)) is not None:
+            # Decomposable metric that has not seen any samples
+            return np.full(len(weights), np.nan)
+        return self.inner.resample_results(len(weights), rng)
+
+    def interval(
+        self, weights: np.ndarray, rng: np.random.Generator, confidence_level: float = 0.95
+    ) -> Tuple[float, float]:
+        """Return the percentile bootstrap interval ``(lower, upper)``."""
+        samples = self.resampled(weights, rng)
+        samples = samples[~np.isnan(samples)]
+        if not samples.size:
+            return 0.0, 0.0
+        tail = (1.0 - confidence_level) / 2 * 100
+        lower, upper = np.percentile(samples, [tail, 100 - tail])
+        return float(lower), float(upper)
@@ -1,24 +1,180 @@
-from typing import List, Dict
+"""Calibration metrics for confidence scores against binary correctness labels.
+
+Every metric is computed from histograms of ``(count, sum of confidences,
+sum of labels)`` per confidence bin, built with ``np.digitize`` and
+``np.bincount``. The histograms add up across chunks, so the same functions
+back the streaming :class:`~guage_kit.metrics.accumulators.CalibrationAccumulator`.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
 from pydantic import BaseModel
 
+DEFAULT_CALIBRATION_BINS = 15
+# Equal-width bins the streaming adaptive ECE derives its equal-mass bins from
+ADAPTIVE_RESOLUTION = 200
+CONFIDENCE_FIELD = 'confidence'
+CORRECT_FIELD = 'correct'
+
+
 class CalibrationMetric(BaseModel):
-    """Class to represent a calibration metric."""
+    """Calibration summary of a set of predictions."""
     confidence: float
     accuracy: float
+    ece: float = 0.0
+    adaptive_ece: float = 0.0
+    brier_score: float = 0.0
+
+
+def _clean(predictions: Sequence[float], true_labels: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return confidences clipped to [0, 1] and labels, dropping pairs with a missing value."""
+    p = np.asarray(predictions, dtype=float)
+    y = np.asarray(true_labels, dtype=float)
+    keep = ~(np.isnan(p) | np.isnan(y))
+    return np.clip(p[keep], 0.0, 1.0), y[keep]
+
+
+def bin_indices(confidences: np.ndarray, n_bins: int) -> np.ndarray:
+    """Assign confidences to ``n_bins`` equal-width bins ``[0, 1/n], (1/n, 2/n], ...``."""
+    return np.digitize(confidences, np.linspace(0.0, 1.0, n_bins + 1)[1:-1], right=True)
+
+
+def calibration_histogram(confidences: np.ndarray, labels: np.ndarray, n_bins: int) -> np.ndarray:
+    """Return ``(3, n_bins)`` rows of per-bin counts, confidence sums and label sums."""
+    bins = bin_indices(confidences, n_bins)
+    return np.stack([
+        np.bincount(bins, minlength=n_bins).astype(float),
+        np.bincount(bins, weights=confidences, minlength=n_bins),
+        np.bincount(bins, weights=labels, minlength=n_bins),
+    ])
+
+
+def ece_from_histograms(histograms: np.ndarray) -> np.ndarray:
+    """ECE of ``(..., 3, n_bins)`` histograms.
+
+    A bin contributes ``count * |mean confidence - accuracy|``, which equals
+    ``|confidence sum - label sum|``.
+    """
+    total = histograms[..., 0, :].sum(axis=-1)
+    gap = np.abs(histograms[..., 1, :] - histograms[..., 2, :]).sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, gap / np.where(total > 0, total, 1.0), 0.0)
+
+
+def equal_mass_histograms(histograms: np.ndarray, n_bins: int) -> np.ndarray:
+    """Merge fine ``(..., 3, n_fine)`` histograms into ``n_bins`` bins of about equal count.
+
+    Each fine bin goes to the equal-mass bin that contains the middle of its
+    mass, so the result is exact when the fine bins do not straddle a quantile.
+    """
+    counts = histograms[..., 0, :]
+    total = counts.sum(axis=-1, keepdims=True)
+    middle = np.cumsum(counts, axis=-1) - counts / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        target = np.where(total > 0, middle * n_bins / np.where(total > 0, total, 1.0), 0.0)
+    target = np.minimum(target.astype(np.int64), n_bins - 1)
+
+    lead = counts.shape[:-1]
+    rows = np.arange(int(np.prod(lead)), dtype=np.int64).reshape(lead + (1,))
+    flat = (rows * n_bins + target).ravel()
+    size = rows.size * n_bins
+    merged = [
+        np.bincount(flat, weights=histograms[..., k, :].ravel(), minlength=size).reshape(lead + (n_bins,))
+        for k in range(3)
+    ]
+    return np.stack(merged, axis=-2)
 
-def expected_calibration_error(predictions: List[float], true_labels: List[int]) -> float:
-    """Calculate the Expected Calibration Error (ECE).
+
+def reliability_diagram(
+    predictions: Sequence[float],
+    true_labels: Sequence[float],
+    n_bins: int = DEFAULT_CALIBRATION_BINS,
+    strategy: str = 'uniform',
+) -> Dict[str, np.ndarray]:
+    """Per-bin data for a reliability diagram.
+
+    Args:
+        predictions: Predicted probabilities (confidences) in [0, 1].
+        true_labels: Binary correctness labels (0 or 1).
+        n_bins: Number of bins.
+        strategy: ``'uniform'`` for equal-width bins or ``'quantile'`` for
+            bins with about the same number of predictions.
+
+    Returns:
+        Dict[str, np.ndarray]: ``edges`` (``n_bins + 1`` bin edges), ``count``,
+        ``confidence`` (mean confidence) and ``accuracy`` per bin; empty bins
+        have NaN means.
+
+    Raises:
+        ValueError: If the strategy is unknown.
+    """
+    p, y = _clean(predictions, true_labels)
+    if strategy == 'uniform':
+        edges = np.linspace(0.0, 1.0, n_bins + 1)
+        histogram = calibration_histogram(p, y, n_bins)
+    elif strategy == 'quantile':
+        edges = np.quantile(p, np.linspace(0.0, 1.0, n_bins + 1)) if p.size else np.linspace(0.0, 1.0, n_bins + 1)
+        bins = np.clip(np.searchsorted(edges, p, side='left') - 1, 0, n_bins - 1)
+        histogram = np.stack([
+            np.bincount(bins, minlength=n_bins).astype(float),
+            np.bincount(bins, weights=p, minlength=n_bins),
+            np.bincount(bins, weights=y, minlength=n_bins),
+        ])
+    else:
+        raise ValueError(f"Unknown binning strategy: {strategy}")
+    count = histogram[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'edges': edges,
+            'count': count.astype(np.int64),
+            'confidence': np.where(count > 0, histogram[1] / count, np.nan),
+            'accuracy': np.where(count > 0, histogram[2] / count, np.nan),
+        }
+
+
+def expected_calibration_error(
+    predictions: List[float], true_labels: List[int], n_bins: int = DEFAULT_CALIBRATION_BINS
+) -> float:
+    """Calculate the Expected Calibration Error (ECE) with equal-width bins.
 
     Parameters:
     predictions (List[float]): List of predicted probabilities.
     true_labels (List[int]): List of true binary labels (0 or 1).
+    n_bins (int): Number of equal-width confidence bins.
 
     Returns:
-    float: The ECE score.
+    float: The ECE score, the count-weighted mean gap between confidence and accuracy per bin.
     """
-    # Implementation of ECE calculation
-    # This is a placeholder for the actual implementation
-    return 0.0
+    p, y = _clean(predictions, true_labels)
+    return float(ece_from_histograms(calibration_histogram(p, y, n_bins)))
+
+
+def adaptive_calibration_error(
+    predictions: List[float], true_labels: List[int], n_bins: int = DEFAULT_CALIBRATION_BINS
+) -> float:
+    """Calculate the adaptive ECE, using bins that hold equal numbers of predictions.
+
+    Parameters:
+    predictions (List[float]): List of predicted probabilities.
+    true_labels (List[int]): List of true binary labels (0 or 1).
+    n_bins (int): Number of equal-mass bins.
+
+    Returns:
+    float: The adaptive ECE score.
+    """
+    p, y = _clean(predictions, true_labels)
+    if not p.size:
+        return 0.0
+    order = np.argsort(p, kind='stable')
+    bins = np.empty(p.size, dtype=np.int64)
+    bins[order] = np.arange(p.size) * n_bins // p.size
+    histogram = np.stack([
+        np.bincount(bins, minlength=n_bins).astype(float),
+        np.bincount(bins, weights=p, minlength=n_bins),
+        np.bincount(bins, weights=y, minlength=n_bins),
+    ])
+    return float(ece_from_histograms(histogram))
+
 
 def brier_score(predictions: List[float], true_labels: List[int]) -> float:
     """Calculate the Brier score.
@@ -28,22 +184,30 @@ def brier_score(predictions: List[float], true_labels: List[int]) -> float:
     true_labels (List[int]): List of true binary labels (0 or 1).
 
     Returns:
-    float: The Brier score.
+    float: The Brier score, the mean squared difference between probability and label.
     """
-    # Implementation of Brier score calculation
-    # This is a placeholder for the actual implementation
-    return 0.0
+    p, y = _clean(predictions, true_labels)
+    return float(np.mean((p - y) ** 2)) if p.size else 0.0
+
 
-def calibration_metrics(predictions: List[float], true_labels: List[int]) -> CalibrationMetric:
+def calibration_metrics(
+    predictions: List[float], true_labels: List[int], n_bins: int = DEFAULT_CALIBRATION_BINS
+) -> CalibrationMetric:
     """Calculate calibration metrics.
 
     Parameters:
     predictions (List[float]): List of predicted probabilities.
     true_labels (List[int]): List of true binary labels (0 or 1).
+    n_bins (int): Number of bins for the ECE variants.
 
     Returns:
-    CalibrationMetric: A dataclass containing calibration metrics.
+    CalibrationMetric: Mean confidence, accuracy, ECE, adaptive ECE and Brier score.
     """
-    ece = expected_calibration_error(predictions, true_labels)
-    brier = brier_score(predictions, true_labels)
-    return CalibrationMetric(confidence=ece, accuracy=brier)
\ No newline at end of file
+    p, y = _clean(predictions, true_labels)
+    return CalibrationMetric(
+        confidence=float(p.mean()) if p.size else 0.0,
+        accuracy=float(y.mean()) if y.size else 0.0,
+        ece=expected_calibration_error(p, y, n_bins),
+        adaptive_ece=adaptive_calibration_error(p, y, n_bins),
+        brier_score=brier_score(p, y),
+    )
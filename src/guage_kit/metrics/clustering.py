@@ -0,0 +1,478 @@
+"""Clustering quality of large embedding sets.
+
+:class:`MiniBatchKMeans` clusters an array or memory-mapped ``.npy`` file
+from random mini-batches, so only a batch of vectors is in memory at a time,
+and assigns the final clusters in blocks. :func:`adjusted_rand_index` and
+:func:`normalized_mutual_info` compare two labelings through their
+contingency table, built with one ``np.bincount`` over combined label codes.
+:func:`silhouette_estimate` replaces the quadratic exact silhouette with an
+estimate: points are sampled in rounds and scored against a per-cluster
+reference sample until the confidence interval of the mean is narrow enough.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+import pathlib
+import numpy as np
+import scipy.sparse as sp
+from scipy.stats import norm
+
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_BLOCK = 32_768
+# Contingency tables with up to this many cells are counted densely with bincount
+DENSE_TABLE_CELLS = 1 << 24
+AVERAGE_METHODS = ('arithmetic', 'geometric', 'min', 'max')
+
+ClusterSource = Union[np.ndarray, str, pathlib.Path]
+
+
+def _as_array(source: ClusterSource) -> np.ndarray:
+    if isinstance(source, np.ndarray):
+        return source
+    path = pathlib.Path(source)
+    if path.suffix == '.npy':
+        return np.load(path, mmap_mode='r')
+    raise ValueError(f"Unsupported embedding file format: {path.suffix}; clustering reads arrays and .npy files")
+
+
+def _rows(array: np.ndarray, rows: np.ndarray, normalize: bool) -> np.ndarray:
+    """Read ``rows`` (sorted, for sequential memmap access) as float32."""
+    vectors = np.asarray(array[rows], dtype=np.float32)
+    if normalize:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+    return vectors
+
+
+def _label_codes(labels: Any) -> Tuple[np.ndarray, int]:
+    """Map labels to dense codes ``0..k-1``."""
+    labels = np.asarray(labels)
+    if labels.dtype.kind in 'iu' and labels.size and labels.min() >= 0 and labels.max() < 4 * labels.size:
+        # Small non-negative integers: compress the used values without sorting
+        used = np.bincount(labels) > 0
+        remap = np.cumsum(used) - 1
+        return remap[labels].astype(np.int64), int(used.sum())
+    uniques, codes = np.unique(labels, return_inverse=True)
+    return codes.astype(np.int64).ravel(), len(uniques)
+
+
+class Contingency(NamedTuple):
+    """Sparse contingency table of two labelings.
+
+    Attributes:
+        rows: Size of every class of the first labeling.
+        cols: Size of every cluster of the second labeling.
+        cell_rows: Class of every nonzero cell.
+        cell_cols: Cluster of every nonzero cell.
+        cells: Count of every nonzero cell.
+    """
+    rows: np.ndarray
+    cols: np.ndarray
+    cell_rows: np.ndarray
+    cell_cols: np.ndarray
+    cells: np.ndarray
+
+
+def contingency_table(labels_true: Any, labels_pred: Any) -> Contingency:
+    """Count co-occurrences of two labelings of the same points.
+
+    Raises:
+        ValueError: If the labelings have different lengths.
+    """
+    a, n_a = _label_codes(labels_true)
+    b, n_b = _label_codes(labels_pred)
+    if len(a) != len(b):
+        raise ValueError(f"Labelings have different lengths: {len(a)} and {len(b)}")
+    keys = a * n_b + b
+    if n_a * n_b <= DENSE_TABLE_CELLS:
+        counts = np.bincount(keys, minlength=n_a * n_b)
+        cell_keys = np.flatnonzero(counts)
+        cells = counts[cell_keys]
+    else:
+        cell_keys, cells = np.unique(keys, return_counts=True)
+    return Contingency(
+        np.bincount(a, minlength=n_a), np.bincount(b, minlength=n_b),
+        cell_keys // max(n_b, 1), cell_keys % max(n_b, 1), cells,
+    )
+
+
+def _pair_count(counts: np.ndarray) -> float:
+    counts = counts.astype(np.float64)
+    return float(np.dot(counts, counts - 1) / 2)
+
+
+def adjusted_rand_index(labels_true: Any, labels_pred: Any) -> float:
+    """Adjusted Rand index between two labelings, in [-1, 1] (1 for identical partitions).
+
+    Args:
+        labels_true: Reference class of every point.
+        labels_pred: Cluster of every point.
+    """
+    table = contingency_table(labels_true, labels_pred)
+    n = float(table.rows.sum())
+    if n < 2:
+        return 1.0
+    pairs_rows, pairs_cols = _pair_count(table.rows), _pair_count(table.cols)
+    expected = pairs_rows * pairs_cols / (n * (n - 1) / 2)
+    maximum = (pairs_rows + pairs_cols) / 2
+    if maximum == expected:
+        # Both labelings are trivial (one cluster, or all singletons)
+        return 1.0
+    return float((_pair_count(table.cells) - expected) / (maximum - expected))
+
+
+def _entropy(counts: np.ndarray) -> float:
+    p = counts[counts > 0] / counts.sum()
+    return float(-np.dot(p, np.log(p)))
+
+
+def normalized_mutual_info(labels_true: Any, labels_pred: Any, average: str = 'arithmetic') -> float:
+    """Normalized mutual information between two labelings, in [0, 1].
+
+    Args:
+        labels_true: Reference class of every point.
+        labels_pred: Cluster of every point.
+        average: How the two entropies are combined into the normaliser:
+            ``'arithmetic'`` (default), ``'geometric'``, ``'min'`` or ``'max'``.
+
+    Raises:
+        ValueError: If ``average`` is unknown.
+    """
+    if average not in AVERAGE_METHODS:
+        raise ValueError(f"Unknown average: {average}. Use one of {', '.join(AVERAGE_METHODS)}")
+    table = contingency_table(labels_true, labels_pred)
+    n = float(table.rows.sum())
+    if n == 0 or (len(table.rows) == 1 and len(table.cols) == 1):
+        return 1.0
+    cells = table.cells.astype(np.float64)
+    outer = table.rows[table.cell_rows].astype(np.float64) * table.cols[table.cell_cols]
+    mutual_info = float(np.dot(cells / n, np.log(cells * n / outer)))
+    h_true, h_pred = _entropy(table.rows), _entropy(table.cols)
+    normalizer = {
+        'arithmetic': (h_true + h_pred) / 2, 'geometric': np.sqrt(h_true * h_pred),
+        'min': min(h_true, h_pred), 'max': max(h_true, h_pred),
+    }[average]
+    return float(min(max(mutual_info / normalizer, 0.0), 1.0)) if normalizer > 0 else 0.0
+
+
+class MiniBatchKMeans:
+    """Mini-batch k-means over arrays or memory-mapped ``.npy`` files.
+
+    Centroids are seeded with greedy k-means++ on a sample and then moved
+    towards the points of random mini-batches: each centroid becomes the
+    running mean of every point assigned to it so far (Sculley, 2010). Training stops
+    after ``max_steps`` batches or once the smoothed centroid movement falls
+    below ``tol`` times the data variance.
+
+    Args:
+        n_clusters: Number of clusters.
+        batch_size: Points per mini-batch.
+        max_steps: Mini-batches to train on; defaults to one pass over the
+            data, and at least 100.
+        tol: Early-stopping threshold on centroid movement.
+        init_size: Points sampled for k-means++ seeding; defaults to
+            ``max(3 * n_clusters, 3 * batch_size)``.
+        reassignment_ratio: Every 10 batches, centroids that attracted fewer
+            than this fraction of the busiest centroid's points are moved to
+            random points of the batch.
+        normalize: L2-normalise vectors first (spherical k-means, cosine geometry).
+        seed: Seed for sampling and seeding.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_steps: Optional[int] = None,
+        tol: float = 1e-4,
+        init_size: Optional[int] = None,
+        reassignment_ratio: float = 0.01,
+        normalize: bool = False,
+        seed: int = 0,
+    ):
+        if n_clusters < 1:
+            raise ValueError("n_clusters must be a positive integer")
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_steps = max_steps
+        self.tol = tol
+        self.init_size = init_size
+        self.reassignment_ratio = reassignment_ratio
+        self.normalize = normalize
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.steps = 0
+
+    def _seed(self, sample: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Greedy k-means++: of a few candidates drawn by squared distance, keep the one that lowers the potential most."""
+        sq_norms = np.einsum('ij,ij->i', sample, sample)
+        n_trials = 2 + int(np.log(self.n_clusters))
+        chosen = [int(rng.integers(len(sample)))]
+        closest = np.maximum(sq_norms - 2 * sample @ sample[chosen[0]] + sq_norms[chosen[0]], 0.0)
+        for _ in range(1, self.n_clusters):
+            total = closest.sum()
+            if total > 0:
+                candidates = np.minimum(np.searchsorted(np.cumsum(closest), rng.random(n_trials) * total), len(sample) - 1)
+            else:
+                candidates = rng.integers(len(sample), size=n_trials)
+            distances = np.maximum(sq_norms[candidates, None] - 2 * sample[candidates] @ sample.T + sq_norms, 0.0)
+            potentials = np.minimum(distances, closest).sum(axis=1)
+            best = int(np.argmin(potentials))
+            chosen.append(int(candidates[best]))
+            closest = np.minimum(closest, distances[best])
+        return sample[chosen].copy()
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, half_norms: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ centroids.T - half_norms, axis=1)
+
+    def fit(self, source: ClusterSource) -> "MiniBatchKMeans":
+        """Train the centroids on ``source``.
+
+        Args:
+            source: ``(n, dim)`` array, ``np.memmap`` or ``.npy`` path.
+
+        Returns:
+            MiniBatchKMeans: ``self``.
+
+        Raises:
+            ValueError: If there are fewer points than clusters.
+        """
+        data = _as_array(source)
+        n = len(data)
+        if n < self.n_clusters:
+            raise ValueError(f"Need at least {self.n_clusters} points, got {n}")
+        rng = np.random.default_rng(self.seed)
+        init_size = min(self.init_size or max(3 * self.n_clusters, 3 * self.batch_size), n)
+        sample = _rows(data, np.sort(rng.choice(n, init_size, replace=False)), self.normalize)
+        centroids = self._seed(sample, rng).astype(np.float64)
+        threshold = self.tol * self.n_clusters * float(sample.var(axis=0).sum())
+        counts = np.zeros(self.n_clusters)
+
+        max_steps = self.max_steps or max(100, -(-n // self.batch_size))
+        smoothed = None
+        self.steps = 0
+        for step in range(max_steps):
+            batch = _rows(data, np.sort(rng.integers(0, n, self.batch_size)), self.normalize)
+            nearest = self._nearest(batch, centroids.astype(np.float32), 0.5 * np.einsum('ij,ij->i', centroids, centroids))
+            membership = sp.csr_matrix(
+                (np.ones(len(batch)), (nearest, np.arange(len(batch)))), shape=(self.n_clusters, len(batch))
+            )
+            sums = membership @ batch.astype(np.float64)
+            batch_counts = np.bincount(nearest, minlength=self.n_clusters)
+            hit = batch_counts > 0
+            previous = centroids[hit]
+            counts[hit] += batch_counts[hit]
+            # Running mean of every point assigned so far
+            centroids[hit] += (sums[hit] - batch_counts[hit, None] * previous) / counts[hit, None]
+            shift = float(((centroids[hit] - previous) ** 2).sum())
+            if step % 10 == 9:
+                # Move centroids that attract almost no points onto random batch points
+                starved = counts < self.reassignment_ratio * counts.max()
+                if starved.any() and not starved.all():
+                    picks = rng.choice(len(batch), min(int(starved.sum()), len(batch)), replace=False)
+                    targets = np.flatnonzero(starved)[:len(picks)]
+                    centroids[targets] = batch[picks]
+                    counts[targets] = counts[~starved].min()
+            smoothed = shift if smoothed is None else 0.9 * smoothed + 0.1 * shift
+            self.steps = step + 1
+            if step >= 10 and smoothed <= threshold:
+                break
+        self.centroids = centroids.astype(np.float32)
+        return self
+
+    def predict(self, source: ClusterSource, block_size: int = DEFAULT_BLOCK) -> np.ndarray:
+        """Assign every point to its nearest centroid, reading ``block_size`` rows at a time."""
+        if self.centroids is None:
+            raise ValueError("Call fit() before predict()")
+        data = _as_array(source)
+        half_norms = 0.5 * np.einsum('ij,ij->i', self.centroids, self.centroids)
+        labels = np.empty(len(data), dtype=np.int32)
+        for start in range(0, len(data), block_size):
+            block = _rows(data, np.arange(start, min(start + block_size, len(data))), self.normalize)
+            labels[start:start + len(block)] = self._nearest(block, self.centroids, half_norms)
+        return labels
+
+    def fit_predict(self, source: ClusterSource) -> np.ndarray:
+        return self.fit(source).predict(source)
+
+
+def _reference_sample(codes: np.ndarray, per_cluster: int, rng: np.random.Generator) -> np.ndarray:
+    """Sorted row numbers of up to ``per_cluster`` random members of every cluster."""
+    order = rng.permutation(len(codes))
+    grouped = order[np.argsort(codes[order], kind='stable')]
+    sizes = np.bincount(codes[grouped])
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    rank = np.arange(len(grouped)) - starts
+    return np.sort(grouped[rank < per_cluster])
+
+
+def silhouette_estimate(
+    source: ClusterSource,
+    labels: Any,
+    tolerance: float = 0.01,
+    confidence_level: float = 0.95,
+    reference_per_cluster: int = 200,
+    batch_size: int = 1024,
+    max_points: Optional[int] = None,
+    metric: str = 'euclidean',
+    block_size: int = 16_384,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Estimate the mean silhouette coefficient without the O(n^2) pairwise distances.
+
+    Every cluster is represented by a random reference sample of up to
+    ``reference_per_cluster`` members, from which the mean distance of a
+    point to each cluster is estimated. Points are drawn without replacement
+    in rounds of ``batch_size`` and scored against the reference sample until
+    the confidence interval of the mean silhouette is at most ``tolerance``
+    wide on either side, or ``max_points`` points were scored. The interval
+    covers the point sampling; when every cluster fits in the reference
+    sample the per-point values are exact, and scoring all points then gives
+    the exact silhouette.
+
+    Args:
+        source: ``(n, dim)`` array, ``np.memmap`` or ``.npy`` path.
+        labels: Cluster of every point.
+        tolerance: Target half-width of the confidence interval.
+        confidence_level: Coverage of the interval.
+        reference_per_cluster: Reference points per cluster (at least 2).
+        batch_size: Points scored per round.
+        max_points: Upper bound on scored points; all points by default.
+        metric: ``'euclidean'`` or ``'cosine'`` distance.
+        block_size: Reference points compared per matrix product.
+        seed: Seed for the reference and point samples.
+
+    Returns:
+        Dict[str, float]: ``silhouette`` (estimated mean), ``stderr``,
+        ``ci_lower``, ``ci_upper`` and ``n_points`` (points scored).
+
+    Raises:
+        ValueError: If the number of clusters is not between 2 and ``n - 1``,
+            or the metric is unknown.
+    """
+    if metric not in ('euclidean', 'cosine'):
+        raise ValueError(f"Unknown metric: {metric}. Use 'euclidean' or 'cosine'")
+    if reference_per_cluster < 2:
+        raise ValueError("reference_per_cluster must be at least 2")
+    data = _as_array(source)
+    codes, k = _label_codes(labels)
+    n = len(codes)
+    if len(data) != n:
+        raise ValueError(f"Got {len(data)} points but {n} labels")
+    if not 2 <= k <= n - 1:
+        raise ValueError(f"Number of clusters is {k}; the silhouette needs 2 to n_samples - 1 clusters")
+    rng = np.random.default_rng(seed)
+    normalize = metric == 'cosine'
+    sizes = np.bincount(codes, minlength=k)
+
+    reference_rows = _reference_sample(codes, reference_per_cluster, rng)
+    reference = _rows(data, reference_rows, normalize)
+    reference_sq = np.einsum('ij,ij->i', reference, reference)
+    reference_codes = codes[reference_rows]
+    reference_counts = np.bincount(reference_codes, minlength=k).astype(np.float64)
+    in_reference = np.zeros(n, dtype=bool)
+    in_reference[reference_rows] = True
+    blocks = [
+        (start, sp.csr_matrix(
+            (np.ones(min(block_size, len(reference) - start)),
+             (np.arange(min(block_size, len(reference) - start)), reference_codes[start:start + block_size])),
+            shape=(min(block_size, len(reference) - start), k),
+        ))
+        for start in range(0, len(reference), block_size)
+    ]
+
+    max_points = min(max_points or n, n)
+    order = rng.permutation(n)[:max_points]
+    z = float(norm.ppf(0.5 + confidence_level / 2))
+    values = []
+    scored = 0
+    mean = stderr = 0.0
+    while scored < max_points:
+        rows = np.sort(order[scored:scored + batch_size])
+        scored += len(rows)
+        points = _rows(data, rows, normalize)
+        points_sq = np.einsum('ij,ij->i', points, points)
+        sums = np.zeros((len(rows), k))
+        for start, membership in blocks:
+            block = reference[start:start + membership.shape[0]]
+            products = points @ block.T
+            if normalize:
+                distances = 1.0 - products
+            else:
+                distances = np.sqrt(np.maximum(points_sq[:, None] + reference_sq[None, start:start + len(block)] - 2 * products, 0.0))
+            sums += (membership.T @ distances.T.astype(np.float64)).T
+
+        own = codes[rows]
+        local = np.arange(len(rows))
+        # A point in the reference sample must not count its zero distance to itself
+        own_counts = reference_counts[own] - in_reference[rows]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            a = sums[local, own] / own_counts
+            means = sums / reference_counts
+        means[local, own] = np.inf
+        b = means.min(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            s = np.where(np.maximum(a, b) > 0, (b - a) / np.maximum(a, b), 0.0)
+        s[sizes[own] == 1] = 0.0  # Singleton clusters score 0 by convention
+        values.append(s)
+
+        sample = np.concatenate(values)
+        mean = float(sample.mean())
+        if len(sample) > 1:
+            # Finite population correction: scoring every point leaves no sampling error
+            stderr = float(sample.std(ddof=1) / np.sqrt(len(sample)) * np.sqrt(1 - len(sample) / n))
+        if len(sample) > 1 and z * stderr <= tolerance:
+            break
+
+    return {
+        'silhouette': mean,
+        'stderr': stderr,
+        'ci_lower': mean - z * stderr,
+        'ci_upper': mean + z * stderr,
+        'n_points': scored,
+    }
+
+
+def clustering_metrics(
+    embeddings: ClusterSource,
+    labels_true: Any,
+    labels_pred: Optional[Any] = None,
+    n_clusters: Optional[int] = None,
+    silhouette: bool = True,
+    normalize: bool = False,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Cluster embeddings and score the clusters against reference classes.
+
+    Args:
+        embeddings: ``(n, dim)`` array, ``np.memmap`` or ``.npy`` path.
+        labels_true: Reference class of every embedding.
+        labels_pred: Precomputed clusters; otherwise :class:`MiniBatchKMeans`
+            is run with ``n_clusters`` (default: the number of classes).
+        n_clusters: Number of k-means clusters.
+        silhouette: Also estimate the silhouette of the clusters
+            (see :func:`silhouette_estimate`).
+        normalize: Cluster and measure distances in cosine geometry.
+        seed: Seed for k-means and the silhouette sample.
+
+    Returns:
+        Dict[str, Any]: ``ari``, ``nmi`` and, with ``silhouette``, the
+        ``silhouette`` estimate with ``silhouette_ci_lower``/``silhouette_ci_upper``.
+    """
+    if labels_pred is None:
+        k = n_clusters or _label_codes(labels_true)[1]
+        labels_pred = MiniBatchKMeans(k, normalize=normalize, seed=seed).fit_predict(embeddings)
+    results: Dict[str, Any] = {
+        'ari': adjusted_rand_index(labels_true, labels_pred),
+        'nmi': normalized_mutual_info(labels_true, labels_pred),
+    }
+    if silhouette:
+        estimate = silhouette_estimate(
+            embeddings, labels_pred, metric='cosine' if normalize else 'euclidean', seed=seed
+        )
+        results.update(
+            silhouette=estimate['silhouette'],
+            silhouette_ci_lower=estimate['ci_lower'],
+            silhouette_ci_upper=estimate['ci_upper'],
+        )
+    return results
@@ -0,0 +1,263 @@
+"""RAG context metrics from a shared per-chunk relevance matrix.
+
+For a batch of samples, :func:`context_relevance` judges every retrieved
+chunk once and returns a flattened :class:`ContextRelevance`: whether each
+chunk is relevant to the query (from id labels, or because it supports a
+reference statement) and which answer sentences each chunk supports. All
+sentence/chunk pairs of the batch are compared in one vectorized step, with
+every distinct text vectorized or encoded once. :func:`context_scores` then
+reduces the matrix to the four context metrics:
+
+* ``context_precision``: average precision of the ranked chunks, i.e. whether
+  relevant chunks are ranked above irrelevant ones;
+* ``context_recall``: share of relevant ids retrieved, or of reference
+  statements supported by some chunk;
+* ``context_utilization``: share of retrieved chunks that support the answer;
+* ``noise_sensitivity``: share of answer sentences supported only by
+  irrelevant chunks (lower is better).
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from .encoders import TextEncoder
+from .hallucination import _content_vectorizer, split_claims
+
+CONTEXT_METRICS = ('context_precision', 'context_recall', 'context_utilization', 'noise_sensitivity')
+RELEVANCE_MODES = ('lexical', 'embedding', 'ids')
+DEFAULT_CONTEXT_THRESHOLD = 0.5
+
+
+class ContextRelevance(NamedTuple):
+    """Per-chunk and per-sentence judgements for a batch, flattened by sample.
+
+    Sample ``i`` owns ``relevant[chunk_offsets[i]:chunk_offsets[i + 1]]`` (in
+    rank order) and ``supported_by_relevant[sentence_offsets[i]:sentence_offsets[i + 1]]``.
+
+    Attributes:
+        chunk_offsets: ``n_samples + 1`` offsets into the chunk arrays.
+        relevant: Whether each chunk is relevant to the query.
+        used: Whether each chunk supports at least one answer sentence.
+        n_targets: Relevant ids or reference statements per sample; 0 when the
+            sample has no relevance information.
+        n_recalled: How many of the targets the retrieved chunks cover.
+        sentence_offsets: ``n_samples + 1`` offsets into the sentence arrays.
+        supported_by_relevant: Whether each answer sentence is supported by a relevant chunk.
+        supported_by_irrelevant: Whether each answer sentence is supported by an irrelevant chunk.
+    """
+    chunk_offsets: np.ndarray
+    relevant: np.ndarray
+    used: np.ndarray
+    n_targets: np.ndarray
+    n_recalled: np.ndarray
+    sentence_offsets: np.ndarray
+    supported_by_relevant: np.ndarray
+    supported_by_irrelevant: np.ndarray
+
+
+def _offsets(counts: Sequence[int]) -> np.ndarray:
+    return np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]).astype(np.int64)
+
+
+def _sample_pairs(left_offsets: np.ndarray, right_offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every ``(left, right)`` index pair that belongs to the same sample."""
+    left_counts, right_counts = np.diff(left_offsets), np.diff(right_offsets)
+    owner = np.repeat(np.arange(len(left_counts)), left_counts)
+    per_left = right_counts[owner]
+    pair_left = np.repeat(np.arange(len(owner)), per_left)
+    first = _offsets(per_left)[:-1]
+    pair_right = np.arange(len(pair_left)) - np.repeat(first, per_left) + np.repeat(right_offsets[:-1][owner], per_left)
+    return pair_left, pair_right
+
+
+class _TextRows:
+    """Vectorizes or encodes every distinct text of a batch once."""
+
+    def __init__(self, texts: Sequence[str], encoder: Optional[TextEncoder]):
+        self.index = {text: i for i, text in enumerate(dict.fromkeys(texts))}
+        self.encoder = encoder
+        if encoder is not None:
+            self.vectors = encoder.encode(list(self.index))
+        else:
+            self.matrix = _content_vectorizer().transform(list(self.index)).tocsr()
+            self.counts = np.diff(self.matrix.indptr).astype(float)
+
+    def rows(self, texts: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.index[text] for text in texts), dtype=np.int64, count=len(texts))
+
+    def support(self, statement_rows: np.ndarray, chunk_rows: np.ndarray) -> np.ndarray:
+        """How well each chunk supports the statement of its pair.
+
+        Lexically, the share of the statement's content words found in the
+        chunk; with an encoder, the cosine similarity of their embeddings.
+        """
+        if not len(statement_rows):
+            return np.zeros(0)
+        if self.encoder is not None:
+            return np.einsum('ij,ij->i', self.vectors[statement_rows], self.vectors[chunk_rows])
+        hits = np.asarray(
+            self.matrix[statement_rows].multiply(self.matrix[chunk_rows]).sum(axis=1), dtype=float
+        ).ravel()
+        counts = self.counts[statement_rows]
+        return np.where(counts > 0, hits / np.where(counts > 0, counts, 1.0), 1.0)
+
+
+def context_relevance(
+    answers: Sequence[str],
+    chunk_texts: Sequence[Optional[Sequence[str]]],
+    references: Optional[Sequence[Optional[Sequence[str]]]] = None,
+    retrieved_ids: Optional[Sequence[Optional[Sequence[str]]]] = None,
+    relevant_ids: Optional[Sequence[Optional[Sequence[str]]]] = None,
+    mode: str = 'lexical',
+    threshold: float = DEFAULT_CONTEXT_THRESHOLD,
+    encoder: Optional[TextEncoder] = None,
+) -> ContextRelevance:
+    """Judge every retrieved chunk of a batch once.
+
+    Args:
+        answers: Generated text per sample.
+        chunk_texts: Retrieved chunk texts per sample, in rank order; None without retrieval.
+        references: Reference answers per sample (``'lexical'``/``'embedding'`` modes).
+        retrieved_ids: Retrieved chunk ids per sample (``'ids'`` mode).
+        relevant_ids: Relevant chunk ids per sample (``'ids'`` mode).
+        mode: ``'ids'`` labels chunks relevant when their id is in
+            ``relevant_ids``; ``'lexical'`` and ``'embedding'`` label them
+            relevant when they support a sentence of a reference.
+        threshold: Support a statement needs from a chunk (content-word
+            coverage, or cosine similarity with an encoder).
+        encoder: Text encoder; required for ``'embedding'`` mode and used for
+            answer support in every mode when given.
+
+    Returns:
+        ContextRelevance: The flattened judgements.
+
+    Raises:
+        ValueError: If the mode is unknown or its inputs are missing.
+    """
+    if mode not in RELEVANCE_MODES:
+        raise ValueError(f"Unknown context relevance mode: {mode}")
+    if mode == 'embedding' and encoder is None:
+        raise ValueError("The 'embedding' relevance mode needs an encoder")
+    if mode == 'ids' and (retrieved_ids is None or relevant_ids is None):
+        raise ValueError("The 'ids' relevance mode needs retrieved_ids and relevant_ids")
+    if mode != 'ids' and references is None:
+        raise ValueError(f"The '{mode}' relevance mode needs references")
+    num_samples = len(answers)
+
+    # Chunks in rank order; in id mode the id list decides how many were retrieved
+    if mode == 'ids':
+        chunk_counts = [len(ids or ()) for ids in retrieved_ids]
+        chunks = [
+            (texts[rank] if texts and rank < len(texts) else '')
+            for ids, texts in zip(retrieved_ids, chunk_texts) for rank in range(len(ids or ()))
+        ]
+    else:
+        chunk_counts = [len(texts or ()) for texts in chunk_texts]
+        chunks = [text for texts in chunk_texts for text in texts or ()]
+    chunk_offsets = _offsets(chunk_counts)
+
+    # Reference statements (similarity modes) and answer sentences, all vectorized together
+    statements = [] if mode == 'ids' else [
+        [sentence for reference in refs or () for sentence in split_claims(reference or '')]
+        for refs in references
+    ]
+    sentences = [split_claims(answer or '') for answer in answers]
+    flat_statements = [sentence for sample in statements for sentence in sample]
+    flat_sentences = [sentence for sample in sentences for sentence in sample]
+    text_rows = _TextRows(flat_statements + flat_sentences + chunks, encoder)
+    chunk_rows = text_rows.rows(chunks)
+
+    relevant = np.zeros(len(chunks), dtype=bool)
+    n_targets = np.zeros(num_samples, dtype=np.int64)
+    n_recalled = np.zeros(num_samples, dtype=np.int64)
+    if mode == 'ids':
+        for i, (ids, labels) in enumerate(zip(retrieved_ids, relevant_ids)):
+            labels = set(labels or ())
+            if not labels:
+                continue
+            relevant[chunk_offsets[i]:chunk_offsets[i + 1]] = [doc_id in labels for doc_id in ids or ()]
+            n_targets[i] = len(labels)
+            n_recalled[i] = len(labels.intersection(ids or ()))
+    else:
+        statement_offsets = _offsets([len(s) for s in statements])
+        pair_statement, pair_chunk = _sample_pairs(statement_offsets, chunk_offsets)
+        support = text_rows.support(text_rows.rows(flat_statements)[pair_statement], chunk_rows[pair_chunk]) >= threshold
+        np.logical_or.at(relevant, pair_chunk[support], True)
+        covered = np.zeros(len(flat_statements), dtype=bool)
+        np.logical_or.at(covered, pair_statement[support], True)
+        statement_owner = np.repeat(np.arange(num_samples), np.diff(statement_offsets))
+        n_targets = np.bincount(statement_owner, minlength=num_samples).astype(np.int64)
+        n_recalled = np.bincount(statement_owner, weights=covered, minlength=num_samples).astype(np.int64)
+
+    # Answer sentences against the chunks of their sample; chunks without text support nothing
+    sentence_offsets = _offsets([len(s) for s in sentences])
+    pair_sentence, pair_chunk = _sample_pairs(sentence_offsets, chunk_offsets)
+    has_text = np.array([bool(chunk) for chunk in chunks], dtype=bool)
+    keep = has_text[pair_chunk]
+    pair_sentence, pair_chunk = pair_sentence[keep], pair_chunk[keep]
+    support = text_rows.support(text_rows.rows(flat_sentences)[pair_sentence], chunk_rows[pair_chunk]) >= threshold
+    used = np.zeros(len(chunks), dtype=bool)
+    np.logical_or.at(used, pair_chunk[support], True)
+    by_relevant = np.zeros(len(flat_sentences), dtype=bool)
+    by_irrelevant = np.zeros(len(flat_sentences), dtype=bool)
+    from_relevant = relevant[pair_chunk]
+    np.logical_or.at(by_relevant, pair_sentence[support & from_relevant], True)
+    np.logical_or.at(by_irrelevant, pair_sentence[support & ~from_relevant], True)
+
+    return ContextRelevance(
+        chunk_offsets, relevant, used, n_targets, n_recalled, sentence_offsets, by_relevant, by_irrelevant
+    )
+
+
+def context_scores(
+    relevance: ContextRelevance,
+    has_retrieval: Optional[np.ndarray] = None,
+    has_texts: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """Reduce a :class:`ContextRelevance` to per-sample context metrics.
+
+    Args:
+        relevance: Judgements from :func:`context_relevance`.
+        has_retrieval: Mask of samples with a retrieval result; every metric
+            is NaN elsewhere. All samples by default.
+        has_texts: Mask of samples whose chunk texts are known; utilization
+            and noise sensitivity are NaN elsewhere. All samples by default.
+
+    Returns:
+        Dict[str, np.ndarray]: Per-sample scores for :data:`CONTEXT_METRICS`.
+        Precision, recall and noise sensitivity are NaN without relevance
+        information; precision, utilization and noise sensitivity are NaN
+        without retrieved chunks; utilization and noise sensitivity are NaN
+        without answer sentences.
+    """
+    offsets = relevance.chunk_offsets
+    num_samples = len(offsets) - 1
+    n_chunks = np.diff(offsets)
+    owner = np.repeat(np.arange(num_samples), n_chunks)
+    rank = np.arange(len(owner)) - offsets[:-1][owner] + 1
+    flags = relevance.relevant.astype(float)
+    # Precision at each rank, from the running count of relevant chunks per sample
+    running = np.cumsum(flags) - np.repeat(np.concatenate([[0.0], np.cumsum(flags)])[offsets[:-1]], n_chunks)
+    precision_sum = np.bincount(owner, weights=flags * running / rank, minlength=num_samples)
+    n_hits = np.bincount(owner, weights=flags, minlength=num_samples)
+    used = np.bincount(owner, weights=relevance.used, minlength=num_samples)
+
+    n_sentences = np.diff(relevance.sentence_offsets)
+    sentence_owner = np.repeat(np.arange(num_samples), n_sentences)
+    noisy = relevance.supported_by_irrelevant & ~relevance.supported_by_relevant
+    n_noisy = np.bincount(sentence_owner, weights=noisy, minlength=num_samples)
+
+    everywhere = np.ones(num_samples, dtype=bool)
+    retrieved = everywhere if has_retrieval is None else np.asarray(has_retrieval, dtype=bool)
+    labelled = retrieved & (relevance.n_targets > 0)
+    answered = retrieved & (n_chunks > 0) & (n_sentences > 0)
+    if has_texts is not None:
+        answered &= np.asarray(has_texts, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'context_precision': np.where(
+                labelled & (n_chunks > 0), np.where(n_hits > 0, precision_sum / n_hits, 0.0), np.nan
+            ),
+            'context_recall': np.where(labelled, relevance.n_recalled / relevance.n_targets, np.nan),
+            'context_utilization': np.where(answered, used / n_chunks, np.nan),
+            'noise_sensitivity': np.where(answered & labelled, n_noisy / n_sentences, np.nan),
+        }
@@ -0,0 +1,482 @@
+"""Embedding drift between snapshots, computed from persisted sketches.
+
+:func:`sketch_embeddings` summarizes an embedding snapshot in one streaming
+pass into a :class:`DriftSketch` whose size does not depend on the number of
+vectors:
+
+* the mean and covariance of :class:`~guage_kit.metrics.embedding_stats.EmbeddingStats`;
+* histograms of the vectors projected onto fixed random unit directions;
+* a uniform reservoir sample of the vectors.
+
+Sketches are saved as ``.npz`` files and :func:`compare_sketches` computes
+drift between two of them without the raw vectors: centroid shift and
+Fréchet distance from the moments, Kolmogorov-Smirnov and Wasserstein
+distances per projection from the histograms, and MMD, coverage and outlier
+rate from the reservoir samples.
+"""
+
+from typing import Any, Dict, Optional, Tuple, Union
+import pathlib
+import numpy as np
+from ..utils.parallel import parallel_imap
+from .embedding_stats import (
+    DEFAULT_CHUNK_SIZE,
+    EmbeddingSource,
+    EmbeddingStats,
+    _open_source,
+    iter_embedding_chunks,
+)
+
+DEFAULT_PROJECTIONS = 64
+DEFAULT_PROJECTION_BINS = 256
+DEFAULT_RESERVOIR_SIZE = 4096
+SKETCH_VERSION = 1
+# Rows per block of the pairwise distance and kernel computations
+DISTANCE_BLOCK = 1024
+
+
+def random_projections(dim: int, n_projections: int, seed: int) -> np.ndarray:
+    """Return ``(dim, n_projections)`` random unit directions determined by ``seed``."""
+    directions = np.random.default_rng(seed).normal(size=(dim, n_projections))
+    return (directions / np.linalg.norm(directions, axis=0)).astype(np.float32)
+
+
+class DriftSketch:
+    """Mergeable fixed-size summary of an embedding snapshot.
+
+    Sketches are comparable when they share ``dim``, ``n_projections`` and
+    ``seed`` (and so the projection directions). Histograms cover
+    ``[-projection_range, projection_range]`` in ``bins`` equal-width bins plus
+    one underflow and one overflow bin; the range is set from the first chunk
+    if not given.
+
+    Args:
+        dim: Embedding dimension.
+        n_projections: Number of random projection directions.
+        bins: Histogram bins per projection.
+        projection_range: Half-width of the histogram range.
+        reservoir_size: Vectors kept in the reservoir sample.
+        covariance: Track the full covariance (needed for the Fréchet distance).
+        seed: Seed of the projection directions.
+        stream: Index of the row range this sketch covers when several
+            sketches are merged, so that they draw independent reservoir samples.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        n_projections: int = DEFAULT_PROJECTIONS,
+        bins: int = DEFAULT_PROJECTION_BINS,
+        projection_range: Optional[float] = None,
+        reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+        covariance: bool = True,
+        seed: int = 0,
+        stream: int = 0,
+    ):
+        self.dim = dim
+        self.n_projections = n_projections
+        self.bins = bins
+        self.projection_range = projection_range
+        self.reservoir_size = reservoir_size
+        self.seed = seed
+        self.stats = EmbeddingStats(dim, covariance=covariance)
+        self.projections = random_projections(dim, n_projections, seed)
+        self.histograms = np.zeros((n_projections, bins + 2), dtype=np.int64)
+        self.projection_min = np.full(n_projections, np.inf)
+        self.projection_max = np.full(n_projections, -np.inf)
+        self.reservoir = np.empty((0, dim), dtype=np.float32)
+        self._rng = np.random.default_rng([seed, stream])
+
+    @property
+    def count(self) -> int:
+        return self.stats.count
+
+    def update(self, chunk: np.ndarray) -> None:
+        """Fold a ``(n, dim)`` chunk of embeddings into the sketch."""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        n = len(chunk)
+        seen = self.count
+        self.stats.update(chunk)
+        if n == 0:
+            return
+
+        projected = chunk @ self.projections
+        if self.projection_range is None:
+            # Round up to a power of two so snapshots of a similar scale share bin edges
+            largest = float(np.abs(projected).max()) * 2 or 1.0
+            self.projection_range = float(2.0 ** np.ceil(np.log2(largest)))
+        self.histograms += self._histogram(projected)
+        self.projection_min = np.minimum(self.projection_min, projected.min(axis=0))
+        self.projection_max = np.maximum(self.projection_max, projected.max(axis=0))
+        self._sample(chunk, seen)
+
+    def _histogram(self, projected: np.ndarray) -> np.ndarray:
+        scaled = (projected + self.projection_range) * (self.bins / (2 * self.projection_range))
+        bins = np.clip(np.floor(scaled), -1, self.bins).astype(np.int64) + 1
+        keys = bins + np.arange(self.n_projections, dtype=np.int64) * (self.bins + 2)
+        return np.bincount(keys.ravel(), minlength=self.histograms.size).reshape(self.histograms.shape)
+
+    def _sample(self, chunk: np.ndarray, seen: int) -> None:
+        """Algorithm R over a chunk: row ``t`` replaces a random slot with probability ``k / (t + 1)``."""
+        k = self.reservoir_size
+        fill = min(max(k - seen, 0), len(chunk))
+        if fill:
+            self.reservoir = np.concatenate([self.reservoir, chunk[:fill]])
+        rest = np.arange(seen + fill, seen + len(chunk), dtype=np.int64)
+        if not rest.size:
+            return
+        slots = (self._rng.random(rest.size) * (rest + 1)).astype(np.int64)
+        accepted = slots < k
+        rows, slots = rest[accepted] - seen, slots[accepted]
+        # A slot drawn twice keeps the later row, as in the sequential algorithm
+        last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+        self.reservoir[slots[last]] = chunk[rows[last]]
+
+    def _check_compatible(self, other: "DriftSketch") -> None:
+        if (self.dim, self.n_projections, self.seed) != (other.dim, other.n_projections, other.seed):
+            raise ValueError(
+                "Sketches use different projections: "
+                f"dim/n_projections/seed {self.dim}/{self.n_projections}/{self.seed} "
+                f"vs {other.dim}/{other.n_projections}/{other.seed}"
+            )
+
+    def merge(self, other: "DriftSketch") -> None:
+        """Fold a sketch of other rows of the same snapshot into this one.
+
+        Both sketches must use the same projections, bins and projection range.
+        The merged reservoir is a uniform sample of the union of their rows.
+        """
+        self._check_compatible(other)
+        if other.count == 0:
+            return
+        if self.count and (self.bins, self.projection_range) != (other.bins, other.projection_range):
+            raise ValueError("Only sketches with the same bins and projection range can be merged")
+        if self.count == 0:
+            self.projection_range = other.projection_range
+
+        size = min(self.reservoir_size, self.count + other.count)
+        from_self = self._rng.hypergeometric(self.count, other.count, size) if self.count else 0
+        keep_self = self._rng.choice(len(self.reservoir), from_self, replace=False)
+        keep_other = self._rng.choice(len(other.reservoir), size - from_self, replace=False)
+        self.reservoir = np.concatenate([self.reservoir[np.sort(keep_self)], other.reservoir[np.sort(keep_other)]])
+
+        self.stats.merge(other.stats)
+        self.histograms += other.histograms
+        self.projection_min = np.minimum(self.projection_min, other.projection_min)
+        self.projection_max = np.maximum(self.projection_max, other.projection_max)
+
+    def cdf_knots(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(x, F)``: ``(n_projections, bins + 3)`` knots of each projection's piecewise-linear CDF.
+
+        Mass is spread uniformly within each bin; the underflow and overflow
+        bins stretch to the smallest and largest projected values seen.
+        """
+        r = self.projection_range or 1.0
+        edges = np.linspace(-r, r, self.bins + 1)
+        x = np.empty((self.n_projections, self.bins + 3))
+        x[:, 0] = np.minimum(self.projection_min, -r)
+        x[:, 1:-1] = edges
+        x[:, -1] = np.maximum(self.projection_max, r)
+        cumulative = np.concatenate(
+            [np.zeros((self.n_projections, 1)), np.cumsum(self.histograms, axis=1)], axis=1
+        )
+        return x, cumulative / max(self.count, 1)
+
+    def save(self, path: Union[str, pathlib.Path]) -> None:
+        """Write the sketch to an ``.npz`` file."""
+        np.savez(
+            path,
+            version=SKETCH_VERSION,
+            n_projections=self.n_projections,
+            bins=self.bins,
+            projection_range=np.nan if self.projection_range is None else self.projection_range,
+            reservoir_size=self.reservoir_size,
+            seed=self.seed,
+            histograms=self.histograms,
+            projection_min=self.projection_min,
+            projection_max=self.projection_max,
+            reservoir=self.reservoir,
+            **{'stats_' + key: value for key, value in self.stats.state().items()},
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, pathlib.Path]) -> "DriftSketch":
+        """Read a sketch written by :meth:`save`."""
+        with np.load(path) as data:
+            state = dict(data)
+        projection_range = float(state['projection_range'])
+        sketch = cls(
+            int(state['stats_dim']),
+            n_projections=int(state['n_projections']),
+            bins=int(state['bins']),
+            projection_range=None if np.isnan(projection_range) else projection_range,
+            reservoir_size=int(state['reservoir_size']),
+            covariance='stats_m2' in state,
+            seed=int(state['seed']),
+        )
+        sketch.stats = EmbeddingStats.from_state(state, prefix='stats_')
+        sketch.histograms = state['histograms']
+        sketch.projection_min = state['projection_min']
+        sketch.projection_max = state['projection_max']
+        sketch.reservoir = state['reservoir']
+        return sketch
+
+
+def _sketch_range(task: Tuple[Any, int, int, Dict[str, Any], int]) -> DriftSketch:
+    source, start, stop, options, chunk_size = task
+    sketch = DriftSketch(**options, stream=start)
+    for chunk in iter_embedding_chunks(source, chunk_size, start=start, stop=stop):
+        sketch.update(chunk)
+    return sketch
+
+
+def sketch_embeddings(
+    source: EmbeddingSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    column: str = 'embedding',
+    n_projections: int = DEFAULT_PROJECTIONS,
+    bins: int = DEFAULT_PROJECTION_BINS,
+    projection_range: Optional[float] = None,
+    reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+    covariance: bool = True,
+    seed: int = 0,
+    like: Optional[DriftSketch] = None,
+    num_workers: int = 1,
+) -> DriftSketch:
+    """Summarize an embedding snapshot into a :class:`DriftSketch` in one pass.
+
+    Args:
+        source: Array, ``.npy`` file or ``.parquet`` file (see
+            :func:`~guage_kit.metrics.embedding_stats.iter_embedding_chunks`).
+        chunk_size: Rows folded per update.
+        column: Parquet column holding the embeddings.
+        n_projections: Number of random projection directions.
+        bins: Histogram bins per projection.
+        projection_range: Half-width of the histogram range; set from the
+            first chunk by default.
+        reservoir_size: Vectors kept in the reservoir sample.
+        covariance: Track the full covariance (needed for the Fréchet distance).
+        seed: Seed of the projection directions.
+        like: Existing sketch (e.g. of the reference snapshot) whose
+            projections, bins, range and reservoir size are reused, so the
+            histograms line up exactly. Overrides the settings above.
+        num_workers: Worker processes for ``.npy`` files; each sketches a
+            contiguous row range and the sketches are merged.
+
+    Returns:
+        DriftSketch: The sketch of the whole snapshot.
+    """
+    n_rows, dim = _open_source(source, column)
+    options = dict(
+        dim=dim, n_projections=n_projections, bins=bins, projection_range=projection_range,
+        reservoir_size=reservoir_size, covariance=covariance, seed=seed,
+    )
+    if like is not None:
+        options.update(
+            n_projections=like.n_projections, bins=like.bins, projection_range=like.projection_range,
+            reservoir_size=like.reservoir_size, seed=like.seed,
+        )
+    is_npy = isinstance(source, (str, pathlib.Path)) and pathlib.Path(source).suffix == '.npy'
+
+    if num_workers > 1 and is_npy and n_rows:
+        if options['projection_range'] is None:
+            # Workers must share bin edges, so fix the range from the first chunk up front
+            probe = DriftSketch(**options)
+            probe.update(next(iter_embedding_chunks(source, chunk_size)))
+            options['projection_range'] = probe.projection_range
+        step = -(-n_rows // num_workers)
+        tasks = [(str(source), i, min(i + step, n_rows), options, chunk_size) for i in range(0, n_rows, step)]
+        sketch = DriftSketch(**options)
+        for partial in parallel_imap(_sketch_range, tasks, num_workers=num_workers):
+            sketch.merge(partial)
+        return sketch
+
+    sketch = DriftSketch(**options)
+    for chunk in iter_embedding_chunks(source, chunk_size, column=column):
+        sketch.update(chunk)
+    return sketch
+
+
+def projection_distances(reference: DriftSketch, current: DriftSketch) -> Tuple[np.ndarray, np.ndarray]:
+    """Kolmogorov-Smirnov and Wasserstein-1 distance per projection.
+
+    Both CDFs are evaluated on the union of their knots; between knots they
+    are linear, so the KS statistic is exact for the binned distributions and
+    the Wasserstein distance (the area between the CDFs) nearly so.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: ``(ks, wasserstein)``, one value per projection.
+    """
+    reference._check_compatible(current)
+    ref_x, ref_f = reference.cdf_knots()
+    cur_x, cur_f = current.cdf_knots()
+    ks = np.empty(reference.n_projections)
+    wasserstein = np.empty(reference.n_projections)
+    for p in range(reference.n_projections):
+        grid = np.union1d(ref_x[p], cur_x[p])
+        gap = np.abs(np.interp(grid, ref_x[p], ref_f[p]) - np.interp(grid, cur_x[p], cur_f[p]))
+        ks[p] = gap.max()
+        wasserstein[p] = np.sum((gap[1:] + gap[:-1]) / 2 * np.diff(grid))
+    return ks, wasserstein
+
+
+def frechet_distance(reference: EmbeddingStats, current: EmbeddingStats) -> float:
+    """Fréchet distance between Gaussians fitted to two snapshots.
+
+    ``|mu_1 - mu_2|^2 + tr(S_1 + S_2 - 2 (S_1 S_2)^{1/2})``, with the trace of the
+    matrix square root taken from the eigenvalues of ``S_1^{1/2} S_2 S_1^{1/2}``.
+
+    Raises:
+        ValueError: If either snapshot was sketched without covariance.
+    """
+    if reference.m2 is None or current.m2 is None:
+        raise ValueError("The Fréchet distance needs sketches built with covariance=True")
+    cov_ref = reference.m2 / max(reference.count, 1)
+    cov_cur = current.m2 / max(current.count, 1)
+    values, vectors = np.linalg.eigh(cov_ref)
+    root = (vectors * np.sqrt(np.clip(values, 0.0, None))) @ vectors.T
+    cross = np.sqrt(np.clip(np.linalg.eigvalsh(root @ cov_cur @ root), 0.0, None)).sum()
+    delta = reference.mean - current.mean
+    return float(max(delta @ delta + np.trace(cov_ref) + np.trace(cov_cur) - 2 * cross, 0.0))
+
+
+def _squared_distances(a: np.ndarray, b: np.ndarray, b_sq: np.ndarray) -> np.ndarray:
+    a_sq = np.einsum('ij,ij->i', a, a)
+    return np.maximum(a_sq[:, None] + b_sq[None, :] - 2 * (a @ b.T), 0.0)
+
+
+def _kernel_sum(a: np.ndarray, b: np.ndarray, gamma: float, same: bool) -> float:
+    """Sum of ``exp(-gamma |a_i - b_j|^2)`` over all pairs, excluding ``i == j`` when ``same``."""
+    b_sq = np.einsum('ij,ij->i', b, b)
+    total = 0.0
+    for i in range(0, len(a), DISTANCE_BLOCK):
+        total += float(np.exp(-gamma * _squared_distances(a[i:i + DISTANCE_BLOCK], b, b_sq)).sum())
+    # Self-pairs contribute exp(0) = 1 each
+    return total - len(a) if same else total
+
+
+def _kth_distance(a: np.ndarray, b: np.ndarray, k: int, same: bool) -> np.ndarray:
+    """Distance from each row of ``a`` to its ``k``-th nearest row of ``b`` (skipping itself when ``same``)."""
+    b_sq = np.einsum('ij,ij->i', b, b)
+    k = min(k + same, len(b))
+    out = np.empty(len(a))
+    for i in range(0, len(a), DISTANCE_BLOCK):
+        block = _squared_distances(a[i:i + DISTANCE_BLOCK], b, b_sq)
+        out[i:i + DISTANCE_BLOCK] = np.partition(block, k - 1, axis=1)[:, k - 1]
+    return np.sqrt(out)
+
+
+def mmd_squared(x: np.ndarray, y: np.ndarray, bandwidth: Optional[float] = None, seed: int = 0) -> Tuple[float, float]:
+    """Unbiased MMD² between two samples with a Gaussian kernel.
+
+    Args:
+        x: ``(n, dim)`` sample.
+        y: ``(m, dim)`` sample.
+        bandwidth: Kernel width ``sigma`` in ``exp(-|a - b|^2 / (2 sigma^2))``;
+            defaults to the median pairwise distance of up to 1000 pooled points.
+        seed: Seed of the subsample used for the median heuristic.
+
+    Returns:
+        Tuple[float, float]: The MMD² estimate and the bandwidth used.
+    """
+    n, m = len(x), len(y)
+    if n < 2 or m < 2:
+        return 0.0, bandwidth or 0.0
+    if bandwidth is None:
+        pooled = np.concatenate([x, y])
+        pooled = pooled[np.random.default_rng(seed).permutation(len(pooled))[:1000]]
+        distances = np.sqrt(_squared_distances(pooled, pooled, np.einsum('ij,ij->i', pooled, pooled)))
+        bandwidth = float(np.median(distances[np.triu_indices(len(pooled), 1)])) or 1.0
+    gamma = 1.0 / (2 * bandwidth ** 2)
+    k_xx = _kernel_sum(x, x, gamma, same=True) / (n * (n - 1))
+    k_yy = _kernel_sum(y, y, gamma, same=True) / (m * (m - 1))
+    k_xy = _kernel_sum(x, y, gamma, same=False) / (n * m)
+    return k_xx + k_yy - 2 * k_xy, bandwidth
+
+
+def compare_sketches(
+    reference: DriftSketch,
+    current: DriftSketch,
+    bandwidth: Optional[float] = None,
+    neighbors: int = 5,
+    normalize: bool = False,
+) -> Dict[str, float]:
+    """Drift of ``current`` relative to ``reference``, from their sketches alone.
+
+    Args:
+        reference: Sketch of the reference snapshot.
+        current: Sketch of the new snapshot, built with the same projections
+            (``sketch_embeddings(..., like=reference)``).
+        bandwidth: Gaussian kernel width for MMD; median heuristic by default.
+        neighbors: ``k`` of the nearest-neighbour balls behind coverage and outlier rate.
+        normalize: L2-normalize the reservoir samples before MMD, coverage and
+            outlier rate (for embeddings compared by cosine similarity).
+
+    Returns:
+        Dict[str, float]: ``centroid_shift`` (Euclidean distance between the
+        means), ``centroid_cosine_distance``, ``norm_shift`` (change in mean
+        norm), ``frechet_distance`` (with covariance), ``ks_max`` / ``ks_mean``
+        and ``wasserstein_mean`` (over projections; the latter is the sliced
+        Wasserstein distance), ``mmd2`` and ``mmd_bandwidth``, ``coverage``
+        (share of reference points whose ``k``-NN ball contains a current
+        point; about 1 without drift) and ``outlier_rate`` (share of current
+        points farther from their ``k``-th reference neighbour than 95% of
+        reference points are; about 0.05 without drift).
+
+    Raises:
+        ValueError: If the sketches use different projections.
+    """
+    reference._check_compatible(current)
+    ref_stats, cur_stats = reference.stats, current.stats
+    delta = ref_stats.mean - cur_stats.mean
+    norms = np.linalg.norm(ref_stats.mean) * np.linalg.norm(cur_stats.mean)
+    results = {
+        'reference_count': ref_stats.count,
+        'current_count': cur_stats.count,
+        'centroid_shift': float(np.linalg.norm(delta)),
+        'centroid_cosine_distance': float(1.0 - ref_stats.mean @ cur_stats.mean / norms) if norms else 0.0,
+        'norm_shift': cur_stats.result()['norm_mean'] - ref_stats.result()['norm_mean'],
+    }
+    if ref_stats.m2 is not None and cur_stats.m2 is not None:
+        results['frechet_distance'] = frechet_distance(ref_stats, cur_stats)
+
+    ks, wasserstein = projection_distances(reference, current)
+    results.update(ks_max=float(ks.max()), ks_mean=float(ks.mean()), wasserstein_mean=float(wasserstein.mean()))
+
+    x = reference.reservoir.astype(np.float64)
+    y = current.reservoir.astype(np.float64)
+    if normalize:
+        x = x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+        y = y / np.maximum(np.linalg.norm(y, axis=1, keepdims=True), 1e-12)
+    mmd2, sigma = mmd_squared(x, y, bandwidth)
+    results.update(mmd2=mmd2, mmd_bandwidth=sigma)
+    if len(x) > neighbors and len(y):
+        radius = _kth_distance(x, x, neighbors, same=True)
+        results['coverage'] = float(np.mean(_kth_distance(x, y, 1, same=False) <= radius))
+        results['outlier_rate'] = float(np.mean(_kth_distance(y, x, neighbors, same=False) > np.quantile(radius, 0.95)))
+    return results
+
+
+def embedding_drift(
+    reference: Union[DriftSketch, EmbeddingSource],
+    current: Union[DriftSketch, EmbeddingSource],
+    **options: Any,
+) -> Dict[str, float]:
+    """Drift between two snapshots given as sketches, saved sketches or embeddings.
+
+    Paths ending in ``.npz`` are loaded with :meth:`DriftSketch.load`; other
+    sources are sketched with :func:`sketch_embeddings`, the current snapshot
+    with the reference's settings. Options are passed to
+    :func:`sketch_embeddings` or :func:`compare_sketches` by name.
+    """
+    compare_options = {key: options.pop(key) for key in ('bandwidth', 'neighbors', 'normalize') if key in options}
+
+    def _sketch(source: Union[DriftSketch, EmbeddingSource], like: Optional[DriftSketch]) -> DriftSketch:
+        if isinstance(source, DriftSketch):
+            return source
+        if isinstance(source, (str, pathlib.Path)) and pathlib.Path(source).suffix == '.npz':
+            return DriftSketch.load(source)
+        return sketch_embeddings(source, like=like, **options)
+
+    reference = _sketch(reference, None)
+    return compare_sketches(reference, _sketch(current, reference), **compare_options)
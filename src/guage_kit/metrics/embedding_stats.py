@@ -0,0 +1,273 @@
+"""Streaming intrinsic statistics for large embedding sets.
+
+Embeddings are read in chunks from an array, a ``.npy`` file (memory-mapped)
+or a Parquet column and folded into a mergeable :class:`EmbeddingStats`
+state whose size depends only on the dimension: running mean and
+co-moment matrix (Chan et al.'s batched Welford update), the sum of unit
+vectors for anisotropy, and a log-spaced histogram of norms. Memory stays
+bounded no matter how many vectors are processed, and row ranges can be
+processed in worker processes and merged exactly.
+"""
+
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+import pathlib
+import numpy as np
+from ..utils.parallel import parallel_imap
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_CHUNK_SIZE = 65_536
+# Norm histogram: log10 bins over [1e-6, 1e6], each about 2.3% wide
+NORM_BINS = np.linspace(-6.0, 6.0, 1201)
+
+
+class EmbeddingStats:
+    """Mergeable running statistics of an embedding set.
+
+    Args:
+        dim: Embedding dimension.
+        covariance: Track the full covariance, needed for effective rank and
+            isotropy; costs ``dim x dim`` float64 memory and one matrix product per chunk.
+    """
+
+    def __init__(self, dim: int, covariance: bool = True):
+        self.dim = dim
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self.m2 = np.zeros((dim, dim)) if covariance else None
+        self.sq = np.zeros(dim)  # Per-dimension co-moments, also available without m2
+        self.unit_sum = np.zeros(dim)
+        self.unit_count = 0
+        self.norm_hist = np.zeros(len(NORM_BINS) + 1, dtype=np.int64)
+        self.norm_sum = 0.0
+        self.norm_sq_sum = 0.0
+        self.norm_min = np.inf
+        self.norm_max = 0.0
+
+    def update(self, chunk: np.ndarray) -> None:
+        """Fold a ``(n, dim)`` chunk of embeddings into the running state."""
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 2 or chunk.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of shape (n, {self.dim}), got {chunk.shape}")
+        n = len(chunk)
+        if n == 0:
+            return
+        if chunk.dtype not in (np.float32, np.float64):
+            chunk = chunk.astype(np.float32)
+
+        chunk_mean = chunk.mean(axis=0, dtype=np.float64)
+        centered = chunk - chunk_mean.astype(chunk.dtype)
+        chunk_sq = np.einsum('ij,ij->j', centered, centered, dtype=np.float64)
+        chunk_m2 = (centered.T @ centered).astype(np.float64) if self.m2 is not None else None
+
+        norms = np.sqrt(np.einsum('ij,ij->i', chunk, chunk, dtype=np.float64))
+        nonzero = norms > 0
+        unit_sum = (chunk[nonzero] / norms[nonzero, None]).sum(axis=0, dtype=np.float64)
+        hist = np.bincount(
+            np.searchsorted(NORM_BINS, np.log10(np.maximum(norms, 1e-300))), minlength=len(NORM_BINS) + 1
+        )
+
+        self._merge_moments(n, chunk_mean, chunk_sq, chunk_m2)
+        self.unit_sum += unit_sum
+        self.unit_count += int(nonzero.sum())
+        self.norm_hist += hist
+        self.norm_sum += float(norms.sum())
+        self.norm_sq_sum += float(np.dot(norms, norms))
+        self.norm_min = min(self.norm_min, float(norms.min()))
+        self.norm_max = max(self.norm_max, float(norms.max()))
+
+    def _merge_moments(self, n: int, mean: np.ndarray, sq: np.ndarray, m2: Optional[np.ndarray]) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        weight = self.count * n / total
+        self.sq += sq + delta * delta * weight
+        if self.m2 is not None:
+            self.m2 += m2 + np.outer(delta, delta) * weight
+        self.mean += delta * (n / total)
+        self.count = total
+
+    def merge(self, other: "EmbeddingStats") -> None:
+        """Fold the state of another accumulator over different rows into this one."""
+        if other.count == 0:
+            return
+        self._merge_moments(other.count, other.mean, other.sq, other.m2 if self.m2 is not None else None)
+        self.unit_sum += other.unit_sum
+        self.unit_count += other.unit_count
+        self.norm_hist += other.norm_hist
+        self.norm_sum += other.norm_sum
+        self.norm_sq_sum += other.norm_sq_sum
+        self.norm_min = min(self.norm_min, other.norm_min)
+        self.norm_max = max(self.norm_max, other.norm_max)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Return the running state as arrays, e.g. for ``np.savez``."""
+        return {key: np.asarray(value) for key, value in vars(self).items() if value is not None}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, np.ndarray], prefix: str = '') -> "EmbeddingStats":
+        """Rebuild an accumulator from :meth:`state` (keys optionally prefixed)."""
+        stats = cls(int(state[prefix + 'dim']), covariance=prefix + 'm2' in state)
+        for key in vars(stats):
+            if prefix + key in state:
+                value = np.asarray(state[prefix + key])
+                setattr(stats, key, value.item() if value.ndim == 0 else value.copy())
+        return stats
+
+    def norm_quantile(self, q: float) -> float:
+        """Approximate a quantile of the norm distribution from the histogram."""
+        if self.count == 0:
+            return 0.0
+        cumulative = np.cumsum(self.norm_hist)
+        index = int(np.searchsorted(cumulative, q * self.count))
+        # Midpoint of the bin in log space, clipped to the observed range
+        low = NORM_BINS[max(index - 1, 0)]
+        high = NORM_BINS[min(index, len(NORM_BINS) - 1)]
+        return float(np.clip(10 ** ((low + high) / 2), self.norm_min, self.norm_max))
+
+    def result(self) -> Dict[str, Any]:
+        """Return the statistics for everything seen so far.
+
+        Returns:
+            Dictionary with ``count``, per-dimension ``mean``/``var``/``std``,
+            norm summary (``norm_mean``, ``norm_std``, ``norm_min``, ``norm_max``,
+            ``norm_p05``, ``norm_p50``, ``norm_p95``), ``anisotropy`` (mean
+            cosine similarity over all pairs of distinct vectors) and, with
+            covariance tracking, ``effective_rank`` (exponential of the entropy
+            of the normalised covariance spectrum), ``isotropy``
+            (``effective_rank / dim``) and ``top_component_ratio`` (share of
+            variance on the first principal axis).
+        """
+        n = self.count
+        var = self.sq / n if n else np.zeros(self.dim)
+        norm_mean = self.norm_sum / n if n else 0.0
+        pairs = self.unit_count * (self.unit_count - 1)
+        # sum_{i != j} u_i . u_j = |sum u|^2 - sum |u_i|^2
+        anisotropy = (float(self.unit_sum @ self.unit_sum) - self.unit_count) / pairs if pairs else 0.0
+        results = {
+            'count': n,
+            'mean': self.mean.copy(),
+            'var': var,
+            'std': np.sqrt(var),
+            'norm_mean': norm_mean,
+            'norm_std': float(np.sqrt(max(self.norm_sq_sum / n - norm_mean ** 2, 0.0))) if n else 0.0,
+            'norm_min': self.norm_min if n else 0.0,
+            'norm_max': self.norm_max,
+            'norm_p05': self.norm_quantile(0.05),
+            'norm_p50': self.norm_quantile(0.5),
+            'norm_p95': self.norm_quantile(0.95),
+            'anisotropy': anisotropy,
+        }
+        if self.m2 is not None:
+            eigenvalues = np.clip(np.linalg.eigvalsh(self.m2 / n if n else self.m2), 0.0, None)
+            total = eigenvalues.sum()
+            if total > 0:
+                p = eigenvalues[eigenvalues > 0] / total
+                effective_rank = float(np.exp(-(p * np.log(p)).sum()))
+                top_ratio = float(eigenvalues[-1] / total)
+            else:
+                effective_rank, top_ratio = 0.0, 0.0
+            results.update(
+                effective_rank=effective_rank, isotropy=effective_rank / self.dim, top_component_ratio=top_ratio
+            )
+        return results
+
+
+EmbeddingSource = Union[np.ndarray, str, pathlib.Path]
+
+
+def _open_source(source: EmbeddingSource, column: str) -> Tuple[int, int]:
+    """Return ``(n_rows, dim)`` of an embedding source without reading it."""
+    if isinstance(source, np.ndarray):
+        return source.shape
+    path = pathlib.Path(source)
+    if path.suffix == '.npy':
+        return np.load(path, mmap_mode='r').shape
+    if path.suffix == '.parquet':
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required to read Parquet embeddings. Install with: pip install guage-kit[arrow]")
+        parquet = pq.ParquetFile(path)
+        first = next(parquet.iter_batches(batch_size=1, columns=[column]), None)
+        dim = len(first.column(0)[0]) if first is not None and first.num_rows else 0
+        return parquet.metadata.num_rows, dim
+    raise ValueError(f"Unsupported embedding file format: {path.suffix}")
+
+
+def iter_embedding_chunks(
+    source: EmbeddingSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    column: str = 'embedding',
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """Yield ``(n, dim)`` chunks of embeddings from an array or file.
+
+    Args:
+        source: Array (including ``np.memmap``), ``.npy`` file (memory-mapped)
+            or ``.parquet`` file with a list-of-floats column.
+        chunk_size: Rows per chunk.
+        column: Parquet column holding the embeddings.
+        start: First row to read (arrays and ``.npy`` only).
+        stop: Row to stop before (arrays and ``.npy`` only).
+    """
+    if isinstance(source, (str, pathlib.Path)) and pathlib.Path(source).suffix == '.parquet':
+        _open_source(source, column)
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size, columns=[column]):
+            values = batch.column(0)
+            dim = len(values[0]) if len(values) else 0
+            flat = values.flatten().to_numpy(zero_copy_only=False)
+            yield flat.reshape(len(values), dim)
+        return
+
+    array = source if isinstance(source, np.ndarray) else np.load(source, mmap_mode='r')
+    stop = len(array) if stop is None else min(stop, len(array))
+    for i in range(start, stop, chunk_size):
+        yield np.asarray(array[i:min(i + chunk_size, stop)])
+
+
+def _stats_for_range(task: Tuple[Any, int, int, int, bool, int]) -> EmbeddingStats:
+    source, start, stop, dim, covariance, chunk_size = task
+    stats = EmbeddingStats(dim, covariance=covariance)
+    for chunk in iter_embedding_chunks(source, chunk_size, start=start, stop=stop):
+        stats.update(chunk)
+    return stats
+
+
+def embedding_statistics(
+    source: EmbeddingSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    column: str = 'embedding',
+    covariance: bool = True,
+    num_workers: int = 1,
+) -> Dict[str, Any]:
+    """Compute intrinsic statistics of an embedding set with bounded memory.
+
+    Args:
+        source: Array, ``.npy`` file or ``.parquet`` file (see :func:`iter_embedding_chunks`).
+        chunk_size: Rows folded per update.
+        column: Parquet column holding the embeddings.
+        covariance: Track the full covariance (effective rank and isotropy).
+        num_workers: Worker processes for ``.npy`` files; each handles a
+            contiguous row range and the partial states are merged.
+
+    Returns:
+        The dictionary described in :meth:`EmbeddingStats.result`.
+    """
+    n_rows, dim = _open_source(source, column)
+    is_npy = isinstance(source, (str, pathlib.Path)) and pathlib.Path(source).suffix == '.npy'
+
+    if num_workers > 1 and is_npy and n_rows:
+        step = -(-n_rows // num_workers)
+        tasks = [(str(source), i, min(i + step, n_rows), dim, covariance, chunk_size) for i in range(0, n_rows, step)]
+        stats = EmbeddingStats(dim, covariance=covariance)
+        for partial in parallel_imap(_stats_for_range, tasks, num_workers=num_workers):
+            stats.merge(partial)
+        return stats.result()
+
+    stats = EmbeddingStats(dim, covariance=covariance)
+    for chunk in iter_embedding_chunks(source, chunk_size, column=column):
+        stats.update(chunk)
+    return stats.result()
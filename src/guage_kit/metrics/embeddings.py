@@ -1,7 +1,9 @@
-from typing import List, Any
+from typing import List, Any, Optional, Sequence, Union
 import numpy as np
 from scipy.stats import spearmanr
 from ..schemas.core import EvalSample
+from .embedding_stats import DEFAULT_CHUNK_SIZE, embedding_statistics
+from .encoders import HashingEncoder, TextEncoder, paired_cosine
 
 def sts_spearman(reference_embeddings: List[List[float]], candidate_embeddings: List[List[float]]) -> float:
     """Calculate the Spearman correlation coefficient between reference and candidate embeddings.
@@ -21,67 +23,121 @@ def sts_spearman(reference_embeddings: List[List[float]], candidate_embeddings:
     return correlation
 
 
-def compute_sts_spearman(eval_samples: List[EvalSample]) -> float:
-    """Compute STS Spearman correlation across evaluation samples.
-    
-    This is a placeholder implementation that computes similarity between
-    query and generation texts using simple character-level features.
+STS_SCORE_FIELD = 'sts_score'
+
+
+def _default_encoder() -> TextEncoder:
+    return HashingEncoder()
+
+
+def sts_features(
+    queries: Sequence[str],
+    generations: Sequence[str],
+    gold_scores: Sequence[Optional[float]],
+    encoder: Optional[TextEncoder] = None,
+) -> np.ndarray:
+    """Build the per-sample rows used by :func:`compute_sts_spearman`.
+
+    Args:
+        queries: First text of each pair.
+        generations: Second text of each pair.
+        gold_scores: Human similarity judgement per pair, or None when missing.
+        encoder: Text encoder; a :class:`HashingEncoder` by default.
+
+    Returns:
+        Array of shape ``(n_samples, 2)``: embedding cosine similarity and gold
+        score (NaN when missing).
     """
-    if not eval_samples:
+    encoder = encoder or _default_encoder()
+    gold = np.array([np.nan if g is None else float(g) for g in gold_scores], dtype=float)
+    return np.column_stack([paired_cosine(encoder, queries, generations), gold]).reshape(len(gold), 2)
+
+
+def sts_spearman_from_features(features: np.ndarray) -> float:
+    """Reduce stacked :func:`sts_features` rows to the STS Spearman score.
+
+    Pairs without a gold score are ignored; fewer than two scored pairs, or
+    constant scores, give 0.0.
+    """
+    features = np.asarray(features, dtype=float).reshape(-1, 2)
+    features = features[~np.isnan(features).any(axis=1)]
+    if len(features) < 2 or np.ptp(features[:, 0]) == 0 or np.ptp(features[:, 1]) == 0:
         return 0.0
-    
-    # Simple character-level features as a proxy for embeddings
-    query_features = []
-    generation_features = []
-    
-    for sample in eval_samples:
-        query_text = sample.query.prompt
-        gen_text = sample.generation.text
-        
-        # Simple features: length, character counts, etc.
-        q_feat = [
-            len(query_text),
-            query_text.count(' '),
-            query_text.count('.'),
-            query_text.count('?'),
-            len(set(query_text.lower()))
-        ]
-        
-        g_feat = [
-            len(gen_text),
-            gen_text.count(' '),
-            gen_text.count('.'),
-            gen_text.count('?'),
-            len(set(gen_text.lower()))
-        ]
-        
-        query_features.append(q_feat)
-        generation_features.append(g_feat)
-    
-    try:
-        correlation, _ = spearmanr(query_features, generation_features, axis=0)
-        return float(np.mean(correlation) if hasattr(correlation, '__iter__') else correlation)
-    except (ValueError, TypeError, AttributeError):
+    correlation, _ = spearmanr(features[:, 0], features[:, 1])
+    return float(correlation)
+
+
+def compute_sts_spearman(
+    eval_samples: List[EvalSample],
+    encoder: Optional[TextEncoder] = None,
+    score_field: str = STS_SCORE_FIELD,
+) -> float:
+    """Compute STS Spearman: rank correlation between embedding similarity and gold scores.
+
+    Each sample is a pair of texts (query prompt and generation) whose gold
+    similarity is read from ``query.metadata[score_field]``.
+
+    Args:
+        eval_samples: Samples to score.
+        encoder: Text encoder; a :class:`HashingEncoder` by default.
+        score_field: Metadata key holding the gold similarity.
+    """
+    if not eval_samples:
         return 0.0
 
+    return sts_spearman_from_features(sts_features(
+        [sample.query.prompt for sample in eval_samples],
+        [sample.generation.text for sample in eval_samples],
+        [sample.query.metadata.get(score_field) for sample in eval_samples],
+        encoder=encoder,
+    ))
+
 
-def intrinsic_metrics(embeddings: List[List[float]]) -> dict[str, Any]:
+def semantic_similarity_scores(
+    predictions: Sequence[str],
+    references: Sequence[Sequence[str]],
+    encoder: Optional[TextEncoder] = None,
+) -> np.ndarray:
+    """Embedding cosine similarity of each prediction to its closest reference.
+
+    Predictions and all references are encoded together, so repeated texts are
+    encoded once. Samples without references score NaN.
+    """
+    encoder = encoder or _default_encoder()
+    counts = np.array([len(refs) for refs in references], dtype=np.int64)
+    flat_refs = [ref for refs in references for ref in refs]
+    vectors = encoder.encode(list(predictions) + flat_refs)
+    pred_vectors = np.repeat(vectors[:len(predictions)], counts, axis=0)
+    similarities = np.einsum('ij,ij->i', pred_vectors, vectors[len(predictions):])
+
+    scores = np.full(len(predictions), np.nan)
+    has_refs = counts > 0
+    if has_refs.any():
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        scores[has_refs] = np.maximum.reduceat(similarities, offsets[has_refs])
+    return scores
+
+
+def intrinsic_metrics(
+    embeddings: Union[List[List[float]], np.ndarray, str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict[str, Any]:
     """Calculate intrinsic metrics for embeddings.
 
+    Embeddings are processed in chunks by :func:`embedding_statistics`, so a
+    memory-mapped array or a ``.npy``/``.parquet`` path is never loaded whole.
+
     Args:
-        embeddings (List[List[float]]): A list of embeddings.
+        embeddings: Embedding rows, an array, or a path to a ``.npy``/``.parquet`` file.
+        chunk_size: Rows processed per chunk.
 
     Returns:
-        dict[str, Any]: A dictionary containing intrinsic metrics.
+        dict[str, Any]: Mean and standard deviation per dimension plus norm,
+        anisotropy and effective rank statistics (see
+        :meth:`~guage_kit.metrics.embedding_stats.EmbeddingStats.result`).
     """
-    # Example metric: mean and std deviation of embeddings
-    mean_embedding = np.mean(embeddings, axis=0)
-    std_embedding = np.std(embeddings, axis=0)
-
-    return {
-        "mean": mean_embedding,
-        "std": std_embedding,
-    }
+    if not isinstance(embeddings, (np.ndarray, str)):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embedding_statistics(embeddings, chunk_size=chunk_size)
 
 def evaluate_embeddings(reference_embeddings: List[List[float]], candidate_embeddings: List[List[float]]) -> dict[str, Any]:
     """Evaluate embeddings using various metrics.
@@ -0,0 +1,301 @@
+"""Pluggable text encoders with a persistent, memory-mapped vector cache.
+
+Encoders turn texts into L2-normalised float32 vectors, so cosine similarity
+is a row-wise dot product. Every call encodes each distinct text once, in
+batches, and an optional :class:`VectorCache` keeps vectors on disk keyed by
+a hash of the text, so texts seen in earlier runs (typically the reference
+answers) are never encoded again.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+import hashlib
+import pathlib
+import numpy as np
+from ..utils.cache import DEFAULT_CACHE_DIR
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: single-writer caches only
+    HAS_FCNTL = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    HAS_SENTENCE_TRANSFORMERS = True
+except ImportError:
+    HAS_SENTENCE_TRANSFORMERS = False
+
+DEFAULT_ENCODER = 'hashing'
+_DIGEST_SIZE = 16
+
+
+def text_digest(text: str) -> bytes:
+    """Return the fixed-size hash that identifies ``text`` in a :class:`VectorCache`."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=_DIGEST_SIZE).digest()
+
+
+class VectorCache:
+    """Append-only on-disk store of vectors keyed by text hash.
+
+    Vectors live in ``vectors.bin`` as raw ``dtype`` rows read through a memory
+    map; the matching digests are appended to ``keys.bin`` after the vectors,
+    so a reader never sees a key whose vector is incomplete. Appends are
+    serialised with a file lock, so several processes can share one cache.
+
+    Args:
+        directory: Directory holding the cache files; created if missing.
+        dim: Vector dimension.
+        dtype: Storage type, ``'float16'`` (default, half the disk) or ``'float32'``.
+    """
+
+    def __init__(self, directory: Union[str, pathlib.Path], dim: int, dtype: str = 'float16'):
+        self.directory = pathlib.Path(directory)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keys_path = self.directory / 'keys.bin'
+        self.vectors_path = self.directory / 'vectors.bin'
+        self._rows: Dict[bytes, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._count = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_rows'], state['_vectors'], state['_count'] = {}, None, 0
+        return state
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._count
+
+    def _refresh(self) -> None:
+        """Pick up rows appended since the last read, by this or another process."""
+        if not self.keys_path.exists():
+            return
+        row_bytes = self.dim * self.dtype.itemsize
+        count = min(self.keys_path.stat().st_size // _DIGEST_SIZE, self.vectors_path.stat().st_size // row_bytes)
+        if count == self._count:
+            return
+        with open(self.keys_path, 'rb') as f:
+            f.seek(self._count * _DIGEST_SIZE)
+            new_keys = f.read((count - self._count) * _DIGEST_SIZE)
+        for i in range(count - self._count):
+            self._rows[new_keys[i * _DIGEST_SIZE:(i + 1) * _DIGEST_SIZE]] = self._count + i
+        self._count = count
+        self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode='r', shape=(count, self.dim))
+
+    def lookup(self, digests: Sequence[bytes]) -> np.ndarray:
+        """Return the row of each digest, or -1 where it is not cached."""
+        self._refresh()
+        return np.fromiter((self._rows.get(d, -1) for d in digests), dtype=np.int64, count=len(digests))
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        """Return the vectors stored at ``rows`` as float32."""
+        if len(rows) == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def add(self, digests: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Append vectors for digests that are not cached yet."""
+        with open(self.directory / 'lock', 'w') as lock:
+            if HAS_FCNTL:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._refresh()
+            new = [i for i, d in enumerate(digests) if d not in self._rows]
+            if not new:
+                return
+            # Trim a partial row left by an interrupted writer before appending
+            row_bytes = self.dim * self.dtype.itemsize
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(self._count * row_bytes)
+                f.write(np.ascontiguousarray(vectors[new], dtype=self.dtype).tobytes())
+            with open(self.keys_path, 'ab') as f:
+                f.truncate(self._count * _DIGEST_SIZE)
+                f.write(b''.join(digests[i] for i in new))
+        self._refresh()
+
+
+class TextEncoder:
+    """Base class for text encoders.
+
+    Subclasses implement :meth:`_encode_batch` and :meth:`fingerprint`.
+
+    Args:
+        batch_size: Distinct texts encoded per model call.
+        cache_dir: Root of an on-disk :class:`VectorCache`; each encoder uses
+            its own subdirectory. ``None`` disables the cache.
+        cache_dtype: Storage type for cached vectors.
+    """
+
+    dim: int = 0
+
+    def __init__(
+        self,
+        batch_size: int = 256,
+        cache_dir: Optional[Union[str, pathlib.Path]] = None,
+        cache_dtype: str = 'float16',
+    ):
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir
+        self.cache_dtype = cache_dtype
+        self._cache: Optional[VectorCache] = None
+
+    def fingerprint(self) -> str:
+        """Identify the encoder and its settings; vectors are only shared between equal fingerprints."""
+        raise NotImplementedError
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode distinct texts into an ``(n, dim)`` array."""
+        raise NotImplementedError
+
+    @property
+    def cache(self) -> Optional[VectorCache]:
+        if self.cache_dir is not None and self._cache is None:
+            name = hashlib.blake2b(self.fingerprint().encode(), digest_size=8).hexdigest()
+            self._cache = VectorCache(pathlib.Path(self.cache_dir) / name, self.dim, self.cache_dtype)
+        return self._cache
+
+    def _encode_new(self, texts: List[str]) -> np.ndarray:
+        parts = [self._encode_batch(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        vectors = np.concatenate(parts).astype(np.float32) if parts else np.zeros((0, self.dim), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode ``texts`` into L2-normalised float32 rows, one per input text.
+
+        Each distinct text is encoded at most once; cached vectors are reused.
+        """
+        unique = list(dict.fromkeys(texts))
+        vectors = np.zeros((len(unique), self.dim), dtype=np.float32)
+        cache = self.cache
+        if cache is None:
+            vectors[:] = self._encode_new(unique)
+        else:
+            digests = [text_digest(text) for text in unique]
+            rows = cache.lookup(digests)
+            hit = rows >= 0
+            vectors[hit] = cache.get(rows[hit])
+            missing = np.flatnonzero(~hit)
+            if len(missing):
+                encoded = self._encode_new([unique[i] for i in missing])
+                # Round like cached rows so first and repeated runs agree
+                vectors[missing] = encoded.astype(cache.dtype)
+                cache.add([digests[i] for i in missing], encoded)
+        position = {text: i for i, text in enumerate(unique)}
+        return vectors[[position[text] for text in texts]] if len(texts) else vectors
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_cache'] = None
+        return state
+
+
+class HashingEncoder(TextEncoder):
+    """Dependency-free encoder: hashed word n-gram counts.
+
+    Captures lexical overlap only, but is deterministic, needs no model
+    download and encodes hundreds of thousands of texts per second.
+
+    Args:
+        n_features: Vector dimension.
+        ngram_range: Word n-gram sizes to hash.
+        **kwargs: Options of :class:`TextEncoder`.
+    """
+
+    def __init__(self, n_features: int = 1024, ngram_range: tuple = (1, 2), **kwargs: Any):
+        super().__init__(**kwargs)
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.dim = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=self.ngram_range, alternate_sign=False, norm='l2'
+        )
+
+    def fingerprint(self) -> str:
+        return f"hashing|{self.dim}|{self.ngram_range}"
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.vectorizer.transform(texts).toarray()
+
+
+class SentenceTransformerEncoder(TextEncoder):
+    """Encoder backed by a sentence-transformers model (``neural`` extra).
+
+    The model is loaded on first use (encoding or reading :attr:`dim`), not
+    when the encoder is built, and is not pickled, so worker processes load
+    their own copy.
+
+    Args:
+        model_name: Hugging Face model id or local path.
+        device: Torch device, CPU by default.
+        **kwargs: Options of :class:`TextEncoder`.
+
+    Raises:
+        ImportError: If sentence-transformers is not installed.
+    """
+
+    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', device: str = 'cpu', **kwargs: Any):
+        if not HAS_SENTENCE_TRANSFORMERS:
+            raise ImportError(
+                "sentence-transformers is required for this encoder. Install with: pip install guage-kit[neural]"
+            )
+        super().__init__(**kwargs)
+        self.model_name = model_name
+        self.device = device
+        self._model = None
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state['_model'] = None
+        return state
+
+    def fingerprint(self) -> str:
+        return f"sentence-transformers|{self.model_name}"
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True)
+
+
+def encoder_from_config(config: Mapping[str, Any]) -> TextEncoder:
+    """Build the encoder selected by ``config``.
+
+    Config keys:
+        embeddings.encoder: ``'hashing'`` (default) or a sentence-transformers
+            model name, optionally prefixed with ``'sentence-transformers:'``.
+        embeddings.batch_size: Distinct texts per model call (default 256).
+        embeddings.vector_cache: ``True`` to cache vectors under
+            ``.guage_kit/cache/vectors``, or a directory path.
+        embeddings.cache_dtype: ``'float16'`` (default) or ``'float32'``.
+    """
+    name = config.get('embeddings.encoder', DEFAULT_ENCODER)
+    vector_cache = config.get('embeddings.vector_cache')
+    kwargs = {
+        'batch_size': config.get('embeddings.batch_size', 256),
+        'cache_dir': (DEFAULT_CACHE_DIR / 'vectors' if vector_cache is True else vector_cache) or None,
+        'cache_dtype': config.get('embeddings.cache_dtype', 'float16'),
+    }
+    if name == 'hashing':
+        return HashingEncoder(**kwargs)
+    prefix = 'sentence-transformers:'
+    return SentenceTransformerEncoder(name[len(prefix):] if name.startswith(prefix) else name, **kwargs)
+
+
+def paired_cosine(encoder: TextEncoder, left: Sequence[str], right: Sequence[str]) -> np.ndarray:
+    """Cosine similarity of each ``(left[i], right[i])`` pair.
+
+    All texts are encoded in one call, so a text appearing on both sides or in
+    several pairs is encoded once, and the similarities are one row-wise product.
+    """
+    vectors = encoder.encode(list(left) + list(right))
+    return np.einsum('ij,ij->i', vectors[:len(left)], vectors[len(left):])
@@ -0,0 +1,212 @@
+"""Lexical groundedness of generations in their retrieved context.
+
+Each sample's retrieved chunk texts are tokenized once and indexed as hashed
+word n-grams; the answer's n-grams are then looked up in that index. Hashes
+include the sample, so a whole chunk of samples is indexed and queried with
+one vectorized membership test, and the cost grows linearly with the number
+of context and answer tokens rather than with chunks x sentences.
+
+From the matched n-grams every answer gets:
+
+* ``groundedness``: share of answer tokens inside an n-gram found in the context;
+* ``faithfulness``: share of answer sentences (see
+  :func:`~guage_kit.metrics.hallucination.split_claims`) with at least
+  ``threshold`` of their tokens grounded;
+* ``longest_supported_span``: longest run of answer tokens whose every n-gram
+  occurs in the context;
+* ``unsupported_token_rate``: share of answer content words (stop words
+  excluded) that appear nowhere in the context.
+
+Answers shorter than ``n`` tokens are matched word by word. Samples without
+retrieved chunks or without answer tokens score NaN.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+import re
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from .hallucination import split_claims
+
+DEFAULT_NGRAM = 3
+DEFAULT_SENTENCE_THRESHOLD = 0.5
+GROUNDEDNESS_METRICS = ('groundedness', 'faithfulness', 'longest_supported_span', 'unsupported_token_rate')
+
+_TOKEN = re.compile(r'\w+')
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+@lru_cache(maxsize=65536)
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN.findall(text.lower()))
+
+
+class _Vocabulary:
+    """Interns tokens to integer ids and remembers which are stop words."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self._texts: Dict[str, np.ndarray] = {}
+
+    def encode(self, text: str) -> np.ndarray:
+        encoded = self._texts.get(text)
+        if encoded is None:
+            ids = self.ids
+            encoded = np.array([ids.setdefault(token, len(ids)) for token in _tokens(text)], dtype=np.int64)
+            self._texts[text] = encoded
+        return encoded
+
+    def stop_words(self) -> np.ndarray:
+        """Boolean mask over token ids marking English stop words."""
+        return np.fromiter((token in ENGLISH_STOP_WORDS for token in self.ids), dtype=bool, count=len(self.ids))
+
+
+def _window_hashes(ids: np.ndarray, owner: np.ndarray, segment: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash every ``n``-token window, keyed by its owner sample.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: One hash per window start and whether the
+        window lies inside a single segment (windows crossing segments are invalid).
+    """
+    starts = max(len(ids) - n + 1, 0)
+    hashes = owner[:starts].astype(np.uint64)
+    for j in range(n):
+        hashes = hashes * _HASH_MULTIPLIER + (ids[j:j + starts] + 1).astype(np.uint64)
+    valid = segment[:starts] == segment[n - 1:n - 1 + starts]
+    return hashes, valid
+
+
+def _contains(haystack: np.ndarray, needles: np.ndarray) -> np.ndarray:
+    """Membership of ``needles`` in ``haystack`` by one sort and a binary search.
+
+    Cheaper than ``np.isin`` when the haystack (the context) is much larger
+    than the needles (the answers).
+    """
+    if not len(haystack) or not len(needles):
+        return np.zeros(len(needles), dtype=bool)
+    haystack = np.sort(haystack)
+    positions = np.minimum(np.searchsorted(haystack, needles), len(haystack) - 1)
+    return haystack[positions] == needles
+
+
+def _longest_runs(flags: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Length of the longest run of True ``flags`` per group; runs never cross groups."""
+    longest = np.zeros(n_groups, dtype=np.int64)
+    if not flags.any():
+        return longest
+    padded = np.concatenate([[False], flags, [False]])
+    boundary = np.concatenate([[True], groups[1:] != groups[:-1], [True]])
+    starts = np.flatnonzero(padded[1:-1] & (~padded[:-2] | boundary[:-1]))
+    ends = np.flatnonzero(padded[1:-1] & (~padded[2:] | boundary[1:])) + 1
+    np.maximum.at(longest, groups[starts], ends - starts)
+    return longest
+
+
+def groundedness_scores(
+    answers: Sequence[str],
+    contexts: Sequence[Optional[Sequence[str]]],
+    ngram: int = DEFAULT_NGRAM,
+    threshold: float = DEFAULT_SENTENCE_THRESHOLD,
+) -> Dict[str, np.ndarray]:
+    """Score each answer against its own retrieved chunk texts.
+
+    Args:
+        answers: Generated text per sample.
+        contexts: Retrieved chunk texts per sample; None or empty when nothing was retrieved.
+        ngram: Words per indexed n-gram; longer n-grams demand more verbatim support.
+        threshold: Share of grounded tokens a sentence needs to count as
+            faithful to the context.
+
+    Returns:
+        Dict[str, np.ndarray]: Per-sample ``groundedness``, ``faithfulness``,
+        ``longest_supported_span`` (in tokens) and ``unsupported_token_rate``;
+        NaN for samples without context or answer tokens.
+
+    Raises:
+        ValueError: If ``answers`` and ``contexts`` differ in length or ``ngram < 1``.
+    """
+    if len(answers) != len(contexts):
+        raise ValueError("answers and contexts must have the same length.")
+    if ngram < 1:
+        raise ValueError("ngram must be at least 1")
+    num_samples = len(answers)
+    vocabulary = _Vocabulary()
+    empty = np.zeros(0, dtype=np.int64)
+
+    # Context tokens of every chunk, tagged with their sample and chunk
+    context_ids, context_owner = [], []
+    has_context = np.zeros(num_samples, dtype=bool)
+    for i, chunks in enumerate(contexts):
+        for text in chunks or ():
+            context_ids.append(vocabulary.encode(text))
+            context_owner.append(i)
+        has_context[i] = bool(chunks)
+
+    # Answer tokens, sentence by sentence, tagged with their sample and sentence
+    answer_ids, sentence_owner = [], []
+    for i, answer in enumerate(answers):
+        if not has_context[i]:
+            continue
+        for sentence in split_claims(answer or ''):
+            answer_ids.append(vocabulary.encode(sentence))
+            sentence_owner.append(i)
+
+    context_lengths = np.array([len(ids) for ids in context_ids], dtype=np.int64)
+    context_segment = np.repeat(np.arange(len(context_ids), dtype=np.int64), context_lengths)
+    context_owner = np.repeat(np.array(context_owner, dtype=np.int64), context_lengths)
+    context_ids = np.concatenate(context_ids) if context_ids else empty
+    sentence_lengths = np.array([len(ids) for ids in answer_ids], dtype=np.int64)
+    sentence_owner = np.array(sentence_owner, dtype=np.int64)
+    answer_sentence = np.repeat(np.arange(len(answer_ids), dtype=np.int64), sentence_lengths)
+    answer_owner = sentence_owner[answer_sentence]
+    answer_ids = np.concatenate(answer_ids) if answer_ids else empty
+    lengths = np.bincount(answer_owner, minlength=num_samples)
+
+    # Words present anywhere in the sample's context
+    context_words, _ = _window_hashes(context_ids, context_owner, context_owner, 1)
+    answer_words, _ = _window_hashes(answer_ids, answer_owner, answer_owner, 1)
+    in_context = _contains(context_words, answer_words)
+
+    # Answer n-grams found in the sample's context; answers shorter than n fall back to words
+    context_hashes, context_valid = _window_hashes(context_ids, context_owner, context_segment, ngram)
+    answer_hashes, answer_valid = _window_hashes(answer_ids, answer_owner, answer_owner, ngram)
+    matched = answer_valid & _contains(context_hashes[context_valid], answer_hashes)
+    marks = np.zeros(len(answer_ids) + 1, dtype=np.int64)
+    starts = np.flatnonzero(matched)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, starts + ngram, -1)
+    short = lengths[answer_owner] < ngram
+    covered = np.where(short, in_context, np.cumsum(marks)[:-1] > 0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scored = has_context & (lengths > 0)
+        groundedness = np.bincount(answer_owner, weights=covered, minlength=num_samples) / lengths
+
+        sentence_coverage = np.bincount(answer_sentence, weights=covered, minlength=len(sentence_owner))
+        faithful = sentence_coverage >= threshold * sentence_lengths
+        sentences = np.bincount(sentence_owner, weights=sentence_lengths > 0, minlength=num_samples)
+        faithfulness = np.bincount(
+            sentence_owner, weights=faithful & (sentence_lengths > 0), minlength=num_samples
+        ) / sentences
+
+        content = ~vocabulary.stop_words()[answer_ids]
+        content_count = np.bincount(answer_owner, weights=content, minlength=num_samples)
+        unsupported = np.bincount(answer_owner, weights=content & ~in_context, minlength=num_samples)
+        unsupported_rate = np.where(content_count > 0, unsupported / content_count, 0.0)
+
+    spans = _longest_runs(matched, answer_owner[:len(matched)], num_samples)
+    spans = np.where(spans > 0, spans + ngram - 1, 0)
+    short_samples = lengths < ngram
+    if short_samples.any():
+        word_spans = _longest_runs(in_context, answer_owner, num_samples)
+        spans = np.where(short_samples, word_spans, spans)
+
+    def _mask(values: np.ndarray) -> np.ndarray:
+        return np.where(scored, values, np.nan).astype(float)
+
+    return {
+        'groundedness': _mask(groundedness),
+        'faithfulness': _mask(faithfulness),
+        'longest_supported_span': _mask(spans),
+        'unsupported_token_rate': _mask(unsupported_rate),
+    }
@@ -1,38 +1,418 @@
+"""Claim-level hallucination detection against retrieved context.
+
+Generations are split into sentence-level claims and every claim is checked
+against the retrieved :class:`~guage_kit.schemas.core.ContextChunk` texts of
+its sample. A cheap lexical prefilter drops claim/chunk pairs that share too
+few content words and keeps the best ``max_candidates`` chunks per claim, so
+the entailment model only sees pairs that can plausibly support the claim.
+Entailment models are pluggable (:class:`EntailmentModel`), score distinct
+pairs once in batches and can keep their scores in a persistent verdict cache.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import hashlib
+import pathlib
+import re
+import numpy as np
 from pydantic import BaseModel
-from typing import List, Optional
+from sklearn.feature_extraction.text import HashingVectorizer
+from ..schemas.core import EvalSample
+from ..utils.cache import DEFAULT_CACHE_DIR, DiskCache
+
+try:
+    import transformers
+    HAS_TRANSFORMERS = True
+except ImportError:
+    HAS_TRANSFORMERS = False
+
+DEFAULT_NLI_MODEL = 'cross-encoder/nli-deberta-v3-xsmall'
+
+# A sentence ends at ., ! or ? (plus closing quotes/brackets) followed by a capitalised word
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=["\'(\[]?[A-Z0-9])')
+_LIST_MARKER = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+_ABBREVIATION = re.compile(r'(?:\b(?:[A-Za-z]\.){2,}|\b(?:Mr|Mrs|Ms|Dr|Prof|Sr|Jr|St|vs|etc|approx|No|Fig|Inc|Ltd|Co)\.)$')
+
 
 class UnsupportedClaim(BaseModel):
     query_id: str
     claim: str
     is_supported: bool
+    score: float = 0.0
+
 
 class HallucinationMetrics(BaseModel):
     unsupported_claims: List[UnsupportedClaim]
     unsupported_claim_rate: float
+    num_claims: int = 0
+    samples_with_unsupported: int = 0
+
+
+@lru_cache(maxsize=65536)
+def _split_claims(text: str) -> Tuple[str, ...]:
+    claims: List[str] = []
+    for line in text.splitlines():
+        pieces = _SENTENCE_BREAK.split(_LIST_MARKER.sub('', line))
+        for i, piece in enumerate(pieces):
+            piece = piece.strip()
+            if not piece:
+                continue
+            if i and claims and _ABBREVIATION.search(claims[-1]) and not piece[:1].isdigit():
+                # "Dr. Smith" or "U.S. Army" was split after the abbreviation
+                claims[-1] = f"{claims[-1]} {piece}"
+            else:
+                claims.append(piece)
+    return tuple(claim for claim in claims if re.search(r'\w', claim))
+
+
+def split_claims(text: str) -> List[str]:
+    """Split a generation into sentence-level claims.
+
+    Sentences end at terminal punctuation followed by a capitalised word or a
+    number, and at line breaks; list markers are stripped and common
+    abbreviations (``Dr.``, ``e.g.``, ``U.S.``) do not end a sentence. Splits
+    are LRU-cached per text.
+
+    Args:
+        text: The generated text.
+
+    Returns:
+        List[str]: The claims, in order; fragments without a word character are dropped.
+    """
+    return list(_split_claims(text or ''))
+
+
+@lru_cache(maxsize=1)
+def _content_vectorizer() -> HashingVectorizer:
+    # Binary bag of content words: stop words carry no support signal
+    return HashingVectorizer(
+        n_features=2 ** 20, stop_words='english', binary=True, norm=None, alternate_sign=False
+    )
+
+
+def lexical_coverage(premises: Sequence[str], hypotheses: Sequence[str]) -> np.ndarray:
+    """Fraction of each hypothesis' content words that appear in its premise.
+
+    Hypotheses without content words are fully covered.
+
+    Args:
+        premises: Supporting texts.
+        hypotheses: Claims, aligned with ``premises``.
+
+    Returns:
+        np.ndarray: Coverage in [0, 1] per pair.
+    """
+    vectorizer = _content_vectorizer()
+    claims = vectorizer.transform(hypotheses)
+    hits = np.asarray(claims.multiply(vectorizer.transform(premises)).sum(axis=1), dtype=float).ravel()
+    counts = np.diff(claims.indptr).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, hits / np.where(counts > 0, counts, 1.0), 1.0)
+
+
+class EntailmentModel:
+    """Base class for claim entailment models.
+
+    Subclasses implement :meth:`_predict_batch` and :meth:`fingerprint`.
+
+    Args:
+        batch_size: Pairs scored per model call.
+        cache: Persistent verdict cache keyed by model fingerprint, premise and
+            claim. ``True`` uses ``.guage_kit/cache/verdicts.sqlite``, a string
+            selects another cache directory, or pass a :class:`DiskCache`.
+    """
+
+    # Support score at which a claim counts as entailed
+    threshold: float = 0.5
+
+    def __init__(self, batch_size: int = 32, cache: Union[bool, str, DiskCache] = False):
+        self.batch_size = batch_size
+        if cache is True or isinstance(cache, str):
+            cache_dir = DEFAULT_CACHE_DIR if cache is True else pathlib.Path(cache)
+            cache = DiskCache(cache_dir / "verdicts.sqlite")
+        self.cache: Optional[DiskCache] = cache if isinstance(cache, DiskCache) else None
+
+    def fingerprint(self) -> str:
+        """Identify the model and its settings; cached verdicts are only shared between equal fingerprints."""
+        raise NotImplementedError
+
+    def _predict_batch(self, premises: List[str], hypotheses: List[str]) -> np.ndarray:
+        """Return the probability that each premise entails its hypothesis."""
+        raise NotImplementedError
+
+    def _cache_key(self, premise: str, hypothesis: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.fingerprint(), premise, hypothesis):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return f"nli:{digest.hexdigest()}"
+
+    def predict(self, premises: Sequence[str], hypotheses: Sequence[str]) -> np.ndarray:
+        """Score ``(premises[i], hypotheses[i])`` pairs.
+
+        Each distinct pair is scored at most once; cached verdicts are reused
+        and the remaining pairs are batched in order of length, so batches of
+        a padded model hold texts of similar size.
+
+        Returns:
+            np.ndarray: Entailment probability per pair.
+        """
+        pairs = list(dict.fromkeys(zip(premises, hypotheses)))
+        scores = np.zeros(len(pairs))
+        missing = list(range(len(pairs)))
+        if self.cache is not None and pairs:
+            keys = [self._cache_key(*pair) for pair in pairs]
+            found = self.cache.get_many(keys)
+            missing = [i for i, key in enumerate(keys) if key not in found]
+            for i, key in enumerate(keys):
+                if key in found:
+                    scores[i] = found[key]
+        missing.sort(key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            scores[batch] = self._predict_batch([pairs[i][0] for i in batch], [pairs[i][1] for i in batch])
+        if self.cache is not None and missing:
+            self.cache.set_many({keys[i]: float(scores[i]) for i in missing})
+        position = {pair: i for i, pair in enumerate(pairs)}
+        return scores[[position[pair] for pair in zip(premises, hypotheses)]] if pairs else scores
 
-def evaluate_hallucination(samples: List[dict]) -> HallucinationMetrics:
-    unsupported_claims = []
-    total_claims = 0
-    unsupported_count = 0
 
+class LexicalEntailmentModel(EntailmentModel):
+    """Dependency-free entailment proxy: content-word coverage of the claim.
+
+    A claim counts as supported when at least ``threshold`` of its content
+    words occur in the chunk. It cannot detect negation or swapped facts, but
+    flags claims whose subject matter is absent from the context.
+
+    Args:
+        threshold: Coverage needed for support.
+        **kwargs: Options of :class:`EntailmentModel`.
+    """
+
+    def __init__(self, threshold: float = 0.75, **kwargs: Any):
+        kwargs.setdefault('batch_size', 4096)
+        super().__init__(**kwargs)
+        self.threshold = threshold
+
+    def fingerprint(self) -> str:
+        return "lexical-coverage"
+
+    def _predict_batch(self, premises: List[str], hypotheses: List[str]) -> np.ndarray:
+        return lexical_coverage(premises, hypotheses)
+
+
+class TransformersEntailmentModel(EntailmentModel):
+    """NLI cross-encoder from Hugging Face transformers (``neural`` extra).
+
+    The entailment probability is the softmax of the model's entailment
+    label. Small models such as the default run at usable speed on CPU. The
+    model is loaded on first use and is not pickled, so worker processes load
+    their own copy.
+
+    Args:
+        model_name: Hugging Face model id or local path of an NLI model.
+        device: Torch device, CPU by default.
+        max_length: Token limit per pair; long premises are truncated.
+        threshold: Entailment probability needed for support.
+        **kwargs: Options of :class:`EntailmentModel`.
+
+    Raises:
+        ImportError: If transformers is not installed.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_NLI_MODEL,
+        device: str = 'cpu',
+        max_length: int = 512,
+        threshold: float = 0.5,
+        **kwargs: Any,
+    ):
+        if not HAS_TRANSFORMERS:
+            raise ImportError(
+                "transformers is required for NLI entailment. Install with: pip install guage-kit[neural]"
+            )
+        super().__init__(**kwargs)
+        self.model_name = model_name
+        self.device = device
+        self.max_length = max_length
+        self.threshold = threshold
+        self._model = None
+        self._tokenizer = None
+
+    def _load(self) -> None:
+        self._tokenizer = transformers.AutoTokenizer.from_pretrained(self.model_name)
+        self._model = transformers.AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        self._model.to(self.device).eval()
+        labels = {label.lower(): i for i, label in self._model.config.id2label.items()}
+        self.entailment_index = next((i for label, i in labels.items() if label.startswith('entail')), None)
+        if self.entailment_index is None:
+            raise ValueError(f"{self.model_name} has no entailment label: {sorted(labels)}")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_model'], state['_tokenizer'] = None, None
+        return state
+
+    def fingerprint(self) -> str:
+        return f"transformers-nli|{self.model_name}|{self.max_length}"
+
+    def _predict_batch(self, premises: List[str], hypotheses: List[str]) -> np.ndarray:
+        import torch
+        if self._model is None:
+            self._load()
+        inputs = self._tokenizer(
+            premises, hypotheses, truncation='only_first', max_length=self.max_length,
+            padding=True, return_tensors='pt',
+        ).to(self.device)
+        with torch.inference_mode():
+            logits = self._model(**inputs).logits
+        return torch.softmax(logits.float(), dim=-1)[:, self.entailment_index].cpu().numpy()
+
+
+def claim_support_scores(
+    claims: Sequence[Sequence[str]],
+    contexts: Sequence[Sequence[str]],
+    model: Optional[EntailmentModel] = None,
+    min_overlap: float = 0.3,
+    max_candidates: int = 3,
+) -> List[np.ndarray]:
+    """Score every claim against the context chunks of its sample.
+
+    Args:
+        claims: Claims per sample.
+        contexts: Context chunk texts per sample.
+        model: Entailment model; defaults to :class:`LexicalEntailmentModel`.
+        min_overlap: Lexical coverage a chunk needs to be sent to the model.
+        max_candidates: Chunks per claim, by coverage, sent to the model.
+
+    Returns:
+        List[np.ndarray]: Per sample, the highest entailment probability of
+        each claim over its candidate chunks; 0 for claims without candidates.
+    """
+    model = model or LexicalEntailmentModel()
+    flat_claims = [claim for sample_claims in claims for claim in sample_claims]
+    flat_chunks = [chunk for sample_chunks in contexts for chunk in sample_chunks]
+    claim_counts = np.array([len(c) for c in claims], dtype=np.int64)
+    chunk_counts = np.array([len(c) for c in contexts], dtype=np.int64)
+    claim_offsets = np.concatenate([[0], np.cumsum(claim_counts)])
+    support = np.zeros(len(flat_claims))
+
+    # Every (claim, chunk) pair within a sample
+    owner = np.repeat(np.arange(len(claims)), claim_counts)
+    per_claim = chunk_counts[owner]
+    pair_claim = np.repeat(np.arange(len(flat_claims)), per_claim)
+    first_pair = np.concatenate([[0], np.cumsum(per_claim)])[:-1]
+    chunk_start = np.concatenate([[0], np.cumsum(chunk_counts)])[:-1]
+    pair_chunk = (np.arange(len(pair_claim)) - np.repeat(first_pair, per_claim)
+                  + np.repeat(chunk_start[owner], per_claim))
+
+    if len(pair_claim):
+        # Vectorise each distinct text once, then compare the pairs row-wise
+        vectorizer = _content_vectorizer()
+        claim_texts = {text: i for i, text in enumerate(dict.fromkeys(flat_claims))}
+        chunk_texts = {text: i for i, text in enumerate(dict.fromkeys(flat_chunks))}
+        claim_rows = vectorizer.transform(list(claim_texts))[[claim_texts[t] for t in flat_claims]]
+        chunk_rows = vectorizer.transform(list(chunk_texts))[[chunk_texts[t] for t in flat_chunks]]
+        hits = np.asarray(claim_rows[pair_claim].multiply(chunk_rows[pair_chunk]).sum(axis=1), dtype=float).ravel()
+        counts = np.diff(claim_rows.indptr).astype(float)[pair_claim]
+        overlap = np.where(counts > 0, hits / np.where(counts > 0, counts, 1.0), 1.0)
+
+        keep = np.flatnonzero(overlap >= min_overlap)
+        order = keep[np.lexsort((-overlap[keep], pair_claim[keep]))]
+        ranked_claims = pair_claim[order]
+        starts = np.flatnonzero(np.r_[True, ranked_claims[1:] != ranked_claims[:-1]]) if len(order) else order
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        candidates = order[rank < max_candidates]
+
+        if len(candidates):
+            scores = model.predict(
+                [flat_chunks[j] for j in pair_chunk[candidates]], [flat_claims[i] for i in pair_claim[candidates]]
+            )
+            np.maximum.at(support, pair_claim[candidates], scores)
+    return [support[claim_offsets[i]:claim_offsets[i + 1]] for i in range(len(claims))]
+
+
+def _as_sample(sample: Union[EvalSample, dict]) -> EvalSample:
+    return sample if isinstance(sample, EvalSample) else EvalSample.model_validate(sample)
+
+
+def evaluate_hallucination(
+    samples: Iterable[Union[EvalSample, dict]],
+    model: Optional[EntailmentModel] = None,
+    threshold: Optional[float] = None,
+    min_overlap: float = 0.3,
+    max_candidates: int = 3,
+    chunk_size: int = 1000,
+) -> HallucinationMetrics:
+    """Detect generated claims that the retrieved context does not support.
+
+    Each generation is split with :func:`split_claims` and its claims are
+    scored with :func:`claim_support_scores` against the sample's retrieved
+    chunks, ``chunk_size`` samples at a time.
+
+    Args:
+        samples: Evaluation samples, as models or dicts.
+        model: Entailment model; defaults to :class:`LexicalEntailmentModel`.
+        threshold: Support score a claim needs; defaults to the model's threshold.
+        min_overlap: Lexical coverage a chunk needs to be sent to the model.
+        max_candidates: Chunks per claim, by coverage, sent to the model.
+        chunk_size: Samples scored per batch.
+
+    Returns:
+        HallucinationMetrics: The unsupported claims and the unsupported claim
+        rate over all claims.
+    """
+    model = model or LexicalEntailmentModel()
+    threshold = model.threshold if threshold is None else threshold
+    unsupported_claims: List[UnsupportedClaim] = []
+    num_claims = 0
+    samples_with_unsupported = 0
+
+    def flush(batch: List[EvalSample]) -> None:
+        nonlocal num_claims, samples_with_unsupported
+        claims = [split_claims(sample.generation.text) for sample in batch]
+        contexts = [[chunk.text for chunk in sample.retrieval.chunks] if sample.retrieval else [] for sample in batch]
+        scores = claim_support_scores(claims, contexts, model, min_overlap, max_candidates)
+        for sample, sample_claims, sample_scores in zip(batch, claims, scores):
+            num_claims += len(sample_claims)
+            flagged = np.flatnonzero(sample_scores < threshold)
+            samples_with_unsupported += bool(len(flagged))
+            unsupported_claims.extend(
+                UnsupportedClaim(query_id=sample.query.id, claim=sample_claims[i], is_supported=False,
+                                 score=float(sample_scores[i]))
+                for i in flagged
+            )
+
+    batch: List[EvalSample] = []
     for sample in samples:
-        total_claims += 1
-        # Logic to determine if the claim is supported or not
-        if not is_claim_supported(sample):
-            unsupported_count += 1
-            unsupported_claims.append(UnsupportedClaim(
-                query_id=sample['query']['id'],
-                claim=sample['generation']['text'],
-                is_supported=False
-            ))
-
-    unsupported_claim_rate = unsupported_count / total_claims if total_claims > 0 else 0.0
+        batch.append(_as_sample(sample))
+        if len(batch) >= chunk_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
 
     return HallucinationMetrics(
         unsupported_claims=unsupported_claims,
-        unsupported_claim_rate=unsupported_claim_rate
+        unsupported_claim_rate=len(unsupported_claims) / num_claims if num_claims else 0.0,
+        num_claims=num_claims,
+        samples_with_unsupported=samples_with_unsupported,
     )
 
-def is_claim_supported(sample: dict) -> bool:
-    # Placeholder for actual logic to determine claim support
-    return False  # Assume all claims are unsupported for this example
\ No newline at end of file
+
+def is_claim_supported(
+    claim: str, contexts: Sequence[str], model: Optional[EntailmentModel] = None, threshold: Optional[float] = None
+) -> bool:
+    """Return whether any context chunk entails ``claim``.
+
+    Args:
+        claim: A single claim.
+        contexts: Candidate supporting texts.
+        model: Entailment model; defaults to :class:`LexicalEntailmentModel`.
+        threshold: Support score needed; defaults to the model's threshold.
+    """
+    model = model or LexicalEntailmentModel()
+    threshold = model.threshold if threshold is None else threshold
+    score = claim_support_scores([[claim]], [list(contexts)], model, min_overlap=0.0)[0][0]
+    return bool(score >= threshold)
@@ -1,54 +1,257 @@
-from typing import List
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..utils.parallel import parallel_map
 
 try:
-    from sacrebleu import corpus_bleu
+    from sacrebleu.metrics import BLEU
+    from sacrebleu.metrics.helpers import extract_all_word_ngrams
+    from sacrebleu.tokenizers.tokenizer_13a import Tokenizer13a
     HAS_SACREBLEU = True
 except ImportError:
     HAS_SACREBLEU = False
 
 try:
-    from rouge_score import rouge_scorer
-    HAS_ROUGE_SCORE = True
-except ImportError:
-    HAS_ROUGE_SCORE = False
+    from rouge_score import tokenizers as rouge_tokenizers
     HAS_ROUGE_SCORE = True
 except ImportError:
     HAS_ROUGE_SCORE = False
 
+# Memoisation budget for tokenised/stemmed strings and their n-gram counts
+ROUGE_CACHE_SIZE = 200_000
+_rouge_tokenizer = None
 
-def compute_rouge(predictions: List[str], references: List[List[str]]) -> dict:
-    """Compute ROUGE scores (ROUGE-1, ROUGE-2, ROUGE-L)."""
+
+@lru_cache(maxsize=ROUGE_CACHE_SIZE)
+def _rouge_tokens(text: str) -> Tuple[str, ...]:
+    """Tokenise and Porter-stem a string exactly like rouge-score, once per unique string."""
+    global _rouge_tokenizer
+    if _rouge_tokenizer is None:
+        _rouge_tokenizer = rouge_tokenizers.DefaultTokenizer(use_stemmer=True)
+    return tuple(_rouge_tokenizer.tokenize(text))
+
+
+@lru_cache(maxsize=ROUGE_CACHE_SIZE)
+def _rouge_ngrams(text: str, n: int) -> Counter:
+    tokens = _rouge_tokens(text)
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+@lru_cache(maxsize=ROUGE_CACHE_SIZE)
+def _lcs_masks(text: str) -> Dict[str, int]:
+    """Bit mask of the positions of each token, used by :func:`_lcs_length`."""
+    masks: Dict[str, int] = {}
+    for i, token in enumerate(_rouge_tokens(text)):
+        masks[token] = masks.get(token, 0) | (1 << i)
+    return masks
+
+
+def _lcs_length(tokens: Sequence[str], other: str) -> int:
+    """Length of the longest common subsequence with the tokens of ``other``.
+
+    Uses the bit-parallel algorithm of Crochemore et al. (2001): one big-integer
+    update per token of ``tokens`` instead of a full dynamic-programming table.
+    """
+    length = len(_rouge_tokens(other))
+    masks = _lcs_masks(other)
+    v = (1 << length) - 1
+    for token in tokens:
+        u = v & masks.get(token, 0)
+        v = (v + u) | (v - u)
+    return length - bin(v & ((1 << length) - 1)).count('1')
+
+
+def _fmeasure(overlap: int, pred_count: int, ref_count: int) -> float:
+    precision = overlap / pred_count if pred_count else 0.0
+    recall = overlap / ref_count if ref_count else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+
+
+def _rouge_pair(prediction: str, reference: str, rouge_type: str) -> float:
+    if rouge_type == 'rougeL':
+        pred_len = len(_rouge_tokens(prediction))
+        ref_len = len(_rouge_tokens(reference))
+        if not pred_len or not ref_len:
+            return 0.0
+        return _fmeasure(_lcs_length(_rouge_tokens(prediction), reference), pred_len, ref_len)
+
+    n = int(rouge_type[len('rouge'):])
+    pred_ngrams = _rouge_ngrams(prediction, n)
+    ref_ngrams = _rouge_ngrams(reference, n)
+    overlap = sum(min(count, ref_ngrams[gram]) for gram, count in pred_ngrams.items() if gram in ref_ngrams)
+    return _fmeasure(overlap, sum(pred_ngrams.values()), sum(ref_ngrams.values()))
+
+
+def _rouge_batch(args) -> Dict[str, np.ndarray]:
+    predictions, references, rouge_types, multi_ref = args
+    reduce = np.max if multi_ref == 'max' else np.mean
+    scores = {key: np.zeros(len(predictions)) for key in rouge_types}
+
+    for i, (pred, refs) in enumerate(zip(predictions, references)):
+        refs = refs or ['']
+        for key in rouge_types:
+            scores[key][i] = reduce([_rouge_pair(pred, ref, key) for ref in refs])
+
+    return scores
+
+
+def rouge_scores(
+    predictions: List[str],
+    references: List[List[str]],
+    rouge_types: Sequence[str] = ('rouge1', 'rouge2', 'rougeL'),
+    multi_ref: str = 'max',
+    num_workers: Optional[int] = 1,
+    batch_size: int = 10_000,
+) -> Dict[str, np.ndarray]:
+    """Compute per-sample ROUGE F-measures.
+
+    Scores match ``rouge_score.RougeScorer(..., use_stemmer=True)``. Each unique
+    string is tokenised and stemmed once (LRU-cached per process), n-gram counts
+    are memoised, and ROUGE-L uses a bit-parallel LCS.
+
+    Args:
+        predictions: Generated texts.
+        references: One or more reference texts per prediction.
+        rouge_types: Any of ``rougeN`` (e.g. ``rouge1``, ``rouge2``) and ``rougeL``.
+        multi_ref: How to combine scores against several references: ``'max'`` or ``'mean'``.
+        num_workers: Worker processes for scoring batches; ``1`` scores in-process
+            and ``None`` uses every core.
+        batch_size: Number of predictions per worker batch.
+
+    Returns:
+        Dictionary mapping each ROUGE type to an array with one score per prediction.
+    """
     if not HAS_ROUGE_SCORE:
         raise ImportError("rouge-score is required for ROUGE metrics. Install with: pip install rouge-score")
-    
-    scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
-    scores = {key: 0 for key in ['rouge1', 'rouge2', 'rougeL']}
+    if multi_ref not in ('max', 'mean'):
+        raise ValueError(f"multi_ref must be 'max' or 'mean', got {multi_ref!r}")
+    for key in rouge_types:
+        if key != 'rougeL' and not (key.startswith('rouge') and key[len('rouge'):].isdigit()):
+            raise ValueError(f"Unsupported ROUGE type: {key}")
 
-    for pred, refs in zip(predictions, references):
-        score = scorer.score(pred, refs[0])  # Assuming single reference for simplicity
-        for key in scores:
-            scores[key] += score[key].fmeasure
+    rouge_types = tuple(rouge_types)
+    if num_workers == 1 or len(predictions) <= batch_size:
+        return _rouge_batch((predictions, references, rouge_types, multi_ref))
 
-    # Average scores
-    if len(predictions) > 0:
-        for key in scores:
-            scores[key] /= len(predictions)
+    batches = [
+        (predictions[i:i + batch_size], references[i:i + batch_size], rouge_types, multi_ref)
+        for i in range(0, len(predictions), batch_size)
+    ]
+    parts = parallel_map(_rouge_batch, batches, num_workers=num_workers)
+    return {key: np.concatenate([part[key] for part in parts]) for key in rouge_types}
 
-    return scores
+
+def compute_rouge(
+    predictions: List[str], references: List[List[str]], multi_ref: str = 'max', num_workers: Optional[int] = 1
+) -> dict:
+    """Compute ROUGE scores (ROUGE-1, ROUGE-2, ROUGE-L)."""
+    per_sample = rouge_scores(predictions, references, multi_ref=multi_ref, num_workers=num_workers)
+    return {
+        key: float(values.mean()) if len(values) > 0 else 0
+        for key, values in per_sample.items()
+    }
+
+
+BLEU_MAX_ORDER = 4
+# Memoisation budget for tokenised references/hypotheses and their n-gram counts
+BLEU_CACHE_SIZE = 200_000
+_bleu_tokenizer = None
+
+
+@lru_cache(maxsize=BLEU_CACHE_SIZE)
+def _bleu_ngrams(text: str) -> Tuple[Counter, int]:
+    """13a-tokenise a segment and count its 1..4-grams, once per unique string."""
+    global _bleu_tokenizer
+    if _bleu_tokenizer is None:
+        _bleu_tokenizer = Tokenizer13a()
+    return extract_all_word_ngrams(_bleu_tokenizer(text.rstrip()), 1, BLEU_MAX_ORDER)
+
+
+@lru_cache(maxsize=BLEU_CACHE_SIZE)
+def _bleu_reference_info(refs: Tuple[str, ...]) -> Tuple[Counter, Tuple[int, ...]]:
+    """Clipped n-gram counts (max over references) and lengths of a reference set."""
+    if len(refs) == 1:
+        ngrams, length = _bleu_ngrams(refs[0])
+        return ngrams, (length,)
+    merged: Counter = Counter()
+    lengths = []
+    for ref in refs:
+        ngrams, length = _bleu_ngrams(ref)
+        lengths.append(length)
+        for ngram, count in ngrams.items():
+            if count > merged[ngram]:
+                merged[ngram] = count
+    return merged, tuple(lengths)
+
+
+def bleu_sample_statistics(predictions: List[str], references: List[List[str]]) -> np.ndarray:
+    """Compute per-sample BLEU sufficient statistics.
+
+    Row ``i`` is ``[hyp_len, ref_len, correct_1..4, total_1..4]`` for prediction
+    ``i``, computed exactly as sacrebleu does with its default ``13a`` tokenizer:
+    n-gram matches are clipped by the maximum count over that sample's
+    references and ``ref_len`` is the closest reference length. Samples may have
+    any number of references. Summing rows over any split of the corpus and
+    passing the result to :func:`bleu_from_statistics` gives the corpus BLEU.
+
+    Returns:
+        Integer array of shape ``(n_samples, 10)``.
+    """
+    if not HAS_SACREBLEU:
+        raise ImportError("sacrebleu is required for BLEU metrics. Install with: pip install sacrebleu")
+
+    stats = np.zeros((len(predictions), 2 + 2 * BLEU_MAX_ORDER), dtype=np.int64)
+    for i, (pred, refs) in enumerate(zip(predictions, references)):
+        ref_ngrams, ref_lens = _bleu_reference_info(tuple(refs) if refs else ('',))
+        hyp_ngrams, hyp_len = _bleu_ngrams(pred)
+
+        # Closest reference length, preferring the shorter one on ties
+        ref_len = min(ref_lens, key=lambda length: (abs(hyp_len - length), length))
+
+        row = stats[i]
+        row[0], row[1] = hyp_len, ref_len
+        for ngram, count in hyp_ngrams.items():
+            n = len(ngram) - 1
+            row[2 + BLEU_MAX_ORDER + n] += count
+            if ngram in ref_ngrams:
+                row[2 + n] += min(count, ref_ngrams[ngram])
+    return stats
+
+
+def bleu_statistics(predictions: List[str], references: List[List[str]]) -> np.ndarray:
+    """Compute summed BLEU sufficient statistics for a batch of predictions.
+
+    The returned vector is ``[sys_len, ref_len, correct_1..4, total_1..4]``.
+    Statistics from disjoint batches can be added together and passed to
+    :func:`bleu_from_statistics` to obtain the corpus BLEU of their union.
+    """
+    return bleu_sample_statistics(predictions, references).sum(axis=0)
 
 
 def compute_bleu(predictions: List[str], references: List[List[str]]) -> float:
-    """Compute corpus-level BLEU score."""
+    """Compute corpus-level BLEU score.
+
+    Each prediction is scored against all of its own references, so samples
+    may have different numbers of references.
+    """
+    return bleu_from_statistics(bleu_statistics(predictions, references))
+
+
+def bleu_from_statistics(stats: np.ndarray) -> float:
+    """Compute BLEU on a 0-1 scale from summed sufficient statistics.
+
+    Uses sacrebleu's default exponential smoothing, matching ``corpus_bleu``.
+    """
     if not HAS_SACREBLEU:
         raise ImportError("sacrebleu is required for BLEU metrics. Install with: pip install sacrebleu")
-    
-    # Convert to format expected by sacrebleu
-    refs_by_sentence = []
-    for i in range(len(references[0]) if references else 0):
-        refs_by_sentence.append([ref[i] for ref in references])
-    
-    bleu = corpus_bleu(predictions, refs_by_sentence)
-    return bleu.score / 100.0  # Convert to 0-1 scale
+
+    stats = [int(x) for x in stats]
+    score = BLEU.compute_bleu(
+        correct=stats[2:6], total=stats[6:10], sys_len=stats[0], ref_len=stats[1],
+        smooth_method='exp',  # Same default smoothing as corpus_bleu
+    )
+    return score.score / 100.0
 
 def compute_meteor(predictions: List[str], references: List[List[str]]) -> float:
     """Compute METEOR score (requires external dependencies)."""
@@ -0,0 +1,668 @@
+"""Metric planner that groups requested metrics into families sharing inputs.
+
+Metrics are grouped into families (all ROUGE variants, all retrieval cutoffs,
+...) that are computed together from the same columns. For each chunk of
+samples the plan extracts every needed column in a single pass, then runs each
+family once, instead of re-walking the samples for every metric. Columns may
+also come straight from Arrow record batches (see
+:mod:`guage_kit.datasets.columnar`), skipping per-row model construction.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+import hashlib
+import json
+import numpy as np
+from ..datasets.columnar import list_id_codes
+from ..schemas.core import EvalSample
+from ..utils.cache import DiskCache
+from .accumulators import (
+    BleuAccumulator, BootstrapAccumulator, CalibrationAccumulator, MeanAccumulator, MetricAccumulator,
+    SpearmanAccumulator, bootstrap_groups, poisson_weights,
+)
+from .calibration import CONFIDENCE_FIELD, CORRECT_FIELD, DEFAULT_CALIBRATION_BINS
+from .context_quality import (
+    CONTEXT_METRICS, DEFAULT_CONTEXT_THRESHOLD, RELEVANCE_MODES, context_relevance, context_scores,
+)
+from .embeddings import STS_SCORE_FIELD, semantic_similarity_scores, sts_features, sts_spearman_from_features
+from .encoders import TextEncoder, encoder_from_config
+from .groundedness import DEFAULT_NGRAM, DEFAULT_SENTENCE_THRESHOLD, GROUNDEDNESS_METRICS, groundedness_scores
+from .llm_quality import bleu_sample_statistics, rouge_scores
+from .rag_quality import TfidfSimilarityModel, answer_relevancy_scores
+from .retrieval_ir import sample_retrieval_code_scores, sample_retrieval_scores
+
+
+def _references(sample: EvalSample) -> List[str]:
+    return sample.query.references or ['']  # Empty reference if none provided
+
+
+def _retrieved_ids(sample: EvalSample) -> Optional[List[str]]:
+    return [chunk.id for chunk in sample.retrieval.chunks] if sample.retrieval else None
+
+
+def _chunk_texts(sample: EvalSample) -> Optional[List[str]]:
+    return [chunk.text for chunk in sample.retrieval.chunks] if sample.retrieval else None
+
+
+COLUMN_EXTRACTORS = {
+    'prompt': lambda sample: sample.query.prompt,
+    'prediction': lambda sample: sample.generation.text,
+    'references': _references,
+    'relevant_ids': lambda sample: sample.query.references,
+    'retrieved_ids': _retrieved_ids,
+    'chunk_texts': _chunk_texts,
+    'sts_score': lambda sample: sample.query.metadata.get(STS_SCORE_FIELD),
+    'query_id': lambda sample: sample.query.id,
+    'confidence': lambda sample: sample.query.metadata.get(CONFIDENCE_FIELD),
+    'correct': lambda sample: sample.query.metadata.get(CORRECT_FIELD),
+    'latency_ms': lambda sample: sample.query.metadata.get('latency_ms'),
+    'prompt_tokens': lambda sample: sample.query.metadata.get('prompt_tokens'),
+    'completion_tokens': lambda sample: sample.query.metadata.get('completion_tokens'),
+}
+
+# Per-sample serving costs carried alongside the scores in a run store
+USAGE_COLUMNS = ('latency_ms', 'prompt_tokens', 'completion_tokens')
+
+
+def extract_columns(samples: List[EvalSample], columns: Iterable[str]) -> Dict[str, list]:
+    """Extract the named columns from a chunk of samples in a single pass."""
+    extractors = {name: COLUMN_EXTRACTORS[name] for name in columns}
+    result = {name: [] for name in extractors}
+    for sample in samples:
+        for name, extract in extractors.items():
+            result[name].append(extract(sample))
+    return result
+
+
+def _as_list(column: Any) -> list:
+    """Return a column as a Python list, converting Arrow arrays."""
+    return column.to_pylist() if hasattr(column, 'to_pylist') else column
+
+
+def _reference_lists(column: Any) -> List[List[str]]:
+    return [refs or [''] for refs in _as_list(column)]
+
+
+# Bump when a metric implementation changes so stale cached scores are ignored
+CACHE_VERSION = 1
+
+
+def _row_digests(columns: Mapping[str, list], names: Iterable[str]) -> List[str]:
+    rows = zip(*(columns[name] for name in names))
+    return [hashlib.blake2b(json.dumps(row).encode(), digest_size=16).hexdigest() for row in rows]
+
+
+def _cache_key(tag: str, digest: str) -> str:
+    return hashlib.blake2b(f"{CACHE_VERSION}|{tag}|{digest}".encode(), digest_size=20).hexdigest()
+
+
+class MetricFamily:
+    """A group of metrics computed together from the same input columns."""
+
+    columns: tuple = ()
+    # Whether score() returns one value per sample, which allows per-sample caching
+    cacheable = True
+
+    def __init__(self):
+        self.metrics: List[str] = []
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        """Return True if this family computes ``metric``."""
+        raise NotImplementedError
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        """Register a requested metric with this family."""
+        if metric not in self.metrics:
+            self.metrics.append(metric)
+
+    @property
+    def needs_fit(self) -> bool:
+        """True if the family must see the whole dataset before scoring."""
+        return False
+
+    def fit(self, batches: Iterable[Mapping[str, Any]]) -> None:
+        """Fit dataset-level state from one pass over column ``batches``."""
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """Compute chunk values for every registered metric.
+
+        Columns are Python lists or, on the columnar path, Arrow arrays.
+        """
+        raise NotImplementedError
+
+    def new_accumulator(self, metric: str) -> MetricAccumulator:
+        """Create an empty accumulator for one registered metric."""
+        return MeanAccumulator()
+
+    def cache_tag(self, metric: str) -> str:
+        """Identify a metric and its configuration in per-sample cache keys."""
+        return metric
+
+
+class RougeFamily(MetricFamily):
+    """ROUGE variants, scored with one scorer call per chunk.
+
+    Config keys:
+        rouge.multi_ref: ``'max'`` (default) or ``'mean'`` over multiple references.
+    """
+
+    columns = ('prediction', 'references')
+
+    def __init__(self):
+        super().__init__()
+        self.multi_ref = 'max'
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric in ('rouge1', 'rouge2', 'rougeL')
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        self.multi_ref = config.get('rouge.multi_ref', 'max')
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        return rouge_scores(
+            _as_list(columns['prediction']), _reference_lists(columns['references']),
+            rouge_types=tuple(self.metrics), multi_ref=self.multi_ref,
+        )
+
+    def cache_tag(self, metric: str) -> str:
+        return f"{metric}|{self.multi_ref}"
+
+
+class BleuFamily(MetricFamily):
+    """Corpus BLEU, folded as per-sample n-gram sufficient statistics."""
+
+    columns = ('prediction', 'references')
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric == 'bleu'
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        return {'bleu': bleu_sample_statistics(
+            _as_list(columns['prediction']), _reference_lists(columns['references'])
+        )}
+
+    def new_accumulator(self, metric: str) -> MetricAccumulator:
+        return BleuAccumulator()
+
+
+class RetrievalFamily(MetricFamily):
+    """Rank metrics at every requested cutoff, computed from one hit matrix."""
+
+    columns = ('retrieved_ids', 'relevant_ids')
+
+    def __init__(self):
+        super().__init__()
+        self.engine_names: Dict[str, str] = {}
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric in ('mrr', 'map') or ('@' in metric and metric.split('@')[0] in ('recall', 'precision', 'ndcg'))
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        name, _, k = metric.partition('@')
+        if name in ('mrr', 'map'):
+            self.engine_names[metric] = name
+        else:
+            self.engine_names[metric] = f"{name}@{int(k) if k else config.get('retrieval.k', 10)}"
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        retrieved, relevant = columns['retrieved_ids'], columns['relevant_ids']
+        if hasattr(retrieved, 'to_pylist'):
+            # Arrow id lists are matched as integer codes, without Python sets
+            scores = sample_retrieval_code_scores(
+                *list_id_codes(retrieved, relevant)[:4], set(self.engine_names.values()),
+                has_retrieval=retrieved.is_valid().to_numpy(zero_copy_only=False),
+            )
+        else:
+            scores = sample_retrieval_scores(retrieved, relevant, set(self.engine_names.values()))
+        return {metric: scores[self.engine_names[metric]] for metric in self.metrics}
+
+    def cache_tag(self, metric: str) -> str:
+        return self.engine_names[metric]
+
+
+class AnswerRelevancyFamily(MetricFamily):
+    """Query/answer TF-IDF relevancy.
+
+    Config keys:
+        rag.tfidf: ``'pairwise'`` (default) fits a vectorizer per pair;
+            ``'corpus'`` fits one :class:`TfidfSimilarityModel` over the dataset.
+        rag.tfidf_model: Path to a persisted :class:`TfidfSimilarityModel` to use
+            instead of fitting one.
+    """
+
+    columns = ('prompt', 'prediction')
+
+    def __init__(self):
+        super().__init__()
+        self.model: Optional[TfidfSimilarityModel] = None
+        self.model_digest = ''
+        self.mode = 'pairwise'
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric == 'answer_relevancy'
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        self.mode = config.get('rag.tfidf', 'pairwise')
+        if self.mode not in ('pairwise', 'corpus'):
+            raise ValueError(f"Unknown rag.tfidf mode: {self.mode}")
+        if config.get('rag.tfidf_model'):
+            self.mode = 'corpus'
+            self.model = TfidfSimilarityModel.load(config['rag.tfidf_model'])
+            self.model_digest = self.model.fingerprint()
+
+    @property
+    def needs_fit(self) -> bool:
+        return self.mode == 'corpus' and self.model is None
+
+    def fit(self, batches: Iterable[Mapping[str, Any]]) -> None:
+        def texts():
+            for columns in batches:
+                yield from _as_list(columns['prompt'])
+                yield from _as_list(columns['prediction'])
+
+        self.model = TfidfSimilarityModel().fit(texts())
+        self.model_digest = self.model.fingerprint()
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        return {'answer_relevancy': answer_relevancy_scores(
+            _as_list(columns['prompt']), _as_list(columns['prediction']), model=self.model
+        )}
+
+    def cache_tag(self, metric: str) -> str:
+        # Corpus-fitted scores depend on the IDF weights, not just the pair
+        return f"{metric}|{self.mode}|{self.model_digest}"
+
+
+class EmbeddingFamily(MetricFamily):
+    """Base for metrics computed from text embeddings.
+
+    Config keys are those of :func:`~guage_kit.metrics.encoders.encoder_from_config`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.encoder: Optional[TextEncoder] = None
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        if self.encoder is None:
+            self.encoder = encoder_from_config(config)
+
+    def cache_tag(self, metric: str) -> str:
+        return f"{metric}|{self.encoder.fingerprint()}|{self.encoder.cache_dtype if self.encoder.cache_dir else ''}"
+
+
+class StsFamily(EmbeddingFamily):
+    """STS Spearman between prompt/generation embedding similarity and gold scores.
+
+    Rank based, so it keeps one ``(similarity, gold)`` row per sample. Gold
+    scores come from ``query.metadata['sts_score']``.
+    """
+
+    columns = ('prompt', 'prediction', 'sts_score')
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric == 'sts_spearman'
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        return {'sts_spearman': sts_features(
+            _as_list(columns['prompt']), _as_list(columns['prediction']),
+            _as_list(columns['sts_score']), encoder=self.encoder,
+        )}
+
+    def new_accumulator(self, metric: str) -> MetricAccumulator:
+        return SpearmanAccumulator(sts_spearman_from_features)
+
+
+class SemanticSimilarityFamily(EmbeddingFamily):
+    """Embedding cosine similarity between the generation and its closest reference."""
+
+    columns = ('prediction', 'references')
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric == 'semantic_similarity'
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        return {'semantic_similarity': semantic_similarity_scores(
+            _as_list(columns['prediction']), _reference_lists(columns['references']), encoder=self.encoder,
+        )}
+
+
+class CalibrationFamily(MetricFamily):
+    """Calibration of per-sample confidences against correctness labels.
+
+    Reads ``confidence`` (a probability) and ``correct`` (0 or 1) from
+    ``query.metadata`` or from flat columns of the same names; samples missing
+    either are skipped.
+
+    Config keys:
+        calibration.bins: Number of bins for ``ece`` and ``adaptive_ece`` (default 15).
+    """
+
+    columns = ('confidence', 'correct')
+    # The inputs are the values themselves; nothing to cache
+    cacheable = False
+    METRICS = ('ece', 'adaptive_ece', 'brier')
+
+    def __init__(self):
+        super().__init__()
+        self.n_bins = DEFAULT_CALIBRATION_BINS
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric in cls.METRICS
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        self.n_bins = config.get('calibration.bins', DEFAULT_CALIBRATION_BINS)
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        rows = np.column_stack([
+            np.array(_as_list(columns['confidence']), dtype=float),
+            np.array(_as_list(columns['correct']), dtype=float),
+        ])
+        return {metric: rows for metric in self.metrics}
+
+    def new_accumulator(self, metric: str) -> MetricAccumulator:
+        return CalibrationAccumulator(metric, self.n_bins)
+
+
+class GroundednessFamily(MetricFamily):
+    """Lexical support of the generation in the sample's retrieved chunk texts.
+
+    All four metrics come from one n-gram index of the chunk texts per chunk
+    of samples (see :mod:`~guage_kit.metrics.groundedness`); samples without
+    retrieved chunks are skipped.
+
+    Config keys:
+        groundedness.ngram: Words per matched n-gram (default 3).
+        groundedness.threshold: Share of grounded tokens a sentence needs for
+            ``faithfulness`` (default 0.5).
+    """
+
+    columns = ('prediction', 'chunk_texts')
+
+    def __init__(self):
+        super().__init__()
+        self.ngram = DEFAULT_NGRAM
+        self.threshold = DEFAULT_SENTENCE_THRESHOLD
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric in GROUNDEDNESS_METRICS
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        self.ngram = int(config.get('groundedness.ngram', DEFAULT_NGRAM))
+        self.threshold = float(config.get('groundedness.threshold', DEFAULT_SENTENCE_THRESHOLD))
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        scores = groundedness_scores(
+            _as_list(columns['prediction']), _as_list(columns['chunk_texts']), ngram=self.ngram, threshold=self.threshold
+        )
+        return {metric: scores[metric] for metric in self.metrics}
+
+    def cache_tag(self, metric: str) -> str:
+        return f"{metric}|{self.ngram}|{self.threshold}"
+
+
+class ContextFamily(MetricFamily):
+    """Context precision, recall, utilization and noise sensitivity.
+
+    One :class:`~guage_kit.metrics.context_quality.ContextRelevance` is built
+    per chunk of samples and every requested metric is read from it.
+
+    Config keys:
+        context.relevance: How chunks are judged relevant. ``'lexical'``
+            (default) and ``'embedding'`` check whether a chunk supports a
+            sentence of the references; ``'ids'`` uses the retrieved chunk ids
+            against the query references as relevance labels.
+        context.threshold: Support a sentence needs from a chunk: content-word
+            coverage, or embedding cosine similarity (default 0.5).
+        embeddings.*: Encoder settings for ``'embedding'`` mode (see
+            :func:`~guage_kit.metrics.encoders.encoder_from_config`).
+    """
+
+    columns = ('prediction', 'chunk_texts', 'references')
+
+    def __init__(self):
+        super().__init__()
+        self.mode = 'lexical'
+        self.threshold = DEFAULT_CONTEXT_THRESHOLD
+        self.encoder: Optional[TextEncoder] = None
+
+    @classmethod
+    def matches(cls, metric: str) -> bool:
+        return metric in CONTEXT_METRICS
+
+    def add(self, metric: str, config: Mapping[str, Any]) -> None:
+        super().add(metric, config)
+        self.mode = config.get('context.relevance', 'lexical')
+        if self.mode not in RELEVANCE_MODES:
+            raise ValueError(f"Unknown context.relevance mode: {self.mode}")
+        self.threshold = float(config.get('context.threshold', DEFAULT_CONTEXT_THRESHOLD))
+        if self.mode == 'ids':
+            self.columns = ('prediction', 'chunk_texts', 'retrieved_ids', 'relevant_ids')
+        if self.mode == 'embedding' and self.encoder is None:
+            self.encoder = encoder_from_config(config)
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        chunk_texts = _as_list(columns['chunk_texts'])
+        if self.mode == 'ids':
+            retrieved = _as_list(columns['retrieved_ids'])
+            relevance = context_relevance(
+                _as_list(columns['prediction']), chunk_texts, retrieved_ids=retrieved,
+                relevant_ids=_as_list(columns['relevant_ids']), mode='ids', threshold=self.threshold,
+            )
+            has_retrieval = np.array([ids is not None for ids in retrieved], dtype=bool)
+        else:
+            relevance = context_relevance(
+                _as_list(columns['prediction']), chunk_texts, references=_as_list(columns['references']),
+                mode=self.mode, threshold=self.threshold, encoder=self.encoder,
+            )
+            has_retrieval = np.array([texts is not None for texts in chunk_texts], dtype=bool)
+        has_texts = np.array([bool(texts) for texts in chunk_texts], dtype=bool)
+        scores = context_scores(relevance, has_retrieval=has_retrieval, has_texts=has_texts)
+        return {metric: scores[metric] for metric in self.metrics}
+
+    def cache_tag(self, metric: str) -> str:
+        encoder = self.encoder.fingerprint() if self.encoder is not None else ''
+        return f"{metric}|{self.mode}|{self.threshold}|{encoder}"
+
+
+METRIC_FAMILIES = [
+    RougeFamily, BleuFamily, RetrievalFamily, AnswerRelevancyFamily, StsFamily, SemanticSimilarityFamily,
+    CalibrationFamily, GroundednessFamily, ContextFamily,
+]
+
+# Metrics where a smaller value is better; every other metric is higher-is-better
+LOWER_IS_BETTER = frozenset({'ece', 'adaptive_ece', 'brier', 'unsupported_token_rate', 'noise_sensitivity'})
+
+
+class MetricPlan:
+    """Requested metrics grouped into families, with the union of their input columns."""
+
+    def __init__(self, metrics: List[str], config: Optional[Mapping[str, Any]] = None):
+        config = config or {}
+        self.metrics = list(dict.fromkeys(metrics))
+        self.families: List[MetricFamily] = []
+        self._family_of: Dict[str, MetricFamily] = {}
+        by_class: Dict[type, MetricFamily] = {}
+
+        for metric in self.metrics:
+            family_cls = next((cls for cls in METRIC_FAMILIES if cls.matches(metric)), None)
+            if family_cls is None:
+                raise ValueError(f"Unknown metric: {metric}")
+            if family_cls not in by_class:
+                by_class[family_cls] = family_cls()
+                self.families.append(by_class[family_cls])
+            by_class[family_cls].add(metric, config)
+            self._family_of[metric] = by_class[family_cls]
+
+        self.columns: Set[str] = {column for family in self.families for column in family.columns}
+        self.bootstrap_groups = 0
+
+    def enable_bootstrap(self, n_groups: int) -> None:
+        """Track grouped bootstrap statistics in every accumulator (see :mod:`.accumulators`)."""
+        if n_groups < 1:
+            raise ValueError("The number of bootstrap groups must be positive")
+        self.bootstrap_groups = n_groups
+
+    @property
+    def needs_fit(self) -> bool:
+        """True if any family must see the whole dataset before scoring."""
+        return any(family.needs_fit for family in self.families)
+
+    def fit(self, make_batches: Callable[[], Iterable[Mapping[str, Any]]]) -> None:
+        """Fit every family that needs it, streaming a fresh pass of ``make_batches()`` to each.
+
+        ``make_batches`` returns an iterable of column batches covering
+        :attr:`columns`, e.g. from :func:`extract_columns` per chunk.
+        """
+        for family in self.families:
+            if family.needs_fit:
+                family.fit(make_batches())
+
+    def new_accumulators(self) -> Dict[str, MetricAccumulator]:
+        """Create one empty accumulator per requested metric."""
+        accumulators = {metric: self._family_of[metric].new_accumulator(metric) for metric in self.metrics}
+        if self.bootstrap_groups:
+            return {
+                metric: BootstrapAccumulator(accumulator, self.bootstrap_groups)
+                for metric, accumulator in accumulators.items()
+            }
+        return accumulators
+
+    def score(self, samples: List[EvalSample], cache: Optional[DiskCache] = None) -> Dict[str, np.ndarray]:
+        """Compute chunk values for every metric, extracting each column once.
+
+        With a ``cache``, per-sample scores are looked up by a hash of the metric,
+        its configuration and the sample's input columns, and only the samples
+        missing from the cache are scored.
+        """
+        return self.score_columns(extract_columns(samples, self.columns), len(samples), cache=cache)
+
+    def score_columns(
+        self, columns: Mapping[str, Any], num_samples: int, cache: Optional[DiskCache] = None
+    ) -> Dict[str, np.ndarray]:
+        """Compute chunk values for every metric from already extracted columns."""
+        values = {}
+        for family in self.families:
+            if cache is not None and family.cacheable:
+                values.update(self._score_cached(family, columns, num_samples, cache))
+            else:
+                values.update(family.score(columns))
+        return values
+
+    @staticmethod
+    def _score_cached(
+        family: MetricFamily, columns: Mapping[str, Any], num_samples: int, cache: DiskCache
+    ) -> Dict[str, np.ndarray]:
+        # Normalise so the row and columnar paths produce the same cache keys
+        columns = {
+            name: _reference_lists(columns[name]) if name == 'references' else _as_list(columns[name])
+            for name in family.columns
+        }
+        digests = _row_digests(columns, family.columns)
+        keys = {
+            metric: [_cache_key(family.cache_tag(metric), digest) for digest in digests]
+            for metric in family.metrics
+        }
+        found = cache.get_many(key for metric_keys in keys.values() for key in metric_keys)
+        missing = [
+            i for i in range(num_samples)
+            if any(keys[metric][i] not in found for metric in family.metrics)
+        ]
+
+        computed = {}
+        if missing:
+            computed = family.score({name: [columns[name][i] for i in missing] for name in family.columns})
+
+        values, new_entries = {}, {}
+        for metric in family.metrics:
+            column = [found.get(key) for key in keys[metric]]
+            for j, i in enumerate(missing):
+                value = np.asarray(computed[metric][j]).tolist()
+                column[i] = value
+                new_entries[keys[metric][i]] = value
+            values[metric] = np.array(column, dtype=float)
+        cache.set_many(new_entries)
+        return values
+
+    def update(
+        self,
+        accumulators: Mapping[str, MetricAccumulator],
+        samples: List[EvalSample],
+        cache: Optional[DiskCache] = None,
+        first_row: int = 0,
+    ) -> None:
+        """Score a chunk and fold the values into ``accumulators``."""
+        self.update_columns(
+            accumulators, extract_columns(samples, self.columns), len(samples), cache=cache, first_row=first_row
+        )
+
+    def update_columns(
+        self,
+        accumulators: Mapping[str, MetricAccumulator],
+        columns: Mapping[str, Any],
+        num_samples: int,
+        cache: Optional[DiskCache] = None,
+        first_row: int = 0,
+    ) -> None:
+        """Score a chunk of extracted columns and fold the values into ``accumulators``.
+
+        ``first_row`` is the dataset row number of the chunk's first sample,
+        which decides its bootstrap groups.
+        """
+        self.fold(accumulators, self.score_columns(columns, num_samples, cache=cache), num_samples, first_row)
+
+    def fold(
+        self,
+        accumulators: Mapping[str, MetricAccumulator],
+        values: Mapping[str, np.ndarray],
+        num_samples: int,
+        first_row: int = 0,
+    ) -> None:
+        """Fold chunk values from :meth:`score_columns` into ``accumulators``."""
+        groups = bootstrap_groups(first_row, num_samples, self.bootstrap_groups) if self.bootstrap_groups else None
+        for metric in self.metrics:
+            accumulators[metric].update(values[metric])
+            if groups is not None:
+                accumulators[metric].update_groups(values[metric], groups)
+
+    def confidence_intervals(
+        self,
+        accumulators: Mapping[str, BootstrapAccumulator],
+        n_resamples: int = 1000,
+        confidence_level: float = 0.95,
+        seed: int = 0,
+    ) -> Dict[str, Tuple[float, float]]:
+        """Percentile bootstrap interval of every metric from one shared weight matrix.
+
+        Requires :meth:`enable_bootstrap` before the accumulators were created.
+        """
+        if not self.bootstrap_groups:
+            raise ValueError("Bootstrap statistics were not tracked; call enable_bootstrap() first")
+        weights = poisson_weights(n_resamples, self.bootstrap_groups, seed)
+        rng = np.random.default_rng(seed)
+        return {
+            metric: accumulators[metric].interval(weights, rng, confidence_level) for metric in self.metrics
+        }
+
+
+def plan_metrics(metrics: List[str], config: Optional[Mapping[str, Any]] = None) -> MetricPlan:
+    """Group metric names accepted by :func:`guage_kit.api.evaluate` into a :class:`MetricPlan`.
+
+    Raises:
+        ValueError: If a metric name is unknown.
+    """
+    return MetricPlan(metrics, config)
@@ -1,11 +1,19 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Union
+import hashlib
+import json
+import pathlib
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 from ..schemas.core import EvalSample
 
 def faithfulness(reference: str, generated: str) -> float:
-    """Calculate faithfulness score based on cosine similarity."""
+    """Calculate faithfulness score based on cosine similarity.
+
+    Compares against a reference text; the ``faithfulness`` metric of
+    :func:`guage_kit.api.evaluate` scores against the retrieved chunks instead
+    (see :func:`~guage_kit.metrics.groundedness.groundedness_scores`).
+    """
     # Simple TF-IDF based similarity for now
     vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
     try:
@@ -27,19 +35,134 @@ def answer_relevancy(query: str, answer: str) -> float:
         return 0.0
 
 
-def compute_answer_relevancy(eval_samples: List[EvalSample]) -> float:
-    """Compute answer relevancy across multiple evaluation samples."""
+class TfidfSimilarityModel:
+    """TF-IDF vectorizer fitted once over a corpus and reused for paired cosine similarity.
+
+    Unlike :func:`answer_relevancy` and :func:`faithfulness`, which fit a new
+    vectorizer on every two-document pair, this model learns IDF weights from
+    the whole dataset and scores batches of text pairs with one sparse product.
+
+    Args:
+        **vectorizer_kwargs: Passed to ``TfidfVectorizer``; defaults to English stop words.
+    """
+
+    def __init__(self, **vectorizer_kwargs: Any):
+        vectorizer_kwargs.setdefault('stop_words', 'english')
+        self.vectorizer = TfidfVectorizer(**vectorizer_kwargs)
+
+    def fit(self, texts: Iterable[str]) -> "TfidfSimilarityModel":
+        """Fit the vocabulary and IDF weights; ``texts`` may be a generator."""
+        self.vectorizer.fit(texts)
+        return self
+
+    def paired_cosine(self, left: List[str], right: List[str]) -> np.ndarray:
+        """Cosine similarity between ``left[i]`` and ``right[i]`` for every pair.
+
+        Rows are L2-normalised by the vectorizer, so the cosine is the row-wise
+        sum of the element-wise product of the two sparse matrices.
+        """
+        if len(left) != len(right):
+            raise ValueError("left and right must have the same length.")
+        if not left:
+            return np.zeros(0)
+        a = self.vectorizer.transform(left)
+        b = self.vectorizer.transform(right)
+        return np.asarray(a.multiply(b).sum(axis=1), dtype=float).ravel()
+
+    def fingerprint(self) -> str:
+        """Return a digest of the fitted vocabulary and IDF weights."""
+        digest = hashlib.sha256()
+        digest.update('\x00'.join(self.vectorizer.get_feature_names_out()).encode())
+        digest.update(self.vectorizer.idf_.tobytes())
+        return digest.hexdigest()
+
+    def save(self, path: Union[str, pathlib.Path]) -> None:
+        """Persist the fitted model to ``path``.
+
+        Only data is written, never code: an ``.npz`` archive (under the exact
+        ``path`` given) holding the vocabulary in column order, the IDF weights
+        and the JSON-encoded vectorizer parameters.
+
+        Raises:
+            ValueError: If the vectorizer uses a callable analyzer, tokenizer or
+                preprocessor, which cannot be stored as data.
+        """
+        params = self.vectorizer.get_params()
+        params.pop('vocabulary')
+        if any(callable(params[key]) for key in ('analyzer', 'tokenizer', 'preprocessor')):
+            raise ValueError("Models with a callable analyzer, tokenizer or preprocessor cannot be saved")
+        params['dtype'] = np.dtype(params['dtype']).name
+        if params['stop_words'] is not None and not isinstance(params['stop_words'], str):
+            params['stop_words'] = sorted(params['stop_words'])
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                vocabulary=np.asarray(self.vectorizer.get_feature_names_out(), dtype=str),
+                idf=self.vectorizer.idf_,
+                params=np.asarray(json.dumps(params)),
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, pathlib.Path]) -> "TfidfSimilarityModel":
+        """Load a model written by :meth:`save`.
+
+        The archive is read with ``allow_pickle=False``, so loading a model
+        path taken from configuration never executes code from the file.
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            vocabulary = archive['vocabulary'].tolist()
+            idf = archive['idf']
+            params = json.loads(archive['params'].item())
+        params['dtype'] = np.dtype(params['dtype']).type
+        params['ngram_range'] = tuple(params['ngram_range'])
+        model = cls(**params, vocabulary={term: i for i, term in enumerate(vocabulary)})
+        model.vectorizer.idf_ = idf
+        return model
+
+
+def answer_relevancy_scores(
+    queries: List[str], answers: List[str], model: Optional[TfidfSimilarityModel] = None
+) -> np.ndarray:
+    """Compute per-sample answer relevancy scores for paired query/answer texts.
+
+    With a fitted ``model`` all pairs are scored in one batch; otherwise each
+    pair falls back to :func:`answer_relevancy`.
+    """
+    if model is not None:
+        return model.paired_cosine(queries, answers)
+    return np.array([answer_relevancy(q, a) for q, a in zip(queries, answers)], dtype=float)
+
+
+def faithfulness_scores(
+    references: List[str], generations: List[str], model: Optional[TfidfSimilarityModel] = None
+) -> np.ndarray:
+    """Compute per-sample faithfulness scores for paired reference/generated texts.
+
+    With a fitted ``model`` all pairs are scored in one batch; otherwise each
+    pair falls back to :func:`faithfulness`.
+    """
+    if model is not None:
+        return model.paired_cosine(references, generations)
+    return np.array([faithfulness(r, g) for r, g in zip(references, generations)], dtype=float)
+
+
+def compute_answer_relevancy(
+    eval_samples: List[EvalSample], model: Optional[TfidfSimilarityModel] = None
+) -> float:
+    """Compute answer relevancy across multiple evaluation samples.
+
+    Args:
+        eval_samples: Samples to score.
+        model: Optional fitted :class:`TfidfSimilarityModel` for batched corpus-level scoring.
+    """
     if not eval_samples:
         return 0.0
-    
-    scores = []
-    for sample in eval_samples:
-        query_text = sample.query.prompt
-        answer_text = sample.generation.text
-        score = answer_relevancy(query_text, answer_text)
-        scores.append(score)
-    
-    return np.mean(scores) if scores else 0.0
+
+    return np.mean(answer_relevancy_scores(
+        [sample.query.prompt for sample in eval_samples],
+        [sample.generation.text for sample in eval_samples],
+        model=model,
+    ))
 
 
 def rag_quality_metrics(query: str, reference: str, generated: str) -> Dict[str, Any]:
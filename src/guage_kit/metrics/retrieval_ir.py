@@ -1,5 +1,8 @@
-from typing import List, Dict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 import numpy as np
+import pandas as pd
+from ..datasets.trec import PathLike, Qrels, TrecRun, load_qrels, load_trec_run
 from ..schemas.core import EvalSample
 
 def recall_at_k(retrieved: List[str], relevant: List[str], k: int) -> float:
@@ -38,6 +41,241 @@ def precision_at_k(retrieved: List[str], relevant: List[str], k: int) -> float:
     true_positives = len(retrieved_at_k.intersection(relevant_set))
     return true_positives / k if k > 0 else 0.0
 
+class HitMatrix(NamedTuple):
+    """Dense encoding of a retrieval run for vectorized scoring.
+
+    Attributes:
+        hits: Boolean array of shape ``(n_queries, depth)``; ``hits[i, r]`` is True
+            when the document at rank ``r`` of query ``i`` is relevant. Repeated
+            document ids only count at their first rank.
+        n_relevant: Number of distinct relevant documents per query.
+        n_retrieved: Number of retrieved documents per query.
+        gains: Optional float array shaped like ``hits`` with the graded gain of
+            the document at each rank; None for binary relevance.
+        ideal_gains: Optional ``(n_queries, width)`` array of every judged
+            positive gain per query in descending order, zero-padded; required
+            with ``gains``.
+    """
+    hits: np.ndarray
+    n_relevant: np.ndarray
+    n_retrieved: np.ndarray
+    gains: Optional[np.ndarray] = None
+    ideal_gains: Optional[np.ndarray] = None
+
+
+def encode_hits(
+    retrieved: Sequence[Sequence[str]],
+    relevant: Sequence[Sequence[str]],
+    depth: Optional[int] = None,
+) -> HitMatrix:
+    """Encode ranked id lists and relevance labels into a :class:`HitMatrix`.
+
+    Args:
+        retrieved: Ranked retrieved document ids per query.
+        relevant: Relevant document ids per query.
+        depth: Number of ranks to keep; defaults to the longest ranking.
+
+    Returns:
+        HitMatrix: The encoded run.
+    """
+    n_retrieved = np.fromiter((len(r) for r in retrieved), dtype=np.int64, count=len(retrieved))
+    if depth is None:
+        depth = int(n_retrieved.max()) if len(n_retrieved) else 0
+    hits = np.zeros((len(retrieved), depth), dtype=bool)
+    n_relevant = np.zeros(len(retrieved), dtype=np.int64)
+
+    for i, (ranking, rel) in enumerate(zip(retrieved, relevant)):
+        rel = set(rel)
+        n_relevant[i] = len(rel)
+        if not rel:
+            continue
+        ranking = ranking[:depth]
+        positions = [rank for rank, doc_id in enumerate(ranking) if doc_id in rel]
+        if len(positions) > 1:
+            # Keep only the first rank of each relevant id
+            first = {}
+            for rank in positions:
+                first.setdefault(ranking[rank], rank)
+            positions = list(first.values())
+        hits[i, positions] = True
+
+    return HitMatrix(hits, n_relevant, np.minimum(n_retrieved, depth))
+
+
+def encode_hit_codes(
+    retrieved_offsets: np.ndarray,
+    retrieved_codes: np.ndarray,
+    relevant_offsets: np.ndarray,
+    relevant_codes: np.ndarray,
+    depth: Optional[int] = None,
+    relevant_grades: Optional[np.ndarray] = None,
+    relevance_level: int = 1,
+) -> HitMatrix:
+    """Encode integer-coded id lists into a :class:`HitMatrix` without Python loops.
+
+    Each id list is given in flattened form: query ``i`` owns
+    ``codes[offsets[i]:offsets[i + 1]]``. Codes are non-negative integers shared
+    by both sides, e.g. from dictionary-encoding the string ids.
+
+    Args:
+        retrieved_offsets: ``n_queries + 1`` offsets into ``retrieved_codes``, starting at 0.
+        retrieved_codes: Ranked retrieved document codes.
+        relevant_offsets: ``n_queries + 1`` offsets into ``relevant_codes``, starting at 0.
+        relevant_codes: Relevant document codes.
+        depth: Number of ranks to keep; defaults to the longest ranking.
+        relevant_grades: Optional relevance grade per entry of ``relevant_codes``
+            (graded judgments). Documents graded at least ``relevance_level``
+            count as relevant and positive grades become ``gains``; the first
+            judgment of a repeated (query, document) pair wins.
+        relevance_level: Minimum grade of a relevant document.
+
+    Returns:
+        HitMatrix: The encoded run, identical to :func:`encode_hits` on the decoded
+        lists when no grades are given.
+    """
+    retrieved_codes = np.asarray(retrieved_codes, dtype=np.int64)
+    relevant_codes = np.asarray(relevant_codes, dtype=np.int64)
+    n_retrieved = np.diff(retrieved_offsets).astype(np.int64)
+    n_queries = len(n_retrieved)
+    if depth is None:
+        depth = int(n_retrieved.max()) if n_queries else 0
+
+    # Key every (query, document) pair by a single integer
+    vocab = max(int(max(retrieved_codes.max(initial=-1), relevant_codes.max(initial=-1))) + 1, 1)
+    query_ids = np.arange(n_queries, dtype=np.int64)
+    relevant_keys, first_judgment = np.unique(
+        np.repeat(query_ids, np.diff(relevant_offsets)) * vocab + relevant_codes, return_index=True
+    )
+    grades = None
+    if relevant_grades is not None:
+        grades = np.asarray(relevant_grades, dtype=np.float64)[first_judgment]
+        n_relevant = np.bincount(relevant_keys[grades >= relevance_level] // vocab, minlength=n_queries)
+    else:
+        n_relevant = np.bincount(relevant_keys // vocab, minlength=n_queries)
+
+    retrieved_queries = np.repeat(query_ids, n_retrieved)
+    ranks = np.arange(len(retrieved_codes)) - np.repeat(np.asarray(retrieved_offsets[:-1]), n_retrieved)
+    positions = np.flatnonzero(ranks < depth)
+    keys = retrieved_queries[positions] * vocab + retrieved_codes[positions]
+    if len(relevant_keys):
+        found = np.minimum(np.searchsorted(relevant_keys, keys), len(relevant_keys) - 1)
+        matched = relevant_keys[found] == keys
+        positions, found = positions[matched], found[matched]
+    else:
+        positions, found = positions[:0], positions[:0]
+    # Keep only the first rank of each relevant id
+    _, first = np.unique(retrieved_queries[positions] * vocab + retrieved_codes[positions], return_index=True)
+    positions, found = positions[first], found[first]
+    rows, columns = retrieved_queries[positions], ranks[positions]
+
+    hits = np.zeros((n_queries, depth), dtype=bool)
+    n_retrieved = np.minimum(n_retrieved, depth)
+    if grades is None:
+        hits[rows, columns] = True
+        return HitMatrix(hits, n_relevant.astype(np.int64), n_retrieved)
+
+    hits[rows, columns] = grades[found] >= relevance_level
+    gains = np.zeros((n_queries, depth))
+    gains[rows, columns] = np.maximum(grades[found], 0.0)
+
+    # Positive grades of every judged document, best first, one row per query
+    positive = np.flatnonzero(grades > 0)
+    owners = relevant_keys[positive] // vocab
+    order = np.lexsort((-grades[positive], owners))
+    counts = np.bincount(owners, minlength=n_queries)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if n_queries else counts
+    ideal_gains = np.zeros((n_queries, int(counts.max(initial=0))))
+    ideal_gains[owners[order], np.arange(len(order)) - starts[owners[order]]] = grades[positive][order]
+    return HitMatrix(hits, n_relevant.astype(np.int64), n_retrieved, gains, ideal_gains)
+
+
+@lru_cache(maxsize=None)
+def _discounts(depth: int) -> np.ndarray:
+    """Return the DCG discount table ``1 / log2(rank + 1)`` for ranks ``1..depth``."""
+    table = 1.0 / np.log2(np.arange(2, depth + 2))
+    table.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=None)
+def _ideal_dcg(depth: int) -> np.ndarray:
+    """Return ``idcg[m]``, the DCG of ``m`` relevant documents at the top ranks."""
+    table = np.concatenate(([0.0], np.cumsum(_discounts(depth))))
+    table.setflags(write=False)
+    return table
+
+
+def _parse_cutoff(metric: str) -> Tuple[str, Optional[int]]:
+    name, _, k = metric.partition('@')
+    return name, int(k) if k else None
+
+
+def retrieval_scores(matrix: HitMatrix, metrics: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Compute several retrieval metrics per query from one :class:`HitMatrix`.
+
+    Supported names are ``recall@k``, ``precision@k``, ``ndcg@k``, ``mrr`` and
+    ``map``. Cumulative hit counts and discount tables are computed once and
+    shared by every requested cutoff. nDCG uses binary gains with the ideal
+    ranking placing all ``min(n_relevant, k)`` relevant documents first, or,
+    when the matrix carries graded ``gains``, linear graded gains against the
+    ``k`` best judged grades (the ``trec_eval`` convention).
+
+    Args:
+        matrix: The encoded run.
+        metrics: Metric names to compute.
+
+    Returns:
+        Dict[str, np.ndarray]: One array of per-query scores per metric name.
+
+    Raises:
+        ValueError: If a metric name is not supported.
+    """
+    hits, n_relevant, n_retrieved = matrix.hits, matrix.n_relevant, matrix.n_retrieved
+    n_queries, depth = hits.shape
+    safe_relevant = np.maximum(n_relevant, 1)
+    cumulative = None
+    results = {}
+
+    for metric in metrics:
+        name, k = _parse_cutoff(metric)
+        if name in ('recall', 'precision', 'ndcg') and (k is None or k < 1):
+            raise ValueError(f"Metric {metric} requires a positive cutoff, e.g. {name}@10")
+        if name in ('recall', 'precision', 'map') and cumulative is None:
+            cumulative = np.cumsum(hits, axis=1, dtype=np.int64)
+
+        if name == 'recall':
+            found = cumulative[:, min(k, depth) - 1] if depth else np.zeros(n_queries)
+            scores = np.where(n_relevant > 0, found / safe_relevant, 0.0)
+        elif name == 'precision':
+            found = cumulative[:, min(k, depth) - 1] if depth else np.zeros(n_queries)
+            denom = np.minimum(n_retrieved, k)
+            scores = np.where(denom > 0, found / np.maximum(denom, 1), 0.0)
+        elif name == 'ndcg':
+            k_eff = min(k, depth)
+            if matrix.gains is None:
+                dcg = hits[:, :k_eff] @ _discounts(k_eff)
+                idcg = _ideal_dcg(k)[np.minimum(n_relevant, k)]
+            else:
+                k_ideal = min(k, matrix.ideal_gains.shape[1])
+                dcg = matrix.gains[:, :k_eff] @ _discounts(k_eff)
+                idcg = matrix.ideal_gains[:, :k_ideal] @ _discounts(k_ideal)
+            scores = np.where(idcg > 0, dcg / np.where(idcg > 0, idcg, 1.0), 0.0)
+        elif name == 'mrr':
+            if depth == 0:
+                scores = np.zeros(n_queries)
+            else:
+                scores = np.where(hits.any(axis=1), 1.0 / (hits.argmax(axis=1) + 1), 0.0)
+        elif name == 'map':
+            ranks = np.arange(1, depth + 1)
+            precision_at_hits = np.where(hits, cumulative / ranks, 0.0)
+            scores = np.where(n_relevant > 0, precision_at_hits.sum(axis=1) / safe_relevant, 0.0)
+        else:
+            raise ValueError(f"Unknown retrieval metric: {metric}")
+        results[metric] = scores.astype(float)
+
+    return results
+
+
 def mean_average_precision(retrieved: List[List[str]], relevant: List[List[str]]) -> float:
     """Calculate Mean Average Precision (MAP).
 
@@ -48,83 +286,231 @@ def mean_average_precision(retrieved: List[List[str]], relevant: List[List[str]]
     Returns:
         float: Mean Average Precision score.
     """
-    average_precisions = []
-    for r, rel in zip(retrieved, relevant):
-        ap = 0.0
-        for k in range(1, len(r) + 1):
-            if r[k - 1] in rel:
-                ap += precision_at_k(r, rel, k)
-        average_precisions.append(ap / len(rel) if rel else 0.0)
-    return sum(average_precisions) / len(average_precisions) if average_precisions else 0.0
+    if not retrieved:
+        return 0.0
+    scores = retrieval_scores(encode_hits(retrieved, relevant), ['map'])['map']
+    return float(scores.mean())
+
+
+def sample_retrieval_scores(
+    retrieved: Sequence[Optional[Sequence[str]]],
+    relevant: Sequence[Optional[Sequence[str]]],
+    metrics: Iterable[str],
+) -> Dict[str, np.ndarray]:
+    """Compute retrieval metrics per sample from id columns in one pass.
+
+    Args:
+        retrieved: Ranked retrieved ids per sample, or None without retrieval.
+        relevant: Relevant ids per sample, or None/empty without references.
+        metrics: Metric names accepted by :func:`retrieval_scores`.
+
+    Returns:
+        Dict[str, np.ndarray]: Per-sample scores, NaN where a sample is not scorable.
+    """
+    metrics = list(metrics)
+    scorable = np.array(
+        [ret is not None and bool(rel) for ret, rel in zip(retrieved, relevant)], dtype=bool
+    )
+    partial = retrieval_scores(
+        encode_hits(
+            [ret for ret, ok in zip(retrieved, scorable) if ok],
+            [rel for rel, ok in zip(relevant, scorable) if ok],
+        ),
+        metrics,
+    )
+    results = {}
+    for metric in metrics:
+        scores = np.full(len(scorable), np.nan)
+        scores[scorable] = partial[metric]
+        results[metric] = scores
+    return results
+
+
+def sample_retrieval_code_scores(
+    retrieved_offsets: np.ndarray,
+    retrieved_codes: np.ndarray,
+    relevant_offsets: np.ndarray,
+    relevant_codes: np.ndarray,
+    metrics: Iterable[str],
+    has_retrieval: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """Compute retrieval metrics per sample from integer-coded id lists.
+
+    The columnar counterpart of :func:`sample_retrieval_scores`; see
+    :func:`encode_hit_codes` for the input layout.
+
+    Args:
+        retrieved_offsets: Offsets into ``retrieved_codes``.
+        retrieved_codes: Ranked retrieved document codes.
+        relevant_offsets: Offsets into ``relevant_codes``.
+        relevant_codes: Relevant document codes.
+        metrics: Metric names accepted by :func:`retrieval_scores`.
+        has_retrieval: Boolean mask of samples with a retrieval result; all by default.
+
+    Returns:
+        Dict[str, np.ndarray]: Per-sample scores, NaN where a sample is not scorable.
+    """
+    metrics = list(metrics)
+    matrix = encode_hit_codes(retrieved_offsets, retrieved_codes, relevant_offsets, relevant_codes)
+    scorable = np.diff(relevant_offsets) > 0
+    if has_retrieval is not None:
+        scorable &= np.asarray(has_retrieval, dtype=bool)
+    partial = retrieval_scores(HitMatrix(*(None if part is None else part[scorable] for part in matrix)), metrics)
+    results = {}
+    for metric in metrics:
+        scores = np.full(len(scorable), np.nan)
+        scores[scorable] = partial[metric]
+        results[metric] = scores
+    return results
+
+
+def _take_segments(offsets: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Gather the slices of ``rows`` (-1 for an empty slice) from a flattened layout.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The new offsets and the index of every
+        gathered element in the original flat arrays.
+    """
+    present = rows >= 0
+    safe = np.where(present, rows, 0)
+    lengths = np.where(present, offsets[safe + 1] - offsets[safe], 0)
+    new_offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    index = np.arange(new_offsets[-1]) + np.repeat(offsets[safe] - new_offsets[:-1], lengths)
+    return new_offsets, index
+
+
+def encode_trec(
+    run: TrecRun,
+    qrels: Qrels,
+    depth: Optional[int] = None,
+    relevance_level: int = 1,
+    complete: bool = False,
+) -> Tuple[np.ndarray, HitMatrix]:
+    """Align a run with graded judgments and encode it as a :class:`HitMatrix`.
+
+    Only the two id vocabularies are matched as strings; rankings and
+    judgments stay integer arrays throughout.
+
+    Args:
+        run: Run from :func:`~guage_kit.datasets.trec.load_trec_run`.
+        qrels: Judgments from :func:`~guage_kit.datasets.trec.load_qrels`.
+        depth: Number of ranks to keep; defaults to the longest ranking.
+        relevance_level: Minimum grade of a relevant document.
+        complete: Score every judged query, counting queries missing from the
+            run as empty rankings (``trec_eval -c``). By default only queries
+            present in both are scored.
+
+    Returns:
+        Tuple[np.ndarray, HitMatrix]: The scored query ids (sorted) and their
+        encoded run with graded gains.
+    """
+    judged_queries = pd.Index(qrels.query_ids)
+    query_ids = qrels.query_ids if complete else qrels.query_ids[judged_queries.isin(run.query_ids)]
+    run_offsets, run_index = _take_segments(run.offsets, pd.Index(run.query_ids).get_indexer(query_ids))
+    qrels_offsets, qrels_index = _take_segments(qrels.offsets, judged_queries.get_indexer(query_ids))
+
+    # Judged documents in the run's code space; never-retrieved ones get fresh codes
+    judged = pd.Index(run.doc_ids).get_indexer(qrels.doc_ids)
+    judged = np.where(judged >= 0, judged, len(run.doc_ids) + np.arange(len(qrels.doc_ids)))
+    matrix = encode_hit_codes(
+        run_offsets, run.docs[run_index], qrels_offsets, judged[qrels.docs[qrels_index]],
+        depth=depth, relevant_grades=qrels.grades[qrels_index], relevance_level=relevance_level,
+    )
+    return query_ids, matrix
+
+
+def trec_query_scores(
+    run: Union[TrecRun, PathLike],
+    qrels: Union[Qrels, PathLike],
+    metrics: Iterable[str],
+    depth: Optional[int] = None,
+    relevance_level: int = 1,
+    complete: bool = False,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Score a TREC run against graded qrels per query.
+
+    Args:
+        run: A :class:`~guage_kit.datasets.trec.TrecRun` or the path of a run file.
+        qrels: A :class:`~guage_kit.datasets.trec.Qrels` or the path of a qrels file.
+        metrics: Metric names accepted by :func:`retrieval_scores`; nDCG uses graded gains.
+        depth: Number of ranks to keep; defaults to the longest ranking.
+        relevance_level: Minimum grade counted as relevant by recall, precision, MRR and MAP.
+        complete: Also score judged queries missing from the run (see :func:`encode_trec`).
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: Query ids and one array of
+        per-query scores per metric.
+    """
+    if not isinstance(run, TrecRun):
+        run = load_trec_run(run)
+    if not isinstance(qrels, Qrels):
+        qrels = load_qrels(qrels)
+    query_ids, matrix = encode_trec(run, qrels, depth, relevance_level, complete)
+    return query_ids, retrieval_scores(matrix, metrics)
+
+
+def evaluate_trec(
+    run: Union[TrecRun, PathLike],
+    qrels: Union[Qrels, PathLike],
+    metrics: Iterable[str] = ('ndcg@10', 'map', 'recall@100', 'mrr'),
+    depth: Optional[int] = None,
+    relevance_level: int = 1,
+    complete: bool = False,
+) -> Dict[str, float]:
+    """Mean retrieval metrics of a TREC run over its judged queries.
+
+    Arguments are those of :func:`trec_query_scores`.
+
+    Returns:
+        Dict[str, float]: Mean score per metric and ``num_queries``.
+    """
+    query_ids, scores = trec_query_scores(run, qrels, metrics, depth, relevance_level, complete)
+    results = {metric: float(values.mean()) if len(values) else 0.0 for metric, values in scores.items()}
+    results['num_queries'] = len(query_ids)
+    return results
+
+
+def _retrieval_columns(eval_samples: List[EvalSample]):
+    retrieved = [
+        [chunk.id for chunk in sample.retrieval.chunks] if sample.retrieval else None
+        for sample in eval_samples
+    ]
+    return retrieved, [sample.query.references for sample in eval_samples]
+
+
+def recall_at_k_scores(eval_samples: List[EvalSample], k: int) -> np.ndarray:
+    """Per-sample Recall@k, NaN for samples without retrieval or references."""
+    return sample_retrieval_scores(*_retrieval_columns(eval_samples), [f'recall@{k}'])[f'recall@{k}']
+
+
+def reciprocal_rank_scores(eval_samples: List[EvalSample]) -> np.ndarray:
+    """Per-sample reciprocal rank, NaN for samples without retrieval or references."""
+    return sample_retrieval_scores(*_retrieval_columns(eval_samples), ['mrr'])['mrr']
+
+
+def ndcg_scores(eval_samples: List[EvalSample], k: int) -> np.ndarray:
+    """Per-sample nDCG@k, NaN for samples without retrieval or references."""
+    return sample_retrieval_scores(*_retrieval_columns(eval_samples), [f'ndcg@{k}'])[f'ndcg@{k}']
+
+
+def _nanmean(scores: np.ndarray) -> float:
+    scores = scores[~np.isnan(scores)]
+    return np.mean(scores) if scores.size else 0.0
 
 
 def compute_recall_at_k(eval_samples: List[EvalSample], k: int) -> float:
     """Compute Recall@k across multiple evaluation samples."""
-    if not eval_samples:
-        return 0.0
-    
-    scores = []
-    for sample in eval_samples:
-        if sample.retrieval and sample.query.references:
-            retrieved_ids = [chunk.id for chunk in sample.retrieval.chunks]
-            relevant_ids = sample.query.references
-            score = recall_at_k(retrieved_ids, relevant_ids, k)
-            scores.append(score)
-    
-    return np.mean(scores) if scores else 0.0
+    return _nanmean(recall_at_k_scores(eval_samples, k))
 
 
 def compute_mrr(eval_samples: List[EvalSample]) -> float:
     """Compute Mean Reciprocal Rank across multiple evaluation samples."""
-    if not eval_samples:
-        return 0.0
-    
-    reciprocal_ranks = []
-    for sample in eval_samples:
-        if sample.retrieval and sample.query.references:
-            retrieved_ids = [chunk.id for chunk in sample.retrieval.chunks]
-            relevant_ids = set(sample.query.references)
-            
-            # Find the rank of the first relevant item
-            for i, doc_id in enumerate(retrieved_ids, 1):
-                if doc_id in relevant_ids:
-                    reciprocal_ranks.append(1.0 / i)
-                    break
-            else:
-                reciprocal_ranks.append(0.0)
-    
-    return np.mean(reciprocal_ranks) if reciprocal_ranks else 0.0
+    return _nanmean(reciprocal_rank_scores(eval_samples))
 
 
 def compute_ndcg(eval_samples: List[EvalSample], k: int) -> float:
     """Compute Normalized Discounted Cumulative Gain@k."""
-    if not eval_samples:
-        return 0.0
-    
-    ndcg_scores = []
-    for sample in eval_samples:
-        if sample.retrieval and sample.query.references:
-            retrieved_ids = [chunk.id for chunk in sample.retrieval.chunks[:k]]
-            relevant_ids = set(sample.query.references)
-            
-            # Simple binary relevance (1 if relevant, 0 if not)
-            relevance_scores = [1.0 if doc_id in relevant_ids else 0.0 for doc_id in retrieved_ids]
-            
-            # DCG calculation
-            dcg = 0.0
-            for i, rel in enumerate(relevance_scores):
-                dcg += rel / np.log2(i + 2)  # i+2 because log2(1) is 0
-            
-            # IDCG calculation (perfect ranking)
-            ideal_relevance = sorted(relevance_scores, reverse=True)
-            idcg = 0.0
-            for i, rel in enumerate(ideal_relevance):
-                idcg += rel / np.log2(i + 2)
-            
-            ndcg = dcg / idcg if idcg > 0 else 0.0
-            ndcg_scores.append(ndcg)
-    
-    return np.mean(ndcg_scores) if ndcg_scores else 0.0
+    return _nanmean(ndcg_scores(eval_samples, k))
 
 
 # Additional metrics can be added here as needed.
\ No newline at end of file
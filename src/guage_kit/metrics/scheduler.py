@@ -0,0 +1,313 @@
+"""Chunk scheduler that scores samples serially or across worker processes.
+
+Rows are split into fixed-size chunks. Each chunk is converted to
+:class:`EvalSample` objects and scored by a :class:`MetricPlan` into fresh
+accumulators, either in the calling process or in a worker pool. The partial aggregates are merged in
+input order, so a parallel run produces the same scores as a serial one.
+Arrow record batches from the columnar reader are scheduled the same way but
+go straight to the plan's column scorers. Indexed JSONL files are split into
+byte ranges that each worker reads and parses itself, so rows are never
+decoded in the parent and pickled across. With a
+:class:`~guage_kit.reporting.run_store.RunStore` the per-sample values of
+every chunk are also written to disk as they are merged, and a partially
+stored run resumes after its last stored row.
+"""
+
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import time
+import numpy as np
+from ..datasets.columnar import batch_columns
+from ..datasets.indexed import IndexedJsonl, iter_byte_range
+from ..datasets.loaders import row_to_sample
+from ..reporting.run_store import RunStore
+from ..schemas.core import EvalSample
+from ..utils.cache import DiskCache
+from ..utils.parallel import chunked, parallel_imap
+from .accumulators import MetricAccumulator
+from .planner import USAGE_COLUMNS, MetricPlan
+
+
+def score_chunk(
+    plan: MetricPlan, start: int, rows: List[Any], cache: Optional[DiskCache] = None
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Score one chunk of rows into fresh accumulators.
+
+    Args:
+        plan: The metric plan to apply.
+        start: Index of the first row, which keeps default query ids stable.
+        rows: Raw row dicts or EvalSample objects.
+        cache: Optional per-sample score cache.
+
+    Returns:
+        The number of samples in the chunk and one accumulator per metric.
+    """
+    samples = [
+        item if isinstance(item, EvalSample) else row_to_sample(item, start + i)
+        for i, item in enumerate(rows)
+    ]
+    accumulators = plan.new_accumulators()
+    plan.update(accumulators, samples, cache=cache, first_row=start)
+    return len(samples), accumulators
+
+
+def score_batch(
+    plan: MetricPlan, batch: Any, start: int = 0, cache: Optional[DiskCache] = None
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Score one Arrow record batch of planner columns into fresh accumulators.
+
+    Args:
+        plan: The metric plan to apply.
+        batch: A ``pyarrow.RecordBatch`` from :func:`~guage_kit.datasets.columnar.iter_column_batches`.
+        start: Row number of the first row in the batch.
+        cache: Optional per-sample score cache.
+
+    Returns:
+        The number of samples in the batch and one accumulator per metric.
+    """
+    accumulators = plan.new_accumulators()
+    plan.update_columns(accumulators, batch_columns(batch), batch.num_rows, cache=cache, first_row=start)
+    return batch.num_rows, accumulators
+
+
+def score_byte_range(
+    plan: MetricPlan,
+    file_path: str,
+    first_row: int,
+    byte_start: int,
+    byte_end: int,
+    cache: Optional[DiskCache] = None,
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Read, parse and score the JSONL rows stored in one byte range of a file."""
+    return score_chunk(plan, first_row, list(iter_byte_range(file_path, byte_start, byte_end)), cache=cache)
+
+
+def score_values(
+    plan: MetricPlan, start: int, columns: Mapping[str, Any], cache: Optional[DiskCache] = None
+) -> Tuple[int, Dict[str, np.ndarray], float]:
+    """Score one chunk of planner columns and keep the per-sample values.
+
+    Args:
+        plan: The metric plan to apply.
+        start: Row number of the first row in the chunk.
+        columns: Planner columns of the chunk, including ``query_id``.
+        cache: Optional per-sample score cache.
+
+    Returns:
+        The number of samples, the values per metric and the seconds spent scoring.
+    """
+    started = time.perf_counter()
+    num_samples = len(columns['query_id'])
+    values = plan.score_columns(columns, num_samples, cache=cache)
+    return num_samples, values, time.perf_counter() - started
+
+
+# Each worker receives the plan once through the pool initializer, so fitted
+# models held by families are not pickled again with every chunk.
+_worker_plan: Optional[MetricPlan] = None
+_worker_cache: Optional[DiskCache] = None
+
+
+def _init_worker(plan: MetricPlan, cache: Optional[DiskCache]) -> None:
+    global _worker_plan, _worker_cache
+    _worker_plan, _worker_cache = plan, cache
+
+
+def _score_in_worker(task: Tuple[Callable, tuple]) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    scorer, args = task
+    return scorer(_worker_plan, *args, cache=_worker_cache)
+
+
+def _run_tasks(
+    tasks: Iterable[Tuple[Callable, tuple]],
+    plan: MetricPlan,
+    parallelism: int,
+    cache: Optional[DiskCache],
+) -> Iterator[Any]:
+    """Run scoring tasks in-process or in a worker pool, yielding results in task order."""
+    if parallelism < 1:
+        raise ValueError("parallelism must be a positive integer")
+    if parallelism == 1:
+        return (scorer(plan, *args, cache=cache) for scorer, args in tasks)
+    return parallel_imap(
+        _score_in_worker, tasks, num_workers=parallelism,
+        initializer=_init_worker, initargs=(plan, cache),
+    )
+
+
+def _merge_scored(
+    tasks: Iterator[Tuple[Callable, tuple]],
+    plan: MetricPlan,
+    parallelism: int,
+    cache: Optional[DiskCache],
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    results = _run_tasks(tasks, plan, parallelism, cache)
+    merged = plan.new_accumulators()
+    num_samples = 0
+    for count, partial in results:
+        num_samples += count
+        for metric, accumulator in partial.items():
+            merged[metric].merge(accumulator)
+    return num_samples, merged
+
+
+def score_chunks(
+    rows: Iterable[Any],
+    plan: MetricPlan,
+    chunk_size: int = 1000,
+    parallelism: int = 1,
+    cache: Optional[DiskCache] = None,
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Stream rows through :func:`score_chunk` and merge the partial aggregates.
+
+    Args:
+        rows: Raw row dicts or EvalSample objects, consumed lazily.
+        plan: Metric plan, fitted if any of its families need it.
+        chunk_size: Number of rows per chunk.
+        parallelism: Number of worker processes; ``1`` scores in-process.
+        cache: Optional per-sample score cache shared by all workers.
+
+    Returns:
+        Total number of samples and one merged accumulator per metric.
+
+    Raises:
+        ValueError: If ``parallelism`` is not positive.
+    """
+    def tasks():
+        start = 0
+        for chunk in chunked(rows, chunk_size):
+            yield score_chunk, (start, chunk)
+            start += len(chunk)
+
+    return _merge_scored(tasks(), plan, parallelism, cache)
+
+
+def score_column_batches(
+    batches: Iterable[Any],
+    plan: MetricPlan,
+    parallelism: int = 1,
+    cache: Optional[DiskCache] = None,
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Stream Arrow record batches through :func:`score_batch` and merge the partial aggregates.
+
+    Args:
+        batches: Record batches of planner columns, consumed lazily.
+        plan: Metric plan, fitted if any of its families need it.
+        parallelism: Number of worker processes; ``1`` scores in-process.
+        cache: Optional per-sample score cache shared by all workers.
+
+    Returns:
+        Total number of samples and one merged accumulator per metric.
+
+    Raises:
+        ValueError: If ``parallelism`` is not positive.
+    """
+    def tasks():
+        start = 0
+        for batch in batches:
+            yield score_batch, (batch, start)
+            start += batch.num_rows
+
+    return _merge_scored(tasks(), plan, parallelism, cache)
+
+
+def score_jsonl(
+    file_path: str,
+    plan: MetricPlan,
+    chunk_size: int = 1000,
+    parallelism: int = 1,
+    cache: Optional[DiskCache] = None,
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Score a JSONL file by handing each worker a byte range to parse.
+
+    The file's line index (see :class:`~guage_kit.datasets.indexed.IndexedJsonl`)
+    is built or loaded once, then every chunk is described by its byte span.
+
+    Args:
+        file_path: Path to the JSONL file.
+        plan: Metric plan, fitted if any of its families need it.
+        chunk_size: Number of rows per chunk.
+        parallelism: Number of worker processes; ``1`` scores in-process.
+        cache: Optional per-sample score cache shared by all workers.
+
+    Returns:
+        Total number of samples and one merged accumulator per metric.
+
+    Raises:
+        ValueError: If ``parallelism`` is not positive.
+    """
+    shards = IndexedJsonl(file_path).shards(chunk_size)
+    tasks = ((score_byte_range, (str(file_path), *shard)) for shard in shards)
+    return _merge_scored(tasks, plan, parallelism, cache)
+
+
+def query_ids(column: Any, start: int) -> List[str]:
+    """Return a chunk's query ids as strings; samples without an id are named by their row number.
+
+    Args:
+        column: The chunk's ``query_id`` column (list or Arrow array).
+        start: Row number of the chunk's first sample.
+    """
+    ids = column.to_pylist() if hasattr(column, 'to_pylist') else list(column)
+    return [str(i) if i not in (None, '') else str(start + j) for j, i in enumerate(ids)]
+
+
+def score_to_store(
+    chunks: Iterable[Mapping[str, Any]],
+    plan: MetricPlan,
+    store: RunStore,
+    parallelism: int = 1,
+    cache: Optional[DiskCache] = None,
+) -> Tuple[int, Dict[str, MetricAccumulator]]:
+    """Score column chunks, writing every chunk's per-sample values to ``store``.
+
+    Rows the store already holds are not scored again: their stored values are
+    folded into the accumulators and the matching leading chunks are skipped,
+    so an interrupted run resumes where it stopped and ends with the same
+    results as an uninterrupted one. A complete store is not rescored at all.
+
+    Args:
+        chunks: Planner column chunks including ``query_id`` and the usage
+            columns, in the same chunking as the stored parts.
+        plan: Metric plan, fitted if any of its families need it.
+        store: A run store on which :meth:`~RunStore.begin` was called.
+        parallelism: Number of worker processes; ``1`` scores in-process.
+        cache: Optional per-sample score cache shared by all workers.
+
+    Returns:
+        Total number of samples and one merged accumulator per metric.
+
+    Raises:
+        ValueError: If ``parallelism`` is not positive or the chunks do not
+            line up with the stored parts.
+    """
+    merged = plan.new_accumulators()
+    for first_row, count, values in store.iter_parts(plan.metrics):
+        plan.fold(merged, values, count, first_row)
+    stored = store.num_rows
+    if store.complete:
+        return stored, merged
+
+    pending: deque = deque()
+
+    def tasks():
+        start = 0
+        for columns in chunks:
+            count = len(columns['query_id'])
+            if start + count <= stored:
+                start += count
+                continue
+            if start < stored:
+                raise ValueError(f"Chunk at row {start} straddles the {stored} stored rows; resume with the same chunk size")
+            pending.append((start, columns))
+            yield score_values, (start, columns)
+            start += count
+
+    num_samples = stored
+    for count, values, seconds in _run_tasks(tasks(), plan, parallelism, cache):
+        start, columns = pending.popleft()
+        usage = {name: columns[name] for name in USAGE_COLUMNS if name in columns}
+        store.append(start, query_ids(columns['query_id'], start), values, usage=usage, seconds=seconds)
+        plan.fold(merged, values, count, start)
+        num_samples += count
+    return num_samples, merged
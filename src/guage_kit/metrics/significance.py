@@ -0,0 +1,147 @@
+"""Paired significance tests between two evaluation runs.
+
+Both runs are scored on the same samples. Every metric is reduced to
+per-sample sufficient statistics (see
+:meth:`~guage_kit.metrics.accumulators.MetricAccumulator.sample_statistics`),
+so means and corpus metrics such as BLEU are handled alike. The aligned samples are
+split into balanced random groups and summed per group
+(:meth:`~guage_kit.metrics.accumulators.MetricAccumulator.group_statistics`). One matrix of
+Poisson bootstrap weights and one matrix of random swaps, shared by all
+metrics, then turn the group sums into resampled metric values with a matrix
+product per metric. The cost depends on the number of groups and resamples,
+not on the number of samples. With fewer samples than groups every sample
+is its own group and the tests are the textbook paired bootstrap and
+approximate randomization tests.
+"""
+
+from typing import Any, Dict, Mapping, Sequence
+import numpy as np
+from .accumulators import MetricAccumulator, poisson_weights
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_TEST_GROUPS = 1000
+CORRECTIONS = ('holm', 'bonferroni', 'fdr_bh', 'none')
+
+
+def adjust_pvalues(pvalues: Sequence[float], method: str = 'holm') -> np.ndarray:
+    """Correct p-values for multiple comparisons.
+
+    Args:
+        pvalues: Raw p-values, one per hypothesis.
+        method: ``'holm'`` (step-down, controls the family-wise error rate),
+            ``'bonferroni'``, ``'fdr_bh'`` (Benjamini-Hochberg false discovery
+            rate) or ``'none'``.
+
+    Returns:
+        np.ndarray: Adjusted p-values in input order, capped at 1.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    p = np.asarray(pvalues, dtype=float)
+    m = len(p)
+    if method not in CORRECTIONS:
+        raise ValueError(f"Unknown correction: {method}. Use one of {', '.join(CORRECTIONS)}")
+    if method == 'none' or m == 0:
+        return p.copy()
+    if method == 'bonferroni':
+        return np.minimum(p * m, 1.0)
+
+    order = np.argsort(p, kind='stable')
+    adjusted = np.empty(m)
+    if method == 'holm':
+        adjusted[order] = np.maximum.accumulate(p[order] * (m - np.arange(m)))
+    else:
+        scaled = p[order] * m / np.arange(1, m + 1)
+        adjusted[order] = np.minimum.accumulate(scaled[::-1])[::-1]
+    return np.minimum(adjusted, 1.0)
+
+
+def paired_tests(
+    scores_a: Mapping[str, np.ndarray],
+    scores_b: Mapping[str, np.ndarray],
+    accumulators: Mapping[str, MetricAccumulator],
+    n_resamples: int = DEFAULT_RESAMPLES,
+    alpha: float = 0.05,
+    correction: str = 'holm',
+    n_groups: int = DEFAULT_TEST_GROUPS,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Any]]:
+    """Test every metric for a difference between two aligned runs.
+
+    Args:
+        scores_a: Per-sample values of run A per metric, as returned by
+            :meth:`~guage_kit.metrics.planner.MetricPlan.score_columns`.
+        scores_b: Per-sample values of run B on the same samples, in the same order.
+        accumulators: An accumulator per metric, which defines its sufficient
+            statistics and how the metric is computed from their sums.
+        n_resamples: Bootstrap resamples and random swaps.
+        alpha: Significance level applied to the corrected p-values.
+        correction: Multiple-comparison correction (see :func:`adjust_pvalues`),
+            applied to the approximate randomization p-values.
+        n_groups: Number of sample groups that are resampled together.
+        seed: Seed for grouping, bootstrap weights and swaps.
+
+    Returns:
+        Per metric: ``a`` and ``b`` (metric on each run), ``delta`` (``b - a``),
+        ``ci_lower``/``ci_upper`` (percentile bootstrap interval of the delta
+        at level ``1 - alpha``), ``p_bootstrap``, ``p_randomization``,
+        ``p_adjusted`` and ``significant``.
+
+    Raises:
+        ValueError: If a metric has no per-sample sufficient statistics.
+    """
+    n = len(next(iter(scores_a.values()))) if scores_a else 0
+    n_groups = max(min(n_groups, n), 1)
+    rng = np.random.default_rng(seed)
+    groups = np.empty(n, dtype=np.int64)
+    groups[rng.permutation(n)] = np.arange(n) % n_groups
+    weights = poisson_weights(n_resamples, n_groups, seed)
+    swaps = rng.integers(0, 2, size=(n_resamples, n_groups), dtype=np.uint8).astype(float)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for metric, accumulator in accumulators.items():
+        a = np.asarray(scores_a[metric], dtype=float)
+        b = np.asarray(scores_b[metric], dtype=float)
+        if a.ndim == 1:
+            # Compare means over the samples both runs can score
+            missing = np.isnan(a) | np.isnan(b)
+            a, b = np.where(missing, np.nan, a), np.where(missing, np.nan, b)
+        sums_a = accumulator.group_statistics(a, groups, n_groups)
+        sums_b = accumulator.group_statistics(b, groups, n_groups)
+        if sums_a is None:
+            raise ValueError(f"Metric {metric} has no per-sample statistics and cannot be tested pairwise")
+        total_a, total_b = sums_a.sum(axis=0), sums_b.sum(axis=0)
+        value_a, value_b = accumulator.result_from_statistics(np.stack([total_a, total_b]))
+        delta = value_b - value_a
+
+        # Paired bootstrap: both runs are resampled with the same weights
+        boot = accumulator.result_from_statistics(weights @ sums_b) - accumulator.result_from_statistics(weights @ sums_a)
+        boot = boot[~np.isnan(boot)]
+        # Approximate randomization: swap the runs' outputs in random groups
+        moved = swaps @ (sums_b - sums_a)
+        shuffled = accumulator.result_from_statistics(total_b - moved) - accumulator.result_from_statistics(total_a + moved)
+
+        if np.isnan(delta) or not boot.size:
+            ci_lower = ci_upper = p_boot = p_rand = np.nan
+        else:
+            ci_lower, ci_upper = np.percentile(boot, [alpha / 2 * 100, (1 - alpha / 2) * 100])
+            # Under the null the centred bootstrap distribution covers the observed delta
+            tol = 1e-12 * max(abs(delta), 1.0)
+            p_boot = (np.count_nonzero(np.abs(boot - boot.mean()) >= abs(delta) - tol) + 1) / (boot.size + 1)
+            p_rand = (np.count_nonzero(np.abs(shuffled) >= abs(delta) - tol) + 1) / (n_resamples + 1)
+        results[metric] = {
+            'a': float(value_a), 'b': float(value_b), 'delta': float(delta),
+            'ci_lower': float(ci_lower), 'ci_upper': float(ci_upper),
+            'p_bootstrap': float(p_boot), 'p_randomization': float(p_rand),
+        }
+
+    tested = [metric for metric in results if not np.isnan(results[metric]['p_randomization'])]
+    adjusted = adjust_pvalues([results[metric]['p_randomization'] for metric in tested], correction)
+    for metric in results:
+        results[metric]['p_adjusted'] = float('nan')
+        results[metric]['significant'] = False
+    for metric, p in zip(tested, adjusted):
+        results[metric]['p_adjusted'] = float(p)
+        results[metric]['significant'] = bool(p < alpha)
+    return results
@@ -0,0 +1,362 @@
+"""Nearest-neighbour search for evaluating embedding models as retrievers.
+
+:func:`exact_top_k` scores query blocks against corpus blocks with one BLAS
+matrix product each and keeps a running top-k per query; after the first
+block only scores above the current k-th best are looked at, so the cost is
+dominated by the matrix products. :class:`IVFIndex` is an inverted-file
+approximate index (k-means coarse quantiser) that only scores the documents
+in the ``n_probe`` closest lists of each query. :func:`evaluate_vector_retrieval`
+runs either search and scores the rankings against relevance labels with
+the vectorized metrics in :mod:`guage_kit.metrics.retrieval_ir`.
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+import numpy as np
+from .retrieval_ir import _parse_cutoff, sample_retrieval_code_scores
+
+DEFAULT_QUERY_BLOCK = 1024
+DEFAULT_CORPUS_BLOCK = 32_768
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _as_float32(vectors: np.ndarray, normalize: bool) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return _normalize_rows(vectors) if normalize else vectors
+
+
+def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the ``k`` best columns of every row (unsorted)."""
+    if scores.shape[1] <= k:
+        return scores, ids
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, part, axis=1), np.take_along_axis(ids, part, axis=1)
+
+
+def _merge_top_k(
+    best_scores: np.ndarray, best_ids: np.ndarray, scores: np.ndarray, block_ids: np.ndarray, rows: np.ndarray
+) -> None:
+    """Fold a block of scores into the running top-k of ``rows`` in place.
+
+    Args:
+        best_scores: Running ``(n_queries, k)`` scores, ``-inf`` where empty.
+        best_ids: Running ``(n_queries, k)`` document ids.
+        scores: ``(len(rows), n_block)`` scores of the block.
+        block_ids: Document id of every block column.
+        rows: Query row of every block row.
+    """
+    k = best_scores.shape[1]
+    # Only entries beating the current k-th best can enter the top-k
+    threshold = best_scores[rows].min(axis=1)
+    mask = scores > threshold[:, None]
+    counts = np.count_nonzero(mask, axis=1)
+    touched = np.flatnonzero(counts)
+    if not len(touched):
+        return
+    width = int(counts.max())
+    if width >= scores.shape[1] // 2:
+        # Dense block (typically the first one): partition it as a whole
+        block = scores[touched] if len(touched) < len(rows) else scores
+        if block.shape[1] > k:
+            part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            part_scores, part_ids = np.take_along_axis(block, part, axis=1), block_ids[part]
+        else:
+            part_scores, part_ids = block, np.broadcast_to(block_ids, block.shape)
+    else:
+        # Sparse candidates: pack them into a padded (touched, width) matrix;
+        # flatnonzero on the flat mask is much faster than a 2-D nonzero
+        cand_rows, cand_cols = np.divmod(np.flatnonzero(mask), scores.shape[1])
+        slot = np.zeros(len(rows), dtype=np.int64)
+        slot[touched] = np.arange(len(touched))
+        starts = np.cumsum(counts) - counts
+        position = np.arange(len(cand_rows)) - starts[cand_rows]
+        part_scores = np.full((len(touched), width), -np.inf, dtype=best_scores.dtype)
+        part_ids = np.full((len(touched), width), -1, dtype=best_ids.dtype)
+        part_scores[slot[cand_rows], position] = scores[cand_rows, cand_cols]
+        part_ids[slot[cand_rows], position] = block_ids[cand_cols]
+    target = rows[touched]
+    merged_scores, merged_ids = _top_k(
+        np.concatenate([best_scores[target], part_scores], axis=1),
+        np.concatenate([best_ids[target], part_ids], axis=1),
+        k,
+    )
+    best_scores[target] = merged_scores
+    best_ids[target] = merged_ids
+
+
+def _sort_results(scores: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Highest score first; ties go to the lower document id
+    order = np.lexsort((ids, -scores), axis=1) if scores.size else np.zeros(scores.shape, dtype=np.int64)
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def exact_top_k(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    normalize: bool = True,
+    query_block: int = DEFAULT_QUERY_BLOCK,
+    corpus_block: int = DEFAULT_CORPUS_BLOCK,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact top-k inner-product search, blocked over queries and corpus.
+
+    Memory is bounded by one ``query_block x corpus_block`` float32 score
+    matrix, so ``corpus`` can be a ``np.memmap`` larger than RAM.
+
+    Args:
+        queries: ``(n_queries, dim)`` query embeddings.
+        corpus: ``(n_docs, dim)`` document embeddings.
+        k: Number of neighbours per query (at most ``n_docs``).
+        normalize: L2-normalise both sides, i.e. rank by cosine similarity.
+        query_block: Queries per matrix product.
+        corpus_block: Documents per matrix product.
+
+    Returns:
+        Tuple of ``(scores, ids)``, each ``(n_queries, k)``, best first; ids
+        are row numbers of ``corpus``.
+    """
+    n_queries, n_docs = len(queries), len(corpus)
+    k = min(k, n_docs)
+    scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    ids = np.full((n_queries, k), -1, dtype=np.int64)
+    # The corpus is read once per query block, so make query blocks as large as allowed
+    for q_start in range(0, n_queries, query_block):
+        rows = np.arange(q_start, min(q_start + query_block, n_queries))
+        block_queries = _as_float32(queries[q_start:rows[-1] + 1], normalize)
+        for d_start in range(0, n_docs, corpus_block):
+            docs = _as_float32(corpus[d_start:d_start + corpus_block], normalize)
+            block_ids = np.arange(d_start, d_start + len(docs))
+            _merge_top_k(scores, ids, block_queries @ docs.T, block_ids, rows)
+    return _sort_results(scores, ids)
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index.
+
+    Documents are clustered into ``n_lists`` lists with k-means on a sample;
+    a query is scored only against the documents of its ``n_probe`` closest
+    lists. Vectors are stored contiguously per list, so every probe is one
+    small matrix product. ``n_probe = n_lists`` gives exact results.
+
+    Args:
+        n_lists: Number of lists; defaults to ``4 * sqrt(n_docs)``.
+        n_probe: Lists scanned per query.
+        normalize: L2-normalise documents and queries (cosine similarity).
+        train_size: Documents sampled to train the quantiser; defaults to
+            ``64 * n_lists``.
+        n_iter: k-means iterations.
+        seed: Seed for sampling and initialisation.
+    """
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        normalize: bool = True,
+        train_size: Optional[int] = None,
+        n_iter: int = 10,
+        seed: int = 0,
+    ):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.normalize = normalize
+        self.train_size = train_size
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.vectors: Optional[np.ndarray] = None
+        self.doc_ids: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return 0 if self.doc_ids is None else len(self.doc_ids)
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Return the closest centroid (L2) of every row, blocked over rows."""
+        half_norms = 0.5 * np.einsum('ij,ij->i', centroids, centroids)
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), DEFAULT_CORPUS_BLOCK):
+            block = _as_float32(vectors[start:start + DEFAULT_CORPUS_BLOCK], self.normalize)
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T - half_norms, axis=1)
+        return assignments
+
+    def _train(self, sample: np.ndarray, n_lists: int, rng: np.random.Generator) -> np.ndarray:
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assignments = self._assign(sample, centroids)
+            order = np.argsort(assignments, kind='stable')
+            counts = np.bincount(assignments, minlength=n_lists)
+            present = np.flatnonzero(counts)
+            sums = np.add.reduceat(sample[order], (np.cumsum(counts) - counts)[present], axis=0)
+            centroids[present] = sums / counts[present, None]
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                # Restart empty lists from random sample points
+                centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        return centroids
+
+    def build(self, corpus: np.ndarray) -> "IVFIndex":
+        """Train the quantiser on a sample of ``corpus`` and fill the lists.
+
+        Args:
+            corpus: ``(n_docs, dim)`` document embeddings (may be a ``np.memmap``).
+
+        Returns:
+            IVFIndex: ``self``.
+        """
+        n_docs = len(corpus)
+        n_lists = min(self.n_lists or max(int(4 * np.sqrt(n_docs)), 1), n_docs)
+        train_size = min(self.train_size or 64 * n_lists, n_docs)
+        rng = np.random.default_rng(self.seed)
+        sample_rows = np.sort(rng.choice(n_docs, train_size, replace=False))
+        self.centroids = self._train(_as_float32(corpus[sample_rows], self.normalize), n_lists, rng)
+
+        assignments = self._assign(corpus, self.centroids)
+        self.doc_ids = np.argsort(assignments, kind='stable')
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+        self.vectors = np.empty((n_docs, corpus.shape[1]), dtype=np.float32)
+        for start in range(0, n_docs, DEFAULT_CORPUS_BLOCK):
+            rows = self.doc_ids[start:start + DEFAULT_CORPUS_BLOCK]
+            self.vectors[start:start + len(rows)] = _as_float32(corpus[np.sort(rows)], self.normalize)[
+                np.argsort(np.argsort(rows))
+            ]
+        return self
+
+    def search(self, queries: np.ndarray, k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k inner-product search.
+
+        Args:
+            queries: ``(n_queries, dim)`` query embeddings.
+            k: Number of neighbours per query.
+            n_probe: Lists scanned per query; defaults to the index setting.
+
+        Returns:
+            Tuple of ``(scores, ids)`` as in :func:`exact_top_k`; ids are corpus
+            row numbers, ``-1`` (score ``-inf``) where fewer than ``k``
+            documents were scanned.
+        """
+        if self.centroids is None:
+            raise ValueError("The index is empty; call build() first")
+        n_lists = len(self.centroids)
+        n_probe = min(n_probe or self.n_probe, n_lists)
+        queries = _as_float32(queries, self.normalize)
+        k = min(k, len(self))
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        # Same criterion as the assignment: closest centroids in L2
+        half_norms = 0.5 * np.einsum('ij,ij->i', self.centroids, self.centroids)
+        probes = _top_k(
+            queries @ self.centroids.T - half_norms, np.broadcast_to(np.arange(n_lists), (len(queries), n_lists)), n_probe
+        )[1]
+        # Group queries by list so each list is scored against all its queries at once
+        flat = probes.ravel()
+        order = np.argsort(flat, kind='stable')
+        query_rows = order // n_probe
+        query_offsets = np.concatenate([[0], np.cumsum(np.bincount(flat, minlength=n_lists))])
+        for lst in np.flatnonzero(np.diff(query_offsets)):
+            start, end = self.offsets[lst], self.offsets[lst + 1]
+            if start == end:
+                continue
+            rows = query_rows[query_offsets[lst]:query_offsets[lst + 1]]
+            for d_start in range(start, end, DEFAULT_CORPUS_BLOCK):
+                d_end = min(d_start + DEFAULT_CORPUS_BLOCK, end)
+                block_scores = queries[rows] @ self.vectors[d_start:d_end].T
+                _merge_top_k(scores, ids, block_scores, self.doc_ids[d_start:d_end], rows)
+        return _sort_results(scores, ids)
+
+
+def _relevance_codes(
+    relevant: Sequence[Sequence[Union[int, str]]], doc_ids: Optional[Sequence[str]], n_docs: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Map relevance labels to corpus rows; unknown ids get distinct codes past the corpus."""
+    lengths = np.fromiter((len(rel) for rel in relevant), dtype=np.int64, count=len(relevant))
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    if doc_ids is None:
+        codes = np.fromiter((int(d) for rel in relevant for d in rel), dtype=np.int64, count=int(offsets[-1]))
+        return offsets, codes
+    rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+    unknown: Dict[Union[int, str], int] = {}
+    codes = np.fromiter(
+        (rows[d] if d in rows else unknown.setdefault(d, n_docs + len(unknown)) for rel in relevant for d in rel),
+        dtype=np.int64,
+        count=int(offsets[-1]),
+    )
+    return offsets, codes
+
+
+def evaluate_vector_retrieval(
+    query_embeddings: np.ndarray,
+    corpus_embeddings: np.ndarray,
+    relevant: Sequence[Sequence[Union[int, str]]],
+    metrics: Iterable[str] = ('recall@10', 'ndcg@10', 'mrr'),
+    doc_ids: Optional[Sequence[str]] = None,
+    index: Optional[IVFIndex] = None,
+    k: Optional[int] = None,
+    normalize: bool = True,
+    query_block: int = DEFAULT_QUERY_BLOCK,
+    corpus_block: int = DEFAULT_CORPUS_BLOCK,
+    return_per_query: bool = False,
+) -> Dict[str, Union[float, np.ndarray]]:
+    """Evaluate an embedding model as a retriever over a corpus.
+
+    Every query is searched against the corpus (exactly, or through ``index``)
+    and the ranking is scored against its relevant documents with
+    :func:`guage_kit.metrics.retrieval_ir.retrieval_scores`.
+
+    Args:
+        query_embeddings: ``(n_queries, dim)`` query embeddings.
+        corpus_embeddings: ``(n_docs, dim)`` document embeddings; may be a ``np.memmap``.
+        relevant: Relevant documents per query, as corpus row numbers or, with
+            ``doc_ids``, as document ids.
+        metrics: Metric names accepted by ``retrieval_scores`` (``recall@k``,
+            ``precision@k``, ``ndcg@k``, ``mrr``, ``map``).
+        doc_ids: Id of every corpus row; relevant ids missing from it count as
+            relevant but can never be retrieved.
+        index: A built :class:`IVFIndex` over ``corpus_embeddings`` for
+            approximate search; exact search when None.
+        k: Search depth; defaults to the largest metric cutoff, or 100 when no
+            metric has one.
+        normalize: Rank by cosine similarity instead of raw inner product
+            (exact search only; an index uses its own setting).
+        query_block: Queries per matrix product in exact search.
+        corpus_block: Documents per matrix product in exact search.
+        return_per_query: Also return the per-query scores under ``'per_query'``.
+
+    Returns:
+        Dict[str, Union[float, np.ndarray]]: Mean of every metric over queries
+        with at least one relevant document, plus ``'per_query'`` when asked.
+    """
+    metrics = list(metrics)
+    if k is None:
+        cutoffs = [cutoff for cutoff in (_parse_cutoff(metric)[1] for metric in metrics) if cutoff]
+        k = max(cutoffs) if cutoffs else 100
+    if len(query_embeddings) != len(relevant):
+        raise ValueError("query_embeddings and relevant must have the same length")
+
+    if index is None:
+        _, retrieved = exact_top_k(
+            query_embeddings, corpus_embeddings, k, normalize=normalize,
+            query_block=query_block, corpus_block=corpus_block,
+        )
+    else:
+        _, retrieved = index.search(query_embeddings, k)
+
+    # Drop the -1 padding of queries that saw fewer than k documents
+    found = retrieved >= 0
+    retrieved_offsets = np.concatenate([[0], np.cumsum(found.sum(axis=1))])
+    relevant_offsets, relevant_codes = _relevance_codes(relevant, doc_ids, len(corpus_embeddings))
+    per_query = sample_retrieval_code_scores(
+        retrieved_offsets, retrieved[found], relevant_offsets, relevant_codes, metrics
+    )
+
+    results: Dict[str, Union[float, np.ndarray]] = {}
+    for metric, scores in per_query.items():
+        scores = scores[~np.isnan(scores)]
+        results[metric] = float(scores.mean()) if scores.size else 0.0
+    if return_per_query:
+        results['per_query'] = per_query
+    return results
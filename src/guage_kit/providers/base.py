@@ -0,0 +1,307 @@
+"""Shared asyncio interface for model providers.
+
+Every provider implements :meth:`AsyncProvider._send`, which performs one
+request for one or more prompts. The base class wraps it with the limits a
+generation or judge stage needs to keep many requests in flight safely:
+
+- a semaphore bounding the number of concurrent requests,
+- token buckets for requests per minute (RPM) and tokens per minute (TPM),
+- retries with jittered exponential backoff on throttling and server errors,
+- request batching for endpoints that accept several prompts per call,
+- an optional persistent response cache, with identical prompts in flight
+  coalesced into a single request.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+import asyncio
+import hashlib
+import json
+import pathlib
+import random
+import time
+from ..utils.cache import DEFAULT_CACHE_DIR, DiskCache
+
+
+class ProviderError(Exception):
+    """A failed provider request.
+
+    Args:
+        message: Description of the failure.
+        status: HTTP status code or provider error code, if any.
+        retryable: Whether the request may succeed if sent again.
+        retry_after: Seconds the provider asked us to wait, if given.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[Any] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class ProviderResponse(NamedTuple):
+    """One generated completion.
+
+    Attributes:
+        text: The generated text.
+        model: Model that produced it.
+        prompt_tokens: Input tokens billed, as reported by the provider.
+        completion_tokens: Output tokens billed, as reported by the provider.
+        latency: Wall time of the request in seconds, including retries.
+        cached: True when served from the response cache without a request.
+    """
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    cached: bool = False
+
+
+class RetryPolicy(NamedTuple):
+    """Retry schedule using exponential backoff with full jitter.
+
+    Attributes:
+        max_retries: Retries after the first attempt.
+        base_delay: Backoff ceiling in seconds for the first retry; doubles per retry.
+        max_delay: Upper bound on any single wait.
+    """
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the wait before retry number ``attempt`` (0-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute``.
+
+    Args:
+        rate_per_minute: Sustained rate (requests or tokens per minute).
+        capacity: Largest burst; defaults to one minute's worth.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and take them.
+
+        Requests larger than the capacity wait for a full bucket rather than forever.
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def credit(self, amount: float) -> None:
+        """Return unused tokens to the bucket, or take more when ``amount`` is negative."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AsyncProvider:
+    """Base class for asyncio model providers.
+
+    Args:
+        model: Model identifier sent with every request.
+        max_concurrency: Maximum number of requests in flight.
+        requests_per_minute: Optional RPM limit.
+        tokens_per_minute: Optional TPM limit. Each request reserves an estimate
+            (about four characters per prompt token plus ``max_tokens``) that is
+            corrected once the provider reports actual usage.
+        retry: Retry schedule for retryable :class:`ProviderError` failures.
+        max_batch_size: Prompts sent per request by :meth:`agenerate_many`;
+            providers whose endpoint takes one prompt per call keep this at 1.
+        cache: Persistent response cache keyed by provider, model, prompt and
+            sampling parameters. ``True`` uses ``.guage_kit/cache/responses.sqlite``,
+            a string selects another cache directory, or pass a :class:`DiskCache`.
+        cache_ttl: Seconds a cached response stays valid; ``None`` keeps it until evicted.
+    """
+
+    name = 'base'
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int = 32,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        max_batch_size: int = 1,
+        cache: Union[bool, str, DiskCache] = False,
+        cache_ttl: Optional[float] = None,
+    ):
+        if max_concurrency < 1 or max_batch_size < 1:
+            raise ValueError("max_concurrency and max_batch_size must be positive integers")
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.retry = retry or RetryPolicy()
+        self.max_batch_size = max_batch_size
+        if cache is True or isinstance(cache, str):
+            cache_dir = DEFAULT_CACHE_DIR if cache is True else pathlib.Path(cache)
+            cache = DiskCache(cache_dir / "responses.sqlite")
+        self.cache: Optional[DiskCache] = cache if isinstance(cache, DiskCache) else None
+        self.cache_ttl = cache_ttl
+        self._loop = None
+
+    def _bind_loop(self) -> None:
+        # asyncio primitives belong to one event loop; recreate them per loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._request_bucket = TokenBucket(self.requests_per_minute) if self.requests_per_minute else None
+            self._token_bucket = TokenBucket(self.tokens_per_minute) if self.tokens_per_minute else None
+            self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def _send(self, prompts: List[str], params: Dict[str, Any]) -> List[ProviderResponse]:
+        """Perform one request for ``prompts`` and return one response per prompt.
+
+        Raises:
+            ProviderError: On failure; set ``retryable`` for throttling and transient errors.
+        """
+        raise NotImplementedError
+
+    def cache_namespace(self) -> str:
+        """Identify the provider endpoint in response cache keys."""
+        return self.name
+
+    def cache_key(self, prompt: str, params: Dict[str, Any]) -> str:
+        """Key a request by provider, model, prompt and sampling parameters."""
+        request = [self.cache_namespace(), params.get('model', self.model), prompt,
+                   {k: v for k, v in params.items() if k != 'model'}]
+        return hashlib.blake2b(json.dumps(request, sort_keys=True, default=str).encode(), digest_size=20).hexdigest()
+
+    def estimate_tokens(self, prompts: Sequence[str], params: Dict[str, Any]) -> int:
+        """Estimate the tokens a request will consume, for TPM limiting."""
+        max_tokens = params.get('max_tokens') or 0
+        return sum(len(prompt) // 4 + 1 + max_tokens for prompt in prompts)
+
+    async def _request(self, prompts: List[str], params: Dict[str, Any]) -> List[ProviderResponse]:
+        self._bind_loop()
+        estimate = self.estimate_tokens(prompts, params)
+        async with self._semaphore:
+            start = time.perf_counter()
+            for attempt in range(self.retry.max_retries + 1):
+                if self._request_bucket is not None:
+                    await self._request_bucket.acquire(1)
+                if self._token_bucket is not None:
+                    await self._token_bucket.acquire(estimate)
+                try:
+                    responses = await self._send(prompts, params)
+                except ProviderError as error:
+                    if not error.retryable or attempt == self.retry.max_retries:
+                        raise
+                    await asyncio.sleep(self.retry.delay(attempt, error.retry_after))
+                    continue
+                if self._token_bucket is not None:
+                    used = sum(r.prompt_tokens + r.completion_tokens for r in responses)
+                    self._token_bucket.credit(estimate - used)
+                latency = time.perf_counter() - start
+                return [response._replace(latency=latency) for response in responses]
+        raise AssertionError("unreachable")
+
+    async def _request_batched(self, prompts: List[str], params: Dict[str, Any]) -> List[ProviderResponse]:
+        size = self.max_batch_size
+        batches = await asyncio.gather(
+            *(self._request(prompts[i:i + size], params) for i in range(0, len(prompts), size))
+        )
+        return [response for batch in batches for response in batch]
+
+    async def agenerate(self, prompt: str, **params: Any) -> ProviderResponse:
+        """Generate a completion for one prompt."""
+        return (await self.agenerate_many([prompt], **params))[0]
+
+    async def agenerate_many(self, prompts: Sequence[str], **params: Any) -> List[ProviderResponse]:
+        """Generate completions for many prompts concurrently, in input order.
+
+        Cached responses are returned without a request. Identical prompts,
+        within this call or already in flight from another one, share a single
+        request. The remaining prompts are grouped into requests of up to
+        ``max_batch_size`` and scheduled at once; the concurrency and rate
+        limits decide how many are actually in flight.
+        """
+        self._bind_loop()
+        prompts = list(prompts)
+        keys = [self.cache_key(prompt, params) for prompt in prompts]
+        found = self.cache.get_many(keys) if self.cache is not None else {}
+
+        futures: Dict[str, asyncio.Future] = {}
+        owned: List[str] = []
+        owned_prompts: List[str] = []
+        for key, prompt in zip(keys, prompts):
+            if key in found or key in futures:
+                continue
+            if key in self._in_flight:
+                futures[key] = self._in_flight[key]
+                continue
+            futures[key] = self._in_flight[key] = self._loop.create_future()
+            owned.append(key)
+            owned_prompts.append(prompt)
+
+        if owned:
+            try:
+                responses = await self._request_batched(owned_prompts, params)
+            except BaseException as error:
+                for key in owned:
+                    self._in_flight.pop(key, None)
+                    futures[key].set_exception(error)
+                    futures[key].exception()  # Waiters may not exist; don't warn about it
+                raise
+            if self.cache is not None:
+                self.cache.set_many(
+                    {key: response._asdict() for key, response in zip(owned, responses)}, ttl=self.cache_ttl
+                )
+            for key, response in zip(owned, responses):
+                self._in_flight.pop(key, None)
+                futures[key].set_result(response)
+
+        results = []
+        for key in keys:
+            if key in found:
+                results.append(ProviderResponse(**{**found[key], 'latency': 0.0, 'cached': True}))
+            else:
+                results.append(await futures[key])
+        return results
+
+    def generate_many(self, prompts: Sequence[str], **params: Any) -> List[ProviderResponse]:
+        """Synchronous wrapper around :meth:`agenerate_many`.
+
+        Must not be called from a running event loop; use :meth:`agenerate_many` there.
+        """
+        async def run():
+            try:
+                return await self.agenerate_many(prompts, **params)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run())
+
+    async def aclose(self) -> None:
+        """Release connections held for the current event loop."""
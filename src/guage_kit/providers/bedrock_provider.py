@@ -1,12 +1,73 @@
 # src/guage_kit/providers/bedrock_provider.py
 
-class BedrockProvider:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
+from typing import Any, Dict, List, Optional
+import asyncio
+from .base import AsyncProvider, ProviderError, ProviderResponse
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+    HAS_BOTO3 = True
+except ImportError:
+    HAS_BOTO3 = False
+
+# Bedrock error codes worth retrying
+RETRYABLE_ERRORS = {
+    'ThrottlingException', 'ServiceUnavailableException', 'ModelNotReadyException',
+    'InternalServerException', 'ModelTimeoutException',
+}
+
+# Sampling parameter names mapped to the Converse API's inferenceConfig
+INFERENCE_PARAMS = {'max_tokens': 'maxTokens', 'temperature': 'temperature', 'top_p': 'topP', 'stop': 'stopSequences'}
+
+
+class BedrockProvider(AsyncProvider):
+    """Amazon Bedrock through the Converse API.
+
+    boto3 is blocking, so each request runs in a worker thread while the
+    base class applies the concurrency, rate and retry limits.
+
+    Args:
+        model: Bedrock model id.
+        region_name: AWS region; defaults to the boto3 session's.
+        client: Preconfigured ``bedrock-runtime`` client to use instead of creating one.
+        **limits: Options of :class:`~guage_kit.providers.base.AsyncProvider`.
+    """
+
+    name = 'bedrock'
+
+    def __init__(self, model: str, region_name: Optional[str] = None, client: Any = None, **limits: Any):
+        super().__init__(model, **limits)
+        if client is None:
+            if not HAS_BOTO3:
+                raise ImportError("boto3 is required for Bedrock. Install with: pip install guage-kit[judge]")
+            client = boto3.client('bedrock-runtime', region_name=region_name)
+        self.client = client
+
+    def _converse(self, prompt: str, params: Dict[str, Any]) -> ProviderResponse:
+        inference = {INFERENCE_PARAMS[k]: v for k, v in params.items() if k in INFERENCE_PARAMS}
+        try:
+            response = self.client.converse(
+                modelId=self.model,
+                messages=[{'role': 'user', 'content': [{'text': prompt}]}],
+                inferenceConfig=inference,
+            )
+        except Exception as error:
+            code = error.response['Error']['Code'] if HAS_BOTO3 and isinstance(error, ClientError) else None
+            raise ProviderError(str(error), status=code, retryable=code in RETRYABLE_ERRORS) from error
+        usage = response.get('usage', {})
+        return ProviderResponse(
+            text=''.join(part.get('text', '') for part in response['output']['message']['content']),
+            model=self.model,
+            prompt_tokens=usage.get('inputTokens', 0),
+            completion_tokens=usage.get('outputTokens', 0),
+        )
+
+    async def _send(self, prompts: List[str], params: Dict[str, Any]) -> List[ProviderResponse]:
+        return [await asyncio.to_thread(self._converse, prompts[0], params)]
 
     def generate(self, prompt: str, **kwargs) -> str:
-        # Implement the logic to call the Bedrock API and generate a response
-        pass
+        return self.generate_many([prompt], **kwargs)[0].text
 
     def evaluate(self, response: str, reference: str) -> dict:
         # Implement evaluation logic for the generated response against the reference
@@ -18,4 +79,4 @@ class BedrockProvider:
 
     def get_latency(self, prompt: str) -> float:
         # Implement logic to measure the latency of the Bedrock API call
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,127 @@
+"""Async client for OpenAI-compatible HTTP APIs (OpenAI, vLLM, and similar servers)."""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+from .base import AsyncProvider, ProviderError, ProviderResponse
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenAICompatibleProvider(AsyncProvider):
+    """Provider for servers implementing the OpenAI REST API.
+
+    With ``endpoint='chat'`` each prompt is sent as a single user message to
+    ``/chat/completions``. With ``endpoint='completions'`` up to
+    ``max_batch_size`` prompts go in one ``/completions`` request; the
+    reported token usage is then split evenly across the batch.
+
+    Args:
+        model: Model name.
+        base_url: API root including the version, e.g. ``https://api.openai.com/v1``.
+        api_key: Bearer token; omitted from requests when empty.
+        endpoint: ``'chat'`` (default) or ``'completions'``.
+        timeout: Per-request timeout in seconds.
+        **limits: Concurrency, rate-limit, retry and batching options of
+            :class:`~guage_kit.providers.base.AsyncProvider`.
+
+    Raises:
+        ImportError: If httpx is not installed.
+    """
+
+    name = 'openai-compatible'
+
+    def __init__(
+        self,
+        model: str,
+        base_url: str,
+        api_key: Optional[str] = None,
+        endpoint: str = 'chat',
+        timeout: float = 60.0,
+        **limits: Any,
+    ):
+        if not HAS_HTTPX:
+            raise ImportError("httpx is required for HTTP providers. Install with: pip install guage-kit[judge]")
+        if endpoint not in ('chat', 'completions'):
+            raise ValueError(f"Unknown endpoint: {endpoint}")
+        if endpoint == 'chat':
+            limits.setdefault('max_batch_size', 1)
+            if limits['max_batch_size'] != 1:
+                raise ValueError("The chat endpoint takes one prompt per request; use endpoint='completions' to batch")
+        super().__init__(model, **limits)
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._client_loop = None
+
+    def cache_namespace(self) -> str:
+        return f"{self.name}|{self.base_url}|{self.endpoint}"
+
+    def _http(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self._http().post(f"{self.base_url}{path}", json=body)
+        except httpx.TransportError as error:
+            raise ProviderError(f"{type(error).__name__}: {error}", retryable=True) from error
+        if response.status_code != 200:
+            raise ProviderError(
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                status=response.status_code,
+                retryable=response.status_code == 429 or response.status_code >= 500,
+                retry_after=_retry_after(response.headers),
+            )
+        return response.json()
+
+    async def _send(self, prompts: List[str], params: Dict[str, Any]) -> List[ProviderResponse]:
+        if self.endpoint == 'chat':
+            body = {'model': self.model, 'messages': [{'role': 'user', 'content': prompts[0]}], **params}
+            payload = await self._post('/chat/completions', body)
+            texts = [payload['choices'][0]['message']['content'] or '']
+        else:
+            body = {'model': self.model, 'prompt': prompts, **params}
+            payload = await self._post('/completions', body)
+            choices = sorted(payload['choices'], key=lambda choice: choice.get('index', 0))
+            texts = [choice['text'] for choice in choices]
+        if len(texts) != len(prompts):
+            raise ProviderError(f"Expected {len(prompts)} choices, got {len(texts)}")
+
+        usage = payload.get('usage') or {}
+        model = payload.get('model', body['model'])
+        count = len(texts)
+        return [
+            ProviderResponse(
+                text=text,
+                model=model,
+                prompt_tokens=usage.get('prompt_tokens', 0) // count,
+                completion_tokens=usage.get('completion_tokens', 0) // count,
+            )
+            for text in texts
+        ]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = self._client_loop = None
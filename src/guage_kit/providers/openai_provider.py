@@ -1,20 +1,34 @@
-from typing import Any, Dict
-import openai
-
-class OpenAIProvider:
-    def __init__(self, api_key: str):
-        openai.api_key = api_key
-
-    def generate(self, prompt: str, model: str = "text-davinci-003", **kwargs: Any) -> Dict[str, Any]:
-        response = openai.ChatCompletion.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            **kwargs
-        )
-        return response.choices[0].message['content']
-
-    def evaluate(self, prompt: str, expected_output: str, model: str = "text-davinci-003", **kwargs: Any) -> float:
+from typing import Any, Optional
+from .openai_compatible import OpenAICompatibleProvider
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+class OpenAIProvider(OpenAICompatibleProvider):
+    """OpenAI chat completions with the async limits of :class:`AsyncProvider`.
+
+    Use :meth:`agenerate_many`/:meth:`generate_many` to keep many requests in
+    flight; :meth:`generate` is a blocking single-prompt convenience.
+    """
+
+    name = 'openai'
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        base_url: str = OPENAI_BASE_URL,
+        **kwargs: Any,
+    ):
+        super().__init__(model, base_url, api_key=api_key, **kwargs)
+
+    def generate(self, prompt: str, model: Optional[str] = None, **kwargs: Any) -> str:
+        if model is not None:
+            kwargs['model'] = model
+        return self.generate_many([prompt], **kwargs)[0].text
+
+    def evaluate(self, prompt: str, expected_output: str, model: Optional[str] = None, **kwargs: Any) -> float:
         generated_output = self.generate(prompt, model=model, **kwargs)
         # Here you can implement a comparison logic to evaluate the generated output against the expected output
         # For simplicity, we will return a dummy score
-        return 1.0 if generated_output == expected_output else 0.0
\ No newline at end of file
+        return 1.0 if generated_output == expected_output else 0.0
@@ -1,19 +1,39 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from .openai_compatible import OpenAICompatibleProvider
 
-class VLLMProvider:
-    def __init__(self, model_name: str, api_key: str):
+VLLM_BASE_URL = "http://localhost:8000/v1"
+
+
+class VLLMProvider(OpenAICompatibleProvider):
+    """Client for a vLLM server's OpenAI-compatible API.
+
+    Defaults to the ``/completions`` endpoint so prompts are batched into one
+    request (``max_batch_size``, 32 by default), which vLLM schedules together.
+    """
+
+    name = 'vllm'
+
+    def __init__(
+        self,
+        model_name: str,
+        api_key: Optional[str] = None,
+        base_url: str = VLLM_BASE_URL,
+        endpoint: str = 'completions',
+        **kwargs: Any,
+    ):
+        if endpoint == 'completions':
+            kwargs.setdefault('max_batch_size', 32)
+        super().__init__(model_name, base_url, api_key=api_key, endpoint=endpoint, **kwargs)
         self.model_name = model_name
-        self.api_key = api_key
 
     def generate(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
-        # Implement the logic to call the vLLM API and generate a response
-        response = {
+        response = self.generate_many([prompt], **kwargs)[0]
+        return {
             "prompt": prompt,
-            "generated_text": "This is a placeholder for the generated text.",
-            "model": self.model_name,
+            "generated_text": response.text,
+            "model": response.model,
             "parameters": kwargs
         }
-        return response
 
     def evaluate(self, generated_text: str, reference_text: str) -> Dict[str, float]:
         # Implement evaluation logic (e.g., BLEU, ROUGE) here
@@ -25,8 +45,8 @@ class VLLMProvider:
 
 # Example usage
 if __name__ == "__main__":
-    provider = VLLMProvider(model_name="vllm-model", api_key="your_api_key")
+    provider = VLLMProvider(model_name="vllm-model")
     generated = provider.generate("What is CRISPR?")
     evaluation = provider.evaluate(generated["generated_text"], "CRISPR is a genome editing tool.")
     print(generated)
-    print(evaluation)
\ No newline at end of file
+    print(evaluation)
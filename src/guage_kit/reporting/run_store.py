@@ -0,0 +1,265 @@
+"""Per-sample run store: Parquet parts indexed by a JSON manifest.
+
+A run directory holds one Parquet file per scored chunk under ``parts/`` and
+a ``manifest.json`` recording the metrics, configuration and chunk size of
+the run, the parts written so far and, once the run completes, its aggregate
+results. Each part has a ``row`` and ``query_id`` column, the serving costs
+(``latency_ms``, ``prompt_tokens``, ``completion_tokens``; NaN when the data
+has none) and one column per metric holding the values its accumulator folds:
+a float per sample for averaged metrics, a fixed-size list of statistics per
+sample for corpus metrics such as BLEU.
+
+Parts are written to a temporary file and renamed, and the manifest is
+replaced only after its part is in place, so a crashed run leaves a valid
+prefix of its rows. :func:`guage_kit.api.evaluate` resumes such a run by
+folding the stored values into its accumulators and scoring only the rows
+after them. Readers load just the columns they need with :meth:`RunStore.read`.
+"""
+
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+import hashlib
+import json
+import os
+import pathlib
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+RUN_STORE_VERSION = 1
+DEFAULT_RUNS_DIR = pathlib.Path(".guage_kit") / "runs"
+MANIFEST_NAME = "manifest.json"
+USAGE_FIELDS = ('latency_ms', 'prompt_tokens', 'completion_tokens')
+# Bytes of the data file hashed into its fingerprint
+FINGERPRINT_BYTES = 1 << 20
+
+
+def _write_atomic(path: pathlib.Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def data_fingerprint(path: Union[str, pathlib.Path]) -> str:
+    """Identify a data file by its size and a hash of its first bytes.
+
+    Cheap for any file size, unaffected by moving or touching the file, and
+    different for another dataset or a file that grew or was rewritten.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+    return f"{os.path.getsize(path)}:{digest.hexdigest()}"
+
+
+def _metric_array(values: np.ndarray) -> "pa.Array":
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return pa.array(values, from_pandas=True)
+    # Statistic rows (e.g. BLEU n-gram counts) keep their width
+    return pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+
+
+def _metric_values(column: "pa.ChunkedArray") -> np.ndarray:
+    column = column.combine_chunks()
+    if pa.types.is_fixed_size_list(column.type):
+        return column.values.to_numpy(zero_copy_only=False).reshape(len(column), column.type.list_size)
+    return column.to_numpy(zero_copy_only=False)
+
+
+class RunStore:
+    """Reader and incremental writer of a run directory.
+
+    Args:
+        directory: The run directory; created by :meth:`begin` if missing.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+
+    def __init__(self, directory: Union[str, pathlib.Path]):
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for run stores. Install with: pip install guage-kit[arrow]")
+        self.directory = pathlib.Path(directory)
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.manifest: Optional[Dict[str, Any]] = None
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text())
+
+    @property
+    def num_rows(self) -> int:
+        """Rows stored so far."""
+        return self.manifest['num_rows'] if self.manifest else 0
+
+    @property
+    def complete(self) -> bool:
+        """True once :meth:`finish` recorded the run's results."""
+        return bool(self.manifest and self.manifest['complete'])
+
+    @property
+    def metrics(self) -> List[str]:
+        return list(self.manifest['metrics']) if self.manifest else []
+
+    @property
+    def results(self) -> Optional[Dict[str, float]]:
+        """Aggregate results of a completed run."""
+        return self.manifest.get('results') if self.manifest else None
+
+    def _save_manifest(self) -> None:
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=2).encode('utf-8'))
+
+    def begin(
+        self,
+        metrics: Sequence[str],
+        config: Mapping[str, Any],
+        chunk_size: int,
+        data: Optional[str] = None,
+    ) -> int:
+        """Start a new run, or continue the one already stored in the directory.
+
+        Args:
+            metrics: Metric names of the run.
+            config: Metric configuration.
+            chunk_size: Rows per part; a resumed run must use the same value
+                so its chunks line up with the stored parts.
+            data: Path of the evaluated data file; its :func:`data_fingerprint`
+                must match to resume a stored run.
+
+        Returns:
+            int: The number of rows already stored.
+
+        Raises:
+            ValueError: If the directory holds a run with other settings or data.
+        """
+        settings = {
+            'metrics': list(metrics),
+            # Round-trip through JSON so stored and requested configs compare equal
+            'config': json.loads(json.dumps(dict(config), default=str)),
+            'chunk_size': chunk_size,
+            'data_fingerprint': data_fingerprint(data) if data is not None else None,
+        }
+        if self.manifest is not None:
+            stored = {key: self.manifest.get(key) for key in settings}
+            if stored != settings:
+                raise ValueError(
+                    f"{self.directory} holds a run with different metrics, config, chunk size or data; "
+                    "use a new run directory"
+                )
+            return self.num_rows
+
+        (self.directory / 'parts').mkdir(parents=True, exist_ok=True)
+        self.manifest = {
+            'version': RUN_STORE_VERSION,
+            **settings,
+            'data': data,
+            'created': time.time(),
+            'num_rows': 0,
+            'parts': [],
+            'complete': False,
+            'results': None,
+        }
+        self._save_manifest()
+        return 0
+
+    def append(
+        self,
+        first_row: int,
+        query_ids: Sequence[str],
+        values: Mapping[str, np.ndarray],
+        usage: Optional[Mapping[str, Sequence[Optional[float]]]] = None,
+        seconds: float = 0.0,
+    ) -> None:
+        """Write the scored values of one chunk as the next part.
+
+        Args:
+            first_row: Row number of the chunk's first sample; must follow the stored rows.
+            query_ids: Query id per sample.
+            values: Per-sample values per metric, as returned by
+                :meth:`~guage_kit.metrics.planner.MetricPlan.score_columns`.
+            usage: Optional ``latency_ms``/``prompt_tokens``/``completion_tokens`` per sample.
+            seconds: Time spent scoring the chunk, recorded in the manifest.
+
+        Raises:
+            ValueError: If the run was not started or ``first_row`` leaves a gap.
+        """
+        if self.manifest is None:
+            raise ValueError("Call begin() before appending parts")
+        if first_row != self.num_rows:
+            raise ValueError(f"Part starts at row {first_row} but {self.num_rows} rows are stored")
+        n = len(query_ids)
+        usage = usage or {}
+        arrays = {
+            'row': pa.array(np.arange(first_row, first_row + n, dtype=np.int64)),
+            'query_id': pa.array(list(query_ids), type=pa.string()),
+        }
+        for field in USAGE_FIELDS:
+            column = usage.get(field)
+            column = column.to_pylist() if hasattr(column, 'to_pylist') else column
+            arrays[field] = pa.array(
+                np.full(n, np.nan) if column is None else np.array(column, dtype=np.float64), from_pandas=True
+            )
+        for metric in self.manifest['metrics']:
+            arrays[metric] = _metric_array(values[metric])
+
+        name = f"part-{len(self.manifest['parts']):06d}.parquet"
+        path = self.directory / 'parts' / name
+        tmp = path.with_name(name + ".tmp")
+        pq.write_table(pa.table(arrays), tmp)
+        os.replace(tmp, path)
+
+        self.manifest['parts'].append({'file': name, 'first_row': first_row, 'num_rows': n, 'seconds': seconds})
+        self.manifest['num_rows'] += n
+        self._save_manifest()
+
+    def finish(self, results: Mapping[str, float]) -> None:
+        """Mark the run complete and record its aggregate results."""
+        self.manifest['complete'] = True
+        self.manifest['results'] = dict(results)
+        self._save_manifest()
+
+    def part_paths(self) -> List[pathlib.Path]:
+        return [self.directory / 'parts' / part['file'] for part in self.manifest['parts']] if self.manifest else []
+
+    @property
+    def schema(self) -> Optional["pa.Schema"]:
+        """Schema of the stored parts, read from the first part's footer."""
+        paths = self.part_paths()
+        return pq.read_schema(paths[0]) if paths else None
+
+    def iter_parts(self, metrics: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, int, Dict[str, np.ndarray]]]:
+        """Yield the first row, row count and per-metric values of every stored part, in order."""
+        metrics = self.metrics if metrics is None else list(metrics)
+        for part, path in zip(self.manifest['parts'] if self.manifest else [], self.part_paths()):
+            table = pq.read_table(path, columns=metrics)
+            yield part['first_row'], part['num_rows'], {metric: _metric_values(table[metric]) for metric in metrics}
+
+    def read(self, columns: Optional[Sequence[str]] = None, filter: Optional[Any] = None) -> "pa.Table":
+        """Load the stored rows, reading only ``columns`` from disk.
+
+        Args:
+            columns: Columns to load (``row``, ``query_id``, usage fields and
+                metric names); all by default.
+            filter: Optional ``pyarrow.compute`` expression applied while scanning.
+
+        Returns:
+            pa.Table: The selected columns of all parts, in row order.
+        """
+        paths = [str(path) for path in self.part_paths()]
+        if not paths:
+            return pa.table({name: pa.array([], type=pa.float64()) for name in (columns or ['row'])})
+        dataset = ds.dataset(paths, format='parquet')
+        return dataset.to_table(columns=list(columns) if columns is not None else None, filter=filter)
+
+    def to_pandas(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Load the stored rows as a pandas DataFrame (see :meth:`read`)."""
+        return self.read(columns).to_pandas()
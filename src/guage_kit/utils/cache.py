@@ -0,0 +1,133 @@
+import json
+import os
+import pathlib
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+DEFAULT_CACHE_DIR = pathlib.Path(".guage_kit") / "cache"
+
+
+class DiskCache:
+    """Size-bounded key/value store backed by a single SQLite file.
+
+    Values are stored as JSON. Every read refreshes the entry's access time, and
+    once the number of entries exceeds ``max_entries`` the least recently used
+    ones are evicted. Entries written with a time-to-live are ignored once they
+    expire and are purged before any live entry is evicted. The connection is opened lazily and is not pickled, so a
+    cache object can be handed to worker processes; SQLite's locking makes
+    concurrent writers safe.
+
+    Args:
+        path: SQLite file to use; parent directories are created.
+        max_entries: Maximum number of entries kept after a write.
+        ttl: Default time-to-live in seconds for new entries; ``None`` keeps
+            them until evicted.
+    """
+
+    def __init__(
+        self, path: Union[str, pathlib.Path], max_entries: int = 10_000_000, ttl: Optional[float] = None
+    ):
+        self.path = pathlib.Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+        self._size = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Never share a connection with a forked parent process
+            self._conn, self._pid = None, os.getpid()
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL, expires REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            if 'expires' not in columns:
+                # Caches created before entries could expire
+                self._conn.execute("ALTER TABLE entries ADD COLUMN expires REAL")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._conn.commit()
+            self._size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return self._conn
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values for whichever of ``keys`` are present."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        # Stay below SQLite's default limit on bound parameters
+        for i in range(0, len(keys), 900):
+            batch = keys[i:i + 900]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders}) "
+                "AND (expires IS NULL OR expires > ?)", (*batch, now)
+            ).fetchall()
+            found.update((key, json.loads(value)) for key, value in rows)
+        if found:
+            self.conn.executemany("UPDATE entries SET accessed = ? WHERE key = ?", [(now, key) for key in found])
+            self.conn.commit()
+        return found
+
+    def set_many(self, items: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        """Store ``items`` and evict least recently used entries beyond ``max_entries``.
+
+        Args:
+            items: Values keyed by cache key.
+            ttl: Time-to-live in seconds for these entries; defaults to the cache's ``ttl``.
+        """
+        if not items:
+            return
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = now + ttl if ttl is not None else None
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entries (key, value, accessed, expires) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(value), now, expires) for key, value in items.items()],
+        )
+        self._size += len(items)
+        if self._size > self.max_entries:
+            # Only recount when the running estimate says we may be over budget
+            self.conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            self._size = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            excess = self._size - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed LIMIT ?)", (excess,)
+                )
+                self._size -= excess
+        self.conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        removed = self.conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),)).rowcount
+        self.conn.commit()
+        self._size = max(self._size - removed, 0)
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self.conn.execute("DELETE FROM entries")
+        self.conn.commit()
+        self._size = 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
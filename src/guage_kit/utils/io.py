@@ -1,6 +1,26 @@
 from pathlib import Path
+from typing import Any, Union
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def loads_json(text: Union[str, bytes]) -> Any:
+    """Decode one JSON document, using orjson when it is installed.
+
+    Falls back to the standard library for input orjson rejects but ``json``
+    accepts, such as ``NaN`` literals, so both decoders give the same result.
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
 def write_artifact(file_path: str, data: dict) -> None:
     """Write data to a JSON file."""
     with open(file_path, 'w') as f:
@@ -1,4 +1,6 @@
-from typing import Callable, List
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
 import multiprocessing
 
 def parallel_map(func: Callable, iterable: List, num_workers: int = None) -> List:
@@ -19,4 +21,45 @@ def parallel_batch(func: Callable, data: List, batch_size: int, num_workers: int
     with multiprocessing.Pool(processes=num_workers) as pool:
         results = pool.map(func, batches)
     
-    return results
\ No newline at end of file
+    return results
+
+def parallel_imap(
+    func: Callable,
+    iterable: Iterable,
+    num_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+) -> Iterator:
+    """Lazily apply ``func`` to items across worker processes, yielding results in input order.
+
+    Unlike ``Pool.imap``, at most ``max_in_flight`` items (default: twice the
+    number of workers) are pulled from ``iterable`` ahead of the consumer, so a
+    streamed input is never buffered in full. ``initializer(*initargs)`` runs
+    once in each worker, which is the place to ship large shared state.
+    """
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    if max_in_flight is None:
+        max_in_flight = 2 * num_workers
+
+    with multiprocessing.Pool(num_workers, initializer, initargs) as pool:
+        pending = deque()
+        for item in iterable:
+            pending.append(pool.apply_async(func, (item,)))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def chunked(iterable: Iterable, chunk_size: int) -> Iterator[List]:
+    """Lazily split an iterable into lists of at most ``chunk_size`` items."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from sacrebleu import corpus_bleu
+
+from guage_kit.metrics.llm_quality import bleu_from_statistics, bleu_sample_statistics, compute_bleu
+
+PREDICTIONS = [
+    "The cat is sitting on the mat.",
+    "CRISPR is a genome editing technology.",
+    "",
+    "Paris is the capital of France.",
+    "the the the the",
+]
+REFERENCES = [
+    ["The cat sat on the mat.", "A cat is sitting on a mat."],
+    ["CRISPR is a genome editing tool."],
+    ["Nothing"],
+    ["The capital of France is Paris.", "Paris", "Paris is France's capital."],
+    ["the cat"],
+]
+
+
+def _sacrebleu(predictions, references):
+    max_refs = max(len(refs) for refs in references)
+    streams = [[refs[i] if i < len(refs) else None for refs in references] for i in range(max_refs)]
+    return corpus_bleu(predictions, streams).score / 100.0
+
+
+def test_compute_bleu_matches_sacrebleu_with_variable_references():
+    assert compute_bleu(PREDICTIONS, REFERENCES) == pytest.approx(_sacrebleu(PREDICTIONS, REFERENCES))
+
+
+def test_sharded_statistics_merge_exactly():
+    stats = bleu_sample_statistics(PREDICTIONS, REFERENCES)
+
+    assert stats.dtype == np.int64
+    assert stats.shape == (5, 10)
+    shards = [bleu_sample_statistics(PREDICTIONS[i:i + 2], REFERENCES[i:i + 2]) for i in range(0, 5, 2)]
+    merged = sum(shard.sum(axis=0) for shard in shards)
+    assert merged.tolist() == stats.sum(axis=0).tolist()
+    assert bleu_from_statistics(merged) == compute_bleu(PREDICTIONS, REFERENCES)
+
+
+def test_clipping_and_closest_reference_length():
+    stats = bleu_sample_statistics(["the the the the"], [["the cat", "the the mat"]])[0]
+
+    # Unigram "the" is clipped at 2 by the second reference; closest length is 3
+    assert stats[:3].tolist() == [4, 3, 2]
+    assert stats[6:].tolist() == [4, 3, 2, 1]
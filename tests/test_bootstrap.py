@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.accumulators import (
+    BootstrapAccumulator, MeanAccumulator, SpearmanAccumulator, bootstrap_groups, poisson_weights,
+)
+from guage_kit.metrics.embeddings import sts_spearman_from_features
+
+
+def _rows(n):
+    for i in range(n):
+        yield {
+            "query": {"id": f"q{i}", "prompt": "What is CRISPR?", "references": ["c1", "c3"] if i % 2 else ["A genome editing tool"]},
+            "retrieval": {"query_id": f"q{i}", "chunks": [{"id": f"c{j}", "text": "CRISPR"} for j in range(i % 4, i % 4 + 5)]},
+            "generation": {"query_id": f"q{i}", "text": "CRISPR is a genome editing technology" + " tool" * (i % 3)},
+        }
+
+
+METRICS = ["rougeL", "bleu", "mrr", "ndcg@5"]
+
+
+def test_evaluate_reports_intervals_independent_of_chunking():
+    serial = evaluate(_rows(60), METRICS, chunk_size=1000, bootstrap=200)
+    chunked = evaluate(_rows(60), METRICS, chunk_size=7, bootstrap=200, parallelism=2)
+
+    assert chunked.keys() == serial.keys()
+    for metric in METRICS:
+        assert serial[f"{metric}.ci_lower"] <= serial[metric] <= serial[f"{metric}.ci_upper"]
+        assert chunked[f"{metric}.ci_lower"] == pytest.approx(serial[f"{metric}.ci_lower"])
+        assert chunked[f"{metric}.ci_upper"] == pytest.approx(serial[f"{metric}.ci_upper"])
+    assert serial["mrr.ci_lower"] < serial["mrr.ci_upper"]
+    assert "mrr.ci_lower" not in evaluate(_rows(10), ["mrr"])
+
+
+def test_interval_width_matches_normal_approximation():
+    rng = np.random.default_rng(1)
+    scores = (rng.random(50_000) < 0.3).astype(float)
+    scores[::10] = np.nan  # Not applicable samples do not count
+    accumulator = BootstrapAccumulator(MeanAccumulator(), n_groups=2000)
+    for start in range(0, len(scores), 4096):
+        chunk = scores[start:start + 4096]
+        accumulator.update(chunk)
+        accumulator.update_groups(chunk, bootstrap_groups(start, len(chunk), 2000))
+
+    lower, upper = accumulator.interval(poisson_weights(2000, 2000), np.random.default_rng(0))
+
+    valid = scores[~np.isnan(scores)]
+    half_width = 1.96 * valid.std() / np.sqrt(len(valid))
+    assert accumulator.result() == pytest.approx(valid.mean())
+    assert (upper - lower) / 2 == pytest.approx(half_width, rel=0.15)
+    assert lower < valid.mean() < upper
+
+
+def test_groups_are_spread_and_weights_have_unit_mean():
+    groups = bootstrap_groups(0, 100_000, 1000)
+    assert np.bincount(groups, minlength=1000).min() > 50
+    np.testing.assert_array_equal(bootstrap_groups(500, 10, 1000), groups[500:510])
+
+    weights = poisson_weights(500, 1000, seed=3)
+    assert weights.mean() == pytest.approx(1.0, abs=0.01)
+    assert weights.var() == pytest.approx(1.0, abs=0.02)
+
+
+def test_non_decomposable_metrics_get_intervals():
+    rows = [
+        {"prompt": f"a man plays guitar {i}", "prediction": f"a man plays guitar {i}" if i % 2 else "a cat sleeps", "sts_score": 5.0 if i % 2 else float(i % 3)}
+        for i in range(30)
+    ]
+
+    scores = evaluate(rows, ["sts_spearman"], bootstrap=50)
+
+    assert scores["sts_spearman.ci_lower"] <= scores["sts_spearman"] <= scores["sts_spearman.ci_upper"]
+
+
+def test_spearman_resamples_are_batched_and_match_exact_bootstrap():
+    from scipy.stats import spearmanr
+
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=5000)
+    rows = np.column_stack([x, x + rng.normal(size=x.size)])
+    rows[::97, 1] = np.nan  # Pairs without a gold score are ignored
+    accumulator = SpearmanAccumulator(sts_spearman_from_features)
+    accumulator.update(rows)
+
+    start = time.perf_counter()
+    resampled = accumulator.resample_results(10_000, np.random.default_rng(1))
+    assert time.perf_counter() - start < 10.0
+
+    valid = rows[~np.isnan(rows).any(axis=1)]
+    exact = [
+        spearmanr(*valid[rng.integers(0, len(valid), len(valid))].T)[0] for _ in range(300)
+    ]
+    assert np.mean(resampled) == pytest.approx(accumulator.result(), abs=2e-3)
+    assert np.std(resampled) == pytest.approx(np.std(exact), rel=0.15)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.accumulators import CalibrationAccumulator
+from guage_kit.metrics.calibration import (
+    adaptive_calibration_error,
+    brier_score,
+    calibration_metrics,
+    expected_calibration_error,
+    reliability_diagram,
+)
+
+
+def _predictions(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    p = rng.beta(5, 2, n)
+    # Overconfident: accuracy lags confidence
+    y = (rng.random(n) < p ** 1.5).astype(float)
+    return p, y
+
+
+def test_ece_matches_reference_loop():
+    p, y = _predictions()
+
+    edges = np.linspace(0, 1, 11)
+    expected = 0.0
+    for i, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+        in_bin = (p <= hi) & ((p > lo) if i else (p >= lo))
+        if in_bin.any():
+            expected += in_bin.mean() * abs(p[in_bin].mean() - y[in_bin].mean())
+
+    assert expected_calibration_error(p, y, n_bins=10) == pytest.approx(expected)
+    assert brier_score(p, y) == pytest.approx(np.mean((p - y) ** 2))
+    assert expected_calibration_error([1.0, 0.0], [1, 0]) == 0.0
+    assert brier_score([], []) == 0.0
+
+
+def test_adaptive_bins_hold_equal_mass():
+    p, y = _predictions()
+
+    diagram = reliability_diagram(p, y, n_bins=8, strategy="quantile")
+
+    assert diagram["count"].tolist() == [2500] * 8
+    assert (diagram["confidence"] > diagram["accuracy"]).all()
+    sorted_p = np.sort(p)
+    expected = np.mean([abs(b.mean() - y[np.argsort(p, kind="stable")][i * 2500:(i + 1) * 2500].mean())
+                        for i, b in enumerate(np.split(sorted_p, 8))])
+    assert adaptive_calibration_error(p, y, n_bins=8) == pytest.approx(expected)
+
+    summary = calibration_metrics(p, y)
+    assert summary.confidence > summary.accuracy
+    assert summary.ece > 0.05
+
+
+@pytest.mark.parametrize("metric", ["ece", "adaptive_ece", "brier"])
+def test_accumulators_merge_across_shards(metric):
+    p, y = _predictions()
+    rows = np.column_stack([p, y])
+    rows[::97, 1] = np.nan  # Unlabelled samples are skipped
+
+    shards = [CalibrationAccumulator(metric) for _ in range(3)]
+    for shard, part in zip(shards, np.array_split(rows, 3)):
+        shard.update(part)
+    for shard in shards[1:]:
+        shards[0].merge(shard)
+
+    keep = ~np.isnan(rows[:, 1])
+    exact = {"ece": expected_calibration_error, "adaptive_ece": adaptive_calibration_error, "brier": brier_score}[metric]
+    # Streaming adaptive ECE bins a fine histogram, so it is approximate
+    assert shards[0].result() == pytest.approx(exact(p[keep], y[keep]), rel=0.02 if metric == "adaptive_ece" else 1e-9)
+
+
+def test_evaluate_reads_confidence_and_correct_fields():
+    p, y = _predictions(2000)
+    rows = [
+        {"prompt": "q", "prediction": "a", "confidence": float(pi), "correct": bool(yi)}
+        for pi, yi in zip(p, y)
+    ]
+    rows.append({"prompt": "q", "prediction": "a"})
+
+    scores = evaluate(rows, ["ece", "brier"], config={"calibration.bins": 10}, chunk_size=300)
+
+    assert scores["ece"] == pytest.approx(expected_calibration_error(p, y, n_bins=10))
+    assert scores["brier"] == pytest.approx(brier_score(p, y))
+
+
+def test_group_statistics_match_summed_sample_statistics():
+    rng = np.random.default_rng(0)
+    values = np.column_stack([rng.random(3000), rng.random(3000) < 0.5]).astype(float)
+    values[::11] = np.nan
+    groups = rng.integers(0, 40, len(values))
+
+    for metric in ("ece", "adaptive_ece", "brier"):
+        accumulator = CalibrationAccumulator(metric)
+        dense = accumulator.sample_statistics(values)
+        expected = np.stack([dense[groups == g].sum(axis=0) for g in range(40)])
+        np.testing.assert_allclose(accumulator.group_statistics(values, groups, 40), expected, err_msg=metric)
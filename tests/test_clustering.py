@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn import metrics as sk_metrics
+from sklearn.datasets import make_blobs
+
+from guage_kit.metrics.clustering import (
+    MiniBatchKMeans,
+    adjusted_rand_index,
+    clustering_metrics,
+    normalized_mutual_info,
+    silhouette_estimate,
+)
+
+
+def test_ari_and_nmi_match_reference_implementation():
+    rng = np.random.default_rng(0)
+    truth = rng.integers(0, 20, 5000)
+    noisy = (truth + (rng.random(5000) < 0.3) * rng.integers(0, 20, 5000)) % 25
+    names = np.array(["a", "b", "c"])[truth % 3]
+
+    assert adjusted_rand_index(truth, noisy) == pytest.approx(sk_metrics.adjusted_rand_score(truth, noisy))
+    assert adjusted_rand_index(names, noisy) == pytest.approx(sk_metrics.adjusted_rand_score(names, noisy))
+    for average in ("arithmetic", "geometric", "min", "max"):
+        assert normalized_mutual_info(truth, noisy, average) == pytest.approx(
+            sk_metrics.normalized_mutual_info_score(truth, noisy, average_method=average)
+        )
+    assert adjusted_rand_index([0, 0, 1, 1], [5, 5, 9, 9]) == 1.0
+    assert normalized_mutual_info([0, 0, 0], [1, 1, 1]) == 1.0
+
+
+def test_silhouette_estimate_is_exact_with_full_reference_and_bounded_when_sampled():
+    points, _ = make_blobs(2000, n_features=8, centers=5, cluster_std=3.0, random_state=0)
+    labels = MiniBatchKMeans(5, batch_size=256).fit_predict(points)
+
+    for metric in ("euclidean", "cosine"):
+        exact = silhouette_estimate(points, labels, tolerance=0.0, reference_per_cluster=10_000, metric=metric)
+        assert exact["n_points"] == 2000 and exact["stderr"] == 0.0
+        assert exact["silhouette"] == pytest.approx(sk_metrics.silhouette_score(points, labels, metric=metric), abs=1e-5)
+
+    sampled = silhouette_estimate(points, labels, tolerance=0.02, reference_per_cluster=50, batch_size=100)
+    assert sampled["n_points"] < 2000
+    assert sampled["ci_upper"] - sampled["silhouette"] <= 0.02
+    assert abs(sampled["silhouette"] - sk_metrics.silhouette_score(points, labels)) < 0.05
+
+
+def test_minibatch_kmeans_recovers_blobs_from_npy(tmp_path):
+    points, truth = make_blobs(20_000, n_features=16, centers=10, cluster_std=1.0, random_state=1)
+    path = tmp_path / "embeddings.npy"
+    np.save(path, points.astype(np.float32))
+
+    result = clustering_metrics(str(path), truth)
+
+    assert result["ari"] > 0.95 and result["nmi"] > 0.95
+    assert result["silhouette_ci_lower"] <= result["silhouette"] <= result["silhouette_ci_upper"]
+    with pytest.raises(ValueError, match="clusters"):
+        silhouette_estimate(points, np.zeros(len(points), dtype=int))
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+feather = pytest.importorskip("pyarrow.feather")
+
+from guage_kit.api import evaluate
+from guage_kit.datasets.columnar import iter_column_batches
+from guage_kit.metrics.retrieval_ir import encode_hit_codes, encode_hits
+
+
+def _rows(n):
+    rows = []
+    for i in range(n):
+        rows.append({
+            "query": {"id": f"q{i}", "prompt": f"What is CRISPR {i % 3}?", "references": ["c1", "c3"] if i % 2 else ["A genome editing tool"]},
+            "retrieval": None if i % 7 == 6 else {
+                "query_id": f"q{i}",
+                "chunks": [{"id": f"c{j}", "text": "CRISPR is a genome editing tool"} for j in range(i % 4, i % 4 + 5)],
+            },
+            "generation": {"query_id": f"q{i}", "text": "CRISPR is a genome editing technology" + " tool" * (i % 3)},
+        })
+    return rows
+
+
+METRICS = ["rougeL", "bleu", "recall@1", "recall@5", "mrr", "ndcg@5", "map", "answer_relevancy", "sts_spearman"]
+
+
+def test_parquet_matches_row_path(tmp_path):
+    rows = _rows(30)
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=7)
+
+    expected = evaluate(rows, METRICS)
+    scores = evaluate(str(path), METRICS, chunk_size=4)
+
+    assert scores.keys() == expected.keys()
+    for metric in METRICS:
+        assert scores[metric] == pytest.approx(expected[metric], nan_ok=True)
+
+
+def test_flat_arrow_file_and_corpus_fit(tmp_path):
+    rows = [
+        {"question": "What is CRISPR?", "answer": "A genome editing tool", "reference": "CRISPR edits genomes"},
+        {"question": "Who wrote Hamlet?", "answer": "Shakespeare wrote it", "reference": None},
+        {"question": "Boiling point of water?", "answer": "100 degrees Celsius", "reference": "100 C"},
+    ]
+    path = tmp_path / "data.feather"
+    feather.write_feather(pa.Table.from_pylist(rows), str(path))
+
+    metrics = ["rouge1", "bleu", "answer_relevancy"]
+    config = {"rag.tfidf": "corpus"}
+    assert evaluate(str(path), metrics, config=config) == pytest.approx(evaluate(rows, metrics, config=config))
+
+
+def test_flat_jsonl_matches_parquet_with_empty_retrievals(tmp_path):
+    import json
+
+    rows = []
+    for i in range(40):
+        empty = i % 5 == 0
+        rows.append({
+            "id": f"q{i}",
+            "question": f"What is CRISPR {i}?",
+            "answer": "CRISPR is a genome editing tool. It cuts DNA.",
+            "references": ["c1", "c3"] if i % 2 else ["CRISPR is a genome editing tool"],
+            "retrieved_ids": [] if empty else [f"c{j}" for j in range(i % 4, i % 4 + 3)],
+            "chunk_texts": [] if empty else ["CRISPR is a genome editing tool", "It cuts DNA", "Bananas are yellow"],
+        })
+    jsonl, parquet = tmp_path / "data.jsonl", tmp_path / "data.parquet"
+    jsonl.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    pq.write_table(pa.Table.from_pylist(rows), parquet)
+
+    metrics = ["recall@5", "mrr", "ndcg@5", "groundedness", "context_recall", "context_precision"]
+    expected = evaluate(str(jsonl), metrics, chunk_size=7)
+    scores = evaluate(str(parquet), metrics, chunk_size=7)
+    for metric in metrics:
+        assert scores[metric] == pytest.approx(expected[metric], nan_ok=True), metric
+
+
+def test_column_projection(tmp_path):
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.Table.from_pylist(_rows(5)), path)
+
+    batches = list(iter_column_batches(path, ["retrieved_ids", "relevant_ids"], batch_size=2))
+
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    assert batches[0].schema.names == ["relevant_ids", "retrieved_ids"]
+    assert batches[0].column("retrieved_ids").to_pylist()[1] == ["c1", "c2", "c3", "c4", "c5"]
+
+
+def test_hit_codes_match_hit_lists():
+    rng = np.random.default_rng(0)
+    retrieved = [list(rng.integers(0, 8, rng.integers(0, 7))) for _ in range(50)]
+    relevant = [list(rng.integers(0, 8, rng.integers(0, 4))) for _ in range(50)]
+
+    def flat(lists):
+        offsets = np.concatenate([[0], np.cumsum([len(l) for l in lists])])
+        return offsets, np.array([x for l in lists for x in l], dtype=np.int64)
+
+    expected = encode_hits(retrieved, relevant, depth=5)
+    actual = encode_hit_codes(*flat(retrieved), *flat(relevant), depth=5)
+
+    for a, b in zip(actual, expected):
+        np.testing.assert_array_equal(a, b)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.context_quality import context_relevance, context_scores
+from guage_kit.metrics.encoders import HashingEncoder
+
+METRICS = ["context_precision", "context_recall", "context_utilization", "noise_sensitivity"]
+ANSWERS = ["Paris is the capital of France. Bananas are blue."]
+CHUNKS = [["Bananas are blue in this story.", "Paris is the capital of France.", "Cars have four wheels."]]
+
+
+def test_relevance_from_reference_statements():
+    relevance = context_relevance(ANSWERS, CHUNKS, references=[["The capital of France is Paris. It has two million people."]])
+
+    np.testing.assert_array_equal(relevance.relevant, [False, True, False])
+    np.testing.assert_array_equal(relevance.used, [True, True, False])
+    scores = context_scores(relevance)
+    # The only relevant chunk is ranked second
+    assert scores["context_precision"][0] == 0.5
+    # "It has two million people." is not supported by any chunk
+    assert scores["context_recall"][0] == 0.5
+    assert scores["context_utilization"][0] == pytest.approx(2 / 3)
+    # "Bananas are blue." comes from an irrelevant chunk only
+    assert scores["noise_sensitivity"][0] == 0.5
+
+    embedded = context_scores(context_relevance(
+        ANSWERS, CHUNKS, references=[["The capital of France is Paris."]], mode="embedding",
+        encoder=HashingEncoder(), threshold=0.6,
+    ))
+    assert embedded["context_precision"][0] == 0.5
+
+
+def test_relevance_from_id_labels_and_missing_inputs():
+    relevance = context_relevance(
+        ANSWERS + ["Anything.", "Bananas."], CHUNKS + [None, ["text"]],
+        retrieved_ids=[["c1", "c2", "c3"], None, ["c9"]], relevant_ids=[["c1", "c2", "c7"], ["c1"], None], mode="ids",
+    )
+    scores = context_scores(relevance, has_retrieval=np.array([True, False, True]))
+
+    assert scores["context_precision"][0] == 1.0
+    assert scores["context_recall"][0] == pytest.approx(2 / 3)
+    assert scores["noise_sensitivity"][0] == 0.0
+    assert all(np.isnan(scores[metric][1]) for metric in METRICS)
+    # No relevance labels: only utilization is defined
+    assert np.isnan(scores["context_precision"][2]) and scores["context_utilization"][2] == 0.0
+    with pytest.raises(ValueError, match="references"):
+        context_relevance(ANSWERS, CHUNKS)
+
+
+def test_evaluate_scores_context_metrics_in_one_family():
+    rows = [
+        {"id": "a", "prompt": "Capital of France?", "answer": ANSWERS[0], "reference": "The capital of France is Paris.",
+         "retrieved_ids": ["c1", "c2", "c3"], "contexts": CHUNKS[0]},
+        {"id": "b", "prompt": "Colour of bananas?", "answer": "Bananas are yellow.", "reference": "Bananas are yellow.",
+         "retrieved_ids": ["c4"], "contexts": ["Ripe bananas are yellow."]},
+        {"id": "c", "prompt": "No retrieval", "answer": "Unknown.", "reference": "Unknown."},
+    ]
+
+    scores = evaluate(rows, METRICS + ["groundedness"], chunk_size=2)
+
+    assert scores["context_precision"] == pytest.approx(0.75)
+    assert scores["context_recall"] == 1.0
+    assert scores["noise_sensitivity"] == 0.25
+    labelled = [dict(row, references=["c2"]) for row in rows]
+    by_ids = evaluate(labelled, METRICS, config={"context.relevance": "ids"})
+    assert by_ids["context_precision"] == pytest.approx(0.25)
+    assert by_ids["context_recall"] == 0.5
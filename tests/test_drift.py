@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from guage_kit.metrics.drift import DriftSketch, compare_sketches, embedding_drift, projection_distances, sketch_embeddings
+
+
+def _snapshot(n=20_000, dim=16, shift=0.0, scale=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.normal(size=(n, dim)) * scale + shift).astype(np.float32)
+
+
+def test_projection_distances_match_raw_vectors():
+    reference, current = _snapshot(), _snapshot(shift=0.05, scale=1.2, seed=1)
+    ref_sketch = sketch_embeddings(reference, chunk_size=3000)
+    cur_sketch = sketch_embeddings(current, chunk_size=3000, like=ref_sketch)
+
+    ks, wasserstein = projection_distances(ref_sketch, cur_sketch)
+
+    for p in range(4):
+        direction = ref_sketch.projections[:, p]
+        a, b = reference @ direction, current @ direction
+        assert ks[p] == pytest.approx(stats.ks_2samp(a, b).statistic, abs=0.005)
+        assert wasserstein[p] == pytest.approx(stats.wasserstein_distance(a, b), rel=0.02)
+
+
+def test_drift_is_small_between_samples_of_one_distribution_and_large_after_a_shift():
+    reference = sketch_embeddings(_snapshot())
+    same = compare_sketches(reference, sketch_embeddings(_snapshot(seed=1), like=reference))
+    shifted = compare_sketches(reference, sketch_embeddings(_snapshot(shift=0.3, seed=2), like=reference))
+
+    assert shifted["centroid_shift"] == pytest.approx(0.3 * 4, rel=0.05)
+    for key in ("centroid_shift", "frechet_distance", "ks_max", "wasserstein_mean", "mmd2"):
+        assert shifted[key] > 3 * max(same[key], 1e-3), key
+    assert same["coverage"] > 0.9 > shifted["coverage"]
+    assert shifted["outlier_rate"] > same["outlier_rate"]
+
+
+def test_reservoir_is_uniform_and_merged_npy_sketch_matches(tmp_path):
+    rows = np.repeat(np.arange(50_000, dtype=np.float32)[:, None], 2, axis=1)
+    path = tmp_path / "rows.npy"
+    np.save(path, rows)
+
+    single = sketch_embeddings(rows, chunk_size=1000, reservoir_size=2000)
+    merged = sketch_embeddings(str(path), chunk_size=1000, reservoir_size=2000, num_workers=3)
+
+    for sketch in (single, merged):
+        sample = sketch.reservoir[:, 0]
+        assert len(np.unique(sample)) == 2000
+        assert stats.kstest(sample / 50_000, "uniform").pvalue > 0.001
+    assert merged.count == single.count == 50_000
+    np.testing.assert_array_equal(merged.histograms, single.histograms)
+
+
+def test_saved_sketch_round_trips(tmp_path):
+    reference = sketch_embeddings(_snapshot(5000), reservoir_size=500)
+    reference.save(tmp_path / "reference.npz")
+    current = _snapshot(5000, shift=0.1, seed=1)
+
+    loaded = DriftSketch.load(tmp_path / "reference.npz")
+
+    assert loaded.count == 5000 and loaded.projection_range == reference.projection_range
+    assert embedding_drift(tmp_path / "reference.npz", current) == embedding_drift(reference, current)
+    with pytest.raises(ValueError, match="projections"):
+        compare_sketches(reference, sketch_embeddings(current, seed=1))
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from guage_kit.metrics.embedding_stats import EmbeddingStats, embedding_statistics
+from guage_kit.metrics.embeddings import intrinsic_metrics
+
+
+def _embeddings(n=5000, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.normal(size=(n, dim)) * np.linspace(0.5, 2.0, dim) + 0.3).astype(np.float32)
+
+
+def test_streaming_moments_match_dense():
+    X = _embeddings()
+
+    stats = embedding_statistics(X, chunk_size=700)
+
+    assert stats["count"] == len(X)
+    np.testing.assert_allclose(stats["mean"], X.mean(axis=0, dtype=np.float64), atol=1e-6)
+    np.testing.assert_allclose(stats["var"], X.var(axis=0, dtype=np.float64), rtol=1e-5)
+    eigenvalues = np.linalg.eigvalsh(np.cov(X.T.astype(np.float64), bias=True))
+    p = eigenvalues / eigenvalues.sum()
+    assert stats["effective_rank"] == pytest.approx(np.exp(-(p * np.log(p)).sum()), rel=1e-6)
+    assert stats["isotropy"] == pytest.approx(stats["effective_rank"] / 16)
+
+    norms = np.linalg.norm(X, axis=1)
+    assert stats["norm_mean"] == pytest.approx(norms.mean(), rel=1e-5)
+    assert stats["norm_p50"] == pytest.approx(np.median(norms), rel=0.03)
+    units = X / norms[:, None]
+    pairwise = units @ units.T
+    assert stats["anisotropy"] == pytest.approx((pairwise.sum() - len(X)) / (len(X) * (len(X) - 1)), rel=1e-4)
+
+
+def test_merge_matches_single_pass():
+    X = _embeddings(3000)
+    left, right = EmbeddingStats(16), EmbeddingStats(16)
+    left.update(X[:1234])
+    right.update(X[1234:])
+    left.merge(right)
+
+    expected = embedding_statistics(X)
+    merged = left.result()
+    for key in ("mean", "var", "anisotropy", "effective_rank", "norm_p95"):
+        np.testing.assert_allclose(merged[key], expected[key], rtol=1e-6, atol=1e-9)
+
+
+def test_npy_workers_and_intrinsic_metrics(tmp_path):
+    X = _embeddings(2000)
+    path = tmp_path / "emb.npy"
+    np.save(path, X)
+
+    parallel = embedding_statistics(str(path), chunk_size=300, num_workers=2)
+    metrics = intrinsic_metrics(X.tolist())
+
+    np.testing.assert_allclose(parallel["var"], metrics["var"], rtol=1e-6)
+    np.testing.assert_allclose(metrics["std"], X.std(axis=0, dtype=np.float64), rtol=1e-5)
+
+
+def test_parquet_source(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    X = _embeddings(500, dim=8)
+    path = tmp_path / "emb.parquet"
+    pq.write_table(pa.table({"embedding": list(X)}), path)
+
+    stats = embedding_statistics(str(path), chunk_size=128, covariance=False)
+
+    np.testing.assert_allclose(stats["mean"], X.mean(axis=0, dtype=np.float64), atol=1e-6)
+    assert "effective_rank" not in stats
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.embeddings import semantic_similarity_scores
+from guage_kit.metrics.encoders import HashingEncoder, VectorCache, paired_cosine
+
+
+class CountingEncoder(HashingEncoder):
+    def __init__(self, **kwargs):
+        super().__init__(n_features=64, **kwargs)
+        self.encoded = []
+
+    def _encode_batch(self, texts):
+        self.encoded.extend(texts)
+        return super()._encode_batch(texts)
+
+
+def test_encoder_normalises_and_deduplicates():
+    encoder = CountingEncoder(batch_size=2)
+
+    vectors = encoder.encode(["a cat", "a dog", "a cat", "", "a bird"])
+
+    assert vectors.shape == (5, 64)
+    assert encoder.encoded == ["a cat", "a dog", "", "a bird"]
+    np.testing.assert_allclose(np.linalg.norm(vectors[[0, 1, 4]], axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+    assert not vectors[3].any()
+
+
+def test_vector_cache_is_reused_across_encoders(tmp_path):
+    texts = ["the reference answer", "another reference", "a prediction"]
+    first = CountingEncoder(cache_dir=tmp_path).encode(texts)
+
+    second_encoder = CountingEncoder(cache_dir=tmp_path)
+    second = second_encoder.encode(texts + ["something new"])
+
+    assert second_encoder.encoded == ["something new"]
+    np.testing.assert_array_equal(second[:3], first)
+    assert len(second_encoder.cache) == 4
+
+
+def test_vector_cache_ignores_partial_rows(tmp_path):
+    cache = VectorCache(tmp_path, dim=4, dtype="float32")
+    cache.add([b"k" * 16], np.ones((1, 4), dtype=np.float32))
+    with open(cache.vectors_path, "ab") as f:
+        f.write(b"\x00" * 6)  # Interrupted writer
+
+    reopened = VectorCache(tmp_path, dim=4, dtype="float32")
+    reopened.add([b"j" * 16], np.full((1, 4), 2.0, dtype=np.float32))
+
+    rows = reopened.lookup([b"k" * 16, b"j" * 16, b"x" * 16])
+    assert rows.tolist() == [0, 1, -1]
+    np.testing.assert_array_equal(reopened.get(rows[:2]), [[1] * 4, [2] * 4])
+
+
+def test_similarity_scores():
+    encoder = HashingEncoder()
+
+    assert paired_cosine(encoder, ["same text"], ["same text"])[0] == pytest.approx(1.0)
+    scores = semantic_similarity_scores(
+        ["red apples", "blue sky", "anything"], [["green pears", "red apples"], ["grey sea"], []], encoder=encoder
+    )
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[1] == pytest.approx(0.0)
+    assert np.isnan(scores[2])
+
+
+def test_evaluate_sts_spearman_uses_gold_scores():
+    rows = [
+        {"prompt": "a man is playing a guitar", "prediction": "a man is playing a guitar", "sts_score": 5.0},
+        {"prompt": "a man is playing a guitar", "prediction": "a man is playing the flute", "sts_score": 3.0},
+        {"prompt": "a man is playing a guitar", "prediction": "a woman slices an onion", "sts_score": 0.5},
+        {"prompt": "a dog runs", "prediction": "a dog runs fast", "sts_score": 4.0},
+        {"prompt": "no gold", "prediction": "score here"},
+    ]
+
+    scores = evaluate(rows, ["sts_spearman", "semantic_similarity"])
+
+    assert scores["sts_spearman"] == pytest.approx(1.0)
+    assert evaluate(rows[-1:], ["sts_spearman"])["sts_spearman"] == 0.0
+
+
+def test_sentence_transformer_encoder_loads_model_on_first_use(monkeypatch):
+    from guage_kit.metrics import encoders
+
+    loaded = []
+
+    class FakeModel:
+        def __init__(self, name, device):
+            loaded.append(name)
+
+        def get_sentence_embedding_dimension(self):
+            return 3
+
+        def encode(self, texts, **kwargs):
+            return np.ones((len(texts), 3), dtype=np.float32) / np.sqrt(3)
+
+    monkeypatch.setattr(encoders, "HAS_SENTENCE_TRANSFORMERS", True)
+    monkeypatch.setattr(encoders, "SentenceTransformer", FakeModel, raising=False)
+
+    encoder = encoders.SentenceTransformerEncoder("fake-model")
+    assert loaded == []
+    assert encoder.encode(["a", "b"]).shape == (2, 3)
+    assert encoder.dim == 3 and loaded == ["fake-model"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.groundedness import groundedness_scores
+
+METRICS = ["groundedness", "faithfulness", "longest_supported_span", "unsupported_token_rate"]
+
+
+def test_scores_against_each_samples_own_chunks():
+    contexts = [
+        ["Paris is the capital of France. It has 2 million people.", "The Eiffel Tower was built in 1889."],
+        ["The Eiffel Tower was built in 1889."],
+        None,
+        ["Paris"],
+    ]
+    answers = [
+        "Paris is the capital of France. The tower was built by aliens in 1920.",
+        "Paris is the capital of France.",
+        "Paris is the capital of France.",
+        "Paris",
+    ]
+
+    scores = groundedness_scores(answers, contexts)
+
+    # 6 tokens of the first sentence plus "tower was built" out of 14
+    assert scores["groundedness"][0] == pytest.approx(9 / 14)
+    assert scores["faithfulness"][0] == 0.5
+    assert scores["longest_supported_span"][0] == 6
+    # "aliens" and "1920" of 7 content words are missing from the context
+    assert scores["unsupported_token_rate"][0] == pytest.approx(2 / 7)
+    # Another sample's chunks do not count
+    assert scores["groundedness"][1] == 0 and scores["unsupported_token_rate"][1] == 1
+    assert all(np.isnan(scores[metric][2]) for metric in METRICS)
+    # Answers shorter than the n-gram size are matched word by word
+    assert scores["groundedness"][3] == 1 and scores["longest_supported_span"][3] == 1
+
+
+def test_ngram_size_controls_verbatim_support():
+    context = [["the quick brown fox jumps over the lazy dog"]]
+    answer = ["the quick brown cat jumps over the lazy dog"]
+
+    assert groundedness_scores(answer, context, ngram=1)["groundedness"][0] == pytest.approx(8 / 9)
+    assert groundedness_scores(answer, context, ngram=3)["groundedness"][0] == pytest.approx(8 / 9)
+    assert groundedness_scores(answer, context, ngram=4)["groundedness"][0] == pytest.approx(5 / 9)
+    assert groundedness_scores(answer, context, ngram=3)["longest_supported_span"][0] == 5
+
+
+def test_evaluate_reads_chunk_texts_from_nested_and_flat_rows(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    nested = [
+        {
+            "query": {"id": f"q{i}", "prompt": "What is CRISPR?"},
+            "retrieval": None if i == 3 else {
+                "query_id": f"q{i}",
+                "chunks": [{"id": f"c{j}", "text": f"CRISPR is a genome editing tool number {j}"} for j in range(i + 1)],
+            },
+            "generation": {"query_id": f"q{i}", "text": f"CRISPR is a genome editing tool. It was found on Mars {i}."},
+        }
+        for i in range(5)
+    ]
+    flat = [
+        {"id": row["query"]["id"], "prompt": row["query"]["prompt"], "answer": row["generation"]["text"],
+         "chunk_texts": [chunk["text"] for chunk in row["retrieval"]["chunks"]] if row["retrieval"] else None}
+        for row in nested
+    ]
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.Table.from_pylist(nested), path)
+
+    expected = evaluate(nested, METRICS, chunk_size=2)
+
+    assert expected["faithfulness"] == 0.5
+    assert evaluate(str(path), METRICS, chunk_size=2) == pytest.approx(expected)
+    assert evaluate(flat, METRICS) == pytest.approx(expected)
+    assert evaluate(nested, ["groundedness"], config={"groundedness.ngram": 8})["groundedness"] < expected["groundedness"]
@@ -0,0 +1,96 @@
+import numpy as np
+
+from guage_kit.metrics.hallucination import (
+    EntailmentModel,
+    claim_support_scores,
+    evaluate_hallucination,
+    is_claim_supported,
+    split_claims,
+)
+from guage_kit.utils.cache import DiskCache
+
+
+class CountingModel(EntailmentModel):
+    """Supports a claim when the premise contains it verbatim and records every scored pair."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def fingerprint(self):
+        return "counting"
+
+    def _predict_batch(self, premises, hypotheses):
+        self.calls.append(list(zip(premises, hypotheses)))
+        return np.array([float(h.rstrip('.') in p) for p, h in zip(premises, hypotheses)])
+
+
+def _sample(query_id, answer, chunks):
+    return {
+        "query": {"id": query_id, "prompt": "q"},
+        "generation": {"query_id": query_id, "text": answer},
+        "retrieval": {"query_id": query_id, "chunks": [{"id": str(i), "text": t} for i, t in enumerate(chunks)]},
+    }
+
+
+def test_split_claims():
+    text = "Dr. Smith founded Acme Inc. in 1999. Revenue grew 5.2% in 2020! Is it big?\n- It has 300 staff.\n2. It is in the U.S. Navy yard."
+
+    assert split_claims(text) == [
+        "Dr. Smith founded Acme Inc. in 1999.",
+        "Revenue grew 5.2% in 2020!",
+        "Is it big?",
+        "It has 300 staff.",
+        "It is in the U.S. Navy yard.",
+    ]
+    assert split_claims("") == []
+
+
+def test_prefilter_limits_pairs_sent_to_the_model():
+    chunks = [
+        "The Eiffel Tower in Paris was completed in 1889",
+        "Paris is the capital of France",
+        "Bananas are rich in potassium",
+    ]
+    claims = [["The Eiffel Tower was completed in 1889.", "The moon is made of cheese."], []]
+    model = CountingModel(batch_size=1)
+
+    scores = claim_support_scores(claims, [chunks, chunks], model, min_overlap=0.3, max_candidates=1)
+
+    assert [s.tolist() for s in scores] == [[0.0, 0.0], []]
+    # Only the best chunk of the first claim passes; the second claim shares no content words
+    assert model.calls == [[(chunks[0], claims[0][0])]]
+
+
+def test_verdicts_are_cached(tmp_path):
+    cache = DiskCache(tmp_path / "verdicts.sqlite")
+    premises, hypotheses = ["a b c", "a b c", "x y"], ["a b", "a b", "z"]
+
+    first = CountingModel(cache=cache)
+    assert first.predict(premises, hypotheses).tolist() == [1.0, 1.0, 0.0]
+    assert sum(len(batch) for batch in first.calls) == 2
+
+    second = CountingModel(cache=cache)
+    assert second.predict(premises, hypotheses).tolist() == [1.0, 1.0, 0.0]
+    assert second.calls == []
+
+
+def test_evaluate_hallucination_flags_unsupported_claims():
+    context = ["The Eiffel Tower, located in Paris, was completed in 1889 for the World's Fair."]
+    samples = [
+        _sample("q1", "The Eiffel Tower is in Paris. It was completed in 1889. The tower is made of chocolate.", context),
+        _sample("q2", "The Eiffel Tower was completed in 1889.", context),
+        _sample("q3", "Nothing was retrieved for this answer.", []),
+    ]
+
+    result = evaluate_hallucination(samples, chunk_size=2)
+
+    assert result.num_claims == 5
+    assert [(c.query_id, c.claim) for c in result.unsupported_claims] == [
+        ("q1", "The tower is made of chocolate."),
+        ("q3", "Nothing was retrieved for this answer."),
+    ]
+    assert result.unsupported_claim_rate == 2 / 5
+    assert result.samples_with_unsupported == 2
+    assert is_claim_supported("Paris is the capital of France", ["France's capital is Paris."])
+    assert not is_claim_supported("Paris is the capital of Spain", ["France's capital is Paris."])
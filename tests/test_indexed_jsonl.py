@@ -0,0 +1,75 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.datasets.indexed import IndexedJsonl, index_path_for, iter_byte_range
+from guage_kit.datasets.loaders import iter_jsonl
+
+
+def _write(path, rows, blank_every=3):
+    with open(path, "w") as f:
+        for i, row in enumerate(rows):
+            if i % blank_every == 0:
+                f.write("\n   \n")
+            f.write(json.dumps(row) + "\n")
+
+
+ROWS = [
+    {"id": f"q{i}", "prompt": f"question {i}", "prediction": "an answer" * (i % 4), "references": [f"answer {i}"]}
+    for i in range(20)
+]
+
+
+def test_random_access_matches_sequential_reader(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, ROWS)
+
+    rows = IndexedJsonl(path)
+
+    assert len(rows) == len(ROWS)
+    assert list(rows) == list(iter_jsonl(path)) == ROWS
+    assert rows[7] == ROWS[7]
+    assert rows[-1] == ROWS[-1]
+    with pytest.raises(IndexError):
+        rows[len(ROWS)]
+
+
+def test_index_is_cached_and_invalidated(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, ROWS[:5])
+    assert len(IndexedJsonl(path)) == 5
+    assert index_path_for(path).exists()
+
+    with open(path, "a") as f:
+        f.write(json.dumps(ROWS[5]) + "\n")
+    os.utime(path, ns=(0, 10**18))
+
+    assert len(IndexedJsonl(path)) == 6
+
+
+def test_shards_cover_every_row_once(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, ROWS)
+    rows = pickle.loads(pickle.dumps(IndexedJsonl(path)))
+
+    parsed = []
+    for first_row, start, end in rows.shards(6):
+        shard = list(iter_byte_range(path, start, end))
+        assert shard == ROWS[first_row:first_row + len(shard)]
+        parsed.extend(shard)
+
+    assert parsed == ROWS
+
+
+def test_parallel_jsonl_matches_serial(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write(path, ROWS)
+    metrics = ["rougeL", "bleu", "answer_relevancy"]
+
+    serial = evaluate(str(path), metrics)
+    parallel = evaluate(str(path), metrics, parallelism=2, chunk_size=4)
+
+    assert parallel == pytest.approx(serial)
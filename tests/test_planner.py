@@ -0,0 +1,43 @@
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.planner import RetrievalFamily, RougeFamily, plan_metrics
+from guage_kit.schemas.core import ContextChunk, EvalSample, Generation, Query, RetrievalResult
+
+
+def _sample(i):
+    return EvalSample(
+        query=Query(id=f"q{i}", prompt="What is CRISPR?", references=["c1", "c2"]),
+        retrieval=RetrievalResult(query_id=f"q{i}", chunks=[ContextChunk(id=f"c{j}", text="x") for j in range(i, i + 4)]),
+        generation=Generation(query_id=f"q{i}", text="CRISPR edits genomes"),
+    )
+
+
+def test_metrics_are_grouped_into_families():
+    plan = plan_metrics(["rouge1", "rougeL", "recall@1", "recall@5", "ndcg@10", "mrr", "bleu"])
+
+    families = {type(family): family for family in plan.families}
+    assert len(plan.families) == 3
+    assert families[RougeFamily].metrics == ["rouge1", "rougeL"]
+    assert families[RetrievalFamily].metrics == ["recall@1", "recall@5", "ndcg@10", "mrr"]
+    assert plan.columns == {"prediction", "references", "retrieved_ids", "relevant_ids"}
+
+
+def test_plan_scores_every_cutoff_from_one_pass():
+    samples = [_sample(i) for i in range(3)]
+    values = plan_metrics(["recall@1", "recall@5", "precision@2", "map"]).score(samples)
+
+    assert values["recall@1"].tolist() == [0.0, 0.5, 0.5]
+    assert values["recall@5"].tolist() == [1.0, 1.0, 0.5]
+    assert values["precision@2"].tolist() == [0.5, 1.0, 0.5]
+
+
+def test_new_metric_names_are_accepted_by_evaluate():
+    scores = evaluate([_sample(i) for i in range(3)], ["rouge1", "rouge2", "precision@2", "map"])
+
+    assert set(scores) == {"rouge1", "rouge2", "precision@2", "map"}
+
+
+def test_unknown_metric_raises():
+    with pytest.raises(ValueError):
+        plan_metrics(["recall"])
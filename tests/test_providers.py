@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from guage_kit.providers.base import ProviderError, RetryPolicy, TokenBucket
+from guage_kit.providers.bedrock_provider import BedrockProvider
+from guage_kit.providers.openai_compatible import OpenAICompatibleProvider
+from guage_kit.providers.vllm_provider import VLLMProvider
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Minimal OpenAI-compatible server that echoes prompts back in upper case."""
+
+    daemon_threads = True
+
+    def __init__(self, throttle_first=0, delay=0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.throttle_first = throttle_first
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=()):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append((self.path, body))
+            throttled = len(server.requests) <= server.throttle_first
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if throttled:
+                return self._reply(429, {"error": "slow down"}, [("Retry-After", "0.01")])
+            if self.path.endswith("/chat/completions"):
+                prompts = [body["messages"][0]["content"]]
+                choices = [{"index": 0, "message": {"role": "assistant", "content": prompts[0].upper()}}]
+            elif self.path.endswith("/completions"):
+                prompts = body["prompt"]
+                # Out of order on purpose; clients must sort by index
+                choices = [{"index": i, "text": p.upper()} for i, p in reversed(list(enumerate(prompts)))]
+            else:
+                return self._reply(404, {"error": "not found"})
+            usage = {"prompt_tokens": 3 * len(prompts), "completion_tokens": 5 * len(prompts)}
+            self._reply(200, {"model": body["model"], "choices": choices, "usage": usage})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def server(request):
+    kwargs = getattr(request, "param", {})
+    server = FakeOpenAIServer(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("server", [{"delay": 0.05}], indirect=True)
+def test_chat_requests_are_bounded_and_ordered(server):
+    provider = OpenAICompatibleProvider("judge", server.url, api_key="test", max_concurrency=4)
+    prompts = [f"prompt {i}" for i in range(20)]
+
+    responses = provider.generate_many(prompts, temperature=0)
+
+    assert [r.text for r in responses] == [p.upper() for p in prompts]
+    assert server.max_in_flight <= 4
+    assert responses[0].prompt_tokens == 3 and responses[0].completion_tokens == 5
+    assert server.requests[0][1]["temperature"] == 0
+
+
+@pytest.mark.parametrize("server", [{"throttle_first": 2}], indirect=True)
+def test_throttled_requests_are_retried(server):
+    provider = OpenAICompatibleProvider("judge", server.url, retry=RetryPolicy(max_retries=3, base_delay=0.01))
+
+    assert provider.generate_many(["hello"])[0].text == "HELLO"
+    assert len(server.requests) == 3
+
+    strict = OpenAICompatibleProvider("judge", server.url, retry=RetryPolicy(max_retries=0))
+    server.throttle_first = len(server.requests) + 1
+    with pytest.raises(ProviderError) as error:
+        strict.generate_many(["hello"])
+    assert error.value.status == 429
+
+
+def test_vllm_batches_prompts_per_request(server):
+    provider = VLLMProvider("local-model", base_url=server.url, max_batch_size=8)
+    prompts = [f"p{i}" for i in range(20)]
+
+    responses = provider.generate_many(prompts, max_tokens=4)
+
+    assert [r.text for r in responses] == [p.upper() for p in prompts]
+    assert [len(body["prompt"]) for _, body in server.requests] == [8, 8, 4]
+    assert provider.generate("hi")["generated_text"] == "HI"
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate_per_minute=60 * 50, capacity=1)
+
+    async def take(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    start = time.monotonic()
+    asyncio.run(take(6))
+    assert time.monotonic() - start >= 0.09
+
+
+def test_bedrock_runs_blocking_client_in_threads():
+    class FakeClient:
+        def converse(self, modelId, messages, inferenceConfig):
+            assert inferenceConfig == {"maxTokens": 10}
+            text = messages[0]["content"][0]["text"]
+            return {"output": {"message": {"content": [{"text": text[::-1]}]}}, "usage": {"inputTokens": 1, "outputTokens": 2}}
+
+    provider = BedrockProvider("anthropic.model", client=FakeClient())
+
+    responses = provider.generate_many(["abc", "xyz"], max_tokens=10)
+
+    assert [r.text for r in responses] == ["cba", "zyx"]
+    assert responses[1].completion_tokens == 2
+
+
+@pytest.mark.parametrize("server", [{"delay": 0.05}], indirect=True)
+def test_response_cache_and_single_flight(server, tmp_path):
+    def provider():
+        return OpenAICompatibleProvider("judge", server.url, cache=str(tmp_path), cache_ttl=3600)
+
+    first = provider().generate_many(["same", "same", "other", "same"], temperature=0)
+
+    assert [r.text for r in first] == ["SAME", "SAME", "OTHER", "SAME"]
+    assert len(server.requests) == 2
+    assert not any(r.cached for r in first)
+
+    again = provider().generate_many(["same", "other"], temperature=0)
+    assert [r.text for r in again] == ["SAME", "OTHER"]
+    assert all(r.cached for r in again)
+    assert len(server.requests) == 2
+
+    # Different sampling parameters are a different request
+    provider().generate_many(["same"], temperature=1)
+    assert len(server.requests) == 3
+
+
+@pytest.mark.parametrize("server", [{"delay": 0.05}], indirect=True)
+def test_concurrent_identical_prompts_share_one_request(server):
+    provider = OpenAICompatibleProvider("judge", server.url)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(provider.agenerate("hello") for _ in range(5)))
+        finally:
+            await provider.aclose()
+
+    responses = asyncio.run(run())
+
+    assert [r.text for r in responses] == ["HELLO"] * 5
+    assert len(server.requests) == 1
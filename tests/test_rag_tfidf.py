@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pytest
+
+from guage_kit.api import evaluate
+from guage_kit.metrics.rag_quality import TfidfSimilarityModel, answer_relevancy_scores
+
+QUERIES = ["What is CRISPR?", "What is the capital of France?", "Who wrote Hamlet?"]
+ANSWERS = ["CRISPR is a genome editing tool.", "Paris is the capital of France.", "I am not sure."]
+
+
+def test_paired_cosine_matches_dense_cosine():
+    model = TfidfSimilarityModel().fit(QUERIES + ANSWERS)
+
+    scores = model.paired_cosine(QUERIES, ANSWERS)
+
+    a = model.vectorizer.transform(QUERIES).toarray()
+    b = model.vectorizer.transform(ANSWERS).toarray()
+    expected = [x @ y / (np.linalg.norm(x) * np.linalg.norm(y) or 1.0) for x, y in zip(a, b)]
+    assert scores == pytest.approx(expected)
+    assert scores[2] == 0.0
+
+
+def test_model_round_trips_through_disk(tmp_path):
+    model = TfidfSimilarityModel().fit(QUERIES + ANSWERS)
+    model.save(tmp_path / "tfidf.npz")
+
+    loaded = TfidfSimilarityModel.load(tmp_path / "tfidf.npz")
+
+    assert answer_relevancy_scores(QUERIES, ANSWERS, model=loaded) == pytest.approx(
+        model.paired_cosine(QUERIES, ANSWERS)
+    )
+    assert loaded.fingerprint() == model.fingerprint()
+
+    bigrams = TfidfSimilarityModel(ngram_range=(1, 2), stop_words=["is", "the"], sublinear_tf=True)
+    bigrams.fit(QUERIES + ANSWERS).save(tmp_path / "bigrams.model")
+    assert TfidfSimilarityModel.load(tmp_path / "bigrams.model").paired_cosine(QUERIES, ANSWERS) == pytest.approx(
+        bigrams.paired_cosine(QUERIES, ANSWERS)
+    )
+    with pytest.raises(ValueError):
+        TfidfSimilarityModel(tokenizer=str.split, token_pattern=None).fit(QUERIES).save(tmp_path / "callable.npz")
+
+
+def test_evaluate_corpus_mode(tmp_path):
+    path = tmp_path / "data.jsonl"
+    with open(path, "w") as f:
+        for i, (q, a) in enumerate(zip(QUERIES, ANSWERS)):
+            f.write(json.dumps({"id": f"q{i}", "prompt": q, "prediction": a}) + "\n")
+
+    model = TfidfSimilarityModel().fit(QUERIES + ANSWERS)
+    scores = evaluate(str(path), ["answer_relevancy"], config={"rag.tfidf": "corpus"}, parallelism=2, chunk_size=2)
+
+    assert scores["answer_relevancy"] == pytest.approx(model.paired_cosine(QUERIES, ANSWERS).mean())
+
+
+def test_corpus_mode_rejects_one_shot_iterators():
+    rows = iter([{"prompt": QUERIES[0], "prediction": ANSWERS[0]}])
+
+    with pytest.raises(ValueError):
+        evaluate(rows, ["answer_relevancy"], config={"rag.tfidf": "corpus"})
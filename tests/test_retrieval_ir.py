@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from guage_kit.metrics.retrieval_ir import (
+    encode_hits,
+    mean_average_precision,
+    precision_at_k,
+    recall_at_k,
+    retrieval_scores,
+    sample_retrieval_code_scores,
+    sample_retrieval_scores,
+)
+
+
+def _random_run(n_queries=200, seed=0):
+    rng = np.random.default_rng(seed)
+    retrieved = [[f"d{j}" for j in rng.integers(0, 30, rng.integers(0, 15))] for _ in range(n_queries)]
+    relevant = [[f"d{j}" for j in rng.integers(0, 30, rng.integers(0, 4))] for _ in range(n_queries)]
+    return retrieved, relevant
+
+
+def _ndcg(retrieved, relevant, k):
+    rel = set(relevant)
+    seen, dcg = set(), 0.0
+    for rank, doc_id in enumerate(retrieved[:k]):
+        if doc_id in rel and doc_id not in seen:
+            dcg += 1.0 / np.log2(rank + 2)
+            seen.add(doc_id)
+    idcg = sum(1.0 / np.log2(rank + 2) for rank in range(min(len(rel), k)))
+    return dcg / idcg if idcg else 0.0
+
+
+def _average_precision(retrieved, relevant):
+    rel = set(relevant)
+    seen, ap = set(), 0.0
+    for k, doc_id in enumerate(retrieved, 1):
+        if doc_id in rel and doc_id not in seen:
+            seen.add(doc_id)
+            ap += precision_at_k(retrieved, relevant, k)
+    return ap / len(rel) if rel else 0.0
+
+
+def test_vectorized_scores_match_reference_implementations():
+    retrieved, relevant = _random_run()
+    metrics = ["recall@1", "recall@5", "recall@100", "precision@3", "ndcg@5", "ndcg@20", "mrr", "map"]
+
+    scores = retrieval_scores(encode_hits(retrieved, relevant), metrics)
+
+    for i, (ret, rel) in enumerate(zip(retrieved, relevant)):
+        assert scores["recall@1"][i] == pytest.approx(recall_at_k(ret, rel, 1))
+        assert scores["recall@5"][i] == pytest.approx(recall_at_k(ret, rel, 5))
+        assert scores["recall@100"][i] == pytest.approx(recall_at_k(ret, rel, 100))
+        assert scores["precision@3"][i] == pytest.approx(precision_at_k(ret, rel, 3))
+        assert scores["ndcg@5"][i] == pytest.approx(_ndcg(ret, rel, 5))
+        assert scores["ndcg@20"][i] == pytest.approx(_ndcg(ret, rel, 20))
+        assert scores["map"][i] == pytest.approx(_average_precision(ret, rel))
+        first = next((r for r, d in enumerate(ret, 1) if d in set(rel)), None)
+        assert scores["mrr"][i] == pytest.approx(1.0 / first if first else 0.0)
+
+
+def test_mean_average_precision():
+    retrieved = [["a", "b", "c"], ["x", "y"]]
+    relevant = [["a", "c"], ["y"]]
+
+    # (1/1 + 2/3) / 2 for the first query, 1/2 for the second
+    assert mean_average_precision(retrieved, relevant) == pytest.approx(((1 + 2 / 3) / 2 + 0.5) / 2)
+
+
+def test_cutoff_is_required():
+    with pytest.raises(ValueError):
+        retrieval_scores(encode_hits([["a"]], [["a"]]), ["ndcg"])
+
+
+def test_all_empty_retrievals_score_zero():
+    metrics = ["recall@5", "precision@5", "ndcg@5", "mrr", "map"]
+    # A chunk where every scorable sample retrieved nothing encodes a depth-0 hit matrix
+    scores = sample_retrieval_scores([[], []], [["a"], ["b"]], metrics)
+    codes = sample_retrieval_code_scores([0, 0, 0], [], [0, 1, 2], [0, 1], metrics)
+    for metric in metrics:
+        np.testing.assert_array_equal(scores[metric], [0.0, 0.0])
+        np.testing.assert_array_equal(codes[metric], [0.0, 0.0])
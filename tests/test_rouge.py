@@ -0,0 +1,55 @@
+import pytest
+from rouge_score import rouge_scorer
+
+from guage_kit.metrics.llm_quality import compute_rouge, rouge_scores
+
+PREDICTIONS = [
+    "The cats are sitting on the mats.",
+    "CRISPR is a genome editing technology.",
+    "",
+    "Paris is the capital of France, and the capital is big.",
+]
+REFERENCES = [
+    ["The cat sat on the mat.", "A cat is sitting on a mat."],
+    ["A genome editing tool"],
+    ["Nothing was generated"],
+    ["The capital of France is Paris.", "Paris", "France's capital city is Paris."],
+]
+
+
+def _reference_scores(reduce):
+    scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
+    expected = {key: [] for key in ["rouge1", "rouge2", "rougeL"]}
+    for pred, refs in zip(PREDICTIONS, REFERENCES):
+        scores = [scorer.score(ref, pred) for ref in refs]
+        for key in expected:
+            expected[key].append(reduce([s[key].fmeasure for s in scores]))
+    return expected
+
+
+@pytest.mark.parametrize("multi_ref,reduce", [("max", max), ("mean", lambda xs: sum(xs) / len(xs))])
+def test_matches_rouge_score_with_multiple_references(multi_ref, reduce):
+    scores = rouge_scores(PREDICTIONS, REFERENCES, multi_ref=multi_ref)
+
+    for key, expected in _reference_scores(reduce).items():
+        assert scores[key] == pytest.approx(expected)
+
+
+def test_worker_batches_match_in_process_scores():
+    serial = rouge_scores(PREDICTIONS * 5, REFERENCES * 5)
+    parallel = rouge_scores(PREDICTIONS * 5, REFERENCES * 5, num_workers=2, batch_size=3)
+
+    for key in serial:
+        assert parallel[key].tolist() == serial[key].tolist()
+
+
+def test_compute_rouge_averages_per_sample_scores():
+    averaged = compute_rouge(PREDICTIONS, REFERENCES)
+
+    for key, expected in _reference_scores(max).items():
+        assert averaged[key] == pytest.approx(sum(expected) / len(expected))
+
+
+def test_unknown_rouge_type_raises():
+    with pytest.raises(ValueError):
+        rouge_scores(PREDICTIONS, REFERENCES, rouge_types=["rougeX"])
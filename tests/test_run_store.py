@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from guage_kit.api import evaluate
+from guage_kit.reporting.run_store import RunStore
+
+
+def _write_rows(path, n):
+    rows = [
+        {"id": f"q{i}", "prompt": "what is x", "prediction": f"x is {i % 7} apples",
+         "reference": f"x is {i % 5} apples", "latency_ms": 10.0 + i, "prompt_tokens": 5}
+        for i in range(n)
+    ]
+    path.write_text("\n".join(json.dumps(row) for row in rows))
+    return path
+
+
+def test_run_store_holds_per_sample_values(tmp_path):
+    data = str(_write_rows(tmp_path / "data.jsonl", 250))
+    metrics = ["rougeL", "bleu"]
+
+    scores = evaluate(data, metrics, chunk_size=100, run_dir=str(tmp_path / "run"))
+
+    assert scores == evaluate(data, metrics, chunk_size=100)
+    store = RunStore(tmp_path / "run")
+    assert store.complete and store.results == scores
+    assert [part["num_rows"] for part in store.manifest["parts"]] == [100, 100, 50]
+
+    table = store.read(["query_id", "rougeL", "latency_ms", "completion_tokens"]).to_pandas()
+    assert table.columns.tolist() == ["query_id", "rougeL", "latency_ms", "completion_tokens"]
+    assert table["query_id"].tolist()[:2] == ["q0", "q1"]
+    assert table["rougeL"].mean() == pytest.approx(scores["rougeL"])
+    assert table["latency_ms"].tolist() == [10.0 + i for i in range(250)]
+    assert table["completion_tokens"].isna().all()
+    # BLEU keeps its per-sample n-gram statistics
+    bleu = next(values for _, _, values in store.iter_parts(["bleu"]))["bleu"]
+    assert bleu.shape == (100, 10)
+
+
+def test_interrupted_run_resumes_after_stored_rows(tmp_path):
+    data = str(_write_rows(tmp_path / "data.jsonl", 250))
+    metrics = ["rougeL", "bleu"]
+    run_dir = tmp_path / "run"
+    expected = evaluate(data, metrics, chunk_size=100, bootstrap=50)
+
+    evaluate(data, metrics, chunk_size=100, run_dir=str(run_dir))
+    # Simulate a crash after the first part was written
+    manifest = json.loads((run_dir / "manifest.json").read_text())
+    manifest.update(parts=manifest["parts"][:1], num_rows=100, complete=False, results=None)
+    (run_dir / "manifest.json").write_text(json.dumps(manifest))
+
+    resumed = evaluate(data, metrics, chunk_size=100, run_dir=str(run_dir), bootstrap=50)
+
+    assert resumed == expected
+    store = RunStore(run_dir)
+    assert store.complete and store.num_rows == 250
+    assert store.read(["row"]).column("row").to_pylist() == list(range(250))
+
+    with pytest.raises(ValueError, match="different"):
+        evaluate(data, metrics, chunk_size=50, run_dir=str(run_dir))
+
+
+def test_append_rejects_gaps(tmp_path):
+    store = RunStore(tmp_path / "run")
+    store.begin(["rougeL"], {}, chunk_size=10)
+
+    with pytest.raises(ValueError, match="starts at row 5"):
+        store.append(5, ["a"], {"rougeL": np.array([1.0])})
+
+
+def test_run_dir_rejects_other_data_and_rewrites_reports(tmp_path):
+    data = str(_write_rows(tmp_path / "a.jsonl", 30))
+    other = tmp_path / "b.jsonl"
+    other.write_text(json.dumps({"id": "q0", "prompt": "p", "prediction": "zzz", "reference": "x is 1 apples"}))
+    run_dir = str(tmp_path / "run")
+    scores = evaluate(data, ["rougeL"], chunk_size=10, run_dir=run_dir)
+
+    with pytest.raises(ValueError, match="data"):
+        evaluate(str(other), ["rougeL"], chunk_size=10, run_dir=run_dir)
+
+    # A completed run still writes the requested reports
+    report = tmp_path / "report.json"
+    assert evaluate(data, ["rougeL"], chunk_size=10, run_dir=run_dir, report={"json": str(report)}) == scores
+    written = json.loads(report.read_text())
+    assert written["metrics"] == scores and written["num_samples"] == 30
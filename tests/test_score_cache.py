@@ -0,0 +1,61 @@
+import pytest
+
+import guage_kit.metrics.planner as planner
+from guage_kit.api import evaluate
+from guage_kit.utils.cache import DiskCache
+
+
+def _rows(n, edited=()):
+    return [
+        {
+            "id": f"q{i}",
+            "prompt": "What is CRISPR?",
+            "prediction": ("edited " if i in edited else "") + f"CRISPR is tool number {i}",
+            "reference": "CRISPR is a genome editing tool",
+        }
+        for i in range(n)
+    ]
+
+
+def test_rerun_only_scores_changed_rows(tmp_path, monkeypatch):
+    scored = []
+    original = planner.rouge_scores
+
+    def counting_rouge_scores(predictions, references, **kwargs):
+        scored.extend(predictions)
+        return original(predictions, references, **kwargs)
+
+    monkeypatch.setattr(planner, "rouge_scores", counting_rouge_scores)
+    metrics = ["rougeL", "answer_relevancy", "bleu"]
+
+    first = evaluate(_rows(20), metrics, cache=str(tmp_path), chunk_size=6)
+    assert len(scored) == 20
+
+    scored.clear()
+    second = evaluate(_rows(20, edited={3}), metrics, cache=str(tmp_path), chunk_size=6)
+    assert scored == ["edited CRISPR is tool number 3"]
+
+    uncached = evaluate(_rows(20, edited={3}), metrics)
+    assert second == pytest.approx(uncached)
+    assert first["rougeL"] != second["rougeL"]
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.set_many({"a": 1.0})
+    cache.set_many({"b": [1.0, 2.0]})
+    cache.get_many(["a"])
+    cache.set_many({"c": float("nan")})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert len(cache) == 2
+
+
+def test_disk_cache_ttl(tmp_path):
+    cache = DiskCache(tmp_path / "c.sqlite", ttl=3600)
+    cache.set_many({"fresh": 1})
+    cache.set_many({"stale": 2}, ttl=-1)
+
+    assert cache.get_many(["fresh", "stale"]) == {"fresh": 1}
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
@@ -0,0 +1,134 @@
+import json
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from guage_kit.api import compare, score_samples
+from guage_kit.cli import main
+from guage_kit.metrics.accumulators import MeanAccumulator
+from guage_kit.metrics.significance import adjust_pvalues, paired_tests
+
+
+def _run(n, worse_every=0):
+    for i in range(n):
+        wrong = worse_every and i % worse_every == 0
+        yield {
+            "id": f"q{i}",
+            "prompt": "Where did the cat sit?",
+            "prediction": "a dog barked" if wrong else f"the cat sat on mat {i}",
+            "references": [f"the cat sat on the mat {i}"],
+        }
+
+
+def test_adjust_pvalues():
+    p = [0.01, 0.04, 0.03, 0.2]
+
+    np.testing.assert_allclose(adjust_pvalues(p, "bonferroni"), [0.04, 0.16, 0.12, 0.8])
+    np.testing.assert_allclose(adjust_pvalues(p, "holm"), [0.04, 0.09, 0.09, 0.2])
+    np.testing.assert_allclose(adjust_pvalues(p, "fdr_bh"), [0.04, 0.0533333, 0.0533333, 0.2], rtol=1e-5)
+    with pytest.raises(ValueError):
+        adjust_pvalues(p, "sidak")
+
+
+def test_paired_tests_detect_shift_and_keep_null_calibrated():
+    rng = np.random.default_rng(0)
+    a = rng.random(20_000)
+    b = a + rng.normal(0.01, 0.05, a.size)
+    same = a + rng.normal(0.0, 0.05, a.size)
+    a[::50] = np.nan  # Dropped from both sides of the pair
+
+    results = paired_tests(
+        {"shift": a, "null": a}, {"shift": b, "null": same},
+        {"shift": MeanAccumulator(), "null": MeanAccumulator()}, n_resamples=2000,
+    )
+
+    valid = ~np.isnan(a)
+    shift = results["shift"]
+    assert shift["delta"] == pytest.approx((b[valid] - a[valid]).mean())
+    assert shift["ci_lower"] < shift["delta"] < shift["ci_upper"]
+    assert shift["p_randomization"] < 0.001 and shift["significant"]
+    assert results["null"]["p_adjusted"] > 0.05 and not results["null"]["significant"]
+
+
+def test_compare_aligns_runs_by_query_id():
+    baseline = list(_run(120, worse_every=3))
+    candidate = list(_run(130))[::-1]  # Different order and extra samples
+
+    result = compare(baseline, candidate, ["rougeL", "bleu"], n_resamples=500)
+
+    assert (result["num_samples"], result["only_a"], result["only_b"]) == (120, 0, 10)
+    for metric in ("rougeL", "bleu"):
+        assert result["metrics"][metric]["delta"] > 0
+        assert result["metrics"][metric]["significant"]
+
+    ids, scores = score_samples(candidate, ["bleu"])
+    assert ids[0] == "q129" and scores["bleu"].shape == (130, 10)
+    with pytest.raises(ValueError):
+        compare(baseline, candidate, ["sts_spearman"])
+
+
+def test_compare_columnar_runs_without_ids(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pa = pytest.importorskip("pyarrow")
+    paths = []
+    for name, rows in (("base", _run(25)), ("cand", _run(25, worse_every=2))):
+        rows = [{key: value for key, value in row.items() if key != "id"} for row in rows]
+        paths.append(str(tmp_path / f"{name}.parquet"))
+        pq.write_table(pa.Table.from_pylist(rows), paths[-1])
+
+    ids, _ = score_samples(paths[0], ["rougeL"], chunk_size=7)
+    assert ids == [str(i) for i in range(25)]
+    result = compare(*paths, ["rougeL"], chunk_size=7, n_resamples=200)
+    assert (result["num_samples"], result["only_a"], result["only_b"]) == (25, 0, 0)
+    assert result["metrics"]["rougeL"]["delta"] < 0
+
+
+def test_cli_compare_fails_on_regression(tmp_path, capsys):
+    paths = {}
+    for name, rows in (("base", _run(60)), ("cand", _run(60, worse_every=2))):
+        paths[name] = tmp_path / f"{name}.jsonl"
+        paths[name].write_text("".join(json.dumps(row) + "\n" for row in rows))
+    argv = ["guage-kit", "compare", "--baseline", str(paths["base"]), "--candidate", str(paths["cand"]),
+            "--metrics", "rougeL", "--resamples", "500"]
+
+    with patch.object(sys, "argv", argv):
+        main()
+    assert json.loads(capsys.readouterr().out)["metrics"]["rougeL"]["delta"] < 0
+
+    with patch.object(sys, "argv", argv + ["--fail-on-regression"]), pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 1
+
+
+def test_cli_regression_gate_respects_lower_is_better_metrics(tmp_path, capsys):
+    rng = np.random.default_rng(0)
+    confidence = rng.random(2000)
+    correct = rng.random(2000) < confidence
+
+    def _calibration_run(name, shift):
+        path = tmp_path / f"{name}.jsonl"
+        rows = ({"id": f"q{i}", "prompt": "q", "prediction": "a", "confidence": min(float(p) + shift, 1.0),
+                 "correct": bool(y)} for i, (p, y) in enumerate(zip(confidence, correct)))
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        return str(path)
+
+    calibrated, overconfident = _calibration_run("calibrated", 0.0), _calibration_run("overconfident", 0.3)
+
+    def _gate(baseline, candidate):
+        argv = ["guage-kit", "compare", "--baseline", baseline, "--candidate", candidate,
+                "--metrics", "ece", "--resamples", "500", "--fail-on-regression"]
+        with patch.object(sys, "argv", argv):
+            main()
+        return json.loads(capsys.readouterr().out)["metrics"]["ece"]
+
+    # Lower ECE is an improvement: positive delta and the gate passes
+    improved = _gate(overconfident, calibrated)
+    assert improved["lower_is_better"] and improved["significant"]
+    assert improved["delta"] == pytest.approx(improved["a"] - improved["b"]) and improved["delta"] > 0
+    assert improved["ci_lower"] <= improved["delta"] <= improved["ci_upper"]
+
+    with pytest.raises(SystemExit) as exit_info:
+        _gate(calibrated, overconfident)
+    assert exit_info.value.code == 1
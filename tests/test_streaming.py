@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from guage_kit.api import evaluate, iter_samples
+from guage_kit.metrics.llm_quality import compute_bleu
+
+
+def _rows(n):
+    for i in range(n):
+        yield {
+            "query": {"id": f"q{i}", "prompt": "What is CRISPR?", "references": ["c1", "c3"] if i % 2 else ["A genome editing tool"]},
+            "retrieval": {
+                "query_id": f"q{i}",
+                "chunks": [{"id": f"c{j}", "text": "CRISPR is a genome editing tool"} for j in range(i % 4, i % 4 + 5)],
+            },
+            "generation": {"query_id": f"q{i}", "text": "CRISPR is a genome editing technology" + " tool" * (i % 3)},
+        }
+
+
+METRICS = ["rougeL", "bleu", "recall@1", "recall@5", "mrr", "ndcg@5", "answer_relevancy"]
+
+
+def test_chunk_size_does_not_change_scores():
+    full = evaluate(list(_rows(40)), METRICS, chunk_size=1000)
+    chunked = evaluate(_rows(40), METRICS, chunk_size=3)
+
+    assert full.keys() == chunked.keys()
+    for metric in METRICS:
+        assert chunked[metric] == pytest.approx(full[metric])
+
+
+def test_streamed_bleu_matches_corpus_bleu():
+    samples = list(iter_samples(_rows(25)))
+    predictions = [s.generation.text for s in samples]
+    references = [s.query.references for s in samples]
+
+    scores = evaluate(iter(samples), ["bleu"], chunk_size=4)
+
+    assert scores["bleu"] == pytest.approx(compute_bleu(predictions, references))
+
+
+def test_evaluate_streams_from_file(tmp_path):
+    path = tmp_path / "data.jsonl"
+    with open(path, "w") as f:
+        for row in _rows(10):
+            f.write(json.dumps(row) + "\n")
+
+    report_path = tmp_path / "report.json"
+    scores = evaluate(str(path), ["recall@5"], chunk_size=4, report={"json": str(report_path)})
+
+    assert 0.0 <= scores["recall@5"] <= 1.0
+    with open(report_path) as f:
+        assert json.load(f)["num_samples"] == 10
+
+
+def test_parallel_scores_match_serial():
+    serial = evaluate(_rows(60), METRICS, chunk_size=7)
+    parallel = evaluate(_rows(60), METRICS, chunk_size=7, parallelism=3)
+
+    assert parallel == serial
+
+
+def test_parallelism_must_be_positive():
+    with pytest.raises(ValueError):
+        evaluate(_rows(2), ["mrr"], parallelism=0)
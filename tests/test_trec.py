@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from guage_kit.datasets.trec import load_qrels, load_trec_run
+from guage_kit.metrics.retrieval_ir import encode_hits, evaluate_trec, retrieval_scores, trec_query_scores
+
+RUN = """\
+q1 Q0 d3 1 3.0 bm25
+q1 Q0 d1 2 2.0 bm25
+q1 Q0 d2 3 2.0 bm25
+q1 Q0 d7 4 1.0 bm25
+q2 Q0 d8 1 5.0 bm25
+q2 Q0 d4 2 4.0 bm25
+qx Q0 d1 1 1.0 bm25
+"""
+
+QRELS = """\
+q1 0 d1 2
+q1 0 d2 1
+q1 0 d3 0
+q1 0 d9 1
+q2 0 d4 1
+q3 0 d5 1
+"""
+
+
+@pytest.fixture
+def trec_files(tmp_path):
+    run, qrels = tmp_path / "run.txt", tmp_path / "qrels.txt"
+    run.write_text(RUN)
+    qrels.write_text(QRELS)
+    return run, qrels
+
+
+def test_load_trec_run_interns_and_ranks(trec_files):
+    run = load_trec_run(trec_files[0])
+    assert list(run.query_ids) == ["q1", "q2", "qx"]
+    assert run.docs.dtype == np.int32
+    assert list(run.offsets) == [0, 4, 6, 7]
+    # Score ties are broken by descending document id, as in trec_eval
+    assert list(run.doc_ids[run.docs[:4]]) == ["d3", "d2", "d1", "d7"]
+
+
+def test_graded_scores_match_hand_computed(trec_files):
+    query_ids, scores = trec_query_scores(*trec_files, ["ndcg@10", "map", "recall@3", "mrr"])
+    assert list(query_ids) == ["q1", "q2"]
+
+    # q1 ranks grades [0, 1, 2, 0]; the ideal ranking is [2, 1, 1]
+    dcg = 1 / np.log2(3) + 2 / np.log2(4)
+    idcg = 2 + 1 / np.log2(3) + 1 / np.log2(4)
+    np.testing.assert_allclose(scores["ndcg@10"], [dcg / idcg, 1 / np.log2(3)])
+    np.testing.assert_allclose(scores["map"], [(1 / 2 + 2 / 3) / 3, 1 / 2])
+    np.testing.assert_allclose(scores["recall@3"], [2 / 3, 1.0])
+    np.testing.assert_allclose(scores["mrr"], [1 / 2, 1 / 2])
+
+    results = evaluate_trec(*trec_files, ["map"], relevance_level=2)
+    assert results == {"map": pytest.approx((1 / 3 + 0.0) / 2), "num_queries": 2}
+    complete = evaluate_trec(*trec_files, ["mrr"], complete=True)
+    assert complete["num_queries"] == 3
+    assert complete["mrr"] == pytest.approx(1 / 3)
+
+
+def test_binary_qrels_match_encode_hits(tmp_path):
+    rng = np.random.default_rng(0)
+    run_lines, qrels_lines, retrieved, relevant = [], [], [], []
+    for q in range(50):
+        docs = [f"d{j}" for j in rng.choice(40, rng.integers(1, 20), replace=False)]
+        rel = sorted({f"d{j}" for j in rng.integers(0, 40, rng.integers(1, 5))})
+        run_lines += [f"q{q:02d} Q0 {doc} {r + 1} {100 - r} run" for r, doc in enumerate(docs)]
+        qrels_lines += [f"q{q:02d}\t{doc}\t1" for doc in rel]
+        retrieved.append(docs)
+        relevant.append(rel)
+    (tmp_path / "run.trec").write_text("\n".join(run_lines))
+    (tmp_path / "qrels.tsv").write_text("query-id\tcorpus-id\tscore\n" + "\n".join(qrels_lines))
+
+    metrics = ["ndcg@5", "ndcg@10", "recall@10", "precision@5", "map", "mrr"]
+    _, scores = trec_query_scores(tmp_path / "run.trec", tmp_path / "qrels.tsv", metrics)
+    expected = retrieval_scores(encode_hits(retrieved, relevant), metrics)
+    for metric in metrics:
+        np.testing.assert_allclose(scores[metric], expected[metric], err_msg=metric)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from guage_kit.metrics.retrieval_ir import encode_hits, retrieval_scores
+from guage_kit.metrics.vector_search import IVFIndex, evaluate_vector_retrieval, exact_top_k
+
+
+def _data(n_docs=3000, n_queries=200, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    corpus = rng.normal(size=(n_docs, dim)).astype(np.float32)
+    # Queries are noisy copies of documents, so the nearest neighbours are meaningful
+    targets = rng.choice(n_docs, n_queries, replace=False)
+    queries = corpus[targets] + 0.3 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+    return corpus, queries, targets
+
+
+def _brute_force(queries, corpus, k):
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    c = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    return np.argsort(-(q @ c.T), axis=1, kind="stable")[:, :k]
+
+
+def test_exact_top_k_matches_brute_force_across_blocks(tmp_path):
+    corpus, queries, _ = _data()
+    np.save(tmp_path / "corpus.npy", corpus)
+    mapped = np.load(tmp_path / "corpus.npy", mmap_mode="r")
+
+    scores, ids = exact_top_k(queries, mapped, 10, query_block=64, corpus_block=700)
+
+    np.testing.assert_array_equal(ids, _brute_force(queries, corpus, 10))
+    assert (np.diff(scores, axis=1) <= 0).all()
+    assert exact_top_k(queries[:3], corpus[:4], 10)[1].shape == (3, 4)
+
+
+def test_ivf_index_is_exact_when_probing_every_list():
+    corpus, queries, _ = _data()
+    expected = _brute_force(queries, corpus, 5)
+
+    index = IVFIndex(n_lists=20, n_probe=20).build(corpus)
+    np.testing.assert_array_equal(index.search(queries, 5)[1], expected)
+
+    _, approx = index.search(queries, 5, n_probe=4)
+    overlap = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(approx, expected)])
+    assert 0.3 < overlap <= 1.0
+
+
+def test_evaluate_vector_retrieval_matches_retrieval_scores():
+    corpus, queries, targets = _data()
+    doc_ids = [f"d{i}" for i in range(len(corpus))]
+    relevant = [[doc_ids[t], "missing-doc"] if i % 3 == 0 else [doc_ids[t]] for i, t in enumerate(targets)]
+    relevant[1] = []
+    metrics = ["recall@10", "ndcg@10", "mrr", "map"]
+
+    results = evaluate_vector_retrieval(queries, corpus, relevant, metrics, doc_ids=doc_ids, return_per_query=True)
+
+    ranked = [[doc_ids[i] for i in row] for row in _brute_force(queries, corpus, 10)]
+    keep = [i for i, rel in enumerate(relevant) if rel]
+    expected = retrieval_scores(encode_hits([ranked[i] for i in keep], [relevant[i] for i in keep]), metrics)
+    for metric in metrics:
+        assert results[metric] == pytest.approx(expected[metric].mean())
+    assert np.isnan(results["per_query"]["mrr"][1])
+    # A relevant id outside the corpus caps recall at 1/2
+    assert results["per_query"]["recall@10"][0] <= 0.5
+
+    index = IVFIndex(n_lists=10, n_probe=10).build(corpus)
+    approx = evaluate_vector_retrieval(queries, corpus, relevant, metrics, doc_ids=doc_ids, index=index)
+    assert approx["ndcg@10"] == pytest.approx(results["ndcg@10"])